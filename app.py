@@ -37,8 +37,32 @@ import random
 from datetime import datetime, timedelta
 import hashlib
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from streamlit_javascript import st_javascript
 
+# Unified TMDB title loader (details + videos + providers in one request)
+from services.tmdb import get_title_details
+
+# Local title catalog (inverted index in front of TMDB search)
+from title_catalog import get_title_catalog
+
+# Genre bitmasks (prefer/avoid/mood checks are a single bitwise AND)
+from genre_registry import mask_from_ids, item_genre_mask
+
+# Mr.DP response cache (common first-turn prompts skip the API call)
+from mr_dp_cache import get_mr_dp_cache, MR_DP_CACHE_CONTENT_TTL
+
+# Offline Mr.DP intent/entity matcher (all keyword tables, one compiled pass)
+from mr_dp_intents import match_intents, extract_entities
+
+# Mr.DP crisis detection (shared by every Mr.DP entry point)
+from mr_dp_crisis import detect_crisis, CRISIS_MESSAGE
+
+# Mr.DP prompt builder (token budget, cacheable system prefix, rolling summary)
+from mr_dp_prompt import PromptBuilder
+
 # Mr.DP Floating Chat Widget
 from mr_dp_floating import render_floating_mr_dp, sanitize_chat_content
 
@@ -902,6 +926,12 @@ FEELING_TO_GENRES = {
     "Motivated": {"prefer": [18, 99, 36]},  # Drama, Documentary, History (inspiring)
 }
 
+# Same map as genre bitmasks, for filtering results we already have
+FEELING_GENRE_MASKS = {
+    feeling: {"prefer": mask_from_ids(prefs.get("prefer")), "avoid": mask_from_ids(prefs.get("avoid"))}
+    for feeling, prefs in FEELING_TO_GENRES.items()
+}
+
 # Music mood mappings
 FEELING_TO_MUSIC = {
     "Sad": {"query": "sad songs comfort healing", "playlist": "37i9dQZF1DX7qK8ma5wgG1", "genres": ["acoustic", "piano", "indie folk"]},
@@ -1199,6 +1229,7 @@ def _clean_movie_results(results):
             "backdrop": f"{TMDB_BACKDROP_URL}{item.get('backdrop_path', '')}" if item.get('backdrop_path') else None,
             "release_date": item.get("release_date") or item.get("first_air_date") or "",
             "vote_average": item.get("vote_average", 0),
+            "genre_mask": item_genre_mask(item),
         })
     return clean
 
@@ -1234,11 +1265,24 @@ def discover_movies(page=1, current_feeling=None, desired_feeling=None):
     except:
         return []
 
-@st.cache_data(ttl=3600)
+SEARCH_RESULTS_LIMIT = 20
+
 def search_movies(query, page=1):
-    api_key = get_tmdb_key()
-    if not api_key or not query:
+    """
+    Title search - answered from the local title catalog when it can,
+    TMDB /search/multi only on a miss (the response is fed back into the catalog).
+    The catalog is process-wide, so it replaces the per-query st.cache_data entry.
+    """
+    if not query:
         return []
+    catalog = get_title_catalog()
+    if page == 1:
+        local = catalog.lookup(query, limit=SEARCH_RESULTS_LIMIT)
+        if local is not None:
+            return _clean_movie_results(local)
+    api_key = get_tmdb_key()
+    if not api_key:
+        return _clean_movie_results(catalog.search(query, limit=SEARCH_RESULTS_LIMIT)) if page == 1 else []
     try:
         r = requests.get(
             f"{TMDB_BASE_URL}/search/multi",
@@ -1247,45 +1291,27 @@ def search_movies(query, page=1):
         )
         r.raise_for_status()
         results = [item for item in r.json().get("results", []) if item.get("media_type") in ["movie", "tv"]]
-        return _clean_movie_results(results)
+        catalog.add_many(results)
+        if page != 1:
+            return _clean_movie_results(results)
+        catalog.mark_backfilled(query)
+        # Catalog ranking first, then TMDB matches it can't see (alternate titles)
+        ranked = catalog.search(query, limit=SEARCH_RESULTS_LIMIT)
+        seen = {(item.get("media_type"), item.get("id")) for item in ranked}
+        ranked += [item for item in results if (item["media_type"], item.get("id")) not in seen]
+        return _clean_movie_results(ranked)[:SEARCH_RESULTS_LIMIT]
     except:
         return []
 
-@st.cache_data(ttl=86400)
 def get_movie_providers(tmdb_id, media_type):
     """Get streaming providers from TMDB with availability data."""
     api_key = get_tmdb_key()
-    if not api_key:
-        return [], None
-    try:
-        r = requests.get(
-            f"{TMDB_BASE_URL}/{media_type}/{tmdb_id}/watch/providers",
-            params={"api_key": api_key},
-            timeout=8
-        )
-        r.raise_for_status()
-        data = r.json().get("results", {}).get("US", {})
-        
-        # Get the official TMDB watch page link (has real deep links via JustWatch)
-        tmdb_watch_link = f"https://www.themoviedb.org/{media_type}/{tmdb_id}/watch?locale=US"
-        
-        # Combine flatrate (subscription) and rent options
-        providers = []
-        
-        # Subscription services first (flatrate)
-        for p in data.get("flatrate", []):
-            p["availability"] = "stream"  # Available with subscription
-            providers.append(p)
-        
-        # Rent/buy options
-        for p in data.get("rent", []):
-            if not any(existing["provider_id"] == p["provider_id"] for existing in providers):
-                p["availability"] = "rent"
-                providers.append(p)
-        
-        return providers[:8], tmdb_watch_link
-    except:
+    details = get_title_details(tmdb_id, media_type, api_key=api_key) if api_key else None
+    if not details:
         return [], None
+    # Subscription services first (flatrate), then rent options - with the
+    # official TMDB watch page link (real deep links via JustWatch)
+    return details["providers"], details["watch_link"]
 
 
 def get_movie_deep_link(provider_name, title, tmdb_id=None, media_type="movie"):
@@ -1346,30 +1372,73 @@ def get_movie_trailer(tmdb_id, media_type="movie"):
     api_key = get_tmdb_key()
     if not api_key or not tmdb_id:
         return None
-    try:
-        r = requests.get(
-            f"{TMDB_BASE_URL}/{media_type}/{tmdb_id}/videos",
-            params={"api_key": api_key},
-            timeout=8
-        )
-        r.raise_for_status()
-        videos = r.json().get("results", [])
-        # Prioritize: Official Trailer > Trailer > Teaser
-        for video in videos:
-            if video.get("site") == "YouTube" and video.get("type") == "Trailer" and "official" in video.get("name", "").lower():
-                return video.get("key")
-        for video in videos:
-            if video.get("site") == "YouTube" and video.get("type") == "Trailer":
-                return video.get("key")
-        for video in videos:
-            if video.get("site") == "YouTube" and video.get("type") == "Teaser":
-                return video.get("key")
-        for video in videos:
-            if video.get("site") == "YouTube":
-                return video.get("key")
-        return None
-    except:
-        return None
+    details = get_title_details(tmdb_id, media_type, api_key=api_key)
+    return details.get("trailer_key") if details else None
+
+# --------------------------------------------------
+# 8.1 CARD MEDIA PREFETCH (providers + trailers for a whole grid)
+# --------------------------------------------------
+CARD_PREFETCH_WORKERS = 8
+
+def prefetch_card_media(items, show_providers=True, enable_preview=True):
+    """
+    Fetch watch providers and trailer keys for a whole grid of cards at once.
+
+    Runs the (cached) get_title_details lookups - one append_to_response
+    request per title - in parallel on a bounded thread pool, warms the
+    st.cache_data entries, and attaches the result to each item as
+    item["_card_media"] so render_movie_card doesn't make any blocking calls.
+    One round-trip for the whole feed instead of ~2 per card.
+    """
+    if not items or not (show_providers or enable_preview):
+        return items
+
+    # Unique (id, type) pairs still missing data
+    pending = {}
+    for item in items:
+        tmdb_id = item.get("id")
+        if not tmdb_id or "_card_media" in item:
+            continue
+        pending.setdefault((tmdb_id, item.get("type", "movie")), []).append(item)
+
+    if not pending:
+        return items
+
+    # Worker threads need the script context to use st.cache_data
+    ctx = get_script_run_ctx()
+
+    def _attach_ctx():
+        add_script_run_ctx(threading.current_thread(), ctx)
+
+    api_key = get_tmdb_key()
+    if not api_key:
+        return items
+
+    with ThreadPoolExecutor(max_workers=CARD_PREFETCH_WORKERS, initializer=_attach_ctx) as pool:
+        futures = {
+            key: pool.submit(get_title_details, key[0], key[1], api_key=api_key)
+            for key in pending
+        }
+
+    for key, future in futures.items():
+        try:
+            details = future.result() or {}
+        except Exception as e:
+            print(f"Card prefetch error: {e}")
+            details = {}
+
+        media = {}
+        if show_providers:
+            media["providers"] = details.get("providers", [])
+            media["watch_link"] = details.get("watch_link")
+        if enable_preview:
+            media["trailer_key"] = details.get("trailer_key")
+
+        for item in pending[key]:
+            item["_card_media"] = media
+
+    return items
+
 
 # --------------------------------------------------
 # 9. MR.DP - CONVERSATIONAL AI CURATOR 🧾
@@ -1612,6 +1681,8 @@ User: "scare me" or "I want horror"
 
 Remember: Be genuine, warm, and helpful. You're not just finding content - you're helping someone feel better. ALWAYS match the mood they want to the appropriate content - if they want happy, give them happy content, not random stuff!"""
 
+MR_DP_PROMPT_V1 = PromptBuilder(MR_DP_SYSTEM_PROMPT, "gpt-4o-mini")
+
 def ask_mr_dp(user_prompt, chat_history=None):
     """
     Full conversational AI response from Mr.DP using GPT-4.
@@ -1623,18 +1694,14 @@ def ask_mr_dp(user_prompt, chat_history=None):
 
     # Try GPT first for natural conversation
     if openai_client:
+        cache = None if detect_crisis(user_prompt) else get_mr_dp_cache()   # crisis wording is always answered fresh
+        if cache:
+            cached = cache.get("v1", user_prompt, history=chat_history)
+            if cached is not None:
+                return cached
         try:
-            # Build messages with conversation history for memory
-            messages = [{"role": "system", "content": MR_DP_SYSTEM_PROMPT}]
-            if chat_history:
-                # Include last 10 messages for context (limit tokens)
-                for msg in chat_history[-10:]:
-                    if msg["role"] == "user":
-                        messages.append({"role": "user", "content": msg["content"]})
-                    else:
-                        # Re-wrap assistant messages as simple text so GPT understands context
-                        messages.append({"role": "assistant", "content": msg["content"]})
-            messages.append({"role": "user", "content": user_prompt})
+            # Conversation memory: recent turns verbatim, older ones summarized, within the token budget
+            messages = MR_DP_PROMPT_V1.build(user_prompt, chat_history)
 
             response = openai_client.chat.completions.create(
                 model="gpt-4o-mini",
@@ -1644,6 +1711,7 @@ def ask_mr_dp(user_prompt, chat_history=None):
                 response_format={"type": "json_object"}
             )
 
+            MR_DP_PROMPT_V1.record_usage(response.usage)
             content = response.choices[0].message.content.strip()
 
             # Parse JSON from response - handle multiple formats
@@ -1701,6 +1769,8 @@ def ask_mr_dp(user_prompt, chat_history=None):
             if result["media_type"] not in ["movies", "music", "podcasts", "audiobooks", "shorts", "artist"]:
                 result["media_type"] = "movies"
 
+            if cache:
+                cache.put("v1", user_prompt, result, history=chat_history)
             return result
 
         except Exception as e:
@@ -1710,308 +1780,225 @@ def ask_mr_dp(user_prompt, chat_history=None):
     # Fallback: Heuristic-based response
     return heuristic_mr_dp(user_prompt)
 
+
+# Offline Mr.DP replies, keyed by what mr_dp_intents detected
+MR_DP_MEDIA_DEFAULTS = {
+    "movies": {"icon": "🎬", "default_msg": "Let me find something perfect for your vibe!", "default_genres": "popular films, crowd-pleasers"},
+    "music": {"icon": "🎵", "default_msg": "Let me find the perfect tunes for you!", "default_genres": "popular hits"},
+    "podcasts": {"icon": "🎙️", "default_msg": "Let me find some great podcasts for you!", "default_genres": "engaging shows, storytelling"},
+    "audiobooks": {"icon": "📚", "default_msg": "Let me find a great audiobook for you!", "default_genres": "bestsellers, engaging narration"},
+    "shorts": {"icon": "⚡", "default_msg": "Quick dopamine hits coming up!", "default_genres": "viral, entertaining, trending"},
+    "artist": {"icon": "🎤", "default_msg": "Let me pull up that artist!", "default_genres": "artist discography"},
+}
+
+# Current feeling -> reply per media type (keywords and targets live in mr_dp_intents)
+MR_DP_FEELING_RESPONSES = {
+    "Bored": {
+        "messages": {
+            "movies": "The boredom struggle is real! Let me find something that'll actually grab your attention 🎬",
+            "music": "The boredom struggle is real! Let me queue up some bangers 🎵",
+            "podcasts": "Boredom be gone! I've got some engaging podcasts that'll hook you 🎙️",
+            "audiobooks": "Time to escape! Here's an audiobook that'll transport you 📚",
+            "shorts": "Quick fix incoming! Here's some content that'll snap you out of it ⚡",
+        }
+    },
+    "Stressed": {
+        "messages": {
+            "movies": "Deep breath - time for some gentle, relaxing vibes 🌿",
+            "music": "Deep breath - I've got calming tunes to help you decompress 🌿",
+            "podcasts": "Let's ease that stress with some soothing content 🌿",
+            "audiobooks": "Escape the stress with a calming listen 🌿",
+            "shorts": "Some satisfying, calming shorts to melt that stress away 🌿",
+        }
+    },
+    "Anxious": {
+        "messages": {
+            "movies": "Anxiety is tough. Here's something comforting and soothing 💫",
+            "music": "I've got calming music to ease that anxiety 💫",
+            "podcasts": "Here are some calming podcasts for when anxiety hits 💫",
+            "audiobooks": "A gentle audiobook to help you feel grounded 💫",
+            "shorts": "Oddly satisfying content to calm those nerves 💫",
+        }
+    },
+    "Sad": {
+        "messages": {
+            "movies": "Sending virtual hugs 🫂 Here's something warm and uplifting.",
+            "music": "Sending hugs 🫂 Sometimes you need music that understands.",
+            "podcasts": "Here's some comforting voices to keep you company 🫂",
+            "audiobooks": "A story to wrap around you like a blanket 🫂",
+            "shorts": "Wholesome content to lift your spirits 🫂",
+        }
+    },
+    "Tired": {
+        "messages": {
+            "movies": "Running on empty? Easy-watching picks that won't drain you 😴",
+            "music": "Chill vibes for when you're running on empty 😴",
+            "podcasts": "Light, easy listening for tired ears 😴",
+            "audiobooks": "Something gentle for tired minds 😴",
+            "shorts": "Low-effort content for when you're drained 😴",
+        }
+    },
+    "Scared": {
+        "messages": {
+            "movies": "Ooh, feeling brave! Let me find some quality scares for you 👻",
+            "music": "Dark and eerie vibes coming right up 🎃",
+            "podcasts": "Creepy podcasts that'll give you chills 👻",
+            "audiobooks": "Spine-tingling stories to keep you up at night 🌙",
+            "shorts": "Jump scares and creepy content incoming! 😱",
+        }
+    },
+    "Nostalgic": {
+        "messages": {
+            "movies": "Taking you back in time! Classic vibes incoming 🥹",
+            "music": "Time machine activated! Here's some throwback hits 📼",
+            "podcasts": "Nostalgic conversations about the good old days 🥹",
+            "audiobooks": "Stories that'll take you back 📼",
+            "shorts": "Throwback content for the feels! 🥹",
+        }
+    },
+    "Romantic": {
+        "messages": {
+            "movies": "Love is in the air! Here's some swoon-worthy picks 💕",
+            "music": "Setting the mood with romantic tunes 💕",
+            "podcasts": "Love stories and relationship wisdom 💕",
+            "audiobooks": "Romance that'll make your heart flutter 💕",
+            "shorts": "Cute couples and romantic moments 💕",
+        }
+    },
+    "Adventurous": {
+        "messages": {
+            "movies": "Adventure awaits! Let's explore new worlds 🏔️",
+            "music": "Epic soundtracks for your next adventure 🏔️",
+            "podcasts": "Travel stories and wild adventures 🏔️",
+            "audiobooks": "Epic journeys and explorations 🏔️",
+            "shorts": "Amazing places and adventures to inspire you 🏔️",
+        }
+    },
+    "Frustrated": {
+        "messages": {
+            "movies": "I feel you! Let's find something to take the edge off 😤",
+            "music": "Let's channel that energy! 😤",
+            "podcasts": "Something to help you vent and relax 😤",
+            "audiobooks": "An escape from the frustration 😤",
+            "shorts": "Satisfying karma videos to make you feel better 😤",
+        }
+    },
+    "Hopeful": {
+        "messages": {
+            "movies": "Keeping that hope alive with inspiring stories 🌈",
+            "music": "Uplifting tunes to keep you going 🌈",
+            "podcasts": "Inspiring conversations and success stories 🌈",
+            "audiobooks": "Stories of triumph and perseverance 🌈",
+            "shorts": "Inspiring transformations and success stories 🌈",
+        }
+    },
+}
+
+# Desire keyword -> reply and media-specific genres
+MR_DP_DESIRE_RESPONSES = {
+    "laugh": {"message": "Say no more! Comedy incoming 😂", 
+              "genres": {"movies": "comedies, funny films", "music": "funny songs", "podcasts": "comedy podcasts, funny shows", "audiobooks": "humorous books", "shorts": "comedy, fails, funny"}},
+    "funny": {"message": "Let's get those laughs going! 🎭",
+              "genres": {"movies": "comedies, witty films", "music": "comedy, funny", "podcasts": "comedy podcasts", "audiobooks": "humorous books", "shorts": "comedy, fails"}},
+    "relax": {"message": "Chill mode activated ✨",
+              "genres": {"movies": "calming films", "music": "ambient, chill, lo-fi", "podcasts": "calm, soothing shows", "audiobooks": "peaceful fiction", "shorts": "satisfying, ASMR, calming"}},
+    "focus": {"message": "Lock-in mode activated! 🎯",
+              "genres": {"movies": "documentaries", "music": "lo-fi beats, focus music", "podcasts": "educational, learning", "audiobooks": "non-fiction, productivity", "shorts": "focus tips, productivity"}},
+    "sleep": {"message": "Sweet dreams incoming 🌙",
+              "genres": {"movies": "gentle films", "music": "sleep sounds, ambient", "podcasts": "sleep stories, bedtime", "audiobooks": "gentle narration, fiction", "shorts": "rain sounds, ASMR"}},
+    "energy": {"message": "Let's boost that energy! ⚡",
+              "genres": {"movies": "action, adventure", "music": "upbeat, EDM, dance", "podcasts": "motivation, hype", "audiobooks": "inspiring, motivation", "shorts": "hype, motivation, workout"}},
+    "workout": {"message": "Let's get those gains! 💪",
+              "genres": {"movies": "sports films", "music": "workout anthems, EDM", "podcasts": "fitness, motivation", "audiobooks": "sports, discipline", "shorts": "workout, fitness, gym"}},
+    "motivat": {"message": "Let's get motivated! 🌟",
+              "genres": {"movies": "inspiring true stories", "music": "motivational, uplifting", "podcasts": "success stories, motivation", "audiobooks": "self-help, success", "shorts": "motivation, success, transformation"}},
+    "learn": {"message": "Knowledge time! 🧠",
+              "genres": {"movies": "documentaries", "music": "classical, focus", "podcasts": "educational, science", "audiobooks": "non-fiction, learning", "shorts": "facts, explained, science"}},
+    "scared": {"message": "Ooh feeling brave! Spooky content incoming 👻",
+              "genres": {"movies": "horror, thriller", "music": "dark ambient, eerie", "podcasts": "true crime, horror stories", "audiobooks": "horror, thriller", "shorts": "scary, horror, jumpscare"}},
+    "spooky": {"message": "Let's get creepy! 🎃",
+              "genres": {"movies": "horror, supernatural", "music": "spooky, halloween", "podcasts": "paranormal, horror", "audiobooks": "ghost stories, horror", "shorts": "creepy, scary, paranormal"}},
+    "thrill": {"message": "Adrenaline time! 🎢",
+              "genres": {"movies": "thriller, action", "music": "intense, epic", "podcasts": "true crime, suspense", "audiobooks": "thriller, suspense", "shorts": "extreme, thrilling, intense"}},
+    "nostalg": {"message": "Taking you back in time! 🥹",
+              "genres": {"movies": "classic films, retro", "music": "throwback hits, oldies", "podcasts": "90s, 2000s, retro", "audiobooks": "classic literature", "shorts": "throwback, nostalgia, 90s 2000s"}},
+    "romantic": {"message": "Love is in the air! 💕",
+              "genres": {"movies": "romance, romantic comedy", "music": "love songs, R&B", "podcasts": "love stories, relationship", "audiobooks": "romance novels", "shorts": "cute couples, romantic"}},
+    "love": {"message": "Swoon-worthy picks coming up! 💕",
+              "genres": {"movies": "romance, love stories", "music": "love ballads, romantic", "podcasts": "love, relationships", "audiobooks": "romance", "shorts": "couples, love, romantic"}},
+    "adventure": {"message": "Adventure awaits! 🏔️",
+              "genres": {"movies": "adventure, exploration", "music": "epic, cinematic", "podcasts": "travel, adventure", "audiobooks": "adventure, travel", "shorts": "travel, explore, adventure"}},
+    "amuse": {"message": "Let's get those giggles! 😂",
+              "genres": {"movies": "comedy, funny", "music": "fun, upbeat", "podcasts": "comedy, humor", "audiobooks": "comedy, humor", "shorts": "funny, fails, comedy"}},
+    "creepy": {"message": "Getting creepy! 👀",
+              "genres": {"movies": "horror, psychological", "music": "dark, eerie", "podcasts": "creepypasta, horror", "audiobooks": "horror, dark", "shorts": "creepy, unsettling, horror"}},
+    "scare me": {"message": "You asked for it! 😱",
+              "genres": {"movies": "horror, jump scares", "music": "horror soundtrack", "podcasts": "scary stories", "audiobooks": "horror", "shorts": "jumpscare, scary, horror"}},
+    "feel scared": {"message": "Brave mode ON! Let's get spooky 👻",
+              "genres": {"movies": "horror, thriller", "music": "dark ambient", "podcasts": "horror, true crime", "audiobooks": "horror, thriller", "shorts": "scary, creepy, horror"}},
+}
+
+MR_DP_NAME_PATTERN = re.compile(r'\b[A-Z][a-z]+ [A-Z][a-z]+\b')
+
+
 def heuristic_mr_dp(prompt):
     """
     Fallback heuristic when GPT is unavailable.
     Detects media type and provides conversational responses based on keyword matching.
     """
     t = (prompt or "").lower()
-    
-    current, desired, message, mode, query, genres = None, None, "", "discover", "", ""
-    media_type = "movies"  # Default to movies
-    
-    # Detect media type priority (most specific first)
-    
-    # Check for specific artist request (e.g. "play Drake", "Taylor Swift music")
-    artist_patterns = ["play ", "listen to ", "put on ", "songs by ", "music by "]
-    popular_artists = [
-        # Pop/Hip-Hop
-        "drake", "taylor swift", "kendrick", "beyonce", "kanye", "travis scott", "bad bunny", 
-        "weeknd", "doja cat", "sza", "dua lipa", "billie eilish", "ed sheeran", "ariana grande",
-        "post malone", "harry styles", "olivia rodrigo", "morgan wallen", "luke combs", "eminem",
-        "rihanna", "bruno mars", "coldplay", "imagine dragons", "maroon 5", "adele", "shakira",
-        # Rock/Metal
-        "metallica", "led zeppelin", "pink floyd", "queen", "ac/dc", "acdc", "guns n roses",
-        "nirvana", "foo fighters", "linkin park", "green day", "blink 182", "fall out boy",
-        "panic at the disco", "my chemical romance", "slipknot", "avenged sevenfold",
-        "iron maiden", "black sabbath", "megadeth", "slayer", "pantera", "tool",
-        "red hot chili peppers", "pearl jam", "soundgarden", "alice in chains",
-        # Classic/Other
-        "the beatles", "beatles", "rolling stones", "david bowie", "prince", "michael jackson",
-        "elton john", "fleetwood mac", "eagles", "u2", "radiohead", "oasis", "arctic monkeys"
-    ]
-    
-    # Check for artist mentions
-    for artist in popular_artists:
-        if artist in t:
-            media_type = "artist"
-            query = artist.title()
-            message = f"Great taste! Loading up {artist.title()}'s hits! 🎤"
-            desired = "Entertained"
-            genres = "artist discography"
-            break
-    
-    # Check for artist patterns like "play X" or "listen to X"
-    if media_type != "artist":
-        for pattern in artist_patterns:
-            if pattern in t:
-                # Extract what comes after the pattern
-                idx = t.find(pattern) + len(pattern)
-                remaining = t[idx:].strip()
-                # Take first 2-3 words as artist name
-                words = remaining.split()[:3]
-                if words:
-                    potential_artist = " ".join(words).strip(".,!?")
-                    if len(potential_artist) > 2 and potential_artist not in ["some", "something", "music", "songs", "a"]:
-                        media_type = "artist"
-                        query = potential_artist.title()
-                        message = f"Let me pull up {potential_artist.title()} for you! 🎤"
-                        desired = "Entertained"
-                        genres = "artist discography"
-                        break
-    
-    # Check for shorts/short videos
-    if media_type == "movies":
-        shorts_keywords = ["shorts", "short video", "tiktok", "reels", "quick video", "clips", "viral video",
-                          "satisfying", "asmr video", "quick dopamine", "scroll"]
-        if any(k in t for k in shorts_keywords):
-            media_type = "shorts"
-    
-    # Check for podcasts
-    if media_type == "movies":
-        podcast_keywords = ["podcast", "podcasts", "episode", "episodes", "listen to talk", "talk show",
-                           "interview", "conversations", "joe rogan", "lex fridman", "true crime podcast"]
-        if any(k in t for k in podcast_keywords):
-            media_type = "podcasts"
-    
-    # Check for audiobooks
-    if media_type == "movies":
-        audiobook_keywords = ["audiobook", "audiobooks", "audio book", "listen to a book", "book to listen",
-                             "audible", "read to me", "narrated book", "spoken book"]
-        if any(k in t for k in audiobook_keywords):
-            media_type = "audiobooks"
-    
-    # Check for music (but not artist - that's already handled)
-    if media_type == "movies":
-        music_keywords = ["music", "song", "songs", "playlist", "beats", "tunes", "track", "tracks", 
-                          "album", "melody", "lo-fi", "lofi", "workout music", "study music", 
-                          "focus music", "chill music", "sad songs", "happy songs"]
-        if any(k in t for k in music_keywords):
-            media_type = "music"
-    
-    # Media type specific defaults
-    media_defaults = {
-        "movies": {"icon": "🎬", "default_msg": "Let me find something perfect for your vibe!", "default_genres": "popular films, crowd-pleasers"},
-        "music": {"icon": "🎵", "default_msg": "Let me find the perfect tunes for you!", "default_genres": "popular hits"},
-        "podcasts": {"icon": "🎙️", "default_msg": "Let me find some great podcasts for you!", "default_genres": "engaging shows, storytelling"},
-        "audiobooks": {"icon": "📚", "default_msg": "Let me find a great audiobook for you!", "default_genres": "bestsellers, engaging narration"},
-        "shorts": {"icon": "⚡", "default_msg": "Quick dopamine hits coming up!", "default_genres": "viral, entertaining, trending"},
-        "artist": {"icon": "🎤", "default_msg": "Let me pull up that artist!", "default_genres": "artist discography"},
-    }
-    
-    # Detect current feeling
-    feeling_responses = {
-        "Bored": {
-            "keywords": ["bored", "boring", "nothing to watch", "meh", "blah", "dull"],
-            "desired": "Entertained",
-            "messages": {
-                "movies": "The boredom struggle is real! Let me find something that'll actually grab your attention 🎬",
-                "music": "The boredom struggle is real! Let me queue up some bangers 🎵",
-                "podcasts": "Boredom be gone! I've got some engaging podcasts that'll hook you 🎙️",
-                "audiobooks": "Time to escape! Here's an audiobook that'll transport you 📚",
-                "shorts": "Quick fix incoming! Here's some content that'll snap you out of it ⚡",
-            }
-        },
-        "Stressed": {
-            "keywords": ["stress", "overwhelm", "too much", "burnout", "pressure"],
-            "desired": "Relaxed",
-            "messages": {
-                "movies": "Deep breath - time for some gentle, relaxing vibes 🌿",
-                "music": "Deep breath - I've got calming tunes to help you decompress 🌿",
-                "podcasts": "Let's ease that stress with some soothing content 🌿",
-                "audiobooks": "Escape the stress with a calming listen 🌿",
-                "shorts": "Some satisfying, calming shorts to melt that stress away 🌿",
-            }
-        },
-        "Anxious": {
-            "keywords": ["anxious", "anxiety", "nervous", "worried", "panic"],
-            "desired": "Calm",
-            "messages": {
-                "movies": "Anxiety is tough. Here's something comforting and soothing 💫",
-                "music": "I've got calming music to ease that anxiety 💫",
-                "podcasts": "Here are some calming podcasts for when anxiety hits 💫",
-                "audiobooks": "A gentle audiobook to help you feel grounded 💫",
-                "shorts": "Oddly satisfying content to calm those nerves 💫",
-            }
-        },
-        "Sad": {
-            "keywords": ["sad", "down", "depressed", "crying", "upset", "heartbr", "grief"],
-            "desired": "Comforted",
-            "messages": {
-                "movies": "Sending virtual hugs 🫂 Here's something warm and uplifting.",
-                "music": "Sending hugs 🫂 Sometimes you need music that understands.",
-                "podcasts": "Here's some comforting voices to keep you company 🫂",
-                "audiobooks": "A story to wrap around you like a blanket 🫂",
-                "shorts": "Wholesome content to lift your spirits 🫂",
-            }
-        },
-        "Tired": {
-            "keywords": ["tired", "exhaust", "drained", "sleepy", "no energy", "wiped"],
-            "desired": "Relaxed",
-            "messages": {
-                "movies": "Running on empty? Easy-watching picks that won't drain you 😴",
-                "music": "Chill vibes for when you're running on empty 😴",
-                "podcasts": "Light, easy listening for tired ears 😴",
-                "audiobooks": "Something gentle for tired minds 😴",
-                "shorts": "Low-effort content for when you're drained 😴",
-            }
-        },
-        "Scared": {
-            "keywords": ["scared", "spooky", "horror", "creepy", "terrif", "frighten"],
-            "desired": "Scared",
-            "messages": {
-                "movies": "Ooh, feeling brave! Let me find some quality scares for you 👻",
-                "music": "Dark and eerie vibes coming right up 🎃",
-                "podcasts": "Creepy podcasts that'll give you chills 👻",
-                "audiobooks": "Spine-tingling stories to keep you up at night 🌙",
-                "shorts": "Jump scares and creepy content incoming! 😱",
-            }
-        },
-        "Nostalgic": {
-            "keywords": ["nostalg", "throwback", "miss", "remember", "old times", "childhood", "90s", "2000s"],
-            "desired": "Nostalgic",
-            "messages": {
-                "movies": "Taking you back in time! Classic vibes incoming 🥹",
-                "music": "Time machine activated! Here's some throwback hits 📼",
-                "podcasts": "Nostalgic conversations about the good old days 🥹",
-                "audiobooks": "Stories that'll take you back 📼",
-                "shorts": "Throwback content for the feels! 🥹",
-            }
-        },
-        "Romantic": {
-            "keywords": ["romantic", "love", "date night", "cuddle", "partner", "valentine"],
-            "desired": "Romantic",
-            "messages": {
-                "movies": "Love is in the air! Here's some swoon-worthy picks 💕",
-                "music": "Setting the mood with romantic tunes 💕",
-                "podcasts": "Love stories and relationship wisdom 💕",
-                "audiobooks": "Romance that'll make your heart flutter 💕",
-                "shorts": "Cute couples and romantic moments 💕",
-            }
-        },
-        "Adventurous": {
-            "keywords": ["adventure", "explore", "travel", "wild", "spontan"],
-            "desired": "Adventurous",
-            "messages": {
-                "movies": "Adventure awaits! Let's explore new worlds 🏔️",
-                "music": "Epic soundtracks for your next adventure 🏔️",
-                "podcasts": "Travel stories and wild adventures 🏔️",
-                "audiobooks": "Epic journeys and explorations 🏔️",
-                "shorts": "Amazing places and adventures to inspire you 🏔️",
-            }
-        },
-        "Frustrated": {
-            "keywords": ["frustrat", "ugh", "annoyed", "irritat", "fed up"],
-            "desired": "Calm",
-            "messages": {
-                "movies": "I feel you! Let's find something to take the edge off 😤",
-                "music": "Let's channel that energy! 😤",
-                "podcasts": "Something to help you vent and relax 😤",
-                "audiobooks": "An escape from the frustration 😤",
-                "shorts": "Satisfying karma videos to make you feel better 😤",
-            }
-        },
-        "Hopeful": {
-            "keywords": ["hope", "optimist", "looking up", "better", "positive"],
-            "desired": "Inspired",
-            "messages": {
-                "movies": "Keeping that hope alive with inspiring stories 🌈",
-                "music": "Uplifting tunes to keep you going 🌈",
-                "podcasts": "Inspiring conversations and success stories 🌈",
-                "audiobooks": "Stories of triumph and perseverance 🌈",
-                "shorts": "Inspiring transformations and success stories 🌈",
-            }
-        },
-    }
-    
-    # Check for feeling matches
-    for feeling, data in feeling_responses.items():
-        if any(k in t for k in data["keywords"]):
-            current = feeling
-            desired = data["desired"]
-            message = data["messages"].get(media_type, data["messages"]["movies"])
-            break
-    
-    # Check for desired feeling keywords with media-specific genres
-    desire_responses = {
-        "laugh": {"desired": "Entertained", "message": "Say no more! Comedy incoming 😂", 
-                  "genres": {"movies": "comedies, funny films", "music": "funny songs", "podcasts": "comedy podcasts, funny shows", "audiobooks": "humorous books", "shorts": "comedy, fails, funny"}},
-        "funny": {"desired": "Entertained", "message": "Let's get those laughs going! 🎭",
-                  "genres": {"movies": "comedies, witty films", "music": "comedy, funny", "podcasts": "comedy podcasts", "audiobooks": "humorous books", "shorts": "comedy, fails"}},
-        "relax": {"desired": "Relaxed", "message": "Chill mode activated ✨",
-                  "genres": {"movies": "calming films", "music": "ambient, chill, lo-fi", "podcasts": "calm, soothing shows", "audiobooks": "peaceful fiction", "shorts": "satisfying, ASMR, calming"}},
-        "focus": {"desired": "Focused", "message": "Lock-in mode activated! 🎯",
-                  "genres": {"movies": "documentaries", "music": "lo-fi beats, focus music", "podcasts": "educational, learning", "audiobooks": "non-fiction, productivity", "shorts": "focus tips, productivity"}},
-        "sleep": {"desired": "Sleepy", "message": "Sweet dreams incoming 🌙",
-                  "genres": {"movies": "gentle films", "music": "sleep sounds, ambient", "podcasts": "sleep stories, bedtime", "audiobooks": "gentle narration, fiction", "shorts": "rain sounds, ASMR"}},
-        "energy": {"desired": "Energized", "message": "Let's boost that energy! ⚡",
-                  "genres": {"movies": "action, adventure", "music": "upbeat, EDM, dance", "podcasts": "motivation, hype", "audiobooks": "inspiring, motivation", "shorts": "hype, motivation, workout"}},
-        "workout": {"desired": "Energized", "message": "Let's get those gains! 💪",
-                  "genres": {"movies": "sports films", "music": "workout anthems, EDM", "podcasts": "fitness, motivation", "audiobooks": "sports, discipline", "shorts": "workout, fitness, gym"}},
-        "motivat": {"desired": "Motivated", "message": "Let's get motivated! 🌟",
-                  "genres": {"movies": "inspiring true stories", "music": "motivational, uplifting", "podcasts": "success stories, motivation", "audiobooks": "self-help, success", "shorts": "motivation, success, transformation"}},
-        "learn": {"desired": "Curious", "message": "Knowledge time! 🧠",
-                  "genres": {"movies": "documentaries", "music": "classical, focus", "podcasts": "educational, science", "audiobooks": "non-fiction, learning", "shorts": "facts, explained, science"}},
-        # NEW FEELINGS
-        "scared": {"desired": "Scared", "message": "Ooh feeling brave! Spooky content incoming 👻",
-                  "genres": {"movies": "horror, thriller", "music": "dark ambient, eerie", "podcasts": "true crime, horror stories", "audiobooks": "horror, thriller", "shorts": "scary, horror, jumpscare"}},
-        "spooky": {"desired": "Scared", "message": "Let's get creepy! 🎃",
-                  "genres": {"movies": "horror, supernatural", "music": "spooky, halloween", "podcasts": "paranormal, horror", "audiobooks": "ghost stories, horror", "shorts": "creepy, scary, paranormal"}},
-        "thrill": {"desired": "Thrilled", "message": "Adrenaline time! 🎢",
-                  "genres": {"movies": "thriller, action", "music": "intense, epic", "podcasts": "true crime, suspense", "audiobooks": "thriller, suspense", "shorts": "extreme, thrilling, intense"}},
-        "nostalg": {"desired": "Nostalgic", "message": "Taking you back in time! 🥹",
-                  "genres": {"movies": "classic films, retro", "music": "throwback hits, oldies", "podcasts": "90s, 2000s, retro", "audiobooks": "classic literature", "shorts": "throwback, nostalgia, 90s 2000s"}},
-        "romantic": {"desired": "Romantic", "message": "Love is in the air! 💕",
-                  "genres": {"movies": "romance, romantic comedy", "music": "love songs, R&B", "podcasts": "love stories, relationship", "audiobooks": "romance novels", "shorts": "cute couples, romantic"}},
-        "love": {"desired": "Romantic", "message": "Swoon-worthy picks coming up! 💕",
-                  "genres": {"movies": "romance, love stories", "music": "love ballads, romantic", "podcasts": "love, relationships", "audiobooks": "romance", "shorts": "couples, love, romantic"}},
-        "adventure": {"desired": "Adventurous", "message": "Adventure awaits! 🏔️",
-                  "genres": {"movies": "adventure, exploration", "music": "epic, cinematic", "podcasts": "travel, adventure", "audiobooks": "adventure, travel", "shorts": "travel, explore, adventure"}},
-        "amuse": {"desired": "Amused", "message": "Let's get those giggles! 😂",
-                  "genres": {"movies": "comedy, funny", "music": "fun, upbeat", "podcasts": "comedy, humor", "audiobooks": "comedy, humor", "shorts": "funny, fails, comedy"}},
-        "creepy": {"desired": "Scared", "message": "Getting creepy! 👀",
-                  "genres": {"movies": "horror, psychological", "music": "dark, eerie", "podcasts": "creepypasta, horror", "audiobooks": "horror, dark", "shorts": "creepy, unsettling, horror"}},
-        "scare me": {"desired": "Scared", "message": "You asked for it! 😱",
-                  "genres": {"movies": "horror, jump scares", "music": "horror soundtrack", "podcasts": "scary stories", "audiobooks": "horror", "shorts": "jumpscare, scary, horror"}},
-        "feel scared": {"desired": "Scared", "message": "Brave mode ON! Let's get spooky 👻",
-                  "genres": {"movies": "horror, thriller", "music": "dark ambient", "podcasts": "horror, true crime", "audiobooks": "horror, thriller", "shorts": "scary, creepy, horror"}},
-    }
-    
-    for keyword, data in desire_responses.items():
-        if keyword in t:
-            if not desired:
-                desired = data["desired"]
-            if not message:
-                message = data["message"]
-            if not genres:
-                genres = data["genres"].get(media_type, data["genres"]["movies"])
-            if not current:
-                current = "Bored"
-            break
-    
+    if detect_crisis(t):
+        return {
+            "message": CRISIS_MESSAGE,
+            "current_feeling": "Overwhelmed",
+            "desired_feeling": "Comforted",
+            "media_type": "movies",
+            "mode": "discover",
+            "search_query": "",
+            "genres": ""
+        }
+
+    match = match_intents(t)
+    entities = extract_entities(match)
+
+    media_type = entities["media_type"]
+    current, desired = entities["current_feeling"], entities["desired_feeling"]
+    message, mode, query, genres = "", "discover", "", ""
+
+    # Specific artist ("Taylor Swift music") or "play X" / "listen to X"
+    if media_type == "artist":
+        query = entities["artist"].title()
+        if entities["artist"] == match.first("artist"):
+            message = f"Great taste! Loading up {query}'s hits! 🎤"
+        else:
+            message = f"Let me pull up {query} for you! 🎤"
+        genres = "artist discography"
+
+    # Current feeling
+    if current:
+        messages = MR_DP_FEELING_RESPONSES[current]["messages"]
+        message = messages.get(media_type, messages["movies"])
+
+    # Desired feeling keywords with media-specific genres
+    desire = match.first("desire")
+    if desire:
+        data = MR_DP_DESIRE_RESPONSES[desire]
+        if not message:
+            message = data["message"]
+        if not genres:
+            genres = data["genres"].get(media_type, data["genres"]["movies"])
+        if not current:
+            current = "Bored"
+
     # Check for search mode (specific titles, actors, directors) - only for movies
     if media_type == "movies":
-        import re
-        names_pattern = r'\b[A-Z][a-z]+ [A-Z][a-z]+\b'
-        names = re.findall(names_pattern, prompt)
-        
-        if names or any(ind in t for ind in ["nolan", "spielberg", "tarantino", "scorsese", "kubrick", "villeneuve"]):
+        if MR_DP_NAME_PATTERN.search(prompt) or match.has("director"):
             mode = "search"
             query = prompt
             message = message or "Great choice! Let me search for that 🔍"
-    
+
     # Default fallbacks
-    defaults = media_defaults.get(media_type, media_defaults["movies"])
+    defaults = MR_DP_MEDIA_DEFAULTS.get(media_type, MR_DP_MEDIA_DEFAULTS["movies"])
     if not message:
         message = f"{defaults['default_msg']} {defaults['icon']}"
     if not current:
@@ -2020,7 +2007,7 @@ def heuristic_mr_dp(prompt):
         desired = "Entertained"
     if not genres:
         genres = defaults["default_genres"]
-    
+
     return {
         "message": message,
         "current_feeling": current,
@@ -2340,6 +2327,8 @@ User: "hi" or "hello"
 
 Remember: Be genuine and warm. ALWAYS return valid JSON."""
 
+MR_DP_PROMPT_V2 = PromptBuilder(MR_DP_SYSTEM_PROMPT_V2, "gpt-4o")
+
 # Curated Spotify playlist IDs for each mood
 SPOTIFY_MOOD_PLAYLISTS = {
     "Calm": {"id": "37i9dQZF1DWZd79rJ6a7lp", "name": "Sleep", "description": "Gentle ambient tracks"},
@@ -2463,14 +2452,20 @@ def search_movies_with_links(query: str = None, mood: str = None, limit: int = 3
             r = requests.get(f"{TMDB_BASE_URL}/movie/popular", params={"api_key": api_key}, timeout=8)
 
         r.raise_for_status()
-        results = r.json().get("results", [])[:limit]
+        results = r.json().get("results", [])
+        avoid_mask = FEELING_GENRE_MASKS.get(mood, {}).get("avoid", 0)
+        if avoid_mask:
+            results = [m for m in results if not item_genre_mask(m) & avoid_mask]
+        results = results[:limit]
+        prefetch_card_media(results)
 
         enriched = []
         for movie in results:
             tmdb_id = movie.get("id")
             title = movie.get("title", "")
+            media = movie.get("_card_media", {})
 
-            providers, tmdb_watch_link = get_movie_providers(tmdb_id, "movie")
+            providers, tmdb_watch_link = media.get("providers", []), media.get("watch_link")
             provider_links = []
             for p in providers[:4]:
                 name = p.get("provider_name", "")
@@ -2478,7 +2473,7 @@ def search_movies_with_links(query: str = None, mood: str = None, limit: int = 3
                 if link:
                     provider_links.append({"name": name, "link": link})
 
-            trailer_key = get_movie_trailer(tmdb_id, "movie")
+            trailer_key = media.get("trailer_key")
 
             enriched.append({
                 "id": str(tmdb_id),
@@ -2530,25 +2525,24 @@ def ask_mr_dp_v2(user_prompt: str, chat_history: list = None, user_context: dict
             for p in patterns:
                 context_summary += f"\nBehavior insight: {p.get('description', '')}"
 
+    # Cache scope: profile context + selected mood pair; follow-ups always go to the API
+    cache = None if detect_crisis(user_prompt) else get_mr_dp_cache()   # crisis wording is always answered fresh
+    profile_context = context_summary
+
     current_mood = st.session_state.get("current_feeling", "")
     desired_mood = st.session_state.get("desired_feeling", "")
+    if cache:
+        cached = cache.get("v2", user_prompt, (current_mood, desired_mood), profile_context, chat_history)
+        if cached is not None:
+            return cached
     if current_mood:
         context_summary += f"\nCurrent selected mood: {current_mood}"
     if desired_mood:
         context_summary += f"\nDesired mood: {desired_mood}"
 
-    system_with_context = MR_DP_SYSTEM_PROMPT_V2
-    if context_summary:
-        system_with_context += f"\n\n## CURRENT USER CONTEXT\n{context_summary}"
-
-    messages = [{"role": "system", "content": system_with_context}]
-
-    if chat_history:
-        for msg in chat_history[-8:]:
-            role = "user" if msg["role"] == "user" else "assistant"
-            messages.append({"role": role, "content": msg["content"]})
-
-    messages.append({"role": "user", "content": user_prompt})
+    # Static system prompt first (cacheable prefix), then this user's context
+    user_context_msg = f"## CURRENT USER CONTEXT{context_summary}" if context_summary else ""
+    messages = MR_DP_PROMPT_V2.build(user_prompt, chat_history, user_context_msg)
 
     try:
         print(f"[Mr.DP] Calling OpenAI API with prompt: {user_prompt[:50]}...")
@@ -2560,10 +2554,15 @@ def ask_mr_dp_v2(user_prompt: str, chat_history: list = None, user_context: dict
             response_format={"type": "json_object"}
         )
         print(f"[Mr.DP] API call successful!")
+        MR_DP_PROMPT_V2.record_usage(response.usage)
 
         content = response.choices[0].message.content.strip()
         result = json.loads(content)
         result = enrich_mr_dp_response(result, user_prompt)
+        if cache:
+            # Enriched answers carry titles and provider links - keep those short-lived
+            ttl = MR_DP_CACHE_CONTENT_TTL if result.get("content") else None
+            cache.put("v2", user_prompt, result, (current_mood, desired_mood), profile_context, chat_history, ttl)
         return result
 
     except Exception as e:
@@ -2622,57 +2621,46 @@ def enrich_mr_dp_response(response: dict, user_prompt: str):
     return response
 
 
+# fallback_mr_dp_v2: genre keyword -> (desired mood, reply)
+MR_DP_GENRE_MOODS = {
+    "horror": ("Scared", "Time for some scares! 👻"),
+    "scary": ("Scared", "Let's get spooky! 👻"),
+    "thriller": ("Thrilled", "Edge of your seat time! 🎬"),
+    "comedy": ("Amused", "Let's get you laughing! 😂"),
+    "funny": ("Amused", "Comedy incoming! 😄"),
+    "action": ("Energized", "Action packed picks! 💥"),
+    "romance": ("Romantic", "Love is in the air! 💕"),
+    "romantic": ("Romantic", "Here's some romance! 💕"),
+    "sad": ("Comforted", "Sometimes we need a good cry 🥺"),
+    "drama": ("Inspired", "Drama for you! 🎭"),
+    "adventure": ("Adventurous", "Adventure awaits! 🏔️"),
+    "sci-fi": ("Curious", "Sci-fi exploration! 🚀"),
+    "scifi": ("Curious", "Science fiction picks! 🚀"),
+    "fantasy": ("Entertained", "Fantasy worlds await! ✨"),
+    "documentary": ("Curious", "Learn something new! 📚"),
+    "animation": ("Entertained", "Animated picks! 🎨"),
+    "anime": ("Entertained", "Anime time! 🎌"),
+}
+
+
 def fallback_mr_dp_v2(user_prompt: str):
     """Fallback when API fails - still returns structured content."""
     t = user_prompt.lower()
 
     # CRISIS DETECTION - Always check first
-    crisis_keywords = ["suicide", "kill myself", "end it", "want to die", "hurt myself", "self harm",
-                       "don't want to live", "better off dead", "ending my life", "no reason to live"]
-    is_crisis = any(k in t for k in crisis_keywords)
-
-    if is_crisis:
+    if detect_crisis(t):
         return {
-            "message": "I hear you, and I care about you. Please know you're not alone. 💜\n\n🇺🇸 988 (Suicide & Crisis Lifeline)\n🇬🇧 116 123 (Samaritans)\n🌍 findahelpline.com\n\nIf you're in immediate danger, please call emergency services. These trained professionals can provide the support you deserve.",
+            "message": CRISIS_MESSAGE,
             "content": [],
             "actions": [{"type": "sos", "label": "🆘 SOS Calm Mode", "data": {}}],
             "mood_update": {"current": "Overwhelmed", "desired": "Comforted"},
             "focus_page": None
         }
 
-    is_music = any(k in t for k in ["music", "song", "playlist", "spotify", "play", "tunes", "tune"])
-    is_podcast = any(k in t for k in ["podcast", "podcasts", "pod"])
-    is_audiobook = any(k in t for k in ["audiobook", "audiobooks", "book", "books", "read", "listen to a book"])
-    is_shorts = any(k in t for k in ["shorts", "short", "tiktok", "reels", "quick video"])
-    is_stressed = any(k in t for k in ["stress", "anxious", "overwhelm", "calm", "relax"])
-    is_greeting = any(k in t for k in ["hi", "hello", "hey", "howdy"])
-
-    # Genre detection - map keywords to moods that have those genres
-    genre_mood_map = {
-        "horror": ("Scared", "Time for some scares! 👻"),
-        "scary": ("Scared", "Let's get spooky! 👻"),
-        "thriller": ("Thrilled", "Edge of your seat time! 🎬"),
-        "comedy": ("Amused", "Let's get you laughing! 😂"),
-        "funny": ("Amused", "Comedy incoming! 😄"),
-        "action": ("Energized", "Action packed picks! 💥"),
-        "romance": ("Romantic", "Love is in the air! 💕"),
-        "romantic": ("Romantic", "Here's some romance! 💕"),
-        "sad": ("Comforted", "Sometimes we need a good cry 🥺"),
-        "drama": ("Inspired", "Drama for you! 🎭"),
-        "adventure": ("Adventurous", "Adventure awaits! 🏔️"),
-        "sci-fi": ("Curious", "Sci-fi exploration! 🚀"),
-        "scifi": ("Curious", "Science fiction picks! 🚀"),
-        "fantasy": ("Entertained", "Fantasy worlds await! ✨"),
-        "documentary": ("Curious", "Learn something new! 📚"),
-        "animation": ("Entertained", "Animated picks! 🎨"),
-        "anime": ("Entertained", "Anime time! 🎌"),
-    }
-
-    detected_genre = None
-    for keyword, (mood, msg) in genre_mood_map.items():
-        if keyword in t:
-            detected_genre = (mood, msg)
-            break
+    match = match_intents(t)
+    intent = match.first("quick_intent")
+    genre = match.first("genre")
+    detected_genre = MR_DP_GENRE_MOODS[genre] if genre else None
 
     content = []
     actions = []
@@ -2680,11 +2668,11 @@ def fallback_mr_dp_v2(user_prompt: str):
     mood_update = {"current": None, "desired": "Entertained"}
     focus_page = None  # Which page to show
 
-    if is_greeting:
+    if intent == "greeting":
         message = "Hey! 👋 I'm Mr.DP, your dopamine curator. What vibe are you chasing today?"
         mood_update = {"current": None, "desired": None}
 
-    elif is_stressed:
+    elif intent == "stressed":
         message = "I hear you. Let's bring some calm 💜"
         mood_update = {"current": "Stressed", "desired": "Calm"}
 
@@ -2697,11 +2685,11 @@ def fallback_mr_dp_v2(user_prompt: str):
         content.append({"type": "music", "data": spotify})
         actions.append({"type": "sos", "label": "🆘 SOS Calm Mode", "data": {}})
 
-    elif is_music:
+    elif intent == "music":
         focus_page = "music"  # Switch to music page
-        for pattern in ["play ", "listen to ", "put on "]:
-            if pattern in t:
-                artist = t.split(pattern)[1].split()[0:3]
+        for pattern, _, end in match.all("artist_prefix"):
+            if pattern in ("play ", "listen to ", "put on "):
+                artist = t[end:].split()[0:3]
                 artist_name = " ".join(artist).strip(".,!?")
                 message = f"Loading up {artist_name.title()}! 🎤"
                 spotify = get_spotify_artist_playlist(artist_name)
@@ -2712,17 +2700,17 @@ def fallback_mr_dp_v2(user_prompt: str):
             spotify = get_spotify_playlist_for_mood("Happy")
             content.append({"type": "music", "data": spotify})
 
-    elif is_podcast:
+    elif intent == "podcasts":
         focus_page = "podcasts"  # Switch to podcasts page
         message = "Podcast mode! 🎙️ Check out the Podcasts section"
         mood_update = {"current": None, "desired": "Curious"}
 
-    elif is_audiobook:
+    elif intent == "audiobooks":
         focus_page = "audiobooks"  # Switch to audiobooks page
         message = "Audiobook mode! 📚 Check out the Audiobooks section"
         mood_update = {"current": None, "desired": "Focused"}
 
-    elif is_shorts:
+    elif intent == "shorts":
         focus_page = "shorts"  # Switch to shorts page
         message = "Quick hits mode! ⚡ Check out the Shorts section"
         mood_update = {"current": None, "desired": "Entertained"}
@@ -3103,6 +3091,12 @@ def render_personalized_feed():
 
     sections = get_personalized_feed(user_id) if user_id else get_default_feed()
 
+    # One parallel prefetch for every card in every section
+    prefetch_card_media([
+        item for section in sections if section.get("type") == "movies"
+        for item in section.get("items", [])[:4]
+    ])
+
     for section in sections:
         render_feed_section(section)
 
@@ -4235,6 +4229,8 @@ def render_community_recommendations():
     </p>
     """, unsafe_allow_html=True)
 
+    prefetch_card_media(recs[:4])
+
     cols = st.columns(4)
     for idx, movie in enumerate(recs[:4]):
         with cols[idx]:
@@ -8745,15 +8741,24 @@ def render_movie_card(item, show_providers=True, enable_preview=True):
     media_type = item.get("type", "movie")
     overview = item.get("overview", "")[:300] + "..." if len(item.get("overview", "")) > 300 else item.get("overview", "")
 
+    # Prefetched by prefetch_card_media (falls back to a direct lookup)
+    media = item.get("_card_media") or {}
+
     # Fetch trailer key if preview enabled
     trailer_key = ""
     if enable_preview and tmdb_id:
-        trailer_key = get_movie_trailer(tmdb_id, media_type) or ""
+        if "trailer_key" in media:
+            trailer_key = media["trailer_key"] or ""
+        else:
+            trailer_key = get_movie_trailer(tmdb_id, media_type) or ""
 
     providers_html = ""
     provider_names = ""
     if show_providers:
-        providers, tmdb_watch_link = get_movie_providers(tmdb_id, media_type)
+        if "providers" in media:
+            providers, tmdb_watch_link = media["providers"], media["watch_link"]
+        else:
+            providers, tmdb_watch_link = get_movie_providers(tmdb_id, media_type)
         if providers:
             icons = ""
             provider_names_list = []
@@ -10100,6 +10105,7 @@ def render_main():
     # SEARCH RESULTS
     if st.session_state.search_results:
         st.markdown(f"<div class='section-header'><span class='section-icon'>🔍</span><h2 class='section-title'>Results for \"{safe(st.session_state.search_query)}\"</h2></div>", unsafe_allow_html=True)
+        prefetch_card_media(st.session_state.search_results[:24])
         cols = st.columns(6)
         for i, movie in enumerate(st.session_state.search_results[:24]):
             with cols[i % 6]:
@@ -10368,6 +10374,7 @@ def render_main():
         # ===================== MOVIES RESULTS (DEFAULT) =====================
         else:
             # MOVIE RESULTS - Movie grid
+            prefetch_card_media(results[:24])
             cols = st.columns(6)
             for i, movie in enumerate(results[:24]):
                 with cols[i % 6]:
@@ -10423,6 +10430,8 @@ def render_main():
         
         movies = st.session_state.movies_feed
         if movies:
+            prefetch_card_media(movies[:24])
+
             # First 2 rows (12 movies)
             cols = st.columns(6)
             for i, movie in enumerate(movies[:12]):
@@ -9,10 +9,21 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
 from .routes import search, mr_dp, social, user, content, websocket, gamification, premium, wellness
 from services.realtime.websocket_manager import get_websocket_manager
+from services.realtime.backplane import build_backplane
+from services.realtime.offline_spool import build_offline_spool
+from services.search.http_client import get_http_client
+from services.search.single_flight import get_single_flight
+from services.search.cache import get_cache
+from services.search.catalog import get_catalog
+from services.search.suggest import get_suggest_index
+from services.mr_dp.response_cache import get_response_cache
+from services.mr_dp.agent import get_mr_dp_agent
+from config.settings import REALTIME_CONFIG
 
 logger = logging.getLogger(__name__)
 
@@ -23,15 +34,29 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting dopamine.watch API server...")
 
+    # Shared upstream HTTP pool (TMDB, Spotify, YouTube)
+    http_client = get_http_client()
+    await http_client.start()
+
+    # Local title catalog (seeded from movies.csv) + typeahead index over it
+    get_catalog()
+    get_suggest_index()
+
     # Initialize WebSocket manager background tasks
     ws_manager = get_websocket_manager()
-    await ws_manager.start_background_tasks()
+    await ws_manager.start_background_tasks(
+        build_backplane(REALTIME_CONFIG),
+        await asyncio.to_thread(build_offline_spool, REALTIME_CONFIG)   # counts existing logs
+    )
 
     yield
 
     # Shutdown
     logger.info("Shutting down dopamine.watch API server...")
     await ws_manager.stop_background_tasks()
+    await get_cache().close()
+    await get_mr_dp_agent().close()
+    await http_client.close()
 
 
 # Create FastAPI app
@@ -163,5 +188,12 @@ async def api_status():
             "active_connections": ws_stats.get("current_connections", 0),
             "online_users": ws_stats.get("online_users", 0),
             "active_rooms": ws_stats.get("active_rooms", 0)
-        }
+        },
+        "http_pool": get_http_client().get_stats(),
+        "single_flight": get_single_flight().get_stats(),
+        "cache": get_cache().get_stats(),
+        "catalog": get_catalog().get_stats(),
+        "suggest": get_suggest_index().get_stats(),
+        "mr_dp_cache": get_response_cache().get_stats(),
+        "mr_dp": get_mr_dp_agent().get_stats()
     }
@@ -11,7 +11,7 @@ from typing import Optional, List
 from pydantic import BaseModel
 import json
 
-from services.mr_dp.agent import MrDPAgent
+from services.mr_dp.agent import get_mr_dp_agent
 from services.mr_dp.learning import get_learning_service, EventType
 
 router = APIRouter()
@@ -63,7 +63,7 @@ async def chat_with_mr_dp(request: ChatRequest):
     - Content preferences
     - ADHD-specific needs
     """
-    agent = MrDPAgent()
+    agent = get_mr_dp_agent()
 
     # Build conversation history
     history = []
@@ -112,7 +112,7 @@ async def chat_stream(request: ChatRequest):
 
     Returns Server-Sent Events for real-time streaming.
     """
-    agent = MrDPAgent()
+    agent = get_mr_dp_agent()
 
     history = []
     if request.history:
@@ -136,7 +136,8 @@ async def chat_stream(request: ChatRequest):
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
-            "Connection": "keep-alive"
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"  # proxies must not hold tokens back
         }
     )
 
@@ -152,7 +153,7 @@ async def get_quick_suggestion(request: QuickSuggestionRequest):
 
     Perfect for "Quick Dope Hit" button.
     """
-    agent = MrDPAgent()
+    agent = get_mr_dp_agent()
 
     suggestion = await agent.quick_suggestion(
         user_id=request.user_id,
@@ -184,7 +185,7 @@ async def quick_dope_hit(
 
     ADHD-optimized for immediate gratification.
     """
-    agent = MrDPAgent()
+    agent = get_mr_dp_agent()
 
     return await agent.quick_suggestion(
         user_id=user_id,
@@ -204,7 +205,7 @@ async def marathon_mode(
 
     Perfect for hyperfocus sessions.
     """
-    agent = MrDPAgent()
+    agent = get_mr_dp_agent()
 
     return await agent.marathon_mode(
         user_id=user_id,
@@ -13,6 +13,9 @@ from services.search.aggregator import SearchAggregator
 from services.search.tmdb import TMDBService
 from services.search.spotify import SpotifyService
 from services.search.youtube import YouTubeService
+from services.search.cache import get_cache
+from services.search.single_flight import make_key
+from services.search.suggest import get_suggest_index
 
 router = APIRouter()
 
@@ -40,6 +43,11 @@ class SearchResponse(BaseModel):
     platforms_searched: List[str]
 
 
+class SuggestClickRequest(BaseModel):
+    id: str
+    query: Optional[str] = None
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # UNIFIED SEARCH
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -61,13 +69,18 @@ async def search_all(
     - Unified results ranked by relevance
     """
     aggregator = SearchAggregator()
-
-    results = await aggregator.search_all(
-        query=q,
-        content_type=type or "all",
-        mood=mood,
-        limit=limit,
-        max_duration_minutes=max_duration
+    content_type = type or "all"
+
+    results = await get_cache().get_or_fetch(
+        "search",
+        make_key("route.search", q.strip().lower(), content_type, mood, limit, max_duration),
+        lambda: aggregator.search_all(
+            query=q,
+            content_type=content_type,
+            mood=mood,
+            limit=limit,
+            max_duration_minutes=max_duration
+        )
     )
 
     return SearchResponse(
@@ -84,11 +97,16 @@ async def quick_search(
     limit: int = Query(5, ge=1, le=20)
 ):
     """
-    Quick search for autocomplete/suggestions.
-    Returns minimal data for fast response.
+    Quick search on submit - minimal data for fast response.
+    Runs a real multi-platform search; per-keystroke autocomplete
+    belongs on /suggest, which never leaves the process.
     """
     aggregator = SearchAggregator()
-    results = await aggregator.search_all(query=q, limit=limit)
+    results = await get_cache().get_or_fetch(
+        "search",
+        make_key("route.quick", q.strip().lower(), limit),
+        lambda: aggregator.search_all(query=q, limit=limit)
+    )
 
     return {
         "results": [
@@ -104,6 +122,34 @@ async def quick_search(
     }
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# TYPEAHEAD
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@router.get("/suggest")
+async def suggest(
+    q: str = Query(..., min_length=1, description="What the user has typed so far"),
+    limit: int = Query(8, ge=1, le=20),
+    kinds: Optional[str] = Query(None, description="Comma-separated: title, artist, channel")
+):
+    """
+    Autocomplete suggestions for every keystroke.
+
+    Served from the in-memory prefix index of known titles, artists and
+    channels (no upstream calls), ranked by popularity and click data.
+    """
+    kind_list = [k.strip() for k in kinds.split(",") if k.strip()] if kinds else None
+    suggestions = get_suggest_index().suggest(q, limit=limit, kinds=kind_list)
+    return {"query": q, "suggestions": suggestions}
+
+
+@router.post("/suggest/click")
+async def suggest_click(request: SuggestClickRequest):
+    """Record that a suggestion was picked - clicks feed the suggestion ranking."""
+    known = get_suggest_index().record_click(request.id)
+    return {"status": "recorded", "known": known}
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # PLATFORM-SPECIFIC SEARCH
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -185,17 +231,26 @@ async def get_trending(
     limit: int = Query(10, ge=1, le=50)
 ):
     """Get trending content across platforms."""
-    results = []
+    async def fetch_trending():
+        results = []
+
+        if type in ["all", "movie", "tv"]:
+            tmdb = TMDBService()
+            trending = await tmdb.get_trending(media_type=type if type != "all" else "all", limit=limit)
+            results.extend(trending)
+
+        if type in ["all", "video"]:
+            youtube = YouTubeService()
+            trending = await youtube.get_trending(limit=limit)
+            results.extend(trending)
 
-    if type in ["all", "movie", "tv"]:
-        tmdb = TMDBService()
-        trending = await tmdb.get_trending(media_type=type if type != "all" else "all", limit=limit)
-        results.extend(trending)
+        return results
 
-    if type in ["all", "video"]:
-        youtube = YouTubeService()
-        trending = await youtube.get_trending(limit=limit)
-        results.extend(trending)
+    results = await get_cache().get_or_fetch(
+        "trending",
+        make_key("route.trending", type, limit),
+        fetch_trending
+    )
 
     return {"results": results[:limit], "total": len(results)}
 
@@ -212,6 +267,8 @@ async def get_by_mood(
     Supported moods:
     - happy, sad, anxious, calm, energetic, tired, bored, focused
     """
+    # One spelling for the cache key and the mood boost (mood maps are lowercase)
+    mood = mood.lower()
     aggregator = SearchAggregator()
 
     # Map moods to search strategies
@@ -226,12 +283,16 @@ async def get_by_mood(
         "focused": "documentary educational interesting"
     }
 
-    query = mood_queries.get(mood.lower(), mood)
-    results = await aggregator.search_all(
-        query=query,
-        content_type=type,
-        mood=mood,
-        limit=limit
+    query = mood_queries.get(mood, mood)
+    results = await get_cache().get_or_fetch(
+        "search",
+        make_key("route.mood", mood, type, limit),
+        lambda: aggregator.search_all(
+            query=query,
+            content_type=type,
+            mood=mood,
+            limit=limit
+        )
     )
 
     return {
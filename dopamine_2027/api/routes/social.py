@@ -141,7 +141,7 @@ async def get_party_info(party_id: str):
         "content_title": party.content_title,
         "content_type": party.content_type,
         "state": party.state.value,
-        "current_position": party.current_position,
+        "current_position": party.clock.position(),
         "member_count": len(party.members),
         "host_id": party.host_id,
         "anyone_can_control": party.anyone_can_control,
@@ -198,7 +198,7 @@ async def party_chat(party_id: str, user_id: str, content: str):
     return {
         "message_id": message.id,
         "content": message.content,
-        "timestamp": message.timestamp.isoformat()
+        "timestamp": message.timestamp_iso()
     }
 
 
@@ -304,17 +304,15 @@ async def get_conversations(user_id: str):
 async def get_messages(
     conversation_id: str,
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    before: Optional[int] = Query(None, ge=0, description="Cursor from a previous page's next_cursor")
 ):
-    """Get messages from a conversation."""
+    """Get messages from a conversation, newest page first; follow next_cursor for older ones."""
     service = get_messaging_service()
 
-    conversation = service.get_conversation(conversation_id)
-    if not conversation:
+    page = service.get_messages(conversation_id, before=before, limit=limit)
+    if page is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
-    messages = conversation.messages[-(offset + limit):-offset if offset else None]
-
     return {
         "messages": [
             {
@@ -322,13 +320,15 @@ async def get_messages(
                 "sender_id": m.sender_id,
                 "content": m.content,
                 "created_at": m.created_at.isoformat(),
-                "status": m.status.value,
+                "status": service.get_message_status(conversation_id, m).value,
                 "reply_to_id": m.reply_to_id,
-                "reactions": m.reactions
+                "reactions": m.reactions,
+                "seq": m.seq
             }
-            for m in messages
+            for m in page["messages"]
         ],
-        "total": len(conversation.messages)
+        "next_cursor": page["next_cursor"],
+        "total": page["total"]
     }
 
 
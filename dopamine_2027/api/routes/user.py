@@ -10,6 +10,7 @@ from typing import Optional, List
 from pydantic import BaseModel
 
 from services.mr_dp.learning import get_learning_service, EventType
+from services.search.suggest import get_suggest_index
 
 router = APIRouter()
 
@@ -68,6 +69,10 @@ async def track_event(request: TrackEventRequest):
         data=request.data or {}
     )
 
+    # Search clicks also weight typeahead suggestions
+    if event_type == EventType.SEARCH_CLICK and (request.data or {}).get("content_id"):
+        get_suggest_index().record_click(request.data["content_id"])
+
     return {"status": "tracked", "event_type": request.event_type}
 
 
@@ -187,7 +187,7 @@ async def websocket_dm(
     )
 
     # Send conversation state
-    messages = conversation.messages[-50:]  # Last 50 messages
+    messages = conversation.messages.latest(50)
     await manager.send_to_connection(connection, {
         "type": "conversation_state",
         "conversation_id": conversation_id,
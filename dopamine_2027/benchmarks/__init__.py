@@ -0,0 +1,5 @@
+"""
+Micro-benchmarks for hot paths. Run from dopamine_2027/:
+
+    python -m benchmarks.<name>
+"""
@@ -0,0 +1,196 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+BACKPLANE LOAD TEST
+Several worker processes, each with its own WebSocketManager on a
+RespBackplane, all talking to one RESP server (the bundled stand-in, or a
+real Redis via --redis-url). Checks that a room spread over every worker
+receives every broadcast, that presence and offline queues cross process
+boundaries, and reports throughput and delivery latency.
+
+    python -m benchmarks.backplane_load [--workers 4] [--users 250] [--messages 200]
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import time
+from typing import Dict, List
+
+from services.realtime.backplane import RespBackplane
+from services.realtime.resp_standin import RespStandIn
+from services.realtime.websocket_manager import WebSocketManager
+
+ROOM_ID = "load_party"
+
+
+class RecordingSocket:
+    """Fake socket that timestamps every frame it is sent."""
+
+    def __init__(self):
+        self.arrivals: List[float] = []
+        self.frames: List[Dict] = []
+
+    async def send_text(self, data: str) -> None:
+        self.arrivals.append(time.time())
+        self.frames.append(json.loads(data))
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        pass
+
+
+async def _barrier(barrier) -> None:
+    await asyncio.get_running_loop().run_in_executor(None, barrier.wait)
+
+
+async def _worker(index: int, url: str, users: int, messages: int, barrier, results) -> None:
+    manager = WebSocketManager(send_queue_size=messages + 16)
+    await manager.start_background_tasks(RespBackplane(url))
+
+    sockets: Dict[str, RecordingSocket] = {}
+    for j in range(users):
+        user_id = f"w{index}_u{j}"
+        sockets[user_id] = RecordingSocket()
+        await manager.connect(sockets[user_id], user_id)
+
+    if index == 0:
+        await manager.create_room(ROOM_ID, "watch_party", {"persistent": True})
+    await _barrier(barrier)
+
+    for user_id in sockets:
+        await manager.join_room(user_id, ROOM_ID)
+    await _barrier(barrier)
+    for socket in sockets.values():
+        socket.frames.clear()
+        socket.arrivals.clear()
+
+    # Offline queue: queued here, drained by whichever worker the user shows up on
+    if index == 0:
+        await manager.send_to_user("offline_user", {"type": "queued", "n": 1})
+    await _barrier(barrier)
+
+    published = 0.0
+    if index == 0:
+        started = time.time()
+        for n in range(messages):
+            await manager.send_to_room(ROOM_ID, {
+                "type": "party_chat", "n": n, "sent_at": time.time()
+            })
+        published = time.time() - started
+
+    expected = messages
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        chats = [sum(f["type"] == "party_chat" for f in s.frames) for s in sockets.values()]
+        if min(chats) >= expected:
+            break
+        await asyncio.sleep(0.05)
+
+    latencies = [
+        arrival - frame["sent_at"]
+        for socket in sockets.values()
+        for frame, arrival in zip(socket.frames, socket.arrivals)
+        if frame["type"] == "party_chat"
+    ]
+    received = [sum(f["type"] == "party_chat" for f in s.frames) for s in sockets.values()]
+
+    # Presence: every worker should see the users connected on the others
+    remote_online = sum(
+        (manager.get_presence(f"w{other}_u0") or {}).get("status") == "online"
+        for other in range(barrier.parties) if other != index
+    )
+
+    await _barrier(barrier)
+    offline_drained = None
+    if index == barrier.parties - 1:
+        socket = RecordingSocket()
+        await manager.connect(socket, "offline_user")
+        await asyncio.sleep(0.2)
+        # Replayed messages arrive wrapped in offline_batch frames
+        replayed = [m["type"] for f in socket.frames if f["type"] == "offline_batch" for m in f["messages"]]
+        offline_drained = replayed == ["queued"] and all(f["type"] == "offline_batch" for f in socket.frames)
+
+    results.put({
+        "worker": index,
+        "users": len(sockets),
+        "complete": all(count == expected for count in received),
+        "received": sum(received),
+        "latencies": latencies,
+        "published": published,
+        "remote_online": remote_online,
+        "offline_drained": offline_drained,
+    })
+    await _barrier(barrier)
+    await manager.stop_background_tasks()
+
+
+def _worker_main(*args) -> None:
+    asyncio.run(_worker(*args))
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))] if values else 0.0
+
+
+async def run(workers: int, users: int, messages: int, redis_url: str = None) -> bool:
+    server = None
+    if redis_url is None:
+        server = RespStandIn()
+        port = await server.start("127.0.0.1", 0)
+        redis_url = f"redis://127.0.0.1:{port}"
+    print(f"backplane: {redis_url}  workers: {workers}  users/worker: {users}  messages: {messages}")
+
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=_worker_main, args=(i, redis_url, users, messages, barrier, results))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    loop = asyncio.get_running_loop()
+    reports = [await loop.run_in_executor(None, results.get, True, 120) for _ in processes]
+    await loop.run_in_executor(None, lambda: [process.join() for process in processes])
+    if server is not None:
+        await server.close()
+
+    reports.sort(key=lambda report: report["worker"])
+    latencies = [latency for report in reports for latency in report["latencies"]]
+    deliveries = sum(report["received"] for report in reports)
+    sender = reports[0]
+
+    print(f"{'worker':>6}{'users':>7}{'received':>10}{'complete':>10}{'remote online':>15}")
+    for report in reports:
+        print(f"{report['worker']:>6}{report['users']:>7}{report['received']:>10}"
+              f"{str(report['complete']):>10}{report['remote_online']:>15}")
+
+    span = max(latencies) if latencies else 0.0
+    print(f"published {messages} room messages in {sender['published'] * 1000:.1f}ms "
+          f"({messages / max(sender['published'], 1e-9):.0f} msg/s)")
+    print(f"{deliveries} socket deliveries, latency p50 {_percentile(latencies, 0.5) * 1000:.1f}ms "
+          f"p99 {_percentile(latencies, 0.99) * 1000:.1f}ms max {span * 1000:.1f}ms")
+
+    offline = reports[-1]["offline_drained"]
+    presence = all(report["remote_online"] == workers - 1 for report in reports)
+    complete = all(report["complete"] for report in reports)
+    print(f"room fan-out complete: {complete}  presence shared: {presence}  offline queue drained: {offline}")
+    return complete and presence and bool(offline)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4, help="worker processes")
+    parser.add_argument("--users", type=int, default=250, help="connected users per worker")
+    parser.add_argument("--messages", type=int, default=200, help="room broadcasts from worker 0")
+    parser.add_argument("--redis-url", default=None, help="use this server instead of the stand-in")
+    args = parser.parse_args()
+    ok = asyncio.run(run(args.workers, args.users, args.messages, args.redis_url))
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+BROADCAST ENCODE BENCHMARK
+Encode cost of one room broadcast as membership grows: the old path
+(json.dumps per recipient, as send_json did) against the serialize-once
+frame WebSocketManager builds now.
+
+    python -m benchmarks.broadcast_encode [--sizes 10,100,1000,10000] [--rounds 20]
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+from services.realtime.websocket_manager import WebSocketManager, ORJSON_AVAILABLE, encode_frame
+
+
+class NullSocket:
+    """Accepts frames without doing I/O, so only encode + fan-out is timed."""
+
+    async def send_text(self, data: str) -> None:
+        pass
+
+    async def send_json(self, data: Dict) -> None:
+        json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        pass
+
+
+# Representative payloads: a chat line and a playback sync
+MESSAGES = {
+    "party_chat": {
+        "type": "party_chat",
+        "message": {
+            "id": "msg_6f1c2a",
+            "user_id": "user_42",
+            "display_name": "Sam",
+            "content": "this scene is incredible, rewind 10s?",
+            "is_system": False
+        }
+    },
+    "party_sync": {
+        "type": "party_sync",
+        "event": "seek",
+        "state": "playing",
+        "position": 1834.25,
+        "initiated_by": "user_42"
+    }
+}
+
+
+def per_recipient_encode(message: Dict, members: int, room_id: str) -> float:
+    """Old path: copy context into the dict and encode it for every recipient."""
+    started = time.perf_counter()
+    for _ in range(members):
+        message["room_id"] = room_id
+        message["timestamp"] = "2027-01-01T00:00:00"
+        json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+    return time.perf_counter() - started
+
+
+async def room_broadcast(manager: WebSocketManager, room_id: str, message: Dict) -> float:
+    started = time.perf_counter()
+    await manager.send_to_room(room_id, message)
+    elapsed = time.perf_counter() - started
+    # Drain the outboxes so queue limits don't kick in between rounds
+    for connections in manager._connections.values():
+        for conn in connections:
+            conn.outbox.clear()
+            conn.outbox_keys.clear()
+    return elapsed
+
+
+async def run(sizes: List[int], rounds: int) -> None:
+    print(f"encoder: {'orjson' if ORJSON_AVAILABLE else 'json'}  rounds: {rounds}")
+    print(f"{'message':<12}{'members':>9}{'per-recipient':>16}{'serialize-once':>16}{'encode only':>14}{'speedup':>9}")
+
+    for name, message in MESSAGES.items():
+        for members in sizes:
+            manager = WebSocketManager(send_queue_size=rounds + 1)
+            room_id = f"party_{members}"
+            await manager.create_room(room_id, "watch_party")
+            for i in range(members):
+                connection = await manager.connect(NullSocket(), f"user_{i}")
+                connection.writer_task.cancel()
+                manager._rooms[room_id].members.add(f"user_{i}")
+
+            old = min(per_recipient_encode(dict(message), members, room_id) for _ in range(rounds))
+            new = min([await room_broadcast(manager, room_id, message) for _ in range(rounds)])
+
+            frame = {**message, "room_id": room_id, "timestamp": "2027-01-01T00:00:00"}
+            started = time.perf_counter()
+            for _ in range(rounds):
+                encode_frame(frame)
+            encode = (time.perf_counter() - started) / rounds
+
+            print(f"{name:<12}{members:>9}{old * 1e6:>14.1f}us{new * 1e6:>14.1f}us"
+                  f"{encode * 1e6:>12.1f}us{old / new:>8.1f}x")
+
+            for connections in list(manager._connections.values()):
+                for conn in connections:
+                    manager._stop_writer(conn)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="comma-separated room sizes")
+    parser.add_argument("--rounds", type=int, default=20, help="broadcasts per size (best is reported)")
+    args = parser.parse_args()
+    asyncio.run(run([int(size) for size in args.sizes.split(",")], args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+CRISIS DETECTION BENCHMARK
+Runs the regression corpus (benchmarks/crisis_corpus.txt) through the crisis
+detector (services/mr_dp/crisis.py) and the substring check it replaced,
+then measures throughput on ordinary chat messages and how scan cost grows
+with message length. Exits non-zero if any corpus line is misclassified.
+
+    python -m benchmarks.crisis_detection [--messages 5000] [--rounds 5] [--seed 7]
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import os
+import random
+import time
+from typing import Callable, List, Tuple
+
+from services.mr_dp.crisis import CRISIS_DETECTOR, detect_crisis
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "crisis_corpus.txt")
+
+# The check agent.py ran before: substring search over its own keyword list
+LEGACY_KEYWORDS = [
+    "suicide", "suicidal", "kill myself", "end it all", "want to die",
+    "self harm", "self-harm", "cutting", "hurt myself",
+    "no point", "give up", "can't go on", "end my life"
+]
+
+
+def legacy_detect(message: str) -> bool:
+    message_lower = message.lower()
+    return any(keyword in message_lower for keyword in LEGACY_KEYWORDS)
+
+
+def load_corpus(path: str = CORPUS_PATH) -> List[Tuple[bool, str]]:
+    corpus = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#"):
+                continue
+            label, _, message = line.partition("\t")
+            corpus.append((label == "1", message))
+    return corpus
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CHAT TRAFFIC
+# ═══════════════════════════════════════════════════════════════════════════════
+
+WORDS = ("i", "want", "something", "funny", "tonight", "feeling", "kinda", "stressed", "after", "work",
+         "maybe", "a", "comedy", "or", "horror", "movie", "with", "my", "friends", "podcast", "about",
+         "space", "hey", "mr", "dp", "can't", "sleep", "so", "bored", "lol", "please", "show", "me",
+         "the", "new", "season", "of", "that", "anime", "music", "for", "studying", "chill", "vibes")
+
+
+def build_messages(count: int, seed: int, words: Tuple[int, int] = (4, 30)) -> List[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(*words))) for _ in range(count)]
+
+
+def _time(fn: Callable[[str], bool], messages: List[str], rounds: int) -> float:
+    """Best-of-rounds seconds for the whole list."""
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for message in messages:
+            fn(message)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RUN
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def check_corpus() -> bool:
+    corpus = load_corpus()
+    failures = [(expected, message) for expected, message in corpus if detect_crisis(message) != expected]
+    legacy_misses = sum(1 for expected, message in corpus if expected and not legacy_detect(message))
+    legacy_alarms = sum(1 for expected, message in corpus if not expected and legacy_detect(message))
+    flagged = sum(1 for expected, _ in corpus if expected)
+
+    print(f"corpus: {len(corpus)} messages ({flagged} crisis, {len(corpus) - flagged} not)")
+    print(f"  substring check: {legacy_misses} missed, {legacy_alarms} false alarms")
+    print(f"  detector:        {sum(e for e, _ in failures)} missed, "
+          f"{sum(not e for e, _ in failures)} false alarms")
+    for expected, message in failures:
+        print(f"  FAIL expected={int(expected)} {message!r} terms={CRISIS_DETECTOR.terms(message)}")
+    return not failures
+
+
+def run(count: int, rounds: int, seed: int) -> bool:
+    ok = check_corpus()
+
+    messages = build_messages(count, seed)
+    size = sum(len(m) for m in messages)
+    print(f"\nthroughput: {count} chat messages, {size / count:.0f} chars avg, best of {rounds} rounds")
+    print(f"{'check':<18}{'us/msg':>9}{'MB/s':>8}")
+    for name, fn in (("substring check", legacy_detect), ("detector", detect_crisis)):
+        elapsed = _time(fn, messages, rounds)
+        print(f"{name:<18}{elapsed / count * 1e6:>9.2f}{size / elapsed / 1e6:>8.1f}")
+
+    print("\nscaling (detector): cost per char should stay flat as messages grow")
+    print(f"{'chars':>8}{'us/msg':>10}{'ns/char':>9}")
+    for length in (100, 1_000, 10_000, 100_000):
+        batch = [(m * (length // len(m) + 1))[:length] for m in build_messages(20, seed, (10, 10))]
+        elapsed = _time(detect_crisis, batch, rounds) / len(batch)
+        print(f"{length:>8}{elapsed * 1e6:>10.1f}{elapsed / length * 1e9:>9.1f}")
+
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=5000, help="chat messages for the throughput run")
+    parser.add_argument("--rounds", type=int, default=5, help="timing rounds (best is reported)")
+    parser.add_argument("--seed", type=int, default=7, help="message seed")
+    args = parser.parse_args()
+    raise SystemExit(0 if run(args.messages, args.rounds, args.seed) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+INTENT MATCHING BENCHMARK
+Compiled intent matcher (services/mr_dp/intents.py) against the keyword
+chains it replaced: one `in` scan per keyword, table after table, the way
+heuristic_mr_dp, fallback_mr_dp_v2, get_fallback_response and the agent's
+fallback_response used to run. Checks that both give the same answers on a
+generated prompt corpus, then reports per-prompt cost.
+
+    python -m benchmarks.intent_matching [--prompts 5000] [--rounds 5] [--seed 7]
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from services.mr_dp import intents
+from services.mr_dp.intents import extract_entities, match_intents
+
+_WHOLE_WORD = {
+    word: re.compile(rf"(?<![^\W_]){re.escape(word)}(?![^\W_])") for word in intents.WHOLE_WORDS
+}
+_DURATION_NUMBER = re.compile(intents._DURATION_NUMBER)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# THE OLD CHAINS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _contains(t: str, keyword: str) -> bool:
+    pattern = _WHOLE_WORD.get(keyword)
+    return bool(pattern.search(t)) if pattern else keyword in t
+
+
+def _first(t: str, entries) -> Optional[Any]:
+    for value, keywords in entries:
+        if any(_contains(t, keyword) for keyword in keywords):
+            return value
+    return None
+
+
+def chain_entities(prompt: str) -> Dict[str, Any]:
+    """heuristic_mr_dp's detection, one table after another."""
+    t = prompt.lower()
+    artist = None
+    for name in intents.POPULAR_ARTISTS:
+        if name in t:
+            artist = name
+            break
+    if artist is None:
+        for prefix in intents.ARTIST_PREFIXES:
+            if prefix in t:
+                words = t[t.find(prefix) + len(prefix):].strip().split()[:3]
+                if words:
+                    candidate = " ".join(words).strip(".,!?")
+                    if len(candidate) > 2 and candidate not in intents.NOT_ARTISTS:
+                        artist = candidate
+                        break
+
+    media_type = "artist" if artist else (_first(t, intents.MEDIA_KEYWORDS) or "movies")
+    current = _first(t, intents.FEELING_KEYWORDS)
+    desired = intents.FEELING_TARGETS[current] if current else ("Entertained" if artist else None)
+    if not desired:
+        for keyword, mood in intents.DESIRE_KEYWORDS:
+            if keyword in t:
+                desired = mood
+                break
+
+    duration = None
+    number = _DURATION_NUMBER.search(t)
+    if number:
+        amount = float(number.group("num"))
+        duration = int(round(amount * 60)) if number.group("unit").startswith("h") else int(round(amount))
+    else:
+        duration = _first(t, intents.DURATION_WORDS)
+
+    return {
+        "media_type": media_type,
+        "current_feeling": current,
+        "desired_feeling": desired,
+        "artist": artist,
+        "duration_minutes": duration,
+    }
+
+
+def chain_replies(prompt: str) -> tuple:
+    """The three reply pickers plus director/genre checks, each scanning on its own."""
+    t = prompt.lower()
+    return (
+        _first(t, intents.QUICK_INTENTS),
+        _first(t, intents.TABLES["genre"]),
+        _first(t, intents.CHAT_REPLIES),
+        _first(t, intents.AGENT_REPLIES),
+        any(director in t for director in intents.DIRECTORS),
+    )
+
+
+def matcher_replies(prompt: str) -> tuple:
+    match = match_intents(prompt)
+    return (
+        match.first("quick_intent"),
+        match.first("genre"),
+        match.first("chat_reply"),
+        match.first("agent_reply"),
+        match.has("director"),
+    )
+
+
+def matcher_all(prompt: str) -> tuple:
+    match = match_intents(prompt)
+    return extract_entities(match), (
+        match.first("quick_intent"), match.first("genre"), match.first("chat_reply"),
+        match.first("agent_reply"), match.has("director"),
+    )
+
+
+def chain_all(prompt: str) -> tuple:
+    return chain_entities(prompt), chain_replies(prompt)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CORPUS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+OPENERS = ["", "hey ", "hi mr dp, ", "ugh ", "ok so ", "honestly ", "hello! "]
+STATES = ["i'm bored", "so stressed", "feeling kinda sad", "can't sleep", "tired af", "anxious today",
+          "nostalgic for the 90s", "in a romantic mood", "fed up with work", "feeling hopeful",
+          "totally wiped", "meh", "", "", ""]
+ASKS = ["something funny", "a horror movie", "play drake", "listen to lo-fi beats", "a podcast",
+        "an audiobook", "some shorts", "scare me", "help me pick", "a nolan film", "love songs by adele",
+        "music for my workout", "a thriller", "true crime podcast", "something to relax",
+        "put on taylor swift", "anime", "a documentary to learn", "spooky stuff", "sci-fi please"]
+DURATIONS = ["", "", "", " in 20 min", " for 2 hours", " for like an hour and a half",
+             " half an hour max", " under 45 minutes", " 1.5h"]
+NOISE = ["", " lol", " pls", "!!", " thx", " rn", "..."]
+
+
+def build_corpus(size: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    prompts = []
+    for _ in range(size):
+        state = rng.choice(STATES)
+        ask = rng.choice(ASKS)
+        text = rng.choice(OPENERS) + (f"{state}, want {ask}" if state else f"want {ask}")
+        text += rng.choice(DURATIONS) + rng.choice(NOISE)
+        prompts.append(text.title() if rng.random() < 0.2 else text)
+    return prompts
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RUN
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _time(fn: Callable[[str], Any], prompts: List[str], rounds: int) -> float:
+    """Best-of-rounds seconds per prompt."""
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for prompt in prompts:
+            fn(prompt)
+        best = min(best, time.perf_counter() - started)
+    return best / len(prompts)
+
+
+def run(size: int, rounds: int, seed: int) -> bool:
+    prompts = build_corpus(size, seed)
+
+    mismatches = [p for p in prompts if matcher_all(p) != chain_all(p)]
+    for prompt in mismatches[:5]:
+        print(f"MISMATCH {prompt!r}\n  matcher: {matcher_all(prompt)}\n  chain:   {chain_all(prompt)}")
+
+    print(f"{len(prompts)} prompts, {len(intents.INTENT_MATCHER._targets)} keywords "
+          f"in {len(intents.TABLES)} tables, best of {rounds} rounds")
+    print(f"{'workload':<34}{'chain us':>10}{'matcher us':>12}{'speedup':>9}")
+    workloads = [
+        ("entities (heuristic_mr_dp)", chain_entities, lambda p: extract_entities(match_intents(p))),
+        ("reply pickers", chain_replies, matcher_replies),
+        ("everything", chain_all, matcher_all),
+    ]
+    for name, chain, matcher in workloads:
+        chain_cost = _time(chain, prompts, rounds)
+        matcher_cost = _time(matcher, prompts, rounds)
+        print(f"{name:<34}{chain_cost * 1e6:>10.2f}{matcher_cost * 1e6:>12.2f}"
+              f"{chain_cost / matcher_cost:>8.1f}x")
+
+    print(f"answers identical: {not mismatches} ({len(mismatches)} mismatches)")
+    return not mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=5000, help="corpus size")
+    parser.add_argument("--rounds", type=int, default=5, help="timing rounds (best is reported)")
+    parser.add_argument("--seed", type=int, default=7, help="corpus seed")
+    args = parser.parse_args()
+    raise SystemExit(0 if run(args.prompts, args.rounds, args.seed) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -83,6 +83,108 @@ STRIPE_SECRET_KEY = get_secret("stripe", "secret_key", "STRIPE_SECRET_KEY")
 STRIPE_WEBHOOK_SECRET = get_secret("stripe", "webhook_secret", "STRIPE_WEBHOOK_SECRET")
 STRIPE_ENABLED = bool(STRIPE_PUBLISHABLE_KEY and STRIPE_SECRET_KEY)
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# OUTBOUND HTTP (shared pool for TMDB, Spotify, YouTube)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+HTTP_CLIENT_CONFIG = {
+    # Connection pool
+    "max_connections": int(os.environ.get("HTTP_MAX_CONNECTIONS", 100)),
+    "max_connections_per_host": int(os.environ.get("HTTP_MAX_CONNECTIONS_PER_HOST", 20)),
+    "keepalive_timeout": float(os.environ.get("HTTP_KEEPALIVE_TIMEOUT", 30)),
+    "dns_cache_ttl": int(os.environ.get("HTTP_DNS_CACHE_TTL", 300)),
+
+    # Timeouts (seconds)
+    "total_timeout": float(os.environ.get("HTTP_TOTAL_TIMEOUT", 10)),
+    "connect_timeout": float(os.environ.get("HTTP_CONNECT_TIMEOUT", 3)),
+    "read_timeout": float(os.environ.get("HTTP_READ_TIMEOUT", 8)),
+}
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RESPONSE CACHE (in-process LRU + optional shared tier)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Redis (optional shared cache tier)
+REDIS_URL = get_secret("redis", "url", "REDIS_URL")
+
+CACHE_CONFIG = {
+    # In-process LRU tier
+    "max_entries": int(os.environ.get("CACHE_MAX_ENTRIES", 5000)),
+
+    # Shared tier: "redis", "memory" (per-process stand-in, dev/tests only) or None
+    "shared_tier": os.environ.get("CACHE_SHARED_TIER", "redis" if REDIS_URL else None),
+    "redis_url": REDIS_URL,
+    "key_prefix": "dw:cache:",
+
+    # Per endpoint class (seconds): fresh = served as-is,
+    # stale = extra window served while refreshing in the background
+    "ttls": {
+        "trending": {"fresh": 600, "stale": 3600},
+        "details": {"fresh": 86400, "stale": 604800},
+        "providers": {"fresh": 21600, "stale": 86400},
+        "search": {"fresh": 300, "stale": 1800},
+    },
+}
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# REALTIME BACKPLANE (WebSocket fan-out across workers/nodes)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+REALTIME_CONFIG = {
+    # "redis" (Redis or services.realtime.resp_standin), "memory" or None (single process)
+    "backplane": os.environ.get("REALTIME_BACKPLANE", "redis" if REDIS_URL else None),
+    "redis_url": REDIS_URL,
+    "prefix": "dw:rt:",
+
+    # Offline queues that fill up or go cold spill here (append-only logs; "" = memory only)
+    "offline_spool_dir": os.environ.get(
+        "REALTIME_SPOOL_DIR",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".offline_spool")
+    ),
+    "offline_spool_limit": int(os.environ.get("REALTIME_SPOOL_LIMIT", 1000)),
+}
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# LOCAL TITLE CATALOG (inverted index in front of TMDB search)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+CATALOG_CONFIG = {
+    # Seed file (pipe-delimited, same format as the Streamlit app's movies.csv)
+    "seed_csv": os.environ.get(
+        "CATALOG_SEED_CSV",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "movies.csv")
+    ),
+
+    # Answer locally once this many titles match every query term
+    "min_local_hits": int(os.environ.get("CATALOG_MIN_LOCAL_HITS", 3)),
+
+    # A query backfilled from TMDB is served locally for this long (seconds)
+    "backfill_ttl": int(os.environ.get("CATALOG_BACKFILL_TTL", 3600)),
+
+    # Upper bound on indexed titles (oldest-ingested evicted first)
+    "max_titles": int(os.environ.get("CATALOG_MAX_TITLES", 50000)),
+}
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SEARCH RANKING (vectorized scoring in services/search/ranking.py)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+RANKING_CONFIG = {
+    # Points per factor (a full match on a factor earns its whole weight)
+    "weights": {
+        "title_exact": 30,   # query appears in the title
+        "title_word": 20,    # any query word appears in the title
+        "mood": 20,          # shares a genre with the mood
+        "rating": 20,        # scaled by rating / 10
+        "recency": 15,       # <=1y full, <=3y 2/3, <=5y 1/3
+        "adhd": 10,          # <=30 min full, <=60 min half
+    },
+    "reference_year": 2027,
+
+    # Candidates requested from each platform before ranking
+    "candidates_per_platform": int(os.environ.get("RANKING_CANDIDATES_PER_PLATFORM", 20)),
+}
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # ADHD OPTIMIZATION SETTINGS
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -156,6 +258,52 @@ MR_DP_CONFIG = {
     "adult_content_block": True,
 }
 
+MR_DP_CACHE_CONFIG = {
+    # First-turn completions keyed on (prompt, mood pair, context fingerprint)
+    "enabled": os.environ.get("MR_DP_CACHE_ENABLED", "1") != "0",
+    "max_entries": int(os.environ.get("MR_DP_CACHE_MAX_ENTRIES", 2000)),
+
+    # Seconds an answer is reused; answers naming specific titles go stale sooner
+    "ttl": int(os.environ.get("MR_DP_CACHE_TTL", 6 * 3600)),
+    "content_ttl": int(os.environ.get("MR_DP_CACHE_CONTENT_TTL", 1800)),
+
+    # Near matches: character-trigram Jaccard over content words, short prompts only
+    "similarity_threshold": 0.7,
+    "max_similar_words": 8,
+    "max_prompt_chars": 500,
+}
+
+MR_DP_CLIENT_CONFIG = {
+    # One AsyncOpenAI client (and HTTP pool) for the whole app
+    "max_connections": int(os.environ.get("MR_DP_MAX_CONNECTIONS", 50)),
+    "max_keepalive_connections": int(os.environ.get("MR_DP_MAX_KEEPALIVE", 20)),
+    "keepalive_expiry": float(os.environ.get("MR_DP_KEEPALIVE_EXPIRY", 60)),
+
+    # Timeouts (seconds); a stream may run longer than one read
+    "timeout": float(os.environ.get("MR_DP_TIMEOUT", 30)),
+    "connect_timeout": float(os.environ.get("MR_DP_CONNECT_TIMEOUT", 5)),
+
+    # Recent streams kept for time-to-first-token percentiles
+    "ttft_window": 500,
+}
+
+MR_DP_PROMPT_CONFIG = {
+    # Input tokens per request: system prompt + context + summary + turns + message
+    "max_input_tokens": int(os.environ.get("MR_DP_MAX_INPUT_TOKENS", 6000)),
+
+    # Caps for single pieces, so one pasted essay can't take the whole budget
+    "max_message_tokens": 800,
+    "max_turn_tokens": 300,
+    "max_context_tokens": 400,
+
+    # Recent turns sent verbatim; older ones are folded into the summary
+    # fold_step at a time, so the prompt prefix only moves every few turns
+    "max_history_messages": 10,
+    "fold_step": 6,
+    "summary_tokens": 250,
+    "summary_line_tokens": 40,
+}
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # PREMIUM / SUBSCRIPTION
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -4,13 +4,20 @@ The brain behind Mr.DP - conversational AI with personality, memory, and researc
 """
 
 import json
-from typing import Dict, Any, List, Optional
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Deque
 from datetime import datetime
 
 from config.settings import (
     OPENAI_API_KEY, OPENAI_MODEL, OPENAI_ENABLED,
-    MR_DP_CONFIG, MOODS, CONTENT_TYPES
+    MR_DP_CONFIG, MR_DP_CACHE_CONFIG, MR_DP_CLIENT_CONFIG, MOODS, CONTENT_TYPES
 )
+from services.mr_dp.crisis import detect_crisis
+from services.mr_dp.response_cache import get_response_cache
+from services.mr_dp.intents import match_intents
+from services.mr_dp.prompt_builder import PromptBuilder
+from services.mr_dp.stream_parser import JSONFieldStreamer
 
 # Initialize OpenAI client
 openai_client = None
@@ -115,15 +122,15 @@ User: "I can't decide what to watch"
 Remember: You are a friend helping another friend with ADHD find their next dopamine hit. Be helpful, be brief, be understanding."""
 
 
+# Token-budgeted messages; the system prompt above is the cacheable prefix
+MR_DP_PROMPT = PromptBuilder(MR_DP_SYSTEM_PROMPT, OPENAI_MODEL)
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # CRISIS DETECTION
 # ═══════════════════════════════════════════════════════════════════════════════
 
-CRISIS_KEYWORDS = [
-    "suicide", "suicidal", "kill myself", "end it all", "want to die",
-    "self harm", "self-harm", "cutting", "hurt myself",
-    "no point", "give up", "can't go on", "end my life"
-]
+# Keywords and matching live in services/mr_dp/crisis.py (detect_crisis)
 
 CRISIS_RESPONSE = {
     "message": "I'm really glad you're talking to me. What you're feeling is valid, and you don't have to face this alone. Please reach out to someone who can help: National Suicide Prevention Lifeline: 988 (call or text). Crisis Text Line: Text HOME to 741741. You matter, and help is available 24/7.",
@@ -134,12 +141,6 @@ CRISIS_RESPONSE = {
 }
 
 
-def detect_crisis(message: str) -> bool:
-    """Check if message contains crisis indicators."""
-    message_lower = message.lower()
-    return any(keyword in message_lower for keyword in CRISIS_KEYWORDS)
-
-
 # ═══════════════════════════════════════════════════════════════════════════════
 # MAIN AGENT FUNCTION
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -169,25 +170,17 @@ def get_mr_dp_response(
     if not openai_client:
         return fallback_response(user_message)
 
-    # Build messages for API
-    messages = [{"role": "system", "content": MR_DP_SYSTEM_PROMPT}]
+    # User context if available
+    context_msg = build_context_message(user_context) if user_context else ""
 
-    # Add user context if available
-    if user_context:
-        context_msg = build_context_message(user_context)
-        if context_msg:
-            messages.append({"role": "system", "content": context_msg})
+    # Common first-turn prompts are answered from the cache
+    cache = get_response_cache()
+    cached = cache.get("response", user_message, context=context_msg, history=chat_history)
+    if cached is not None:
+        return cached
 
-    # Add chat history (last 10 messages for context)
-    if chat_history:
-        for msg in chat_history[-10:]:
-            messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
-
-    # Add current user message
-    messages.append({"role": "user", "content": user_message})
+    # System prompt, context, summary of older turns, recent turns, message
+    messages = MR_DP_PROMPT.build(user_message, chat_history, context_msg)
 
     try:
         response = openai_client.chat.completions.create(
@@ -198,11 +191,15 @@ def get_mr_dp_response(
             response_format={"type": "json_object"}
         )
 
+        MR_DP_PROMPT.record_usage(response.usage)
         content = response.choices[0].message.content
         result = json.loads(content)
 
         # Validate and clean response
-        return validate_response(result)
+        result = validate_response(result)
+        ttl = MR_DP_CACHE_CONFIG["content_ttl"] if result.get("suggestions") or result.get("search_query") else None
+        cache.put("response", user_message, result, context=context_msg, history=chat_history, ttl=ttl)
+        return result
 
     except json.JSONDecodeError:
         return fallback_response(user_message)
@@ -275,10 +272,10 @@ def validate_response(response: Dict[str, Any]) -> Dict[str, Any]:
 def fallback_response(user_message: str) -> Dict[str, Any]:
     """Provide a fallback response when API is unavailable."""
 
-    message_lower = user_message.lower()
+    # One compiled pass over the message; the first matching reply wins
+    reply = match_intents(user_message).first("agent_reply")
 
-    # Simple keyword matching for basic responses
-    if any(word in message_lower for word in ["sad", "down", "depressed", "unhappy"]):
+    if reply == "sad":
         return {
             "message": "I'm here for you. Sometimes a good comfort watch helps. How about something uplifting or a familiar favorite?",
             "mood_update": {"current": "sad", "desired": "comforted"},
@@ -290,7 +287,7 @@ def fallback_response(user_message: str) -> Dict[str, Any]:
             "expression": "concerned"
         }
 
-    if any(word in message_lower for word in ["bored", "nothing to do", "boring"]):
+    if reply == "bored":
         return {
             "message": "Let's fix that boredom! Want something that'll grab your attention right away?",
             "mood_update": {"current": "bored", "desired": "engaged"},
@@ -302,7 +299,7 @@ def fallback_response(user_message: str) -> Dict[str, Any]:
             "expression": "excited"
         }
 
-    if any(word in message_lower for word in ["stressed", "anxious", "overwhelmed", "anxiety"]):
+    if reply == "stressed":
         return {
             "message": "Stress is tough. Let's find something calming that won't demand too much from your brain.",
             "mood_update": {"current": "stressed", "desired": "relaxed"},
@@ -314,7 +311,7 @@ def fallback_response(user_message: str) -> Dict[str, Any]:
             "expression": "concerned"
         }
 
-    if any(word in message_lower for word in ["funny", "comedy", "laugh", "hilarious"]):
+    if reply == "funny":
         return {
             "message": "Laughter coming right up! Here are some guaranteed giggles:",
             "mood_update": {"current": None, "desired": "happy"},
@@ -326,7 +323,7 @@ def fallback_response(user_message: str) -> Dict[str, Any]:
             "expression": "excited"
         }
 
-    if any(word in message_lower for word in ["music", "song", "playlist", "tune"]):
+    if reply == "music":
         return {
             "message": "Music mode! What vibe are you going for?",
             "mood_update": {"current": None, "desired": None},
@@ -420,17 +417,47 @@ class MrDPAgent:
     """
     Async Mr.DP Agent for FastAPI endpoints.
     Supports streaming responses and context awareness.
+
+    One instance per app (get_mr_dp_agent()): the AsyncOpenAI client and
+    its connection pool are reused by every request.
     """
 
-    def __init__(self):
+    def __init__(self, config: Dict[str, Any] = None):
+        self._config = {**MR_DP_CLIENT_CONFIG, **(config or {})}
         self.async_client = None
+        self._http_client = None
         if OPENAI_ENABLED:
             try:
+                import httpx
                 from openai import AsyncOpenAI
-                self.async_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+                self._http_client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self._config["max_connections"],
+                        max_keepalive_connections=self._config["max_keepalive_connections"],
+                        keepalive_expiry=self._config["keepalive_expiry"]
+                    ),
+                    timeout=httpx.Timeout(self._config["timeout"], connect=self._config["connect_timeout"])
+                )
+                self.async_client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=self._http_client)
             except Exception as e:
                 print(f"Failed to initialize AsyncOpenAI: {e}")
 
+        # Time to first token (seconds) of recent model streams
+        self._ttft: Deque[float] = deque(maxlen=self._config["ttft_window"])
+        self._stats = {
+            "chats": 0,
+            "streams": 0,
+            "streams_from_cache": 0,
+            "stream_errors": 0,
+        }
+
+    async def close(self) -> None:
+        """Close the pooled HTTP connections (app shutdown)."""
+        if self.async_client is not None:
+            await self.async_client.close()
+        elif self._http_client is not None:
+            await self._http_client.aclose()
+
     async def chat(
         self,
         message: str,
@@ -452,6 +479,8 @@ class MrDPAgent:
         Returns:
             Response dictionary with content, expression, suggestions
         """
+        self._stats["chats"] += 1
+
         # Check for crisis
         if detect_crisis(message):
             return {
@@ -464,30 +493,16 @@ class MrDPAgent:
         if not self.async_client:
             return self._sync_fallback(message, mood)
 
-        # Build messages
-        messages = [{"role": "system", "content": MR_DP_SYSTEM_PROMPT}]
-
         # Add context
-        if context:
-            context_str = self._format_context(context)
-            if context_str:
-                messages.append({"role": "system", "content": context_str})
-
-        if mood:
-            messages.append({
-                "role": "system",
-                "content": f"User's current mood: {mood}"
-            })
-
-        # Add history
-        if history:
-            for msg in history[-10:]:
-                messages.append({
-                    "role": msg.get("role", "user"),
-                    "content": msg.get("content", "")
-                })
-
-        messages.append({"role": "user", "content": message})
+        context_str = self._format_context(context) if context else ""
+
+        # Common first-turn prompts are answered from the cache
+        cache = get_response_cache()
+        cached = cache.get("agent", message, (mood, None), context_str, history)
+        if cached is not None:
+            return cached
+
+        messages = MR_DP_PROMPT.build(message, history, self._session_context(context_str, mood))
 
         try:
             response = await self.async_client.chat.completions.create(
@@ -498,15 +513,19 @@ class MrDPAgent:
                 response_format={"type": "json_object"}
             )
 
+            MR_DP_PROMPT.record_usage(response.usage)
             content = response.choices[0].message.content
             result = json.loads(content)
 
-            return {
+            reply = {
                 "content": result.get("message", ""),
                 "expression": result.get("expression", "happy"),
                 "suggestions": result.get("suggestions", []),
                 "mood_detected": result.get("mood_update", {}).get("current")
             }
+            ttl = MR_DP_CACHE_CONFIG["content_ttl"] if reply["suggestions"] else None
+            cache.put("agent", message, reply, (mood, None), context_str, history, ttl)
+            return reply
 
         except Exception as e:
             print(f"MrDP async error: {e}")
@@ -522,8 +541,14 @@ class MrDPAgent:
         """
         Stream chat response from Mr.DP.
 
-        Yields chunks of the response for real-time display.
+        The model answers in JSON; only the decoded "message" text is
+        yielded as content chunks, token by token. Expression and
+        suggestions follow in one metadata chunk, with the stream's time
+        to first token (ttft_ms).
         """
+        started = time.perf_counter()
+        self._stats["streams"] += 1
+
         if detect_crisis(message):
             yield {
                 "type": "content",
@@ -546,63 +571,81 @@ class MrDPAgent:
             }
             return
 
-        messages = [{"role": "system", "content": MR_DP_SYSTEM_PROMPT}]
-
-        if mood:
-            messages.append({
-                "role": "system",
-                "content": f"User's current mood: {mood}"
-            })
-
-        if history:
-            for msg in history[-10:]:
-                messages.append({
-                    "role": msg.get("role", "user"),
-                    "content": msg.get("content", "")
-                })
+        # Same cache scope as chat() without profile context
+        cache = get_response_cache()
+        cached = cache.get("agent", message, (mood, None), None, history)
+        if cached is not None:
+            self._stats["streams_from_cache"] += 1
+            yield {"type": "content", "content": cached["content"]}
+            yield {
+                "type": "metadata",
+                "expression": cached["expression"],
+                "suggestions": cached.get("suggestions", []),
+                "ttft_ms": round((time.perf_counter() - started) * 1000, 1)
+            }
+            return
 
-        messages.append({"role": "user", "content": message})
+        messages = MR_DP_PROMPT.build(message, history, self._session_context("", mood))
 
+        parser = JSONFieldStreamer("message")
+        ttft = None
         try:
             stream = await self.async_client.chat.completions.create(
                 model=OPENAI_MODEL,
                 messages=messages,
                 temperature=0.7,
                 max_tokens=500,
+                response_format={"type": "json_object"},
                 stream=True
             )
 
-            full_content = ""
             async for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    content = chunk.choices[0].delta.content
-                    full_content += content
-                    yield {"type": "content", "content": content}
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                text = parser.feed(chunk.choices[0].delta.content)
+                if text:
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+                        self._ttft.append(ttft)
+                    yield {"type": "content", "content": text}
 
-            # Parse full response for metadata
-            try:
-                result = json.loads(full_content)
-                yield {
-                    "type": "metadata",
-                    "expression": result.get("expression", "happy"),
-                    "suggestions": result.get("suggestions", [])
-                }
-            except:
+        except Exception as e:
+            print(f"MrDP stream error: {e}")
+            self._stats["stream_errors"] += 1
+            if ttft is None:
+                fallback = self._sync_fallback(message, mood)
+                yield {"type": "content", "content": fallback["content"]}
                 yield {
                     "type": "metadata",
-                    "expression": "happy",
+                    "expression": fallback["expression"],
                     "suggestions": []
                 }
-
-        except Exception as e:
-            print(f"MrDP stream error: {e}")
-            fallback = self._sync_fallback(message, mood)
-            yield {"type": "content", "content": fallback["content"]}
-            yield {
-                "type": "metadata",
-                "expression": fallback["expression"],
-                "suggestions": []
-            }
+                return
+
+        document = parser.result()
+        result = document or {}
+        if ttft is None:
+            # Nothing streamable (no message field) - send whatever we have
+            ttft = time.perf_counter() - started
+            result.setdefault("message", fallback_response(message)["message"])
+            yield {"type": "content", "content": result["message"]}
+
+        reply = {
+            "content": result.get("message", ""),
+            "expression": result.get("expression", "happy"),
+            "suggestions": result.get("suggestions", []),
+            "mood_detected": (result.get("mood_update") or {}).get("current")
+        }
+        if document is not None and parser.done:
+            ttl = MR_DP_CACHE_CONFIG["content_ttl"] if reply["suggestions"] else None
+            cache.put("agent", message, reply, (mood, None), None, history, ttl)
+
+        yield {
+            "type": "metadata",
+            "expression": reply["expression"],
+            "suggestions": reply["suggestions"],
+            "ttft_ms": round(ttft * 1000, 1)
+        }
 
     async def quick_suggestion(
         self,
@@ -661,6 +704,30 @@ class MrDPAgent:
 
         return "User context:\n" + "\n".join(parts) if parts else ""
 
+    @staticmethod
+    def _session_context(context_str: str, mood: str = None) -> str:
+        """Profile context plus the current mood, sent after the static system prompt."""
+        mood_line = f"User's current mood: {mood}" if mood else ""
+        return "\n\n".join(part for part in (context_str, mood_line) if part)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Request counts, time-to-first-token percentiles (ms) and prompt token use."""
+        samples = sorted(self._ttft)
+
+        def percentile(pct: float) -> Optional[float]:
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(len(samples) * pct))] * 1000, 1)
+
+        return {
+            **self._stats,
+            "openai_enabled": self.async_client is not None,
+            "ttft_samples": len(samples),
+            "ttft_p50_ms": percentile(0.5),
+            "ttft_p95_ms": percentile(0.95),
+            "prompt": MR_DP_PROMPT.get_stats(),
+        }
+
     def _sync_fallback(self, message: str, mood: str = None) -> Dict[str, Any]:
         """Fallback when async not available."""
         result = fallback_response(message)
@@ -670,3 +737,19 @@ class MrDPAgent:
             "suggestions": result.get("suggestions", []),
             "mood_detected": result.get("mood_update", {}).get("current")
         }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# GLOBAL INSTANCE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Singleton instance
+_agent: Optional[MrDPAgent] = None
+
+
+def get_mr_dp_agent() -> MrDPAgent:
+    """Get or create the app-wide Mr.DP agent (one pooled OpenAI client)."""
+    global _agent
+    if _agent is None:
+        _agent = MrDPAgent()
+    return _agent
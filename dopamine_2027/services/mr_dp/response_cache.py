@@ -0,0 +1,292 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+MR.DP RESPONSE CACHE
+First-turn prompts repeat a lot ("I'm bored", "something funny", "can't
+sleep"). Completions are cached per (normalized prompt, mood pair, context
+fingerprint) and served on an exact match, or on a near match by character
+trigram similarity within the same mood/context scope. Multi-turn chats
+always go to the model - their answer depends on the whole conversation.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import copy
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from config.settings import MR_DP_CACHE_CONFIG
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# NORMALIZATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_APOSTROPHES = re.compile(r"['’`]")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_REPEATS = re.compile(r"([a-z])\1{2,}")   # letters only: "2000s" stays
+
+# Words that flip or pin down a prompt's meaning: a near match must agree on
+# all of them ("something funny" is not "nothing funny", 20 min is not 90)
+NEGATIONS = frozenset({
+    "no", "not", "nothing", "never", "none", "nobody", "without",
+    "dont", "doesnt", "didnt", "cant", "cannot", "wont", "isnt", "arent",
+    "wasnt", "shouldnt", "wouldnt", "couldnt", "hate", "stop",
+})
+
+# Dropped before near-matching, so "I'm so bored" finds "bored"
+FILLER_WORDS = frozenset({
+    "i", "im", "am", "me", "my", "a", "an", "the", "to", "of", "and", "is", "it", "its",
+    "so", "really", "very", "just", "kinda", "kind", "sort", "bit", "little", "pretty", "super",
+    "please", "pls", "plz", "hey", "hi", "hello", "um", "uh", "ok", "okay", "mr", "dp",
+    "feel", "feeling", "want", "wanna", "need", "give", "show", "find", "recommend",
+    "watch", "something", "anything", "some", "like", "right", "now",
+})
+
+
+def normalize_prompt(text: str) -> str:
+    """Canonical prompt: lowercase ASCII words, apostrophes dropped, 'sooo' -> 'so'."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = text.encode("ascii", "ignore").decode("ascii").lower()
+    text = _APOSTROPHES.sub("", text)
+    text = _REPEATS.sub(r"\1", text)
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def prompt_signature(normalized: str) -> FrozenSet[str]:
+    """Negations and any word with a digit ("90s", "2h", "2024") in a normalized prompt."""
+    return frozenset(
+        word for word in normalized.split()
+        if word in NEGATIONS or any(c.isdigit() for c in word)
+    )
+
+
+def content_words(normalized: str) -> str:
+    """The prompt without filler words (the prompt itself if that leaves nothing)."""
+    words = [w for w in normalized.split() if w not in FILLER_WORDS]
+    return " ".join(words) if words else normalized
+
+
+def trigrams(normalized: str) -> FrozenSet[str]:
+    padded = f" {normalized} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def context_fingerprint(context: Optional[str]) -> str:
+    """Short stable hash of the context text that goes into the prompt ("" if none)."""
+    if not context:
+        return ""
+    return hashlib.sha1(context.encode("utf-8")).hexdigest()[:16]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CACHE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class CachedResponse:
+    """One cached completion and what it was keyed on."""
+
+    __slots__ = ("key", "scope", "prompt", "signature", "grams", "value", "expires_at")
+
+    def __init__(self, key: Tuple[str, str], scope: str, prompt: str, value: Any, expires_at: float):
+        self.key = key
+        self.scope = scope
+        self.prompt = prompt
+        self.signature = prompt_signature(prompt)
+        self.grams = trigrams(content_words(prompt))
+        self.value = value
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """
+    Bounded LRU of Mr.DP completions with exact and near-match lookup.
+
+    - Scope = namespace + mood pair + context fingerprint; nothing is ever
+      served across scopes
+    - Exact hits are a dict lookup on (scope, normalized prompt)
+    - Near hits: short prompts are indexed by the character trigrams of
+      their content words (filler dropped); the best Jaccard match at or
+      above the threshold wins, provided both prompts carry the same
+      negations and numbers
+    - Every entry has its own TTL; expired entries are dropped when touched
+    - Values are deep-copied in and out so callers can mutate what they get
+    """
+
+    def __init__(self, config: Dict[str, Any] = None, clock: Callable[[], float] = time.time):
+        self._config = {**MR_DP_CACHE_CONFIG, **(config or {})}
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._entries: "OrderedDict[Tuple[str, str], CachedResponse]" = OrderedDict()
+        # scope -> trigram -> keys of short prompts containing it
+        self._grams: Dict[str, Dict[str, Set[Tuple[str, str]]]] = {}
+
+        self._stats = {
+            "exact_hits": 0,
+            "similar_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "stored": 0,
+            "expired": 0,
+            "evictions": 0,
+        }
+
+    @staticmethod
+    def scope(namespace: str, moods: Tuple[Optional[str], Optional[str]] = (None, None),
+              context: Optional[str] = None) -> str:
+        current, desired = moods
+        return f"{namespace}|{current or ''}|{desired or ''}|{context_fingerprint(context)}"
+
+    def _similar_enabled(self, prompt: str) -> bool:
+        return len(prompt.split()) <= self._config["max_similar_words"]
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # LOOKUP / STORE
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def get(self, namespace: str, prompt: str, moods: Tuple[Optional[str], Optional[str]] = (None, None),
+            context: Optional[str] = None, history: Optional[List[Dict]] = None) -> Optional[Any]:
+        """Cached response for a first-turn prompt, or None (miss or bypass)."""
+        if not self._config["enabled"]:
+            return None
+        if history:
+            self._stats["bypassed"] += 1
+            return None
+        normalized = normalize_prompt(prompt)
+        if not normalized:
+            return None
+        scope = self.scope(namespace, moods, context)
+
+        with self._lock:
+            now = self._clock()
+            entry = self._live((scope, normalized), now)
+            if entry is not None:
+                self._stats["exact_hits"] += 1
+            elif self._similar_enabled(normalized):
+                entry = self._nearest(scope, normalized, now)
+                if entry is not None:
+                    self._stats["similar_hits"] += 1
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(entry.key)
+            value = entry.value
+        return copy.deepcopy(value)
+
+    def put(self, namespace: str, prompt: str, value: Any,
+            moods: Tuple[Optional[str], Optional[str]] = (None, None),
+            context: Optional[str] = None, history: Optional[List[Dict]] = None,
+            ttl: Optional[float] = None) -> bool:
+        """Cache a first-turn response; returns False when it wasn't cacheable."""
+        if not self._config["enabled"] or history:
+            return False
+        normalized = normalize_prompt(prompt)
+        if not normalized or len(normalized) > self._config["max_prompt_chars"]:
+            return False
+        scope = self.scope(namespace, moods, context)
+        ttl = self._config["ttl"] if ttl is None else ttl
+
+        entry = CachedResponse((scope, normalized), scope, normalized,
+                               copy.deepcopy(value), self._clock() + ttl)
+        with self._lock:
+            self._remove(entry.key)
+            self._entries[entry.key] = entry
+            if self._similar_enabled(normalized):
+                index = self._grams.setdefault(scope, {})
+                for gram in entry.grams:
+                    index.setdefault(gram, set()).add(entry.key)
+            self._stats["stored"] += 1
+
+            while len(self._entries) > self._config["max_entries"]:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._grams.clear()
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # INTERNALS (caller holds the lock)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def _live(self, key: Tuple[str, str], now: float) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= now:
+            self._remove(key)
+            self._stats["expired"] += 1
+            return None
+        return entry
+
+    def _nearest(self, scope: str, prompt: str, now: float) -> Optional[CachedResponse]:
+        index = self._grams.get(scope)
+        if not index:
+            return None
+        grams = trigrams(content_words(prompt))
+        shared: Dict[Tuple[str, str], int] = {}
+        for gram in grams:
+            for key in index.get(gram, ()):
+                shared[key] = shared.get(key, 0) + 1
+
+        threshold = self._config["similarity_threshold"]
+        signature = prompt_signature(prompt)
+        best, best_score = None, threshold
+        for key, overlap in shared.items():
+            entry = self._entries[key]
+            score = overlap / (len(grams) + len(entry.grams) - overlap)
+            if score >= best_score and entry.signature == signature:
+                best, best_score = key, score
+        return self._live(best, now) if best is not None else None
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        index = self._grams.get(entry.scope)
+        if index is None:
+            return
+        for gram in entry.grams:
+            keys = index.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del index[gram]
+        if not index:
+            del self._grams[entry.scope]
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # STATISTICS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self._stats["exact_hits"] + self._stats["similar_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# GLOBAL INSTANCE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Singleton instance
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get or create the global Mr.DP response cache."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
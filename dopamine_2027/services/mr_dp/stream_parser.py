@@ -0,0 +1,120 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+STREAMING JSON FIELD PARSER
+Mr.DP answers as a JSON object, but the user should see the "message" text
+while the model is still writing it. This scanner follows the object
+character by character across chunk boundaries and hands back the decoded
+text of one top-level string field as it arrives; everything else
+(expression, suggestions, ...) is read from the complete document at the end.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class JSONFieldStreamer:
+    """
+    Incremental extractor for one top-level string field of a JSON object.
+
+    - feed(chunk) returns the newly decoded field text (possibly "")
+    - Escapes, including \\uXXXX and surrogate pairs, may be split anywhere
+    - Strings, braces and brackets inside other fields are skipped correctly
+    - result() parses the whole document once the stream has ended
+    """
+
+    def __init__(self, field: str = "message"):
+        self.field = field
+        self._raw: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape: Optional[str] = None   # pending escape ("" after a backslash, hex digits after \u)
+        self._expect_key = False             # next depth-1 string is a key
+        self._is_key = False
+        self._key: List[str] = []
+        self._last_key: Optional[str] = None
+        self._capturing = False              # inside the target field's value
+        self._high_surrogate: Optional[int] = None
+        self.done = False                    # target value closed
+
+    def feed(self, chunk: str) -> str:
+        self._raw.append(chunk)
+        out: List[str] = []
+        for char in chunk:
+            if self._in_string:
+                self._string_char(char, out)
+            elif char == '"':
+                self._in_string = True
+                self._is_key = self._depth == 1 and self._expect_key
+                self._capturing = (
+                    not self._is_key and self._depth == 1
+                    and self._last_key == self.field and not self.done
+                )
+                self._key = []
+            elif char in "{[":
+                self._depth += 1
+                self._expect_key = char == "{" and self._depth == 1
+            elif char in "}]":
+                self._depth -= 1
+            elif self._depth == 1:
+                if char == ",":
+                    self._expect_key = True
+                    self._last_key = None
+                elif char == ":":
+                    self._expect_key = False
+        return "".join(out)
+
+    def _string_char(self, char: str, out: List[str]) -> None:
+        if self._escape is not None:
+            if self._escape == "" and char != "u":
+                self._escape = None
+                self._emit(_ESCAPES.get(char, char), out)
+            elif self._escape == "":
+                self._escape = "u"
+            else:
+                self._escape += char
+                if len(self._escape) == 5:   # "u" + 4 hex digits
+                    code, self._escape = int(self._escape[1:], 16), None
+                    self._emit_code(code, out)
+            return
+
+        if char == "\\":
+            self._escape = ""
+        elif char == '"':
+            self._in_string = False
+            if self._is_key:
+                self._last_key = "".join(self._key)
+            elif self._capturing:
+                self._capturing = False
+                self.done = True
+        else:
+            self._emit(char, out)
+
+    def _emit_code(self, code: int, out: List[str]) -> None:
+        if 0xD800 <= code <= 0xDBFF:
+            self._high_surrogate = code
+            return
+        if 0xDC00 <= code <= 0xDFFF and self._high_surrogate is not None:
+            code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+        self._high_surrogate = None
+        self._emit(chr(code), out)
+
+    def _emit(self, text: str, out: List[str]) -> None:
+        if self._is_key:
+            self._key.append(text)
+        elif self._capturing:
+            out.append(text)
+
+    @property
+    def text(self) -> str:
+        return "".join(self._raw)
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """The complete document, or None if it isn't a JSON object."""
+        try:
+            document = json.loads(self.text)
+        except ValueError:
+            return None
+        return document if isinstance(document, dict) else None
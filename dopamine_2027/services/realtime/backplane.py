@@ -0,0 +1,481 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+REALTIME BACKPLANE
+Pub/sub + shared state that lets several WebSocketManager processes (uvicorn
+workers, nodes) act as one: room broadcasts, per-user delivery, presence,
+the room registry and offline queues.
+
+- InMemoryBackplane: managers in one process sharing a hub (tests, dev)
+- RespBackplane: speaks the Redis protocol (RESP2) over asyncio streams -
+  works against Redis or the bundled stand-in (services.realtime.resp_standin)
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# handler(channel, payload) - called in publish order, must not block
+MessageHandler = Callable[[str, str], None]
+
+
+class BackplaneError(Exception):
+    """The backplane server rejected a command."""
+
+
+class Backplane(ABC):
+    """
+    Interface every backplane implements.
+
+    Channel and key names are passed without the prefix; implementations
+    namespace them so several deployments can share one server.
+    """
+
+    name = "base"
+
+    def __init__(self, prefix: str = "dw:rt:"):
+        self._prefix = prefix
+        self._handler: Optional[MessageHandler] = None
+        self._stats = {"published": 0, "received": 0}
+
+    async def start(self, handler: MessageHandler) -> None:
+        self._handler = handler
+
+    async def close(self) -> None:
+        pass
+
+    # Pub/sub
+    @abstractmethod
+    async def subscribe(self, channel: str) -> None:
+        ...
+
+    @abstractmethod
+    async def unsubscribe(self, channel: str) -> None:
+        ...
+
+    @abstractmethod
+    async def publish(self, channel: str, payload: str) -> int:
+        """Returns the number of subscribers (nodes) that received it."""
+
+    # Hashes
+    @abstractmethod
+    async def hash_set(self, key: str, field: str, value: str) -> None:
+        ...
+
+    @abstractmethod
+    async def hash_get(self, key: str, field: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def hash_delete(self, key: str, field: str) -> None:
+        ...
+
+    @abstractmethod
+    async def hash_all(self, key: str) -> Dict[str, str]:
+        ...
+
+    @abstractmethod
+    async def hash_incr(self, key: str, field: str, amount: int = 1) -> int:
+        ...
+
+    # Sets
+    @abstractmethod
+    async def set_add(self, key: str, member: str) -> None:
+        ...
+
+    @abstractmethod
+    async def set_remove(self, key: str, member: str) -> None:
+        ...
+
+    @abstractmethod
+    async def set_size(self, key: str) -> int:
+        ...
+
+    # Lists (bounded queues)
+    @abstractmethod
+    async def list_push(self, key: str, value: str, max_len: int) -> None:
+        """Append, keeping only the newest max_len entries."""
+
+    @abstractmethod
+    async def list_drain(self, key: str) -> List[str]:
+        """Remove and return every entry, oldest first."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    def _deliver(self, channel: str, payload: str) -> None:
+        self._stats["received"] += 1
+        if self._handler is not None:
+            try:
+                self._handler(channel[len(self._prefix):], payload)
+            except Exception as e:
+                logger.error(f"Backplane handler error on {channel}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, **self._stats}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# IN-MEMORY
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class InMemoryHub:
+    """The shared "server" in-memory backplanes connect to."""
+
+    def __init__(self):
+        self.subscribers: Dict[str, Set["InMemoryBackplane"]] = {}
+        self.data: Dict[str, Any] = {}
+
+
+class InMemoryBackplane(Backplane):
+    """Backplane for managers living in one process (tests, local dev)."""
+
+    name = "memory"
+
+    def __init__(self, hub: InMemoryHub = None, prefix: str = "dw:rt:"):
+        super().__init__(prefix)
+        self._hub = hub or InMemoryHub()
+        self._channels: Set[str] = set()
+
+    async def close(self) -> None:
+        for channel in list(self._channels):
+            await self.unsubscribe(channel[len(self._prefix):])
+
+    async def subscribe(self, channel: str) -> None:
+        channel = self._prefix + channel
+        self._channels.add(channel)
+        self._hub.subscribers.setdefault(channel, set()).add(self)
+
+    async def unsubscribe(self, channel: str) -> None:
+        channel = self._prefix + channel
+        self._channels.discard(channel)
+        subscribers = self._hub.subscribers.get(channel)
+        if subscribers is not None:
+            subscribers.discard(self)
+            if not subscribers:
+                del self._hub.subscribers[channel]
+
+    async def publish(self, channel: str, payload: str) -> int:
+        channel = self._prefix + channel
+        subscribers = list(self._hub.subscribers.get(channel, ()))
+        # Delivered on the next loop iteration, like a network round-trip
+        loop = asyncio.get_running_loop()
+        for subscriber in subscribers:
+            loop.call_soon(subscriber._deliver, channel, payload)
+        self._stats["published"] += 1
+        return len(subscribers)
+
+    def _container(self, key: str, kind: type):
+        return self._hub.data.setdefault(self._prefix + key, kind())
+
+    async def hash_set(self, key: str, field: str, value: str) -> None:
+        self._container(key, dict)[field] = value
+
+    async def hash_get(self, key: str, field: str) -> Optional[str]:
+        return self._hub.data.get(self._prefix + key, {}).get(field)
+
+    async def hash_delete(self, key: str, field: str) -> None:
+        self._hub.data.get(self._prefix + key, {}).pop(field, None)
+
+    async def hash_all(self, key: str) -> Dict[str, str]:
+        return dict(self._hub.data.get(self._prefix + key, {}))
+
+    async def hash_incr(self, key: str, field: str, amount: int = 1) -> int:
+        values = self._container(key, dict)
+        values[field] = str(int(values.get(field, 0)) + amount)
+        return int(values[field])
+
+    async def set_add(self, key: str, member: str) -> None:
+        self._container(key, set).add(member)
+
+    async def set_remove(self, key: str, member: str) -> None:
+        self._hub.data.get(self._prefix + key, set()).discard(member)
+
+    async def set_size(self, key: str) -> int:
+        return len(self._hub.data.get(self._prefix + key, ()))
+
+    async def list_push(self, key: str, value: str, max_len: int) -> None:
+        values = self._container(key, list)
+        values.append(value)
+        del values[:-max_len]
+
+    async def list_drain(self, key: str) -> List[str]:
+        return self._hub.data.pop(self._prefix + key, [])
+
+    async def delete(self, key: str) -> None:
+        self._hub.data.pop(self._prefix + key, None)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RESP (Redis protocol)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _encode_command(*args: Any) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("backplane connection closed")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        return BackplaneError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2].decode()
+    if kind == b"*":
+        count = int(rest)
+        if count < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(count)]
+    raise BackplaneError(f"unexpected reply: {line!r}")
+
+
+class RespConnection:
+    """
+    One pipelined RESP connection: commands are written as they come and
+    replies are matched to callers in order by a single reader task.
+    """
+
+    def __init__(self, host: str, port: int, password: str = None, db: int = 0):
+        self._host = host
+        self._port = port
+        self._password = password
+        self._db = db
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: Deque[asyncio.Future] = deque()
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connecting: Optional[asyncio.Future] = None
+
+    async def _ensure(self) -> None:
+        if self._writer is not None and not self._writer.is_closing():
+            return
+        if self._connecting is None:
+            self._connecting = asyncio.ensure_future(self._connect())
+        try:
+            await asyncio.shield(self._connecting)
+        finally:
+            self._connecting = None
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(self._host, self._port)
+        self._reader_task = asyncio.create_task(self._read_loop(self._reader))
+        if self._password:
+            await self._send("AUTH", self._password)
+        if self._db:
+            await self._send("SELECT", self._db)
+
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                reply = await _read_reply(reader)
+                future = self._pending.popleft()
+                if not future.done():
+                    future.set_result(reply)
+        except asyncio.CancelledError:
+            self._fail(ConnectionError("backplane connection closed"))
+            raise
+        except Exception as e:
+            # Any reader failure (closed socket, garbled or unsolicited reply)
+            # fails the callers and drops the connection so _ensure() reconnects
+            self._fail(e)
+
+    def _fail(self, error: Exception) -> None:
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(ConnectionError(str(error)))
+        if self._writer is not None:
+            self._writer.close()
+        self._writer = None
+
+    async def _send(self, *args: Any) -> Any:
+        return (await self._send_many([args]))[0]
+
+    async def _send_many(self, commands: List[tuple]) -> List[Any]:
+        # Written back to back with no await in between, so a batch is never
+        # interleaved with another coroutine's commands (MULTI/EXEC relies on it)
+        loop = asyncio.get_running_loop()
+        futures = []
+        for args in commands:
+            future = loop.create_future()
+            self._pending.append(future)
+            futures.append(future)
+        self._writer.write(b"".join(_encode_command(*args) for args in commands))
+
+        replies = [await future for future in futures]
+        for reply in replies:
+            if isinstance(reply, BackplaneError):
+                raise reply
+        return replies
+
+    async def execute(self, *args: Any) -> Any:
+        await self._ensure()
+        return await self._send(*args)
+
+    async def execute_many(self, *commands: tuple) -> List[Any]:
+        """Pipeline several commands; returns their replies in order."""
+        await self._ensure()
+        return await self._send_many(list(commands))
+
+    async def close(self) -> None:
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class RespBackplane(Backplane):
+    """
+    Backplane on any server speaking the Redis protocol.
+
+    Uses two connections: a pipelined one for commands and a dedicated
+    subscriber connection (which re-subscribes after a reconnect).
+    """
+
+    name = "resp"
+
+    def __init__(self, url: str, prefix: str = "dw:rt:"):
+        super().__init__(prefix)
+        parsed = urlparse(url)
+        self._host = parsed.hostname or "localhost"
+        self._port = parsed.port or 6379
+        self._password = parsed.password
+        self._db = int(parsed.path.lstrip("/") or 0)
+        self._commands = RespConnection(self._host, self._port, self._password, self._db)
+        self._channels: Set[str] = set()
+        self._sub_writer: Optional[asyncio.StreamWriter] = None
+        self._sub_task: Optional[asyncio.Task] = None
+        self._sub_ready = asyncio.Event()
+
+    async def start(self, handler: MessageHandler) -> None:
+        await super().start(handler)
+        await self._commands.execute("PING")
+        self._sub_task = asyncio.create_task(self._subscriber_loop())
+        await self._sub_ready.wait()
+
+    async def close(self) -> None:
+        if self._sub_task is not None:
+            self._sub_task.cancel()
+        if self._sub_writer is not None:
+            self._sub_writer.close()
+        await self._commands.close()
+
+    async def _subscriber_loop(self) -> None:
+        while True:
+            try:
+                reader, self._sub_writer = await asyncio.open_connection(self._host, self._port)
+                if self._password:
+                    self._sub_writer.write(_encode_command("AUTH", self._password))
+                    await _read_reply(reader)
+                if self._channels:
+                    self._sub_writer.write(_encode_command("SUBSCRIBE", *self._channels))
+                self._sub_ready.set()
+
+                while True:
+                    reply = await _read_reply(reader)
+                    if isinstance(reply, list) and reply and reply[0] == "message":
+                        self._deliver(reply[1], reply[2])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._sub_ready.clear()
+                logger.warning(f"Backplane subscriber disconnected ({e}) - reconnecting")
+                await asyncio.sleep(1)
+
+    async def subscribe(self, channel: str) -> None:
+        channel = self._prefix + channel
+        if channel not in self._channels:
+            self._channels.add(channel)
+            await self._sub_ready.wait()
+            self._sub_writer.write(_encode_command("SUBSCRIBE", channel))
+
+    async def unsubscribe(self, channel: str) -> None:
+        channel = self._prefix + channel
+        if channel in self._channels:
+            self._channels.discard(channel)
+            if self._sub_ready.is_set():
+                self._sub_writer.write(_encode_command("UNSUBSCRIBE", channel))
+
+    async def publish(self, channel: str, payload: str) -> int:
+        self._stats["published"] += 1
+        return await self._commands.execute("PUBLISH", self._prefix + channel, payload)
+
+    async def hash_set(self, key: str, field: str, value: str) -> None:
+        await self._commands.execute("HSET", self._prefix + key, field, value)
+
+    async def hash_get(self, key: str, field: str) -> Optional[str]:
+        return await self._commands.execute("HGET", self._prefix + key, field)
+
+    async def hash_delete(self, key: str, field: str) -> None:
+        await self._commands.execute("HDEL", self._prefix + key, field)
+
+    async def hash_all(self, key: str) -> Dict[str, str]:
+        flat = await self._commands.execute("HGETALL", self._prefix + key) or []
+        return dict(zip(flat[::2], flat[1::2]))
+
+    async def hash_incr(self, key: str, field: str, amount: int = 1) -> int:
+        return await self._commands.execute("HINCRBY", self._prefix + key, field, amount)
+
+    async def set_add(self, key: str, member: str) -> None:
+        await self._commands.execute("SADD", self._prefix + key, member)
+
+    async def set_remove(self, key: str, member: str) -> None:
+        await self._commands.execute("SREM", self._prefix + key, member)
+
+    async def set_size(self, key: str) -> int:
+        return await self._commands.execute("SCARD", self._prefix + key)
+
+    async def list_push(self, key: str, value: str, max_len: int) -> None:
+        key = self._prefix + key
+        await self._commands.execute_many(("RPUSH", key, value), ("LTRIM", key, -max_len, -1))
+
+    async def list_drain(self, key: str) -> List[str]:
+        # LRANGE + DEL in one transaction, so no entry is delivered twice
+        key = self._prefix + key
+        replies = await self._commands.execute_many(
+            ("MULTI",), ("LRANGE", key, 0, -1), ("DEL", key), ("EXEC",)
+        )
+        results = replies[-1]
+        return results[0] if results else []
+
+    async def delete(self, key: str) -> None:
+        await self._commands.execute("DEL", self._prefix + key)
+
+
+def build_backplane(config: Dict[str, Any]) -> Optional[Backplane]:
+    """
+    Create the configured backplane, or None for a single-process manager.
+
+    config: {"backplane": "redis" | "memory" | None, "redis_url": ..., "prefix": ...}
+    """
+    kind = config.get("backplane")
+    prefix = config.get("prefix", "dw:rt:")
+    if kind == "memory":
+        return InMemoryBackplane(prefix=prefix)
+    if kind == "redis":
+        if not config.get("redis_url"):
+            logger.warning("Redis backplane requested without a URL - running single-process")
+            return None
+        return RespBackplane(config["redis_url"], prefix=prefix)
+    return None
@@ -0,0 +1,112 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+OFFLINE SPOOL
+Append-only on-disk logs for offline messages that left memory - queues
+that went cold or filled their ring buffer - so they survive a restart.
+One file per user, one encoded frame per line; a log is compacted to its
+newest entries once it grows past twice the limit.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import hashlib
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class OfflineSpool:
+    """
+    Per-user append-only message logs under one directory.
+
+    Methods do blocking file I/O and are not thread-safe: WebSocketManager
+    calls them one at a time on its spool thread, never on the event loop.
+    """
+
+    def __init__(self, directory: str, max_messages: int = 1000):
+        self._directory = directory
+        self._max_messages = max_messages
+        os.makedirs(directory, exist_ok=True)
+
+        # Lines per log file, rebuilt from disk so a restart picks up old spills
+        self._counts: Dict[str, int] = {}
+        for name in os.listdir(directory):
+            if name.endswith(".log"):
+                with open(os.path.join(directory, name), "rb") as f:
+                    self._counts[name] = sum(1 for _ in f)
+
+        self._stats = {"spilled": 0, "replayed": 0, "compactions": 0}
+
+    def _name(self, user_id: str) -> str:
+        # User ids go through a hash so they can't escape the directory
+        return hashlib.sha1(user_id.encode()).hexdigest() + ".log"
+
+    def __contains__(self, user_id: str) -> bool:
+        return self._name(user_id) in self._counts
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def append(self, user_id: str, frames: Iterable[str]) -> int:
+        """Append encoded frames (oldest first); returns how many were written."""
+        frames = list(frames)
+        if not frames:
+            return 0
+        name = self._name(user_id)
+        path = os.path.join(self._directory, name)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n".join(frames) + "\n")
+
+        self._counts[name] = self._counts.get(name, 0) + len(frames)
+        self._stats["spilled"] += len(frames)
+        if self._counts[name] > 2 * self._max_messages:
+            self._compact(name, path)
+        return len(frames)
+
+    def drain(self, user_id: str) -> List[str]:
+        """Remove and return the user's spooled frames, oldest first (newest max_messages)."""
+        name = self._name(user_id)
+        if self._counts.pop(name, None) is None:
+            return []
+        path = os.path.join(self._directory, name)
+        try:
+            frames = self._read(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return []
+        self._stats["replayed"] += len(frames)
+        return frames
+
+    def _read(self, path: str) -> List[str]:
+        with open(path, encoding="utf-8") as f:
+            frames = [line.rstrip("\n") for line in f if line.strip()]
+        return frames[-self._max_messages:]
+
+    def _compact(self, name: str, path: str) -> None:
+        frames = self._read(path)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(frames) + "\n")
+        os.replace(tmp, path)
+        self._counts[name] = len(frames)
+        self._stats["compactions"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "users": len(self._counts)}
+
+
+def build_offline_spool(config: Dict[str, Any]) -> Optional[OfflineSpool]:
+    """
+    Create the configured spool, or None to keep offline queues in memory only.
+
+    config: {"offline_spool_dir": ..., "offline_spool_limit": ...}
+    """
+    directory = config.get("offline_spool_dir")
+    if not directory:
+        return None
+    try:
+        return OfflineSpool(directory, config.get("offline_spool_limit", 1000))
+    except OSError as e:
+        logger.warning(f"Offline spool unavailable at {directory} ({e}) - memory only")
+        return None
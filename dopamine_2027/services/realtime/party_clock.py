@@ -0,0 +1,100 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PARTY CLOCK
+Timekeeping for watch parties: the server-side playback clock every member
+is measured against, and an NTP-style estimate of each member's clock
+offset so a reported position can be placed on the server timeline.
+
+Times are server epoch seconds (time.time()), the same scale clients get
+from Date.now() / 1000.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import time
+from collections import deque
+from typing import Callable, Deque, Optional, Tuple
+
+
+class PlaybackClock:
+    """
+    Where playback is "now", without anyone ticking it.
+
+    Anchored at (position, server time) whenever play/pause/seek/rate
+    changes; while playing, position = anchor + elapsed * rate.
+    """
+
+    def __init__(self, duration: float = 0.0, clock: Callable[[], float] = time.time):
+        self.duration = duration
+        self.rate = 1.0
+        self.playing = False
+        self._clock = clock
+        self._anchor_position = 0.0
+        self._anchor_time = clock()
+
+    def now(self) -> float:
+        return self._clock()
+
+    def position(self, at: Optional[float] = None) -> float:
+        """Playback position at server time `at` (default: now)."""
+        position = self._anchor_position
+        if self.playing:
+            at = self._clock() if at is None else at
+            position += (at - self._anchor_time) * self.rate
+        if self.duration:
+            position = min(position, self.duration)
+        return max(0.0, position)
+
+    def _reanchor(self, position: float = None) -> None:
+        now = self._clock()
+        self._anchor_position = self.position(now) if position is None else position
+        self._anchor_time = now
+
+    def play(self) -> None:
+        self._reanchor()
+        self.playing = True
+
+    def pause(self) -> None:
+        self._reanchor()
+        self.playing = False
+
+    def seek(self, position: float) -> None:
+        self._reanchor(position)
+
+    def set_rate(self, rate: float) -> None:
+        self._reanchor()
+        self.rate = rate
+
+
+class ClockSync:
+    """
+    Offset of one member's clock from the server's (client - server).
+
+    Each ping/pong gives the four NTP timestamps: t0 server send, t1 client
+    receive, t2 client send, t3 server receive. Of the last `window`
+    samples, the one with the lowest round trip is trusted - queueing delay
+    only ever adds to RTT, so the fastest exchange is the least skewed.
+    """
+
+    def __init__(self, window: int = 8):
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=window)  # (rtt, offset)
+        self.last_sample_at: float = 0.0
+
+    def add_sample(self, t0: float, t1: float, t2: float, t3: float) -> None:
+        rtt = max(0.0, (t3 - t0) - (t2 - t1))
+        offset = ((t1 - t0) + (t2 - t3)) / 2
+        self._samples.append((rtt, offset))
+        self.last_sample_at = t3
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    @property
+    def offset(self) -> float:
+        return min(self._samples)[1] if self._samples else 0.0
+
+    @property
+    def rtt(self) -> float:
+        return min(self._samples)[0] if self._samples else 0.0
+
+    def to_server_time(self, client_time: float) -> float:
+        return client_time - self.offset
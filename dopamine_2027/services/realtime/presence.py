@@ -0,0 +1,180 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+PRESENCE TRACKER
+Who is online, and who gets told about it. Clients only hear about users
+they watch (friends via presence_subscribe) or share a room with; changes
+collect between flushes and go out as one diff per audience, so a burst of
+connect/disconnect churn costs one batch instead of a broadcast per event.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+class PresenceTracker:
+    """
+    Presence state + subscriptions; does no I/O.
+
+    - set() records a change and marks the user dirty
+    - drain() returns (recipients, changes) groups for everything that
+      changed since the last drain; a user who flips back to the state the
+      audience last saw (e.g. reconnect inside one window) yields nothing
+    - The online set is maintained on every change, never rebuilt by a scan
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._online: Set[str] = set()
+
+        # Audiences
+        self._user_watchers: Dict[str, Set[str]] = {}   # watched user -> subscribers
+        self._room_watchers: Dict[str, Set[str]] = {}   # room -> spectators (non-members)
+        self._room_members: Dict[str, Set[str]] = {}
+        self._user_rooms: Dict[str, Set[str]] = {}
+        self._watching: Dict[str, Set[Tuple[str, str]]] = {}  # subscriber -> {("user"|"room", id)}
+
+        # Diff state: dirty users (with rooms reported by other nodes) and what was last sent
+        self._pending: Dict[str, Set[str]] = {}
+        self._sent: Dict[str, Tuple[str, Any]] = {}
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # STATE
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def set(self, user_id: str, entry: Dict[str, Any], rooms: Iterable[str] = ()) -> None:
+        """Record a presence change; `rooms` adds rooms the user is in on other nodes."""
+        self._entries[user_id] = entry
+        if entry.get("status") == "online":
+            self._online.add(user_id)
+        else:
+            self._online.discard(user_id)
+        self._pending.setdefault(user_id, set()).update(rooms)
+
+    def load(self, user_id: str, entry: Dict[str, Any]) -> None:
+        """Seed state without announcing it (startup snapshot)."""
+        self._entries[user_id] = entry
+        if entry.get("status") == "online":
+            self._online.add(user_id)
+        else:
+            self._online.discard(user_id)
+        self._sent[user_id] = (entry.get("status"), entry.get("activity"))
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return self._entries.get(user_id)
+
+    def online_users(self) -> List[str]:
+        return list(self._online)
+
+    def online_count(self) -> int:
+        return len(self._online)
+
+    def rooms_of(self, user_id: str) -> Set[str]:
+        return self._user_rooms.get(user_id, set())
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # SUBSCRIPTIONS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def watch_users(self, subscriber: str, user_ids: Iterable[str]) -> None:
+        watching = self._watching.setdefault(subscriber, set())
+        for user_id in user_ids:
+            if user_id != subscriber:
+                self._user_watchers.setdefault(user_id, set()).add(subscriber)
+                watching.add(("user", user_id))
+
+    def unwatch_users(self, subscriber: str, user_ids: Iterable[str]) -> None:
+        for user_id in user_ids:
+            self._discard(self._user_watchers, user_id, subscriber)
+            self._watching.get(subscriber, set()).discard(("user", user_id))
+
+    def watch_room(self, subscriber: str, room_id: str) -> None:
+        self._room_watchers.setdefault(room_id, set()).add(subscriber)
+        self._watching.setdefault(subscriber, set()).add(("room", room_id))
+
+    def unwatch_room(self, subscriber: str, room_id: str) -> None:
+        self._discard(self._room_watchers, room_id, subscriber)
+        self._watching.get(subscriber, set()).discard(("room", room_id))
+
+    def forget(self, subscriber: str) -> None:
+        """Drop every explicit subscription a user made (their last socket closed)."""
+        for kind, target in self._watching.pop(subscriber, ()):
+            index = self._user_watchers if kind == "user" else self._room_watchers
+            self._discard(index, target, subscriber)
+
+    def join(self, user_id: str, room_id: str) -> None:
+        self._room_members.setdefault(room_id, set()).add(user_id)
+        self._user_rooms.setdefault(user_id, set()).add(room_id)
+
+    def leave(self, user_id: str, room_id: str) -> None:
+        self._discard(self._room_members, room_id, user_id)
+        self._discard(self._user_rooms, user_id, room_id)
+
+    def drop_room(self, room_id: str) -> None:
+        for user_id in self._room_members.pop(room_id, ()):
+            self._discard(self._user_rooms, user_id, room_id)
+        for subscriber in self._room_watchers.pop(room_id, ()):
+            self._watching.get(subscriber, set()).discard(("room", room_id))
+
+    def watched_entries(self, subscriber: str, user_ids: Iterable[str] = None,
+                        room_id: str = None) -> List[Dict[str, Any]]:
+        """Current state of the given users / room members, as change records."""
+        targets = set(user_ids or ())
+        if room_id:
+            targets |= self._room_members.get(room_id, set())
+        targets.discard(subscriber)
+        return [self._change(user_id) for user_id in targets if user_id in self._entries]
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # DIFFS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def drain(self) -> List[Tuple[Set[str], List[Dict[str, Any]]]]:
+        """
+        Take everything that changed since the last drain.
+
+        Returns one (recipients, changes) pair per distinct change list, so
+        a room's members share a single encoded frame.
+        """
+        pending, self._pending = self._pending, {}
+        by_recipient: Dict[str, List[str]] = {}
+        for user_id, remote_rooms in pending.items():
+            entry = self._entries[user_id]
+            state = (entry.get("status"), entry.get("activity"))
+            if self._sent.get(user_id, ("offline", None)) == state:
+                continue
+            if state[0] == "offline":
+                self._sent.pop(user_id, None)
+            else:
+                self._sent[user_id] = state
+            for recipient in self._audience(user_id, remote_rooms):
+                by_recipient.setdefault(recipient, []).append(user_id)
+
+        groups: Dict[Tuple[str, ...], Set[str]] = {}
+        for recipient, user_ids in by_recipient.items():
+            groups.setdefault(tuple(user_ids), set()).add(recipient)
+        return [
+            (recipients, [self._change(user_id) for user_id in user_ids])
+            for user_ids, recipients in groups.items()
+        ]
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def _audience(self, user_id: str, remote_rooms: Set[str]) -> Set[str]:
+        audience = set(self._user_watchers.get(user_id, ()))
+        for room_id in self._user_rooms.get(user_id, set()) | remote_rooms:
+            audience |= self._room_members.get(room_id, set())
+            audience |= self._room_watchers.get(room_id, set())
+        audience.discard(user_id)
+        return audience
+
+    def _change(self, user_id: str) -> Dict[str, Any]:
+        return {"user_id": user_id, **self._entries[user_id]}
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[str]], key: str, value: str) -> None:
+        values = index.get(key)
+        if values is not None:
+            values.discard(value)
+            if not values:
+                del index[key]
@@ -0,0 +1,208 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+RESP STAND-IN
+A tiny Redis-protocol server covering exactly what RespBackplane uses
+(pub/sub, hashes, sets, lists, MULTI/EXEC), for local multi-worker runs and
+load tests without a Redis install. Single process, in-memory, no
+persistence - not for production.
+
+    python -m services.realtime.resp_standin --port 6390
+    REALTIME_BACKPLANE=redis REDIS_URL=redis://127.0.0.1:6390 uvicorn server:app --workers 4
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def _encode(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, bool):
+        return b":%d\r\n" % int(value)
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, Exception):
+        return b"-ERR %s\r\n" % str(value).encode()
+    if isinstance(value, (list, tuple)):
+        return b"*%d\r\n" % len(value) + b"".join(_encode(item) for item in value)
+    if isinstance(value, _Status):
+        return b"+%s\r\n" % value.text.encode()
+    data = value if isinstance(value, bytes) else str(value).encode()
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+def _range(values: List[bytes], start: int, stop: int) -> List[bytes]:
+    """Redis list range: inclusive, negative indexes count from the end."""
+    if start < 0:
+        start = max(0, len(values) + start)
+    if stop < 0:
+        stop = len(values) + stop
+    return values[start:stop + 1]
+
+
+class _Status:
+    def __init__(self, text: str):
+        self.text = text
+
+
+OK = _Status("OK")
+QUEUED = _Status("QUEUED")
+
+
+class _Client:
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.channels: Set[bytes] = set()
+        self.transaction: Optional[List[List[bytes]]] = None
+
+
+class RespStandIn:
+    """In-memory RESP server: the commands RespBackplane sends, nothing more."""
+
+    def __init__(self):
+        self._data: Dict[bytes, Any] = {}
+        self._channels: Dict[bytes, Set[_Client]] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 6390) -> int:
+        """Start listening; returns the bound port (pass 0 for any free port)."""
+        self._server = await asyncio.start_server(self._serve, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        client = _Client(writer)
+        try:
+            while True:
+                args = await self._read_command(reader)
+                if args is None:
+                    break
+                self._dispatch(client, args)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for channel in client.channels:
+                self._channels.get(channel, set()).discard(client)
+            writer.close()
+
+    @staticmethod
+    async def _read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+        line = await reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split()  # inline command (redis-cli, telnet)
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def _dispatch(self, client: _Client, args: List[bytes]) -> None:
+        command = args[0].upper().decode()
+        if client.transaction is not None and command not in ("EXEC", "MULTI"):
+            client.transaction.append(args)
+            client.writer.write(_encode(QUEUED))
+            return
+
+        if command == "MULTI":
+            client.transaction = []
+            client.writer.write(_encode(OK))
+        elif command == "EXEC":
+            queued, client.transaction = client.transaction or [], None
+            client.writer.write(_encode([self._run(client, queued_args) for queued_args in queued]))
+        elif command in ("SUBSCRIBE", "UNSUBSCRIBE"):
+            for channel in args[1:]:
+                subscribers = self._channels.setdefault(channel, set())
+                if command == "SUBSCRIBE":
+                    subscribers.add(client)
+                    client.channels.add(channel)
+                else:
+                    subscribers.discard(client)
+                    client.channels.discard(channel)
+                kind = command.lower().encode()
+                client.writer.write(_encode([kind, channel, len(client.channels)]))
+        else:
+            client.writer.write(_encode(self._run(client, args)))
+
+    def _run(self, client: _Client, args: List[bytes]) -> Any:
+        command, key = args[0].upper().decode(), args[1] if len(args) > 1 else None
+        try:
+            if command in ("PING", "AUTH", "SELECT"):
+                return _Status("PONG") if command == "PING" else OK
+            if command == "PUBLISH":
+                subscribers = self._channels.get(key, ())
+                frame = _encode([b"message", key, args[2]])
+                for subscriber in subscribers:
+                    subscriber.writer.write(frame)
+                return len(subscribers)
+            if command == "HSET":
+                values = self._data.setdefault(key, {})
+                added = 0
+                for field, value in zip(args[2::2], args[3::2]):
+                    added += field not in values
+                    values[field] = value
+                return added
+            if command == "HGET":
+                return self._data.get(key, {}).get(args[2])
+            if command == "HDEL":
+                values = self._data.get(key, {})
+                return sum(values.pop(field, None) is not None for field in args[2:])
+            if command == "HGETALL":
+                return [item for pair in self._data.get(key, {}).items() for item in pair]
+            if command == "HINCRBY":
+                values = self._data.setdefault(key, {})
+                values[args[2]] = str(int(values.get(args[2], 0)) + int(args[3])).encode()
+                return int(values[args[2]])
+            if command == "SADD":
+                members = self._data.setdefault(key, set())
+                before = len(members)
+                members.update(args[2:])
+                return len(members) - before
+            if command == "SREM":
+                members = self._data.get(key, set())
+                before = len(members)
+                members.difference_update(args[2:])
+                return before - len(members)
+            if command == "SCARD":
+                return len(self._data.get(key, ()))
+            if command == "RPUSH":
+                values = self._data.setdefault(key, [])
+                values.extend(args[2:])
+                return len(values)
+            if command == "LTRIM":
+                self._data[key] = _range(self._data.get(key, []), int(args[2]), int(args[3]))
+                return OK
+            if command == "LRANGE":
+                return _range(self._data.get(key, []), int(args[2]), int(args[3]))
+            if command == "DEL":
+                return sum(self._data.pop(k, None) is not None for k in args[1:])
+            return ValueError(f"unknown command '{command}'")
+        except Exception as e:
+            return e
+
+
+async def _main(host: str, port: int) -> None:
+    server = RespStandIn()
+    bound = await server.start(host, port)
+    logger.info(f"RESP stand-in listening on {host}:{bound}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Redis-protocol stand-in for the realtime backplane")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args.host, args.port))
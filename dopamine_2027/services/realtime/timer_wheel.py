@@ -0,0 +1,78 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+TIMER WHEEL
+Hashed timing wheel for per-connection deadlines (heartbeats, timeouts).
+Scheduling and cancelling are O(1); each tick only visits one slot, so the
+cost of a tick follows the number of timers due, not the number of sockets.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import math
+import time
+from typing import Dict, Hashable, List, Optional
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel.
+
+    - `slots` buckets, one per `tick` seconds; a timer lands in the bucket
+      `delay / tick` ticks ahead
+    - Delays longer than one revolution carry a rounds counter
+    - One pending timer per key: scheduling again moves it
+
+    The wheel does not run by itself - the owner calls advance() once per
+    tick and handles the keys that came due.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 64, clock=time.monotonic):
+        self._tick = tick
+        self._slots: List[Dict[Hashable, int]] = [{} for _ in range(slots)]
+        self._where: Dict[Hashable, int] = {}
+        self._clock = clock
+        self._origin = clock()
+        self._current = 0  # ticks processed so far
+
+    @property
+    def tick(self) -> float:
+        return self._tick
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._where
+
+    def schedule(self, key: Hashable, delay: float) -> None:
+        """Fire `key` after at least `delay` seconds (replaces any pending timer)."""
+        self.cancel(key)
+        # Ticks still to go, measured from the tick we're on right now
+        elapsed = (self._clock() - self._origin) / self._tick - self._current
+        ticks = max(1, math.ceil(delay / self._tick + max(0.0, elapsed)))
+        slot = (self._current + ticks) % len(self._slots)
+        self._slots[slot][key] = (ticks - 1) // len(self._slots)
+        self._where[key] = slot
+
+    def cancel(self, key: Hashable) -> bool:
+        slot = self._where.pop(key, None)
+        if slot is None:
+            return False
+        del self._slots[slot][key]
+        return True
+
+    def advance(self, now: Optional[float] = None) -> List[Hashable]:
+        """Process every tick up to `now`; returns the keys that came due."""
+        now = self._clock() if now is None else now
+        target = int((now - self._origin) / self._tick)
+        due = []
+        while self._current < target:
+            self._current += 1
+            bucket = self._slots[self._current % len(self._slots)]
+            for key, rounds in list(bucket.items()):
+                if rounds:
+                    bucket[key] = rounds - 1
+                else:
+                    del bucket[key]
+                    del self._where[key]
+                    due.append(key)
+        return due
@@ -6,17 +6,34 @@ Enables friends to watch content together in real-time with chat and reactions.
 """
 
 import asyncio
+import time
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Set
+from typing import Dict, Optional, Any, Set, Deque
 from dataclasses import dataclass, field
 from enum import Enum
 import uuid
 import logging
 
 from .websocket_manager import get_websocket_manager, MessageType
+from .party_clock import PlaybackClock, ClockSync
 
 logger = logging.getLogger(__name__)
 
+# Per-party history bounds (ring buffers: the oldest entry falls off)
+CHAT_HISTORY_SIZE = 100
+REACTION_HISTORY_SIZE = 500
+
+# Reactions are counted per emoji and broadcast once per window
+REACTION_WINDOW_SECONDS = 1.0
+
+# Distinct emojis a party counts; reactions with a new emoji past this are dropped
+MAX_REACTION_EMOJIS = 32
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.utcfromtimestamp(timestamp).isoformat()
+
 
 class PartyState(Enum):
     """Watch party states."""
@@ -35,6 +52,12 @@ class SyncEvent(Enum):
     BUFFER = "buffer"
     READY = "ready"
 
+    # Drift control
+    POSITION = "position"         # client -> server: {position, client_time}
+    CLOCK_PING = "clock_ping"     # server -> client: {t0}
+    CLOCK_PONG = "clock_pong"     # client -> server: {t0, t1, t2}
+    RATE = "rate"                 # server -> client: {playback_rate} (nudge back into sync)
+
 
 @dataclass
 class PartyMember:
@@ -48,26 +71,48 @@ class PartyMember:
     playback_position: float = 0.0  # Seconds
     is_buffering: bool = False
     last_sync: datetime = field(default_factory=datetime.utcnow)
+    clock_sync: ClockSync = field(default_factory=ClockSync)
+    rate_nudge: float = 1.0  # Playback rate we last asked this member to use
 
 
-@dataclass
 class ChatMessage:
     """A chat message in a watch party."""
-    id: str
-    user_id: str
-    display_name: str
-    content: str
-    timestamp: datetime = field(default_factory=datetime.utcnow)
-    is_system: bool = False
+
+    __slots__ = ("id", "user_id", "display_name", "content", "timestamp", "is_system")
+
+    def __init__(self, id: str, user_id: str, display_name: str, content: str,
+                 timestamp: float = None, is_system: bool = False):
+        self.id = id
+        self.user_id = user_id
+        self.display_name = display_name
+        self.content = content
+        self.timestamp = time.time() if timestamp is None else timestamp  # epoch seconds
+        self.is_system = is_system
+
+    def timestamp_iso(self) -> str:
+        return _iso(self.timestamp)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "display_name": self.display_name,
+            "content": self.content,
+            "is_system": self.is_system,
+            "timestamp": self.timestamp_iso()
+        }
 
 
-@dataclass
 class Reaction:
     """A reaction in a watch party."""
-    user_id: str
-    emoji: str
-    timestamp: datetime = field(default_factory=datetime.utcnow)
-    position: float = 0.0  # Playback position when reacted
+
+    __slots__ = ("user_id", "emoji", "timestamp", "position")
+
+    def __init__(self, user_id: str, emoji: str, timestamp: float = None, position: float = 0.0):
+        self.user_id = user_id
+        self.emoji = emoji
+        self.timestamp = time.time() if timestamp is None else timestamp  # epoch seconds
+        self.position = position  # Playback position when reacted
 
 
 @dataclass
@@ -82,16 +127,20 @@ class WatchParty:
 
     # State
     state: PartyState = PartyState.LOBBY
-    current_position: float = 0.0  # Current playback position
+    current_position: float = 0.0  # Position at the last play/pause/seek (see clock for "now")
     playback_rate: float = 1.0
+    clock: PlaybackClock = field(default_factory=PlaybackClock)
 
     # Members
     members: Dict[str, PartyMember] = field(default_factory=dict)
     max_members: int = 10
 
-    # Chat and reactions
-    chat_history: List[ChatMessage] = field(default_factory=list)
-    reactions: List[Reaction] = field(default_factory=list)
+    # Chat and reactions (bounded ring buffers)
+    chat_history: Deque[ChatMessage] = field(default_factory=lambda: deque(maxlen=CHAT_HISTORY_SIZE))
+    reactions: Deque[Reaction] = field(default_factory=lambda: deque(maxlen=REACTION_HISTORY_SIZE))
+    reaction_totals: Dict[str, int] = field(default_factory=dict)  # emoji -> count over the party
+    pending_reactions: Dict[str, int] = field(default_factory=dict)  # emoji -> count this window
+    reaction_flush: Optional[asyncio.Task] = None
 
     # Timing
     created_at: datetime = field(default_factory=datetime.utcnow)
@@ -114,6 +163,11 @@ class WatchPartyService:
     - Host controls with optional shared control
     - Automatic resync for late joiners
     - Buffer detection and handling
+    - Bounded memory per party: chat and reactions live in ring buffers of
+      slotted records; reactions go out as per-window emoji counts
+    - Drift control: a server playback clock, per-member clock offsets
+      from ping/pong RTT samples, small drift corrected by nudging the
+      member's playback rate, hard seeks only past _max_desync_seconds
     """
 
     def __init__(self):
@@ -128,12 +182,24 @@ class WatchPartyService:
         # Sync settings
         self._max_desync_seconds = 3.0  # Max allowed desync before force resync
         self._sync_interval = 5.0  # Seconds between sync checks
+        self._drift_tolerance = 0.15  # Drift we leave alone (seconds)
+        self._drift_correction_window = 10.0  # Nudged rate closes the gap over this long
+        self._max_rate_nudge = 0.05  # Rate stays within 1 +/- this
+        self._rate_step = 0.01  # Nudged rates are multiples of this
+        self._clock_samples = 4  # Ping/pong exchanges before the offset is trusted
+        self._clock_resample_after = 30.0  # Seconds before a fresh sample is taken
 
         # Statistics
         self._stats = {
             "total_parties_created": 0,
             "total_messages_sent": 0,
-            "total_reactions": 0
+            "total_reactions": 0,
+            "reactions_dropped": 0,
+            "reaction_broadcasts": 0,
+            "position_reports": 0,
+            "clock_pings": 0,
+            "rate_nudges": 0,
+            "resync_seeks": 0
         }
 
     def _register_handlers(self) -> None:
@@ -194,7 +260,8 @@ class WatchPartyService:
             content_duration=content_duration,
             is_private=is_private,
             anyone_can_control=anyone_can_control,
-            invite_code=invite_code
+            invite_code=invite_code,
+            clock=PlaybackClock(duration=content_duration)
         )
 
         # Add host as first member
@@ -294,8 +361,9 @@ class WatchPartyService:
         # Add system message
         await self._add_system_message(party, f"{user_name} joined the party")
 
-        # Send current state to new member
+        # Send current state to new member, and start measuring their clock
         await self._send_party_state(party, user_id)
+        await self._send_clock_ping(user_id)
 
         logger.info(f"User {user_id} joined party {party_id}")
         return party
@@ -370,6 +438,9 @@ class WatchPartyService:
         if party.invite_code:
             self._invite_codes.pop(party.invite_code, None)
 
+        if party.reaction_flush is not None:
+            party.reaction_flush.cancel()
+
         await self._ws_manager.delete_room(party_id)
         del self._parties[party_id]
 
@@ -394,6 +465,7 @@ class WatchPartyService:
             party.started_at = datetime.utcnow()
 
         party.state = PartyState.PLAYING
+        party.clock.play()
 
         await self._broadcast_sync(party, SyncEvent.PLAY, user_id)
         return True
@@ -408,6 +480,8 @@ class WatchPartyService:
             return False
 
         party.state = PartyState.PAUSED
+        party.clock.pause()
+        party.current_position = party.clock.position()
 
         await self._broadcast_sync(party, SyncEvent.PAUSE, user_id)
         return True
@@ -421,12 +495,28 @@ class WatchPartyService:
         # Clamp position
         position = max(0, min(position, party.content_duration))
         party.current_position = position
+        party.clock.seek(position)
 
         await self._broadcast_sync(party, SyncEvent.SEEK, user_id, position=position)
         return True
 
-    async def report_position(self, user_id: str, position: float, is_buffering: bool = False) -> None:
-        """Report current playback position (for sync tracking)."""
+    async def report_position(
+        self,
+        user_id: str,
+        position: float,
+        is_buffering: bool = False,
+        client_time: float = None
+    ) -> None:
+        """
+        Report current playback position (for sync tracking).
+
+        The report is placed on the server timeline (client_time minus the
+        member's clock offset, or arrival minus half the RTT) and compared
+        with the party clock at that instant:
+        - within _drift_tolerance: fine (any earlier nudge is reset)
+        - up to _max_desync_seconds: nudge the member's playback rate
+        - beyond: hard seek, aimed at where the party will be on arrival
+        """
         party = self._get_user_party(user_id)
         if not party:
             return
@@ -438,18 +528,72 @@ class WatchPartyService:
         member.playback_position = position
         member.is_buffering = is_buffering
         member.last_sync = datetime.utcnow()
+        self._stats["position_reports"] += 1
 
-        # Check if significantly desynced
-        if party.state == PartyState.PLAYING:
-            desync = abs(position - party.current_position)
-            if desync > self._max_desync_seconds and not is_buffering:
-                # Force resync
-                await self._ws_manager.send_to_user(user_id, {
-                    "type": MessageType.PARTY_SYNC.value,
-                    "event": SyncEvent.SEEK.value,
-                    "position": party.current_position,
-                    "reason": "resync"
-                })
+        sync = member.clock_sync
+        now = party.clock.now()
+        if len(sync) < self._clock_samples or now - sync.last_sample_at > self._clock_resample_after:
+            await self._send_clock_ping(user_id)
+
+        if party.state != PartyState.PLAYING or is_buffering:
+            return
+
+        reported_at = sync.to_server_time(client_time) if client_time and len(sync) else now - sync.rtt / 2
+        drift = position - party.clock.position(reported_at)  # > 0: member is ahead
+
+        if abs(drift) > self._max_desync_seconds:
+            # Force resync
+            member.rate_nudge = party.clock.rate
+            self._stats["resync_seeks"] += 1
+            await self._ws_manager.send_to_user(user_id, {
+                "type": MessageType.PARTY_SYNC.value,
+                "event": SyncEvent.SEEK.value,
+                "position": party.clock.position(now + sync.rtt / 2),
+                "playback_rate": party.clock.rate,
+                "server_time": now,
+                "reason": "resync"
+            })
+            return
+
+        # Hysteresis: once nudged, keep correcting until well inside the tolerance
+        settled = self._drift_tolerance / 3 if member.rate_nudge != party.clock.rate else self._drift_tolerance
+        if abs(drift) <= settled:
+            rate = party.clock.rate
+        else:
+            correction = max(-self._max_rate_nudge, min(self._max_rate_nudge, drift / self._drift_correction_window))
+            # Quantized so small wobbles in the estimate don't each cost a message
+            rate = round(party.clock.rate * (1 - correction) / self._rate_step) * self._rate_step
+            rate = round(rate, 4)
+
+        if rate != member.rate_nudge:
+            member.rate_nudge = rate
+            self._stats["rate_nudges"] += 1
+            await self._ws_manager.send_to_user(user_id, {
+                "type": MessageType.PARTY_SYNC.value,
+                "event": SyncEvent.RATE.value,
+                "playback_rate": rate,
+                "drift": round(drift, 3)
+            }, queue_if_offline=False)
+
+    async def _send_clock_ping(self, user_id: str) -> None:
+        """Start one NTP-style exchange; the client echoes t0 with its receive/send times."""
+        self._stats["clock_pings"] += 1
+        await self._ws_manager.send_to_user(user_id, {
+            "type": MessageType.PARTY_SYNC.value,
+            "event": SyncEvent.CLOCK_PING.value,
+            "t0": time.time()
+        }, queue_if_offline=False)
+
+    async def record_clock_sample(self, user_id: str, t0: float, t1: float, t2: float) -> None:
+        """A clock_pong arrived: add the sample, and keep sampling until the estimate settles."""
+        party = self._get_user_party(user_id)
+        member = party.members.get(user_id) if party else None
+        if not member:
+            return
+
+        member.clock_sync.add_sample(t0, t1, t2, time.time())
+        if len(member.clock_sync) < self._clock_samples:
+            await self._send_clock_ping(user_id)
 
     async def set_ready(self, user_id: str, is_ready: bool) -> bool:
         """Set member's ready status (for starting playback)."""
@@ -487,11 +631,14 @@ class WatchPartyService:
         position: float = None
     ) -> None:
         """Broadcast a sync event to all party members."""
+        now = party.clock.now()
         message = {
             "type": MessageType.PARTY_SYNC.value,
             "event": event.value,
             "state": party.state.value,
-            "position": position if position is not None else party.current_position,
+            "position": position if position is not None else party.clock.position(now),
+            "playback_rate": party.clock.rate,
+            "server_time": now,  # position is as of this instant; clients extrapolate with their offset
             "initiated_by": initiated_by,
             "timestamp": datetime.utcnow().isoformat()
         }
@@ -524,20 +671,10 @@ class WatchPartyService:
 
         party.chat_history.append(message)
 
-        # Keep only last 100 messages
-        if len(party.chat_history) > 100:
-            party.chat_history = party.chat_history[-100:]
-
         # Broadcast to party
         await self._broadcast_to_party(party, {
             "type": MessageType.PARTY_CHAT.value,
-            "message": {
-                "id": message.id,
-                "user_id": message.user_id,
-                "display_name": message.display_name,
-                "content": message.content,
-                "timestamp": message.timestamp.isoformat()
-            }
+            "message": message.to_dict()
         })
 
         self._stats["total_messages_sent"] += 1
@@ -550,31 +687,49 @@ class WatchPartyService:
             return None
 
         # Validate emoji (allow standard emojis)
-        if len(emoji) > 4:  # Max 4 chars for emoji
+        if not isinstance(emoji, str) or len(emoji) > 4:  # Max 4 chars for emoji
+            return None
+
+        # The per-emoji counters (and the late-joiner snapshot) stay bounded
+        if emoji not in party.reaction_totals and len(party.reaction_totals) >= MAX_REACTION_EMOJIS:
+            self._stats["reactions_dropped"] += 1
             return None
 
         reaction = Reaction(
             user_id=user_id,
             emoji=emoji,
-            position=party.current_position
+            position=party.clock.position()
         )
 
         party.reactions.append(reaction)
+        party.reaction_totals[emoji] = party.reaction_totals.get(emoji, 0) + 1
+        party.pending_reactions[emoji] = party.pending_reactions.get(emoji, 0) + 1
 
-        # Broadcast to party
-        await self._broadcast_to_party(party, {
-            "type": MessageType.PARTY_REACTION.value,
-            "reaction": {
-                "user_id": user_id,
-                "emoji": emoji,
-                "position": reaction.position,
-                "timestamp": reaction.timestamp.isoformat()
-            }
-        })
+        # First reaction of a window schedules its broadcast; the rest just count
+        if party.reaction_flush is None:
+            party.reaction_flush = asyncio.create_task(self._flush_reactions(party))
 
         self._stats["total_reactions"] += 1
         return reaction
 
+    async def _flush_reactions(self, party: WatchParty) -> None:
+        """Broadcast one window's reactions as emoji counts."""
+        try:
+            await asyncio.sleep(REACTION_WINDOW_SECONDS)
+        finally:
+            party.reaction_flush = None
+        counts, party.pending_reactions = party.pending_reactions, {}
+        if not counts or party.party_id not in self._parties:
+            return
+
+        await self._broadcast_to_party(party, {
+            "type": MessageType.PARTY_REACTION.value,
+            "counts": counts,
+            "window": REACTION_WINDOW_SECONDS,
+            "position": party.clock.position()
+        })
+        self._stats["reaction_broadcasts"] += 1
+
     async def _add_system_message(self, party: WatchParty, content: str) -> None:
         """Add a system message to chat."""
         message = ChatMessage(
@@ -588,14 +743,7 @@ class WatchPartyService:
 
         await self._broadcast_to_party(party, {
             "type": MessageType.PARTY_CHAT.value,
-            "message": {
-                "id": message.id,
-                "user_id": "system",
-                "display_name": "System",
-                "content": content,
-                "is_system": True,
-                "timestamp": message.timestamp.isoformat()
-            }
+            "message": message.to_dict()
         })
 
     # ═══════════════════════════════════════════════════════════════════════════
@@ -618,6 +766,19 @@ class WatchPartyService:
             await self.set_ready(user_id, message.get("is_ready", True))
         elif event == SyncEvent.BUFFER.value:
             await self.report_position(user_id, position, is_buffering=True)
+        elif event == SyncEvent.POSITION.value:
+            client_time = message.get("client_time")
+            try:
+                client_time = float(client_time) if client_time is not None else None
+            except (TypeError, ValueError):
+                return
+            await self.report_position(user_id, position, client_time=client_time)
+        elif event == SyncEvent.CLOCK_PONG.value:
+            try:
+                t0, t1, t2 = (float(message[k]) for k in ("t0", "t1", "t2"))
+            except (KeyError, TypeError, ValueError):
+                return
+            await self.record_clock_sample(user_id, t0, t1, t2)
 
     async def _handle_chat_message(self, connection, message: Dict) -> None:
         """Handle chat messages from clients."""
@@ -658,17 +819,13 @@ class WatchPartyService:
             for m in party.members.values()
         ]
 
-        chat_data = [
-            {
-                "id": m.id,
-                "user_id": m.user_id,
-                "display_name": m.display_name,
-                "content": m.content,
-                "is_system": m.is_system,
-                "timestamp": m.timestamp.isoformat()
-            }
-            for m in party.chat_history[-50:]  # Last 50 messages
-        ]
+        # Compact chat snapshot: one row per message in "fields" order, names listed once
+        recent = list(party.chat_history)[-50:]  # Last 50 messages
+        chat_data = {
+            "fields": ["id", "user_id", "content", "timestamp", "is_system"],
+            "rows": [[m.id, m.user_id, m.content, round(m.timestamp, 3), m.is_system] for m in recent],
+            "names": {m.user_id: m.display_name for m in recent}
+        }
 
         state_message = {
             "type": "party_state",
@@ -679,11 +836,14 @@ class WatchPartyService:
                 "content_title": party.content_title,
                 "content_duration": party.content_duration,
                 "state": party.state.value,
-                "current_position": party.current_position,
+                "current_position": party.clock.position(),
+                "playback_rate": party.clock.rate,
+                "server_time": party.clock.now(),
                 "host_id": party.host_id,
                 "anyone_can_control": party.anyone_can_control,
                 "members": members_data,
                 "chat_history": chat_data,
+                "reaction_counts": party.reaction_totals,
                 "invite_code": party.invite_code if party.host_id == user_id else None
             }
         }
@@ -8,14 +8,38 @@ and instant messaging.
 
 import asyncio
 import json
-from datetime import datetime, timedelta
-from typing import Dict, Set, Optional, List, Any, Callable
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Set, Optional, List, Any, Callable, Deque, Tuple, Iterable
 from dataclasses import dataclass, field
 from enum import Enum
 import logging
 
+from .timer_wheel import TimerWheel
+from .backplane import Backplane
+from .presence import PresenceTracker
+from .offline_spool import OfflineSpool
+
 logger = logging.getLogger(__name__)
 
+# Optional dependency: orjson (several times faster than json.dumps)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def encode_frame(message: Dict) -> str:
+    """JSON-encode an outgoing message (same output as WebSocket.send_json)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(message, default=str).decode()
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=str)
+
 
 class ConnectionState(Enum):
     """WebSocket connection states."""
@@ -31,6 +55,7 @@ class MessageType(Enum):
     PRESENCE_UPDATE = "presence_update"
     PRESENCE_SUBSCRIBE = "presence_subscribe"
     PRESENCE_UNSUBSCRIBE = "presence_unsubscribe"
+    PRESENCE_BATCH = "presence_batch"
 
     # Watch Party
     PARTY_JOIN = "party_join"
@@ -52,6 +77,30 @@ class MessageType(Enum):
     PONG = "pong"
     ERROR = "error"
     ACK = "ack"
+    OFFLINE_BATCH = "offline_batch"
+
+
+# Playback commands carry the full party state, so only the latest matters
+PLAYBACK_SYNC_EVENTS = {"play", "pause", "seek"}
+
+
+def coalesce_key(message: Dict) -> Optional[Tuple]:
+    """
+    Key under which a queued message may be replaced by a newer one.
+
+    State-like messages (playback sync, presence, typing, ping) only need
+    their latest value delivered; everything else is never coalesced.
+    """
+    message_type = message.get("type")
+    if message_type == MessageType.PARTY_SYNC.value and message.get("event") in PLAYBACK_SYNC_EVENTS:
+        return (message_type, message.get("room_id") or message.get("party_id"))
+    if message_type == MessageType.PRESENCE_UPDATE.value:
+        return (message_type, message.get("room_id"), message.get("user_id"))
+    if message_type == MessageType.DM_TYPING.value:
+        return (message_type, message.get("conversation_id"), message.get("user_id"))
+    if message_type == MessageType.PING.value:
+        return (message_type,)
+    return None
 
 
 @dataclass
@@ -65,6 +114,16 @@ class Connection:
     subscribed_rooms: Set[str] = field(default_factory=set)
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+    # Outbound queue: [coalesce key, encoded frame] entries drained by the writer task
+    outbox: Deque[List[Any]] = field(default_factory=deque)
+    outbox_keys: Dict[Tuple, List[Any]] = field(default_factory=dict)
+    outbox_ready: asyncio.Event = field(default_factory=asyncio.Event)
+    writer_task: Optional[asyncio.Task] = None
+    full_since: Optional[float] = None  # monotonic time the outbox filled up
+
+    # Heartbeat: when the next server ping is due (monotonic)
+    next_ping_at: float = 0.0
+
 
 @dataclass
 class Room:
@@ -83,48 +142,98 @@ class WebSocketManager:
     Features:
     - Connection pooling and management
     - Room-based messaging (watch parties, group chats)
-    - Presence tracking
+    - Presence tracking: subscription-scoped (friends, shared rooms) and
+      sent as periodic diff batches rather than one broadcast per change
     - Automatic reconnection handling
-    - Rate limiting and backpressure
-    - Message queuing for offline users
+    - Per-connection send queues: fan-out only enqueues, and a writer task
+      per connection does the network I/O, so one slow client never delays
+      the others
+    - Backpressure: state-like messages are coalesced, a full queue drops
+      its oldest message, and a consumer that stays full (or stalls a send)
+      is disconnected
+    - Message queuing for offline users: a ring buffer per user, spilled to
+      an append-only on-disk log (OfflineSpool) when it fills up or goes
+      cold, replayed in batched frames on reconnect
+    - Optional backplane (services.realtime.backplane): room broadcasts,
+      per-user delivery, presence, the room registry and offline queues
+      span every worker/node; each node still delivers only to its own sockets
     """
 
     def __init__(self,
                  ping_interval: int = 30,
                  ping_timeout: int = 10,
                  max_connections_per_user: int = 5,
-                 message_queue_size: int = 100):
+                 message_queue_size: int = 100,
+                 send_queue_size: int = 256,
+                 send_timeout: float = 5.0,
+                 slow_consumer_grace: float = 10.0,
+                 heartbeat_tick: float = 1.0,
+                 presence_batch_interval: float = 0.5,
+                 offline_cold_after: float = 300.0,
+                 replay_batch_size: int = 50):
         # Active connections: user_id -> list of Connection objects
         self._connections: Dict[str, List[Connection]] = {}
 
         # Active rooms: room_id -> Room object
         self._rooms: Dict[str, Room] = {}
 
-        # Presence state: user_id -> status info
-        self._presence: Dict[str, Dict[str, Any]] = {}
+        # Presence state, subscriptions and pending diffs
+        self._presence = PresenceTracker()
+        self._presence_batch_interval = presence_batch_interval
 
-        # Message queues for offline users
-        self._offline_queues: Dict[str, List[Dict]] = {}
+        # Message queues for offline users: encoded frames, newest last
+        self._offline_queues: Dict[str, Deque[str]] = {}
+        self._offline_touched: Dict[str, float] = {}  # user_id -> monotonic time of last enqueue
+        self._offline_spool: Optional[OfflineSpool] = None
+        # Spool file I/O runs on one worker thread: off the event loop, in call order
+        self._spool_executor: Optional[ThreadPoolExecutor] = None
 
         # Configuration
         self._ping_interval = ping_interval
         self._ping_timeout = ping_timeout
         self._max_connections_per_user = max_connections_per_user
         self._message_queue_size = message_queue_size
+        self._offline_cold_after = offline_cold_after
+        self._replay_batch_size = replay_batch_size
+
+        # Per-connection send queue limits
+        self._send_queue_size = send_queue_size
+        self._send_timeout = send_timeout
+        self._slow_consumer_grace = slow_consumer_grace
 
         # Message handlers
         self._handlers: Dict[MessageType, List[Callable]] = {}
 
+        # Heartbeats: one wheel timer per connection (id(connection) -> connection)
+        self._heartbeats = TimerWheel(tick=heartbeat_tick)
+        self._heartbeat_connections: Dict[int, Connection] = {}
+
         # Background tasks
-        self._ping_task: Optional[asyncio.Task] = None
-        self._cleanup_task: Optional[asyncio.Task] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._presence_task: Optional[asyncio.Task] = None
+        self._spool_task: Optional[asyncio.Task] = None
+
+        # Cross-process fan-out (None = this process is the whole cluster)
+        self._backplane: Optional[Backplane] = None
+        self._node_id = uuid.uuid4().hex[:12]
 
         # Statistics
         self._stats = {
             "total_connections": 0,
             "total_messages_sent": 0,
             "total_messages_received": 0,
-            "active_rooms": 0
+            "active_rooms": 0,
+            "frames_encoded": 0,
+            "messages_coalesced": 0,
+            "messages_dropped": 0,
+            "slow_consumers_disconnected": 0,
+            "heartbeat_pings": 0,
+            "stale_connections_reaped": 0,
+            "presence_changes": 0,
+            "presence_batches": 0,
+            "offline_queued": 0,
+            "offline_spilled": 0,
+            "offline_replayed": 0
         }
 
     # ═══════════════════════════════════════════════════════════════════════════
@@ -153,6 +262,8 @@ class WebSocketManager:
         # Add to user's connections
         if user_id not in self._connections:
             self._connections[user_id] = []
+            if self._backplane:
+                await self._backplane.subscribe(f"user:{user_id}")
 
         # Enforce max connections per user
         user_connections = self._connections[user_id]
@@ -163,6 +274,11 @@ class WebSocketManager:
 
         self._connections[user_id].append(connection)
         self._stats["total_connections"] += 1
+        if self._backplane:
+            await self._backplane.hash_incr("online", user_id, 1)
+        connection.writer_task = asyncio.create_task(self._writer(connection))
+        connection.next_ping_at = time.monotonic() + self._ping_interval
+        self._schedule_heartbeat(connection)
 
         # Update presence
         await self._update_presence(user_id, "online")
@@ -190,17 +306,24 @@ class WebSocketManager:
         for conn in connections:
             if conn.websocket == websocket:
                 conn.state = ConnectionState.DISCONNECTED
+                self._stop_writer(conn)
+                self._cancel_heartbeat(conn)
 
                 # Leave all rooms
                 for room_id in list(conn.subscribed_rooms):
                     await self._leave_room(conn, room_id)
 
                 connections.remove(conn)
+                if self._backplane:
+                    await self._backplane.hash_incr("online", user_id, -1)
                 break
 
         # Clean up if no more connections
         if not connections:
             del self._connections[user_id]
+            self._presence.forget(user_id)
+            if self._backplane:
+                await self._backplane.unsubscribe(f"user:{user_id}")
             # Update presence to offline after a delay (to handle reconnects)
             asyncio.create_task(self._delayed_offline(user_id, delay=30))
 
@@ -209,19 +332,24 @@ class WebSocketManager:
     async def _delayed_offline(self, user_id: str, delay: int) -> None:
         """Mark user offline after delay if still disconnected."""
         await asyncio.sleep(delay)
-        if user_id not in self._connections:
+        if user_id not in self._connections and not await self._online_elsewhere(user_id):
             await self._update_presence(user_id, "offline")
 
+    async def _online_elsewhere(self, user_id: str) -> bool:
+        """Whether another node holds a connection for this user."""
+        if not self._backplane:
+            return False
+        return int(await self._backplane.hash_get("online", user_id) or 0) > 0
+
     async def _close_connection(self, connection: Connection, reason: str) -> None:
-        """Force close a connection."""
-        try:
-            await self.send_to_connection(connection, {
-                "type": MessageType.ERROR.value,
-                "reason": reason
-            })
-            await connection.websocket.close()
-        except Exception as e:
-            logger.warning(f"Error closing connection: {e}")
+        """Force close a connection (after its queued messages and the reason)."""
+        await self.send_to_connection(connection, {
+            "type": MessageType.ERROR.value,
+            "reason": reason
+        })
+        # A None frame tells the writer to close the socket
+        connection.outbox.append([None, None])
+        connection.outbox_ready.set()
 
     # ═══════════════════════════════════════════════════════════════════════════
     # MESSAGE SENDING
@@ -237,98 +365,276 @@ class WebSocketManager:
             queue_if_offline: Whether to queue message if user is offline
 
         Returns:
-            True if message was delivered to at least one connection
+            True if message was queued on at least one connection
         """
         connections = self._connections.get(user_id, [])
 
-        if not connections:
-            if queue_if_offline:
-                self._queue_message(user_id, message)
-            return False
-
-        # Send to all user's connections
-        success = False
-        for conn in connections:
-            if await self.send_to_connection(conn, message):
-                success = True
-
-        return success
+        if not self._backplane:
+            if not connections:
+                if queue_if_offline:
+                    await self._queue_message(user_id, message)
+                return False
+            key, frame = self._encode(message)
+            return self._enqueue_user(connections, key, frame)
+
+        # Local sockets directly, other nodes' sockets through the user channel
+        key, frame = self._encode(message)
+        delivered = self._enqueue_user(connections, key, frame)
+        receivers = await self._backplane.publish(f"user:{user_id}", self._pack(key, frame))
+        if receivers > (1 if connections else 0):
+            delivered = True
+        elif not connections and queue_if_offline:
+            await self._queue_message(user_id, message)
+        return delivered
 
     async def send_to_connection(self, connection: Connection, message: Dict) -> bool:
-        """Send message to a specific connection."""
-        try:
-            # Add timestamp if not present
-            if "timestamp" not in message:
-                message["timestamp"] = datetime.utcnow().isoformat()
+        """
+        Queue a message for a specific connection (never waits on the network).
 
-            await connection.websocket.send_json(message)
-            self._stats["total_messages_sent"] += 1
-            return True
-        except Exception as e:
-            logger.warning(f"Failed to send to {connection.user_id}: {e}")
-            connection.state = ConnectionState.DISCONNECTED
-            return False
+        Returns:
+            False if the connection is closed or was just dropped as a slow consumer
+        """
+        key, frame = self._encode(message)
+        return self._enqueue(connection, key, frame)
 
     async def send_to_room(self, room_id: str, message: Dict, exclude_user: str = None) -> int:
         """
         Broadcast message to all members of a room.
 
+        The frame is built and encoded once; every member's connections get
+        the same pre-encoded text.
+
         Args:
             room_id: The room to broadcast to
             message: Message to send
             exclude_user: Optional user to exclude (e.g., message sender)
 
         Returns:
-            Number of users the message was delivered to
+            Number of users the message was queued for (on this node)
         """
         room = self._rooms.get(room_id)
-        if not room:
+        if not room and not self._backplane:
             return 0
 
-        # Add room context to message
-        message["room_id"] = room_id
+        key, frame = self._encode(message, room_id=room_id)
+        delivered_count = self._deliver_room(room_id, key, frame, (exclude_user,))
 
-        delivered_count = 0
-        for user_id in room.members:
-            if user_id != exclude_user:
-                if await self.send_to_user(user_id, message, queue_if_offline=False):
-                    delivered_count += 1
+        if self._backplane:
+            await self._backplane.publish(f"room:{room_id}", self._pack(key, frame, [exclude_user]))
 
         return delivered_count
 
     async def broadcast(self, message: Dict, exclude_users: Set[str] = None) -> int:
-        """Broadcast message to all connected users."""
+        """Broadcast message to all connected users (encoded once)."""
         exclude_users = exclude_users or set()
-        delivered_count = 0
+        key, frame = self._encode(message)
+        delivered_count = self._deliver_all(key, frame, exclude_users)
+
+        if self._backplane:
+            await self._backplane.publish("all", self._pack(key, frame, list(exclude_users)))
+
+        return delivered_count
 
-        for user_id in self._connections.keys():
-            if user_id not in exclude_users:
-                if await self.send_to_user(user_id, message):
+    def _deliver_room(self, room_id: str, key: Optional[Tuple], frame: str, exclude: Iterable[str]) -> int:
+        room = self._rooms.get(room_id)
+        if not room:
+            return 0
+        delivered_count = 0
+        for user_id in room.members:
+            if user_id not in exclude:
+                if self._enqueue_user(self._connections.get(user_id, ()), key, frame):
                     delivered_count += 1
+        return delivered_count
 
+    def _deliver_all(self, key: Optional[Tuple], frame: str, exclude: Iterable[str]) -> int:
+        delivered_count = 0
+        for user_id, connections in self._connections.items():
+            if user_id not in exclude:
+                if self._enqueue_user(connections, key, frame):
+                    delivered_count += 1
         return delivered_count
 
-    def _queue_message(self, user_id: str, message: Dict) -> None:
+    def _encode(self, message: Dict, **context: Any) -> Tuple[Optional[Tuple], str]:
+        """
+        Build the outgoing frame once: context (room_id) and a timestamp are
+        added on a copy, so the caller's dict is never mutated.
+
+        Returns:
+            (coalesce key, encoded frame)
+        """
+        frame = {**message, **context}
+        if "timestamp" not in frame:
+            frame["timestamp"] = datetime.utcnow().isoformat()
+        self._stats["frames_encoded"] += 1
+        return coalesce_key(frame), encode_frame(frame)
+
+    def _enqueue_user(self, connections: List[Connection], key: Optional[Tuple], frame: str) -> bool:
+        success = False
+        for conn in connections:
+            if self._enqueue(conn, key, frame):
+                success = True
+        return success
+
+    def _enqueue(self, connection: Connection, key: Optional[Tuple], frame: str) -> bool:
+        """Put an encoded frame on a connection's outbox, applying backpressure."""
+        if connection.state == ConnectionState.DISCONNECTED:
+            return False
+
+        # Newer state replaces the queued one in place (keeps its position)
+        if key is not None:
+            entry = connection.outbox_keys.get(key)
+            if entry is not None:
+                entry[1] = frame
+                self._stats["messages_coalesced"] += 1
+                return True
+
+        if len(connection.outbox) >= self._send_queue_size:
+            now = time.monotonic()
+            if connection.full_since is None:
+                connection.full_since = now
+            elif now - connection.full_since > self._slow_consumer_grace:
+                self._drop_slow_consumer(connection, "send_queue_full")
+                return False
+
+            # Drop oldest
+            dropped = connection.outbox.popleft()
+            if dropped[0] is not None and connection.outbox_keys.get(dropped[0]) is dropped:
+                del connection.outbox_keys[dropped[0]]
+            self._stats["messages_dropped"] += 1
+
+        entry = [key, frame]
+        connection.outbox.append(entry)
+        if key is not None:
+            connection.outbox_keys[key] = entry
+        connection.outbox_ready.set()
+        return True
+
+    async def _queue_message(self, user_id: str, message: Dict) -> None:
         """Queue a message for offline user."""
-        if user_id not in self._offline_queues:
-            self._offline_queues[user_id] = []
+        _, frame = self._encode(message)
+        self._stats["offline_queued"] += 1
 
-        queue = self._offline_queues[user_id]
+        if self._backplane:
+            await self._backplane.list_push(f"offline:{user_id}", frame, self._message_queue_size)
+            return
 
-        # Enforce queue size limit
-        while len(queue) >= self._message_queue_size:
-            queue.pop(0)  # Remove oldest
+        spill = None
+        queue = self._offline_queues.get(user_id)
+        if queue is None:
+            # Ring buffer: a full deque drops its oldest entry in O(1)
+            queue = self._offline_queues[user_id] = deque(maxlen=self._message_queue_size)
+        elif len(queue) == queue.maxlen and self._offline_spool is not None:
+            spill = self._spill(user_id)
+            queue = self._offline_queues[user_id] = deque(maxlen=self._message_queue_size)
+
+        queue.append(frame)
+        self._offline_touched[user_id] = time.monotonic()
+        if spill is not None:
+            await spill
+
+    def _spool_call(self, method: Callable, *args: Any) -> "asyncio.Future":
+        """
+        Run a spool method on the spool thread. It is submitted right away, so
+        spool calls run in the order they are made even if awaited later.
+        """
+        return asyncio.get_running_loop().run_in_executor(self._spool_executor, method, *args)
 
-        queue.append(message)
+    def _spill(self, user_id: str) -> "asyncio.Future":
+        """Move a user's in-memory queue to the spool; await the result for the write."""
+        queue = list(self._offline_queues.pop(user_id, ()))
+        self._offline_touched.pop(user_id, None)
+        self._stats["offline_spilled"] += len(queue)
+        return self._spool_call(self._offline_spool.append, user_id, queue)
+
+    async def _spill_cold_queues(self, everything: bool = False) -> None:
+        cutoff = time.monotonic() - self._offline_cold_after
+        cold = [user_id for user_id, touched in self._offline_touched.items() if everything or touched < cutoff]
+        await asyncio.gather(*[self._spill(user_id) for user_id in cold])
 
     async def _deliver_queued_messages(self, user_id: str) -> None:
-        """Deliver queued messages when user connects."""
-        if user_id not in self._offline_queues:
+        """Deliver queued messages when user connects, oldest first, in batched frames."""
+        frames: List[str] = []
+        if self._offline_spool is not None:
+            frames += await self._spool_call(self._offline_spool.drain, user_id)
+        frames += self._offline_queues.pop(user_id, ())
+        self._offline_touched.pop(user_id, None)
+        if self._backplane:
+            frames += await self._backplane.list_drain(f"offline:{user_id}")
+        if not frames:
+            return
+
+        # Frames are already encoded - splice them into the batch instead of re-encoding
+        connections = self._connections.get(user_id, ())
+        for start in range(0, len(frames), self._replay_batch_size):
+            chunk = frames[start:start + self._replay_batch_size]
+            batch = '{"type":"%s","count":%d,"messages":[%s]}' % (
+                MessageType.OFFLINE_BATCH.value, len(chunk), ",".join(chunk)
+            )
+            self._enqueue_user(connections, None, batch)
+        self._stats["offline_replayed"] += len(frames)
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # CONNECTION WRITERS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    async def _writer(self, connection: Connection) -> None:
+        """Drain one connection's outbox onto its socket, in order."""
+        try:
+            while True:
+                if not connection.outbox:
+                    connection.outbox_ready.clear()
+                    await connection.outbox_ready.wait()
+                    continue
+
+                entry = connection.outbox.popleft()
+                key, frame = entry
+                if key is not None and connection.outbox_keys.get(key) is entry:
+                    del connection.outbox_keys[key]
+
+                if frame is None:
+                    connection.state = ConnectionState.DISCONNECTED
+                    await connection.websocket.close()
+                    return
+
+                await asyncio.wait_for(connection.websocket.send_text(frame), self._send_timeout)
+                self._stats["total_messages_sent"] += 1
+
+                # Drained to half: the consumer is keeping up again
+                if connection.full_since is not None and len(connection.outbox) <= self._send_queue_size // 2:
+                    connection.full_since = None
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            connection.writer_task = None
+            self._drop_slow_consumer(connection, "send_timeout")
+        except Exception as e:
+            logger.warning(f"Failed to send to {connection.user_id}: {e}")
+            connection.state = ConnectionState.DISCONNECTED
+
+    def _stop_writer(self, connection: Connection) -> None:
+        task = connection.writer_task
+        connection.writer_task = None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+        connection.outbox.clear()
+        connection.outbox_keys.clear()
+
+    def _drop_slow_consumer(self, connection: Connection, reason: str) -> None:
+        """Disconnect a client that can't keep up, so it stops costing memory."""
+        if connection.state == ConnectionState.DISCONNECTED:
             return
+        logger.warning(f"Disconnecting slow consumer {connection.user_id} ({reason})")
+        self._stats["slow_consumers_disconnected"] += 1
+        connection.state = ConnectionState.DISCONNECTED
+        self._stop_writer(connection)
+        asyncio.create_task(self._abort(connection, reason))
 
-        messages = self._offline_queues.pop(user_id, [])
-        for message in messages:
-            await self.send_to_user(user_id, message, queue_if_offline=False)
+    async def _abort(self, connection: Connection, reason: str) -> None:
+        try:
+            await connection.websocket.close(code=1013, reason=reason)
+        except Exception as e:
+            logger.warning(f"Error closing connection: {e}")
+        await self.disconnect(connection.websocket, connection.user_id)
 
     # ═══════════════════════════════════════════════════════════════════════════
     # ROOM MANAGEMENT
@@ -344,16 +650,41 @@ class WebSocketManager:
         self._rooms[room_id] = room
         self._stats["active_rooms"] = len(self._rooms)
 
+        if self._backplane:
+            await self._backplane.hash_set("rooms", room_id, encode_frame({
+                "room_type": room_type,
+                "metadata": room.metadata
+            }))
+
         logger.info(f"Room created: {room_id} ({room_type})")
         return room
 
+    async def _load_room(self, room_id: str) -> Optional[Room]:
+        """Pick up a room another node created (backplane room registry)."""
+        if not self._backplane:
+            return None
+        entry = await self._backplane.hash_get("rooms", room_id)
+        if entry is None:
+            return None
+        entry = json.loads(entry)
+        room = Room(room_id=room_id, room_type=entry["room_type"], metadata=entry["metadata"])
+        self._rooms[room_id] = room
+        self._stats["active_rooms"] = len(self._rooms)
+        return room
+
     async def join_room(self, user_id: str, room_id: str) -> bool:
         """Add user to a room."""
-        room = self._rooms.get(room_id)
+        room = self._rooms.get(room_id) or await self._load_room(room_id)
         if not room:
             return False
 
+        if self._backplane:
+            if not room.members:
+                await self._backplane.subscribe(f"room:{room_id}")
+            await self._backplane.set_add(f"room_members:{room_id}", user_id)
+
         room.members.add(user_id)
+        self._presence.join(user_id, room_id)
 
         # Subscribe all user connections to room
         for conn in self._connections.get(user_id, []):
@@ -377,6 +708,7 @@ class WebSocketManager:
             return False
 
         room.members.discard(user_id)
+        self._presence.leave(user_id, room_id)
 
         # Unsubscribe all user connections
         for conn in self._connections.get(user_id, []):
@@ -390,9 +722,21 @@ class WebSocketManager:
             "room_id": room_id
         })
 
+        # Members on other nodes keep the room alive
+        empty = not room.members
+        if self._backplane:
+            await self._backplane.set_remove(f"room_members:{room_id}", user_id)
+            if empty:
+                await self._backplane.unsubscribe(f"room:{room_id}")
+                empty = await self._backplane.set_size(f"room_members:{room_id}") == 0
+
         # Clean up empty rooms (except persistent ones)
-        if not room.members and not room.metadata.get("persistent"):
+        if empty and not room.metadata.get("persistent"):
             await self.delete_room(room_id)
+        elif not room.members:
+            self._rooms.pop(room_id, None)
+            self._presence.drop_room(room_id)
+            self._stats["active_rooms"] = len(self._rooms)
 
         return True
 
@@ -406,18 +750,32 @@ class WebSocketManager:
             return False
 
         room = self._rooms.pop(room_id)
+        self._presence.drop_room(room_id)
         self._stats["active_rooms"] = len(self._rooms)
 
-        # Notify all members
-        for user_id in room.members:
-            await self.send_to_user(user_id, {
+        if self._backplane:
+            await self._backplane.hash_delete("rooms", room_id)
+            await self._backplane.delete(f"room_members:{room_id}")
+            if room.members:
+                await self._backplane.unsubscribe(f"room:{room_id}")
+            await self._backplane.publish("ctl", self._pack(None, encode_frame({
                 "type": "room_deleted",
                 "room_id": room_id
-            })
+            })))
+
+        await self._notify_room_deleted(room)
 
         logger.info(f"Room deleted: {room_id}")
         return True
 
+    async def _notify_room_deleted(self, room: Room) -> None:
+        # Notify all members (the ones that joined through this node)
+        for user_id in room.members:
+            await self.send_to_user(user_id, {
+                "type": "room_deleted",
+                "room_id": room.room_id
+            })
+
     def get_room(self, room_id: str) -> Optional[Room]:
         """Get room by ID."""
         return self._rooms.get(room_id)
@@ -432,38 +790,70 @@ class WebSocketManager:
     # ═══════════════════════════════════════════════════════════════════════════
 
     async def _update_presence(self, user_id: str, status: str, activity: Dict = None) -> None:
-        """Update user's presence status."""
-        self._presence[user_id] = {
+        """Update user's presence status (announced with the next diff batch)."""
+        entry = {
             "status": status,
             "activity": activity,
             "last_seen": datetime.utcnow().isoformat()
         }
-
-        # Broadcast to friends/subscribers (would need friend list integration)
-        # For now, broadcast to all rooms user is in
-        for conn in self._connections.get(user_id, []):
-            for room_id in conn.subscribed_rooms:
-                await self.send_to_room(room_id, {
-                    "type": MessageType.PRESENCE_UPDATE.value,
-                    "user_id": user_id,
-                    "status": status,
-                    "activity": activity
-                }, exclude_user=user_id)
+        self._presence.set(user_id, entry)
+        self._stats["presence_changes"] += 1
+
+        if self._backplane:
+            await self._backplane.hash_set("presence", user_id, encode_frame({"user_id": user_id, **entry}))
+            await self._backplane.publish("ctl", self._pack(None, encode_frame({
+                "type": "presence",
+                "user_id": user_id,
+                "presence": entry,
+                "rooms": list(self._presence.rooms_of(user_id))
+            })))
 
     async def broadcast_presence(self, user_id: str, status: str, activity: Dict = None) -> None:
         """Public method to broadcast presence update."""
         await self._update_presence(user_id, status, activity)
 
+    async def subscribe_presence(self, user_id: str, user_ids: List[str] = None, room_id: str = None) -> None:
+        """
+        Watch other users' presence (e.g. a friend list) and/or a room's members.
+
+        The subscriber gets the current state right away, then diffs.
+        """
+        if user_ids:
+            self._presence.watch_users(user_id, user_ids)
+        if room_id and room_id in self._rooms:
+            self._presence.watch_room(user_id, room_id)
+
+        snapshot = self._presence.watched_entries(user_id, user_ids, room_id if room_id in self._rooms else None)
+        if snapshot:
+            await self.send_to_user(user_id, {
+                "type": MessageType.PRESENCE_BATCH.value,
+                "changes": snapshot
+            }, queue_if_offline=False)
+
+    def unsubscribe_presence(self, user_id: str, user_ids: List[str] = None, room_id: str = None) -> None:
+        if user_ids:
+            self._presence.unwatch_users(user_id, user_ids)
+        if room_id:
+            self._presence.unwatch_room(user_id, room_id)
+
+    def _flush_presence(self) -> None:
+        """Send every change since the last flush: one frame per distinct diff, local sockets only."""
+        for recipients, changes in self._presence.drain():
+            key, frame = self._encode({
+                "type": MessageType.PRESENCE_BATCH.value,
+                "changes": changes
+            })
+            for recipient in recipients:
+                self._enqueue_user(self._connections.get(recipient, ()), key, frame)
+            self._stats["presence_batches"] += 1
+
     def get_presence(self, user_id: str) -> Optional[Dict]:
         """Get user's current presence."""
         return self._presence.get(user_id)
 
     def get_online_users(self) -> List[str]:
         """Get list of all online users."""
-        return [
-            user_id for user_id, presence in self._presence.items()
-            if presence.get("status") == "online"
-        ]
+        return self._presence.online_users()
 
     # ═══════════════════════════════════════════════════════════════════════════
     # MESSAGE HANDLING
@@ -481,11 +871,22 @@ class WebSocketManager:
 
         message_type = message.get("type")
 
-        # Handle ping/pong
+        # Handle ping/pong (either one proves the client is alive)
         if message_type == MessageType.PING.value:
             connection.last_ping = datetime.utcnow()
             await self.send_to_connection(connection, {"type": MessageType.PONG.value})
             return
+        if message_type == MessageType.PONG.value:
+            connection.last_ping = datetime.utcnow()
+            return
+
+        # Presence subscriptions: {"user_ids": [...]} and/or {"room_id": ...}
+        if message_type == MessageType.PRESENCE_SUBSCRIBE.value:
+            await self.subscribe_presence(connection.user_id, message.get("user_ids"), message.get("room_id"))
+            return
+        if message_type == MessageType.PRESENCE_UNSUBSCRIBE.value:
+            self.unsubscribe_presence(connection.user_id, message.get("user_ids"), message.get("room_id"))
+            return
 
         # Call registered handlers
         try:
@@ -510,51 +911,175 @@ class WebSocketManager:
     # BACKGROUND TASKS
     # ═══════════════════════════════════════════════════════════════════════════
 
-    async def start_background_tasks(self) -> None:
-        """Start background maintenance tasks."""
-        self._ping_task = asyncio.create_task(self._ping_loop())
-        self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+    async def start_background_tasks(self, backplane: Optional[Backplane] = None,
+                                     offline_spool: Optional[OfflineSpool] = None) -> None:
+        """Start background maintenance tasks (and join the backplane / spool, if given)."""
+        self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        self._presence_task = asyncio.create_task(self._presence_loop())
+        if offline_spool is not None:
+            self._offline_spool = offline_spool
+            self._spool_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="offline-spool")
+            self._spool_task = asyncio.create_task(self._spool_loop())
+        if backplane is not None:
+            await self.attach_backplane(backplane)
 
     async def stop_background_tasks(self) -> None:
         """Stop background tasks."""
-        if self._ping_task:
-            self._ping_task.cancel()
-        if self._cleanup_task:
-            self._cleanup_task.cancel()
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+        if self._presence_task:
+            self._presence_task.cancel()
+        if self._spool_task:
+            self._spool_task.cancel()
+        if self._offline_spool is not None:
+            # Whatever is still in memory goes to disk, so a restart keeps it
+            await self._spill_cold_queues(everything=True)
+            self._spool_executor.shutdown(wait=True)
+        if self._backplane:
+            await self._backplane.close()
+            self._backplane = None
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # BACKPLANE
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    async def attach_backplane(self, backplane: Backplane) -> None:
+        """
+        Join the cluster behind `backplane`.
 
-    async def _ping_loop(self) -> None:
-        """Periodically ping connections to keep them alive."""
+        Channels: "all" (broadcast), "ctl" (presence, room deletion),
+        "user:<id>" while this node holds a connection for the user and
+        "room:<id>" while it holds a member of the room. Payloads are the
+        already-encoded frame behind a one-line header, so the receiving
+        node enqueues it without re-encoding.
+        """
+        self._backplane = backplane
+        await backplane.start(self._on_backplane_message)
+        await backplane.subscribe("all")
+        await backplane.subscribe("ctl")
+        for entry in (await backplane.hash_all("presence")).values():
+            entry = json.loads(entry)
+            self._presence.load(entry.pop("user_id"), entry)
+        logger.info(f"Node {self._node_id} joined {backplane.name} backplane")
+
+    def _pack(self, key: Optional[Tuple], frame: str, exclude: List[str] = None) -> str:
+        """Envelope: [node, excluded users, coalesce key] + newline + frame."""
+        header = [self._node_id, [user for user in exclude or () if user], list(key) if key else None]
+        return encode_frame(header) + "\n" + frame
+
+    def _on_backplane_message(self, channel: str, payload: str) -> None:
+        """Deliver a frame another node published to our local sockets."""
+        header, frame = payload.split("\n", 1)
+        node_id, exclude, key = json.loads(header)
+        if node_id == self._node_id:
+            return
+        key = tuple(key) if key else None
+
+        if channel.startswith("room:"):
+            self._deliver_room(channel[5:], key, frame, exclude)
+        elif channel.startswith("user:"):
+            self._enqueue_user(self._connections.get(channel[5:], ()), key, frame)
+        elif channel == "all":
+            self._deliver_all(key, frame, exclude)
+        elif channel == "ctl":
+            self._on_control(json.loads(frame))
+
+    def _on_control(self, message: Dict) -> None:
+        if message["type"] == "presence":
+            self._presence.set(message["user_id"], message["presence"], message.get("rooms", ()))
+        elif message["type"] == "room_deleted":
+            room = self._rooms.pop(message["room_id"], None)
+            if room:
+                self._presence.drop_room(room.room_id)
+                self._stats["active_rooms"] = len(self._rooms)
+                asyncio.create_task(self._backplane.unsubscribe(f"room:{room.room_id}"))
+                asyncio.create_task(self._notify_room_deleted(room))
+
+    async def _heartbeat_loop(self) -> None:
+        """
+        Advance the heartbeat wheel once per tick.
+
+        Only connections whose timer is due are touched: each gets a ping
+        (through the non-blocking send path) or, if it has been silent past
+        ping_interval + ping_timeout, is reaped.
+        """
         while True:
             try:
-                await asyncio.sleep(self._ping_interval)
-
-                for user_id, connections in list(self._connections.items()):
-                    for conn in connections:
-                        if conn.state == ConnectionState.CONNECTED:
-                            await self.send_to_connection(conn, {"type": MessageType.PING.value})
+                await asyncio.sleep(self._heartbeats.tick)
+                for key in self._heartbeats.advance():
+                    connection = self._heartbeat_connections.get(key)
+                    if connection is not None:
+                        self._heartbeat(connection)
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Error in ping loop: {e}")
+                logger.error(f"Error in heartbeat loop: {e}")
 
-    async def _cleanup_loop(self) -> None:
-        """Periodically clean up stale connections."""
+    async def _presence_loop(self) -> None:
+        """Flush presence diffs every presence_batch_interval."""
         while True:
             try:
-                await asyncio.sleep(60)  # Check every minute
-
-                now = datetime.utcnow()
-                timeout = timedelta(seconds=self._ping_interval + self._ping_timeout)
+                await asyncio.sleep(self._presence_batch_interval)
+                self._flush_presence()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in presence loop: {e}")
 
-                for user_id, connections in list(self._connections.items()):
-                    for conn in list(connections):
-                        if now - conn.last_ping > timeout:
-                            logger.info(f"Cleaning up stale connection for {user_id}")
-                            await self.disconnect(conn.websocket, user_id)
+    async def _spool_loop(self) -> None:
+        """Spill queues nobody has added to for offline_cold_after seconds."""
+        while True:
+            try:
+                await asyncio.sleep(min(60.0, self._offline_cold_after))
+                await self._spill_cold_queues()
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Error in cleanup loop: {e}")
+                logger.error(f"Error in offline spool loop: {e}")
+
+    def _heartbeat(self, connection: Connection) -> None:
+        """Handle a due heartbeat timer: reap, ping, then re-arm."""
+        if connection.state == ConnectionState.DISCONNECTED:
+            self._cancel_heartbeat(connection)
+            return
+
+        now = time.monotonic()
+        if self._silence(connection) > self._ping_interval + self._ping_timeout:
+            logger.info(f"Cleaning up stale connection for {connection.user_id}")
+            self._stats["stale_connections_reaped"] += 1
+            self._cancel_heartbeat(connection)
+            connection.state = ConnectionState.DISCONNECTED
+            self._stop_writer(connection)
+            asyncio.create_task(self._abort(connection, "heartbeat_timeout"))
+            return
+
+        if now >= connection.next_ping_at:
+            key, frame = self._encode({"type": MessageType.PING.value})
+            if self._enqueue(connection, key, frame):
+                self._stats["heartbeat_pings"] += 1
+            connection.next_ping_at = now + self._ping_interval
+
+        self._schedule_heartbeat(connection)
+
+    def _schedule_heartbeat(self, connection: Connection) -> None:
+        """Arm the connection's timer for its next ping or its expiry, whichever is first."""
+        now = time.monotonic()
+        expires_in = self._ping_interval + self._ping_timeout - self._silence(connection)
+        delay = min(connection.next_ping_at - now, expires_in)
+        key = id(connection)
+        self._heartbeat_connections[key] = connection
+        self._heartbeats.schedule(key, max(delay, 0.0))
+
+    def _cancel_heartbeat(self, connection: Connection) -> None:
+        key = id(connection)
+        if self._heartbeat_connections.get(key) is connection:
+            del self._heartbeat_connections[key]
+            self._heartbeats.cancel(key)
+
+    @staticmethod
+    def _silence(connection: Connection) -> float:
+        """Seconds since the client last pinged or ponged."""
+        return (datetime.utcnow() - connection.last_ping).total_seconds()
 
     # ═══════════════════════════════════════════════════════════════════════════
     # STATISTICS
@@ -565,8 +1090,15 @@ class WebSocketManager:
         return {
             **self._stats,
             "current_connections": sum(len(c) for c in self._connections.values()),
+            "queued_messages": sum(len(conn.outbox) for conns in self._connections.values() for conn in conns),
+            "heartbeat_timers": len(self._heartbeats),
             "unique_users": len(self._connections),
-            "online_users": len(self.get_online_users())
+            "online_users": self._presence.online_count(),
+            "presence_pending": self._presence.pending_count(),
+            "offline_users": len(self._offline_queues),
+            "offline_spool": self._offline_spool.get_stats() if self._offline_spool is not None else None,
+            "node_id": self._node_id,
+            "backplane": self._backplane.get_stats() if self._backplane else None
         }
 
     def is_user_online(self, user_id: str) -> bool:
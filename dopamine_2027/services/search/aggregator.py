@@ -11,7 +11,16 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 import aiohttp
 
-from config.settings import MOODS
+from config.settings import MOODS, RANKING_CONFIG
+from services.search.http_client import PooledHTTPClient, get_http_client
+from services.search.catalog import get_catalog
+from services.search.suggest import get_suggest_index
+from services.search.ranking import get_ranking_engine
+from services.search.genres import mask_from_names, item_genre_mask
+
+
+# Genres that keep attention on their own
+ADHD_GENRE_MASK = mask_from_names(["comedy", "action", "animation", "documentary"])
 
 
 class SearchAggregator:
@@ -20,7 +29,10 @@ class SearchAggregator:
     Returns unified, ranked results with ADHD-friendly metadata.
     """
 
-    def __init__(self):
+    def __init__(self, http_client: PooledHTTPClient = None):
+        # One pooled client shared by every platform service
+        self.http = http_client or get_http_client()
+
         self.mood_genre_map = {
             "stressed": ["documentary", "nature", "meditation", "ambient"],
             "bored": ["action", "comedy", "thriller", "adventure"],
@@ -31,6 +43,9 @@ class SearchAggregator:
             "energetic": ["action", "sports", "dance", "electronic"],
             "focused": ["documentary", "educational", "ambient", "classical"]
         }
+        self.mood_genre_masks = {
+            mood: mask_from_names(genres) for mood, genres in self.mood_genre_map.items()
+        }
 
     async def search_all(
         self,
@@ -58,17 +73,20 @@ class SearchAggregator:
 
         tasks = []
 
+        # Ranking is vectorized, so over-fetch candidates and let it choose
+        candidates = max(limit, RANKING_CONFIG["candidates_per_platform"])
+
         # Movies & TV
         if content_type in ["all", "movie", "tv"]:
-            tasks.append(self._search_tmdb(query, content_type, limit))
+            tasks.append(self._search_tmdb(query, content_type, candidates))
 
         # Music & Podcasts
         if content_type in ["all", "music", "podcast"]:
-            tasks.append(self._search_spotify(query, content_type, limit))
+            tasks.append(self._search_spotify(query, content_type, candidates))
 
         # Videos
         if content_type in ["all", "video", "shorts"]:
-            tasks.append(self._search_youtube(query, limit))
+            tasks.append(self._search_youtube(query, candidates))
 
         # Execute all searches in parallel
         results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -81,29 +99,37 @@ class SearchAggregator:
             elif isinstance(result, Exception):
                 print(f"Search error: {result}")
 
-        # Apply mood filtering
-        if mood:
-            combined = self._apply_mood_filter(combined, mood)
-
-        # Apply duration filter
-        if max_duration_minutes:
-            combined = [r for r in combined if r.get("duration_minutes", 999) <= max_duration_minutes]
+        # Artists, channels and podcasts we see become typeahead suggestions
+        get_suggest_index().observe(combined)
 
-        # Rank results
-        ranked = self._rank_results(combined, query, mood, user_id)
+        # Mood boost, duration filter and ranking in one vectorized pass
+        ranked = self._rank_results(combined, query, mood, user_id, limit, max_duration_minutes)
 
         # Add ADHD-friendly metadata
         for item in ranked:
             item["time_estimate"] = self._format_duration(item.get("duration_minutes", 0))
             item["adhd_friendly"] = self._is_adhd_friendly(item)
 
-        return ranked[:limit]
+        return ranked
 
     async def _search_tmdb(self, query: str, content_type: str, limit: int) -> List[Dict[str, Any]]:
-        """Search TMDB for movies and TV shows."""
+        """
+        Search movies and TV shows - local catalog first, TMDB only on a miss.
+
+        TMDB results are ingested into the catalog as they arrive, so the
+        answer after a backfill is the catalog's ranking of everything known.
+        """
+        media_types = ["movie", "tv"] if content_type == "all" else [content_type]
+        total = limit * len(media_types)
+
+        catalog = get_catalog()
+        local = catalog.lookup(query, media_types, total)
+        if local is not None:
+            return local
+
         try:
             from services.search.tmdb import TMDBService
-            tmdb = TMDBService()
+            tmdb = TMDBService(self.http)
 
             results = []
 
@@ -115,7 +141,15 @@ class SearchAggregator:
                 shows = await tmdb.search_tv(query, limit)
                 results.extend(shows)
 
-            return results
+            # Don't pin an outage: only remember queries TMDB actually answered
+            if results or not tmdb.enabled:
+                catalog.mark_backfilled(query, media_types)
+
+            # Catalog ranking first, then TMDB matches it can't see (alternate titles)
+            merged = catalog.search(query, media_types, total)
+            seen = {item["id"] for item in merged}
+            merged.extend(item for item in results if item["id"] not in seen)
+            return merged[:total]
 
         except ImportError:
             # Return mock data if TMDB service not implemented
@@ -128,7 +162,7 @@ class SearchAggregator:
         """Search Spotify for music and podcasts."""
         try:
             from services.search.spotify import SpotifyService
-            spotify = SpotifyService()
+            spotify = SpotifyService(self.http)
 
             results = []
 
@@ -152,7 +186,7 @@ class SearchAggregator:
         """Search YouTube for videos."""
         try:
             from services.search.youtube import YouTubeService
-            youtube = YouTubeService()
+            youtube = YouTubeService(self.http)
             return await youtube.search(query, limit)
 
         except ImportError:
@@ -161,81 +195,33 @@ class SearchAggregator:
             print(f"YouTube search error: {e}")
             return []
 
-    def _apply_mood_filter(self, results: List[Dict], mood: str) -> List[Dict]:
-        """Filter results based on mood preferences."""
-        preferred_genres = self.mood_genre_map.get(mood, [])
-
-        if not preferred_genres:
-            return results
-
-        # Boost items matching mood genres
-        for item in results:
-            item_genres = item.get("genres", [])
-            mood_match = any(g.lower() in [pg.lower() for pg in preferred_genres] for g in item_genres)
-            item["mood_boost"] = 20 if mood_match else 0
-
-        return results
-
     def _rank_results(
         self,
         results: List[Dict],
         query: str,
         mood: str = None,
-        user_id: str = None
+        user_id: str = None,
+        limit: int = None,
+        max_duration_minutes: int = None
     ) -> List[Dict]:
         """
-        Rank results by relevance.
+        Rank results by relevance (see services.search.ranking).
 
-        Scoring factors:
-        - Query match: 30 points
-        - Mood match: 25 points
+        Scoring factors (RANKING_CONFIG weights):
+        - Query match: 30 points (any word: 20)
+        - Mood match: 20 points
         - Rating: 20 points
         - Recency: 15 points
         - ADHD friendly: 10 points
         """
-
-        query_lower = query.lower()
-
-        for item in results:
-            score = 0
-
-            # Query match (title contains query)
-            title = item.get("title", "").lower()
-            if query_lower in title:
-                score += 30
-            elif any(word in title for word in query_lower.split()):
-                score += 20
-
-            # Mood boost
-            score += item.get("mood_boost", 0)
-
-            # Rating (normalize to 0-20)
-            rating = item.get("rating", 0)
-            score += (rating / 10) * 20
-
-            # Recency (newer = better, max 15 points)
-            year = item.get("release_year", 2020)
-            years_old = 2027 - year
-            if years_old <= 1:
-                score += 15
-            elif years_old <= 3:
-                score += 10
-            elif years_old <= 5:
-                score += 5
-
-            # ADHD friendly bonus
-            duration = item.get("duration_minutes", 120)
-            if duration <= 30:
-                score += 10
-            elif duration <= 60:
-                score += 5
-
-            item["relevance_score"] = score
-
-        # Sort by score
-        results.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
-
-        return results
+        mood_mask = self.mood_genre_masks.get(mood, 0) if mood else None
+        return get_ranking_engine().rank(
+            results,
+            query,
+            mood_mask=mood_mask,
+            limit=limit,
+            max_duration_minutes=max_duration_minutes
+        )
 
     def _format_duration(self, minutes: int) -> str:
         """Format duration as human-readable string."""
@@ -269,9 +255,7 @@ class SearchAggregator:
             return True
 
         # Certain genres are engaging
-        adhd_genres = ["comedy", "action", "animation", "documentary"]
-        genres = item.get("genres", [])
-        if any(g.lower() in adhd_genres for g in genres):
+        if item_genre_mask(item) & ADHD_GENRE_MASK:
             return True
 
         return False
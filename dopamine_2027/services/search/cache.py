@@ -0,0 +1,400 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+TIERED RESPONSE CACHE
+Bounded in-process LRU in front of an optional shared tier (Redis).
+Per-endpoint-class TTLs with stale-while-revalidate so expiry never blocks.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import asyncio
+import copy
+import functools
+import hashlib
+import inspect
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Callable, Awaitable, Hashable, Set
+import logging
+
+from config.settings import CACHE_CONFIG
+from services.search.single_flight import get_single_flight, make_key
+
+logger = logging.getLogger(__name__)
+
+# Optional dependency: redis-py with asyncio support
+try:
+    import redis.asyncio as redis_asyncio
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis_asyncio = None
+    REDIS_AVAILABLE = False
+
+
+@dataclass
+class CacheEntry:
+    """A cached value with its freshness windows (wall-clock seconds)."""
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.fresh_until
+
+    def is_usable(self, now: float) -> bool:
+        return now < self.stale_until
+
+    def to_json(self) -> str:
+        return json.dumps({"v": self.value, "f": self.fresh_until, "s": self.stale_until})
+
+    @classmethod
+    def from_json(cls, raw: Any) -> "CacheEntry":
+        data = json.loads(raw)
+        return cls(value=data["v"], fresh_until=data["f"], stale_until=data["s"])
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TIERS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class LRUTier:
+    """Bounded in-process LRU keyed on the cache key string."""
+
+    def __init__(self, max_entries: int):
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._max_entries = max_entries
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SharedTier(ABC):
+    """Interface for a cross-process cache tier (string values with expiry)."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemorySharedTier(SharedTier):
+    """
+    Local stand-in for Redis (GET/SETEX/DEL semantics) - dev and tests only.
+
+    It lives inside one process, so uvicorn workers don't share anything
+    through it; production multi-worker deployments need "redis".
+    """
+
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if time.time() >= expires_at:
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        self._data[key] = (value, time.time() + ttl_seconds)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+
+class RedisSharedTier(SharedTier):
+    """Redis-backed shared tier (requires the optional redis package)."""
+
+    def __init__(self, url: str):
+        self._client = redis_asyncio.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        await self._client.set(key, value, ex=ttl_seconds)
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(key)
+
+    async def close(self) -> None:
+        await self._client.close()
+
+
+def _build_shared_tier(config: Dict[str, Any]) -> Optional[SharedTier]:
+    """Create the configured shared tier, falling back to none."""
+    kind = config.get("shared_tier")
+    if kind == "memory":
+        logger.warning("In-memory shared cache tier is per process (dev/tests only) - use redis to share across workers")
+        return InMemorySharedTier()
+    if kind == "redis":
+        if not REDIS_AVAILABLE or not config.get("redis_url"):
+            logger.warning("Redis cache tier requested but unavailable - using in-process cache only")
+            return None
+        return RedisSharedTier(config["redis_url"])
+    return None
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TIERED CACHE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TieredCache:
+    """
+    Two-tier cache shared by the API routes and the search services.
+
+    Lookup order: in-process LRU -> shared tier -> upstream fetch.
+    - Fresh entry: returned immediately
+    - Stale entry (inside the stale window): returned immediately and
+      refreshed in the background, so p99 stays flat across expiries
+    - Missing/expired: fetched through the single-flight group and stored
+      (under its own ("cache", key) flight so it never collides with a
+      @coalesce-decorated method it wraps)
+
+    Empty results (None, [], {}) are never stored - our services return those
+    on upstream errors, and we don't want to pin an outage in the cache.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None, shared_tier: SharedTier = None):
+        self._config = {**CACHE_CONFIG, **(config or {})}
+        self._ttls: Dict[str, Dict[str, int]] = self._config["ttls"]
+        self._local = LRUTier(self._config["max_entries"])
+        self._shared = shared_tier if shared_tier is not None else _build_shared_tier(self._config)
+        self._prefix = self._config["key_prefix"]
+
+        # Background refreshes: keys being refreshed + task references
+        self._refreshing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Statistics
+        self._stats = {
+            "hits_fresh": 0,
+            "hits_stale": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "shared_errors": 0
+        }
+
+    def cache_key(self, key: Hashable) -> str:
+        """Turn a normalized key (see make_key) into a compact string key."""
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        namespace = key[0] if isinstance(key, tuple) and key else "default"
+        return f"{self._prefix}{namespace}:{digest}"
+
+    async def get_or_fetch(
+        self,
+        cache_class: str,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Get a value from cache, fetching (and storing) it on a miss.
+
+        Args:
+            cache_class: TTL class - trending, details, providers, search
+            key: Normalized key (see make_key)
+            fetch: Zero-argument coroutine factory hitting the upstream API
+
+        Returns:
+            A private copy of the cached or fetched value
+        """
+        str_key = self.cache_key(key)
+        now = time.time()
+
+        entry = self._local.get(str_key)
+        if entry is None or not entry.is_usable(now):
+            entry = await self._shared_get(str_key)
+            if entry is not None and entry.is_usable(now):
+                self._stats["shared_hits"] += 1
+                self._local.set(str_key, entry)
+            else:
+                entry = None
+
+        if entry is not None:
+            if entry.is_fresh(now):
+                self._stats["hits_fresh"] += 1
+            else:
+                self._stats["hits_stale"] += 1
+                self._schedule_refresh(cache_class, key, str_key, fetch)
+            return copy.deepcopy(entry.value)
+
+        self._stats["misses"] += 1
+        value = await get_single_flight().do(("cache", key), fetch)
+        await self._store(cache_class, str_key, value)
+        return copy.deepcopy(value)
+
+    async def invalidate(self, key: Hashable) -> None:
+        """Drop a key from both tiers."""
+        str_key = self.cache_key(key)
+        self._local.delete(str_key)
+        if self._shared:
+            try:
+                await self._shared.delete(str_key)
+            except Exception as e:
+                self._stats["shared_errors"] += 1
+                logger.warning(f"Shared cache delete failed: {e}")
+
+    async def close(self) -> None:
+        """Cancel pending refreshes and close the shared tier."""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._shared:
+            await self._shared.close()
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # INTERNALS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def _make_entry(self, cache_class: str, value: Any) -> CacheEntry:
+        ttl = self._ttls.get(cache_class, self._ttls["search"])
+        now = time.time()
+        return CacheEntry(
+            value=value,
+            fresh_until=now + ttl["fresh"],
+            stale_until=now + ttl["fresh"] + ttl["stale"]
+        )
+
+    async def _store(self, cache_class: str, str_key: str, value: Any) -> None:
+        if not value:
+            return
+
+        entry = self._make_entry(cache_class, value)
+        self._local.set(str_key, entry)
+
+        if self._shared:
+            try:
+                ttl_seconds = max(1, int(entry.stale_until - time.time()))
+                await self._shared.set(str_key, entry.to_json(), ttl_seconds)
+            except Exception as e:
+                self._stats["shared_errors"] += 1
+                logger.warning(f"Shared cache write failed: {e}")
+
+    async def _shared_get(self, str_key: str) -> Optional[CacheEntry]:
+        if not self._shared:
+            return None
+        try:
+            raw = await self._shared.get(str_key)
+            return CacheEntry.from_json(raw) if raw else None
+        except Exception as e:
+            self._stats["shared_errors"] += 1
+            logger.warning(f"Shared cache read failed: {e}")
+            return None
+
+    def _schedule_refresh(
+        self,
+        cache_class: str,
+        key: Hashable,
+        str_key: str,
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> None:
+        """Refresh a stale entry in the background (once per key)."""
+        if str_key in self._refreshing:
+            return
+        self._refreshing.add(str_key)
+
+        async def refresh():
+            try:
+                value = await get_single_flight().do(("cache", key), fetch)
+                await self._store(cache_class, str_key, value)
+                self._stats["refreshes"] += 1
+            except Exception as e:
+                self._stats["refresh_errors"] += 1
+                logger.warning(f"Background cache refresh failed: {e}")
+            finally:
+                self._refreshing.discard(str_key)
+
+        task = asyncio.create_task(refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # STATISTICS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        hits = self._stats["hits_fresh"] + self._stats["hits_stale"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "local_entries": len(self._local),
+            "local_evictions": self._local.evictions,
+            "shared_tier": type(self._shared).__name__ if self._shared else None,
+            "refreshing": len(self._refreshing)
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# GLOBAL INSTANCE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Singleton instance
+_cache: Optional[TieredCache] = None
+
+
+def get_cache() -> TieredCache:
+    """Get or create the global tiered cache."""
+    global _cache
+    if _cache is None:
+        _cache = TieredCache()
+    return _cache
+
+
+def cached(cache_class: str, namespace: str):
+    """
+    Decorator that serves a service method (or function) through the global cache.
+
+    Arguments are bound against the signature with defaults applied, so
+    equivalent calls share one entry. `self` is not part of the key.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {k: v for k, v in bound.arguments.items() if k != "self"}
+            key = make_key(namespace, **arguments)
+            return await get_cache().get_or_fetch(cache_class, key, lambda: func(*args, **kwargs))
+
+        return wrapper
+    return decorator
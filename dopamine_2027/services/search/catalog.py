@@ -0,0 +1,582 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+LOCAL TITLE CATALOG
+In-memory inverted index over every movie/TV title we have seen.
+Seeded from movies.csv, grown from TMDB responses, BM25-ranked with prefix
+and typo tolerance - TMDB is only asked when the catalog can't answer.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import csv
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Iterable, Tuple, Set, Callable
+import heapq
+import logging
+
+from config.settings import CATALOG_CONFIG
+from services.search.genres import mask_from_ids, mask_from_names
+
+logger = logging.getLogger(__name__)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TOKENIZATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Indexed fields and their BM25F weights (title matches matter most)
+FIELDS = ("title", "genres", "overview")
+FIELD_WEIGHTS = (3.0, 2.0, 1.0)
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Expansion weights relative to an exact term match
+PREFIX_WEIGHT = 0.8
+TYPO_WEIGHT = 0.6
+
+# Prefix expansion applies to the last query term (the one being typed)
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_SCAN = 256
+MAX_EXPANSIONS = 16
+
+# Typo tolerance: 1 edit from 4 chars, 2 edits from 8 chars
+MIN_TYPO_LENGTH = 4
+LONG_TERM_LENGTH = 8
+
+# Dropped from overviews only - titles keep every word ("It", "Us", "Her")
+OVERVIEW_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "he",
+    "her", "his", "in", "is", "it", "its", "of", "on", "or", "she", "that", "the",
+    "their", "they", "this", "to", "was", "who", "with"
+})
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, strip accents and apostrophes, split on non-alphanumerics."""
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = text.replace("'", "").replace("’", "")
+    return _TOKEN_RE.findall(text)
+
+
+def normalize_title(text: str) -> str:
+    """Canonical form of a title or query (used for exact/prefix title bonuses)."""
+    return " ".join(tokenize(text))
+
+
+def _deletes(term: str, max_edits: int) -> Set[str]:
+    """All strings reachable from term by up to max_edits deletions."""
+    results = {term}
+    frontier = {term}
+    for _ in range(max_edits):
+        next_frontier = set()
+        for word in frontier:
+            if len(word) <= 1:
+                continue
+            for i in range(len(word)):
+                next_frontier.add(word[:i] + word[i + 1:])
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+
+def _max_edits(term: str) -> int:
+    return 2 if len(term) >= LONG_TERM_LENGTH else 1
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein (optimal string alignment) distance, capped at limit + 1."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous_row = None
+    row = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous_row = previous_row, row
+        row = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, before[j - 2] + 1)
+            row[j] = value
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+    return row[len(b)]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CATALOG
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TitleCatalog:
+    """
+    Inverted index of unified title records (the TMDBService record layout).
+
+    - Postings: term -> {record id: (tf in title, tf in genres, tf in overview)}
+    - Ranking: BM25F over the three fields, boosted by query-term coverage
+      and exact/prefix title matches, popularity as a tiebreak
+    - Prefix matching: the last query term expands through a sorted vocabulary
+    - Typo tolerance: deletion neighbourhoods of title/genre terms (SymSpell
+      style) verified with Damerau-Levenshtein distance
+
+    Records are upserted by id, so a details payload enriches the search
+    record that came before it. Seed rows (no TMDB id) are replaced by the
+    real TMDB record as soon as one with the same title shows up.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self._config = {**CATALOG_CONFIG, **(config or {})}
+        self._lock = threading.RLock()
+
+        # Documents: id -> record (insertion order doubles as eviction order)
+        self._docs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._doc_terms: Dict[str, Tuple[str, ...]] = {}
+        self._doc_lengths: Dict[str, Tuple[int, int, int]] = {}
+        self._doc_titles: Dict[str, str] = {}
+        self._length_totals = [0, 0, 0]
+
+        # Index
+        self._postings: Dict[str, Dict[str, Tuple[int, int, int]]] = {}
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+        self._typo_index: Dict[str, Set[str]] = {}
+        self._typo_terms: Dict[str, int] = {}   # title/genre term -> documents using it
+        self._title_ids: Dict[str, Set[str]] = {}
+
+        # Queries already backfilled from TMDB: (query, types) -> expiry
+        self._backfilled: "OrderedDict[tuple, float]" = OrderedDict()
+
+        # Change listeners (e.g. the typeahead index): fn(event, record)
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+
+        # Statistics
+        self._stats = {
+            "searches": 0,
+            "local_answers": 0,
+            "backfilled_answers": 0,
+            "misses": 0,
+            "ingested": 0,
+            "evicted": 0,
+            "seeded": 0
+        }
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # INGESTION
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def add(self, record: Dict[str, Any]) -> bool:
+        """Insert or update one title record. Returns False if it can't be indexed."""
+        if not record or not record.get("id") or not record.get("title"):
+            return False
+        if record.get("type") not in ("movie", "tv"):
+            return False
+
+        with self._lock:
+            doc_id = record["id"]
+            existing = self._docs.get(doc_id)
+            if existing is not None:
+                # Keep richer fields (genres, runtime, providers) from earlier payloads
+                record = {**existing, **{k: v for k, v in record.items() if v not in (None, "", [], {})}}
+                self._remove(doc_id)
+            else:
+                record = dict(record)
+
+            if record.get("tmdb_id") is not None:
+                self._drop_seed_duplicates(record)
+
+            # Genres may have been merged from several payloads
+            record["genre_mask"] = mask_from_ids(record.get("genre_ids")) | mask_from_names(record.get("genres"))
+            self._index(doc_id, record)
+            self._stats["ingested"] += 1
+
+            while len(self._docs) > self._config["max_titles"]:
+                oldest = next(iter(self._docs))
+                self._remove(oldest)
+                self._stats["evicted"] += 1
+        return True
+
+    def add_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Upsert a batch of records (e.g. one TMDB response). Returns how many were indexed."""
+        return sum(1 for record in records or [] if self.add(record))
+
+    def seed_from_csv(self, path: str) -> int:
+        """Load the curated movies.csv (pipe-delimited) into the catalog."""
+        if not path or not os.path.exists(path):
+            return 0
+
+        count = 0
+        try:
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f, delimiter="|"):
+                    if self.add(self._seed_record(row)):
+                        count += 1
+        except Exception as e:
+            logger.warning(f"Catalog seed failed ({path}): {e}")
+
+        self._stats["seeded"] += count
+        logger.info(f"Title catalog seeded with {count} titles from {path}")
+        return count
+
+    def _seed_record(self, row: Dict[str, str]) -> Dict[str, Any]:
+        title = (row.get("Title") or "").strip()
+        try:
+            rating = round(float(row.get("Rating") or 0), 1)
+        except ValueError:
+            rating = 0
+        return {
+            "id": f"catalog_movie_{normalize_title(title).replace(' ', '_')}",
+            "tmdb_id": None,
+            "title": title,
+            "type": "movie",
+            "platform": "tmdb",
+            "poster_url": row.get("Poster") or None,
+            "backdrop_url": row.get("Backdrop") or None,
+            "rating": rating,
+            "vote_count": 0,
+            "release_year": None,
+            "description": row.get("Overview") or "",
+            "genres": [],
+            "duration_minutes": None,
+            "popularity": 0,
+            "sensory_load": row.get("Sensory Load"),
+            "triggers": [t.strip() for t in (row.get("Triggers") or "").split(",") if t.strip()],
+            "watch_link": row.get("Link") or None
+        }
+
+    def _drop_seed_duplicates(self, record: Dict[str, Any]) -> None:
+        """A real TMDB record supersedes the seed row with the same title."""
+        for doc_id in list(self._title_ids.get(normalize_title(record["title"]), ())):
+            seed = self._docs.get(doc_id)
+            if seed and seed.get("tmdb_id") is None and seed.get("type") == record.get("type"):
+                self._remove(doc_id)
+
+    def _index(self, doc_id: str, record: Dict[str, Any]) -> None:
+        title_tokens = tokenize(record.get("title", ""))
+        genre_tokens = tokenize(" ".join(record.get("genres") or []))
+        overview_tokens = [t for t in tokenize(record.get("description") or record.get("overview") or "")
+                           if t not in OVERVIEW_STOPWORDS]
+
+        counts: Dict[str, List[int]] = {}
+        for field, tokens in enumerate((title_tokens, genre_tokens, overview_tokens)):
+            for token in tokens:
+                counts.setdefault(token, [0, 0, 0])[field] += 1
+
+        for term, tfs in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._vocabulary_dirty = True
+            postings[doc_id] = tuple(tfs)
+            if (tfs[0] or tfs[1]) and len(term) >= MIN_TYPO_LENGTH:
+                self._add_typo_term(term)
+
+        lengths = (len(title_tokens), len(genre_tokens), len(overview_tokens))
+        for field in range(3):
+            self._length_totals[field] += lengths[field]
+
+        normalized = " ".join(title_tokens)
+        self._docs[doc_id] = record
+        self._doc_terms[doc_id] = tuple(counts)
+        self._doc_lengths[doc_id] = lengths
+        self._doc_titles[doc_id] = normalized
+        self._title_ids.setdefault(normalized, set()).add(doc_id)
+        self._notify("add", record)
+
+    def _remove(self, doc_id: str) -> None:
+        """Drop a document, its postings and typo variants no other title uses."""
+        record = self._docs.pop(doc_id, None)
+        if record is not None:
+            self._notify("remove", record)
+        for term in self._doc_terms.pop(doc_id, ()):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            tfs = postings.pop(doc_id, None)
+            if tfs and (tfs[0] or tfs[1]) and term in self._typo_terms:
+                self._drop_typo_term(term)
+            if not postings:
+                del self._postings[term]
+                self._vocabulary_dirty = True
+
+        lengths = self._doc_lengths.pop(doc_id, (0, 0, 0))
+        for field in range(3):
+            self._length_totals[field] -= lengths[field]
+
+        normalized = self._doc_titles.pop(doc_id, None)
+        if normalized is not None:
+            ids = self._title_ids.get(normalized)
+            if ids:
+                ids.discard(doc_id)
+                if not ids:
+                    del self._title_ids[normalized]
+
+    def _add_typo_term(self, term: str) -> None:
+        count = self._typo_terms.get(term, 0)
+        self._typo_terms[term] = count + 1
+        if not count:
+            for variant in _deletes(term, _max_edits(term)):
+                self._typo_index.setdefault(variant, set()).add(term)
+
+    def _drop_typo_term(self, term: str) -> None:
+        """Forget a term's deletion variants once no title/genre uses it."""
+        count = self._typo_terms.pop(term) - 1
+        if count:
+            self._typo_terms[term] = count
+            return
+        for variant in _deletes(term, _max_edits(term)):
+            terms = self._typo_index.get(variant)
+            if terms:
+                terms.discard(term)
+                if not terms:
+                    del self._typo_index[variant]
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # LISTENERS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def add_listener(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Call listener("add" | "remove", record) whenever a title enters or leaves."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Snapshot of every indexed record (for bulk-loading derived indexes)."""
+        with self._lock:
+            return list(self._docs.values())
+
+    def _notify(self, event: str, record: Dict[str, Any]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(event, record)
+            except Exception as e:
+                logger.warning(f"Catalog listener failed: {e}")
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # SEARCH
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def search(self, query: str, media_types: Iterable[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Rank catalog titles for a query.
+
+        Args:
+            query: Free-text query (may be a partial, still-being-typed query)
+            media_types: Restrict to "movie" and/or "tv" (None = both)
+            limit: Max results
+
+        Returns:
+            Copies of the matching records, best first, with catalog_score set
+        """
+        results, _ = self._search(query, media_types, limit)
+        return results
+
+    def lookup(self, query: str, media_types: Iterable[str] = None, limit: int = 10) -> Optional[List[Dict[str, Any]]]:
+        """
+        Answer a query locally if the catalog is good enough, else return None.
+
+        The catalog answers when it already backfilled this query from TMDB
+        recently, or when enough titles match every query term. None means
+        "miss" - the caller should ask TMDB, add the results, and call
+        mark_backfilled().
+        """
+        self._stats["searches"] += 1
+        results, strong = self._search(query, media_types, limit)
+
+        if self._is_backfilled(query, media_types):
+            self._stats["backfilled_answers"] += 1
+            return results
+        if strong >= min(limit, self._config["min_local_hits"]):
+            self._stats["local_answers"] += 1
+            return results
+
+        self._stats["misses"] += 1
+        return None
+
+    def mark_backfilled(self, query: str, media_types: Iterable[str] = None) -> None:
+        """Remember that TMDB was asked for this query, so repeats stay local."""
+        with self._lock:
+            key = self._query_key(query, media_types)
+            self._backfilled[key] = time.time() + self._config["backfill_ttl"]
+            self._backfilled.move_to_end(key)
+            while len(self._backfilled) > self._config["max_titles"]:
+                self._backfilled.popitem(last=False)
+
+    def _is_backfilled(self, query: str, media_types: Iterable[str] = None) -> bool:
+        with self._lock:
+            key = self._query_key(query, media_types)
+            expires_at = self._backfilled.get(key)
+            if expires_at is None:
+                return False
+            if time.time() >= expires_at:
+                del self._backfilled[key]
+                return False
+            return True
+
+    def _query_key(self, query: str, media_types: Iterable[str] = None) -> tuple:
+        return normalize_title(query), tuple(sorted(media_types or ("movie", "tv")))
+
+    def _search(self, query: str, media_types: Iterable[str], limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Returns (ranked records, number of titles matching every query term)."""
+        terms = tokenize(query)
+        if not terms:
+            return [], 0
+        types = set(media_types) if media_types else None
+
+        with self._lock:
+            doc_count = len(self._docs)
+            if not doc_count:
+                return [], 0
+            averages = [max(total / doc_count, 1.0) for total in self._length_totals]
+
+            scores: Dict[str, float] = {}
+            matched: Dict[str, int] = {}
+            title_hits: Set[str] = set()
+
+            for position, term in enumerate(terms):
+                is_last = position == len(terms) - 1
+                best: Dict[str, float] = {}
+
+                for variant, weight in self._expand(term, prefix=is_last):
+                    postings = self._postings.get(variant)
+                    if not postings:
+                        continue
+                    df = len(postings)
+                    idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+
+                    for doc_id, tfs in postings.items():
+                        if types and self._docs[doc_id].get("type") not in types:
+                            continue
+                        score = weight * idf * self._bm25(tfs, self._doc_lengths[doc_id], averages)
+                        if score > best.get(doc_id, 0.0):
+                            best[doc_id] = score
+                        if tfs[0]:
+                            title_hits.add(doc_id)
+
+                for doc_id, score in best.items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + score
+                    matched[doc_id] = matched.get(doc_id, 0) + 1
+
+            if not scores:
+                return [], 0
+
+            normalized_query = " ".join(terms)
+            ranked = []
+            strong = 0
+            for doc_id, score in scores.items():
+                coverage = matched[doc_id] / len(terms)
+                score *= coverage * coverage
+
+                title = self._doc_titles[doc_id]
+                if title == normalized_query:
+                    score *= 2.0
+                elif title.startswith(normalized_query):
+                    score *= 1.5
+
+                if coverage == 1.0 and doc_id in title_hits:
+                    strong += 1
+
+                popularity = self._docs[doc_id].get("popularity") or 0
+                ranked.append((score + 0.01 * math.log1p(popularity), doc_id))
+
+            top = heapq.nlargest(limit, ranked)
+            # Shallow copies: callers only add top-level keys (scores, badges)
+            results = [{**self._docs[doc_id], "catalog_score": round(score, 4)} for score, doc_id in top]
+
+        return results, strong
+
+    def _bm25(self, tfs: Tuple[int, int, int], lengths: Tuple[int, int, int], averages: List[float]) -> float:
+        total = 0.0
+        for field in range(3):
+            tf = tfs[field]
+            if tf:
+                norm = 1 - BM25_B + BM25_B * lengths[field] / averages[field]
+                total += FIELD_WEIGHTS[field] * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+        return total
+
+    def _expand(self, term: str, prefix: bool) -> List[Tuple[str, float]]:
+        """The index terms a query term should match, with their weights."""
+        expansions = {}
+        if term in self._postings:
+            expansions[term] = 1.0
+
+        if prefix and len(term) >= MIN_PREFIX_LENGTH:
+            vocabulary = self._sorted_vocabulary()
+            candidates = []
+            i = bisect_left(vocabulary, term)
+            while i < len(vocabulary) and len(candidates) < MAX_PREFIX_SCAN and vocabulary[i].startswith(term):
+                if vocabulary[i] != term and vocabulary[i] in self._postings:
+                    candidates.append(vocabulary[i])
+                i += 1
+            candidates.sort(key=lambda t: len(self._postings[t]), reverse=True)
+            for candidate in candidates[:MAX_EXPANSIONS]:
+                expansions.setdefault(candidate, PREFIX_WEIGHT)
+
+        if term not in self._postings and len(term) >= MIN_TYPO_LENGTH:
+            limit = _max_edits(term)
+            candidates = set()
+            for variant in _deletes(term, limit):
+                candidates |= self._typo_index.get(variant, set())
+            verified = [c for c in candidates if c in self._postings and _edit_distance(term, c, limit) <= limit]
+            verified.sort(key=lambda t: len(self._postings[t]), reverse=True)
+            for candidate in verified[:MAX_EXPANSIONS]:
+                expansions.setdefault(candidate, TYPO_WEIGHT)
+
+        return list(expansions.items())
+
+    def _sorted_vocabulary(self) -> List[str]:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        return self._vocabulary
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # STATISTICS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get catalog statistics, including the local answer rate."""
+        searches = self._stats["searches"]
+        answered = self._stats["local_answers"] + self._stats["backfilled_answers"]
+        return {
+            **self._stats,
+            "local_rate": round(answered / searches, 3) if searches else 0.0,
+            "titles": len(self._docs),
+            "terms": len(self._postings),
+            "typo_variants": len(self._typo_index),
+            "backfilled_queries": len(self._backfilled)
+        }
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# GLOBAL INSTANCE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Singleton instance
+_catalog: Optional[TitleCatalog] = None
+
+
+def get_catalog() -> TitleCatalog:
+    """Get or create the global title catalog (seeded on first use)."""
+    global _catalog
+    if _catalog is None:
+        _catalog = TitleCatalog()
+        _catalog.seed_from_csv(_catalog._config["seed_csv"])
+    return _catalog
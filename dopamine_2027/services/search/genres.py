@@ -0,0 +1,123 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+GENRE BITMASK REGISTRY
+One bit per genre for TMDB genre ids and our string genres ("lofi",
+"feel-good"). Content items carry a precomputed genre_mask, so mood overlap,
+prefer and avoid checks are a single bitwise AND.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import functools
+from typing import Dict, Iterable, List, Any, Tuple
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BIT LAYOUT (append only - positions are stored on items)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+GENRES = (
+    # TMDB movie genres
+    "action", "adventure", "animation", "comedy", "crime", "documentary",
+    "drama", "family", "fantasy", "history", "horror", "music", "mystery",
+    "romance", "science fiction", "tv movie", "thriller", "war", "western",
+    # TMDB TV-only genres
+    "kids", "news", "reality", "soap", "talk", "politics",
+    # Our tags (moods, music and YouTube content)
+    "nature", "meditation", "ambient", "feel-good", "cooking", "crafts",
+    "lofi", "sports", "dance", "electronic", "educational", "classical",
+    "classic", "80s", "90s", "retro", "science", "chill", "relaxation",
+    "health",
+)
+assert len(GENRES) <= 64, "genre masks must fit in a uint64"
+
+GENRE_BITS: Dict[str, int] = {name: 1 << i for i, name in enumerate(GENRES)}
+ALL_GENRES_MASK = (1 << len(GENRES)) - 1
+
+
+def _mask(*names: str) -> int:
+    mask = 0
+    for name in names:
+        mask |= GENRE_BITS[name]
+    return mask
+
+
+# TMDB genre id -> mask
+TMDB_ID_MASKS: Dict[int, int] = {
+    28: _mask("action"), 12: _mask("adventure"), 16: _mask("animation"),
+    35: _mask("comedy"), 80: _mask("crime"), 99: _mask("documentary"),
+    18: _mask("drama"), 10751: _mask("family"), 14: _mask("fantasy"),
+    36: _mask("history"), 27: _mask("horror"), 10402: _mask("music"),
+    9648: _mask("mystery"), 10749: _mask("romance"), 878: _mask("science fiction"),
+    10770: _mask("tv movie"), 53: _mask("thriller"), 10752: _mask("war"),
+    37: _mask("western"),
+    10759: _mask("action", "adventure"), 10762: _mask("kids"), 10763: _mask("news"),
+    10764: _mask("reality"), 10765: _mask("science fiction", "fantasy"),
+    10766: _mask("soap"), 10767: _mask("talk"), 10768: _mask("war", "politics"),
+}
+
+# Other spellings -> mask (TMDB display names included)
+NAME_MASKS: Dict[str, int] = {
+    **GENRE_BITS,
+    "sci-fi": _mask("science fiction"),
+    "lo-fi": _mask("lofi"),
+    "education": _mask("educational"),
+    "action & adventure": _mask("action", "adventure"),
+    "sci-fi & fantasy": _mask("science fiction", "fantasy"),
+    "war & politics": _mask("war", "politics"),
+}
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ENCODING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def mask_from_ids(genre_ids: Iterable[int]) -> int:
+    """TMDB genre ids -> mask (unknown ids are ignored)."""
+    mask = 0
+    for genre_id in genre_ids or ():
+        mask |= TMDB_ID_MASKS.get(genre_id, 0)
+    return mask
+
+
+def mask_from_names(names: Iterable[str]) -> int:
+    """Genre names, any case -> mask (unknown names are ignored)."""
+    mask = 0
+    for name in names or ():
+        if isinstance(name, str):
+            mask |= NAME_MASKS.get(name.strip().lower(), 0)
+    return mask
+
+
+def item_genre_mask(item: Dict[str, Any]) -> int:
+    """
+    An item's precomputed item["genre_mask"], else its mask from "genre_ids"
+    and "genres" (names, or TMDB details {"id", "name"} dicts).
+
+    Never writes to the item (it may be shared, e.g. a cached payload);
+    computed masks are cached by genre list instead.
+    """
+    mask = item.get("genre_mask")
+    if mask is not None:
+        return mask
+    genres = tuple((g.get("id"), g.get("name")) if isinstance(g, dict) else g for g in item.get("genres") or ())
+    return _genres_mask(tuple(item.get("genre_ids") or ()), genres)
+
+
+@functools.lru_cache(maxsize=4096)
+def _genres_mask(genre_ids: Tuple[int, ...], genres: Tuple[Any, ...]) -> int:
+    mask = mask_from_ids(genre_ids)
+    for genre in genres:
+        if isinstance(genre, tuple):
+            genre_id, name = genre
+            mask |= TMDB_ID_MASKS.get(genre_id, 0) or mask_from_names([name])
+        else:
+            mask |= mask_from_names([genre])
+    return mask
+
+
+def genre_names(mask: int) -> List[str]:
+    """Mask -> canonical genre names (for display and debugging)."""
+    return [name for name in GENRES if mask & GENRE_BITS[name]]
+
+
+def overlap_count(mask: int, other: int) -> int:
+    """Number of genres two masks share."""
+    return bin(mask & other).count("1")
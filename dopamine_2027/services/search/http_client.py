@@ -0,0 +1,202 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+SHARED HTTP CLIENT
+One pooled aiohttp session for every upstream API (TMDB, Spotify, YouTube).
+Keeps connections alive between searches so we stop paying TCP+TLS+DNS per call.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import asyncio
+from typing import Dict, Any, Optional
+import logging
+
+import aiohttp
+
+from config.settings import HTTP_CLIENT_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class PooledHTTPClient:
+    """
+    App-lifetime HTTP client shared by all search services.
+
+    Features:
+    - Global and per-host connection limits
+    - Keep-alive connection reuse
+    - DNS caching
+    - Configurable connect/read/total timeouts
+    - Pool statistics (requests, new vs reused connections, DNS hits)
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self._config = {**HTTP_CLIENT_CONFIG, **(config or {})}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session_lock: Optional[asyncio.Lock] = None
+        self._session_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Statistics
+        self._stats = {
+            "requests": 0,
+            "request_errors": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "dns_cache_hits": 0,
+            "dns_cache_misses": 0,
+            "sessions_created": 0
+        }
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # LIFECYCLE
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    async def start(self) -> None:
+        """Create the pooled session (called from the server lifespan)."""
+        await self._ensure_session()
+
+    async def close(self) -> None:
+        """Close the session and release all pooled connections."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        """Return the live session, creating it on first use or after a loop change."""
+        loop = asyncio.get_running_loop()
+        if self._is_live(loop):
+            return self._session
+
+        # One caller rebuilds; the others wait and reuse its session
+        async with self._session_lock_for(loop):
+            if self._is_live(loop):
+                return self._session
+            await self._release_session()
+
+            connector = aiohttp.TCPConnector(
+                limit=self._config["max_connections"],
+                limit_per_host=self._config["max_connections_per_host"],
+                keepalive_timeout=self._config["keepalive_timeout"],
+                ttl_dns_cache=self._config["dns_cache_ttl"],
+                use_dns_cache=True
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=self._config["total_timeout"],
+                connect=self._config["connect_timeout"],
+                sock_read=self._config["read_timeout"]
+            )
+
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                trace_configs=[self._build_trace_config()]
+            )
+            self._loop = loop
+            self._stats["sessions_created"] += 1
+
+            logger.info(
+                f"HTTP pool ready (limit={self._config['max_connections']}, "
+                f"per_host={self._config['max_connections_per_host']})"
+            )
+            return self._session
+
+    def _is_live(self, loop: asyncio.AbstractEventLoop) -> bool:
+        return self._session is not None and not self._session.closed and self._loop is loop
+
+    def _session_lock_for(self, loop: asyncio.AbstractEventLoop) -> asyncio.Lock:
+        # An asyncio.Lock binds to the loop it is first used on
+        if self._session_lock is None or self._session_lock_loop is not loop:
+            self._session_lock = asyncio.Lock()
+            self._session_lock_loop = loop
+        return self._session_lock
+
+    async def _release_session(self) -> None:
+        """Close a session left over from another event loop before it is replaced."""
+        session, session_loop = self._session, self._loop
+        self._session = None
+        self._loop = None
+        if session is None or session.closed:
+            return
+        if session_loop is not None and session_loop.is_running() and not session_loop.is_closed():
+            # Still running in another thread: close it there
+            asyncio.run_coroutine_threadsafe(session.close(), session_loop)
+            return
+        try:
+            # Its loop is gone, so the connector just drops the dead sockets
+            await session.close()
+        except Exception as e:
+            logger.warning(f"Failed to close stale HTTP session: {e}")
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        """Hook aiohttp tracing into our pool statistics."""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            self._stats["requests"] += 1
+
+        async def on_request_exception(session, ctx, params):
+            self._stats["request_errors"] += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            self._stats["connections_created"] += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self._stats["connections_reused"] += 1
+
+        async def on_dns_cache_hit(session, ctx, params):
+            self._stats["dns_cache_hits"] += 1
+
+        async def on_dns_cache_miss(session, ctx, params):
+            self._stats["dns_cache_misses"] += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_exception.append(on_request_exception)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+
+        return trace_config
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # SESSION
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session (do NOT close it - it belongs to the app)."""
+        return await self._ensure_session()
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # STATISTICS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics, including the connection reuse rate."""
+        created = self._stats["connections_created"]
+        reused = self._stats["connections_reused"]
+        total = created + reused
+
+        return {
+            **self._stats,
+            "reuse_rate": round(reused / total, 3) if total else 0.0,
+            "open": self._session is not None and not self._session.closed,
+            "limit": self._config["max_connections"],
+            "limit_per_host": self._config["max_connections_per_host"]
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# GLOBAL INSTANCE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Singleton instance
+_client: Optional[PooledHTTPClient] = None
+
+
+def get_http_client() -> PooledHTTPClient:
+    """Get or create the global pooled HTTP client."""
+    global _client
+    if _client is None:
+        _client = PooledHTTPClient()
+    return _client
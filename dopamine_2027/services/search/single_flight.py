@@ -0,0 +1,148 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+SINGLE-FLIGHT REQUEST COALESCING
+Concurrent callers asking for the same upstream lookup share one request.
+When a title trends, hundreds of identical TMDB calls collapse into one.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import asyncio
+import copy
+import functools
+import inspect
+from typing import Dict, Any, Optional, Callable, Awaitable, Hashable
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(value: Any) -> Hashable:
+    """
+    Normalize an argument so equivalent lookups produce the same key.
+
+    Strings are whitespace-normalized but keep their case - Spotify and
+    YouTube IDs are case-sensitive.
+    """
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_normalize(v) for v in value]
+        return tuple(sorted(items, key=repr)) if isinstance(value, (set, frozenset)) else tuple(items)
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _normalize(v)) for k, v in value.items()))
+    return value
+
+
+def make_key(namespace: str, *args, **kwargs) -> tuple:
+    """Build a normalized single-flight key from a namespace and call arguments."""
+    return (
+        namespace,
+        tuple(_normalize(a) for a in args),
+        tuple(sorted((k, _normalize(v)) for k, v in kwargs.items()))
+    )
+
+
+class SingleFlight:
+    """
+    Deduplicates identical in-flight async calls.
+
+    The first caller for a key (the leader) starts the upstream call as its own
+    task; everyone arriving while it runs awaits that same task. Every caller,
+    the leader included, gets its own deep copy of the result: callers resume
+    in no fixed order, so downstream mutation (ranking, mood boosts) by one
+    must not reach the others. The shared task is shielded, so one caller
+    disconnecting doesn't cancel the lookup for the rest.
+    """
+
+    def __init__(self):
+        # In-flight lookups: key -> shared task
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+        # Statistics
+        self._stats = {
+            "calls": 0,
+            "upstream_calls": 0,
+            "coalesced": 0
+        }
+        self._coalesced_by_namespace: Dict[str, int] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn() once per key for all concurrent callers.
+
+        Args:
+            key: Normalized lookup key (see make_key)
+            fn: Zero-argument coroutine factory performing the upstream call
+
+        Returns:
+            A private copy of the shared result
+        """
+        self._stats["calls"] += 1
+
+        task = self._inflight.get(key)
+        leader = task is None
+
+        if leader:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self._stats["upstream_calls"] += 1
+            task.add_done_callback(functools.partial(self._release, key))
+        else:
+            self._stats["coalesced"] += 1
+            namespace = key[0] if isinstance(key, tuple) and key else "default"
+            self._coalesced_by_namespace[namespace] = self._coalesced_by_namespace.get(namespace, 0) + 1
+
+        return copy.deepcopy(await asyncio.shield(task))
+
+    def _release(self, key: Hashable, task: asyncio.Task) -> None:
+        """Drop a finished task from the in-flight table."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics."""
+        calls = self._stats["calls"]
+        return {
+            **self._stats,
+            "coalesce_rate": round(self._stats["coalesced"] / calls, 3) if calls else 0.0,
+            "in_flight": len(self._inflight),
+            "coalesced_by_namespace": dict(self._coalesced_by_namespace)
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# GLOBAL INSTANCE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Singleton instance
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Get or create the global single-flight group."""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
+
+
+def coalesce(namespace: str):
+    """
+    Decorator that routes a service method through the global single-flight group.
+
+    Arguments are bound against the method signature (defaults applied) so
+    positional and keyword spellings of the same lookup share one key.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = {k: v for k, v in bound.arguments.items() if k != "self"}
+            key = make_key(namespace, **arguments)
+            return await get_single_flight().do(key, lambda: func(self, *args, **kwargs))
+
+        return wrapper
+    return decorator
@@ -5,7 +5,6 @@ Music, podcast, and playlist search via Spotify Web API.
 ═══════════════════════════════════════════════════════════════════════════════
 """
 
-import aiohttp
 import base64
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
@@ -17,6 +16,9 @@ from config.settings import (
     SPOTIFY_CLIENT_SECRET,
     SPOTIFY_ENABLED
 )
+from services.search.http_client import PooledHTTPClient, get_http_client
+from services.search.single_flight import coalesce
+from services.search.cache import cached
 
 logger = logging.getLogger(__name__)
 
@@ -38,10 +40,11 @@ class SpotifyService:
     BASE_URL = "https://api.spotify.com/v1"
     AUTH_URL = "https://accounts.spotify.com/api/token"
 
-    def __init__(self):
+    def __init__(self, http_client: PooledHTTPClient = None):
         self.client_id = SPOTIFY_CLIENT_ID
         self.client_secret = SPOTIFY_CLIENT_SECRET
         self.enabled = SPOTIFY_ENABLED and self.client_id and self.client_secret
+        self.http = http_client or get_http_client()
         self._token: Optional[SpotifyToken] = None
 
     async def _get_token(self) -> Optional[str]:
@@ -59,26 +62,26 @@ class SpotifyService:
                 f"{self.client_id}:{self.client_secret}".encode()
             ).decode()
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.AUTH_URL,
-                    headers={
-                        "Authorization": f"Basic {credentials}",
-                        "Content-Type": "application/x-www-form-urlencoded"
-                    },
-                    data={"grant_type": "client_credentials"}
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        expires_in = data.get("expires_in", 3600)
-                        self._token = SpotifyToken(
-                            access_token=data["access_token"],
-                            expires_at=datetime.utcnow() + timedelta(seconds=expires_in - 60)
-                        )
-                        return self._token.access_token
-                    else:
-                        logger.error(f"Spotify auth failed: {response.status}")
-                        return None
+            session = await self.http.get_session()
+            async with session.post(
+                self.AUTH_URL,
+                headers={
+                    "Authorization": f"Basic {credentials}",
+                    "Content-Type": "application/x-www-form-urlencoded"
+                },
+                data={"grant_type": "client_credentials"}
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    expires_in = data.get("expires_in", 3600)
+                    self._token = SpotifyToken(
+                        access_token=data["access_token"],
+                        expires_at=datetime.utcnow() + timedelta(seconds=expires_in - 60)
+                    )
+                    return self._token.access_token
+                else:
+                    logger.error(f"Spotify auth failed: {response.status}")
+                    return None
         except Exception as e:
             logger.error(f"Spotify token error: {e}")
             return None
@@ -90,22 +93,22 @@ class SpotifyService:
             return None
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.BASE_URL}/{endpoint}",
-                    headers={"Authorization": f"Bearer {token}"},
-                    params=params
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    elif response.status == 429:
-                        # Rate limited
-                        retry_after = response.headers.get("Retry-After", 1)
-                        logger.warning(f"Spotify rate limited, retry after {retry_after}s")
-                        return None
-                    else:
-                        logger.error(f"Spotify API error: {response.status}")
-                        return None
+            session = await self.http.get_session()
+            async with session.get(
+                f"{self.BASE_URL}/{endpoint}",
+                headers={"Authorization": f"Bearer {token}"},
+                params=params
+            ) as response:
+                if response.status == 200:
+                    return await response.json()
+                elif response.status == 429:
+                    # Rate limited
+                    retry_after = response.headers.get("Retry-After", 1)
+                    logger.warning(f"Spotify rate limited, retry after {retry_after}s")
+                    return None
+                else:
+                    logger.error(f"Spotify API error: {response.status}")
+                    return None
         except Exception as e:
             logger.error(f"Spotify request error: {e}")
             return None
@@ -114,6 +117,7 @@ class SpotifyService:
     # SEARCH METHODS
     # ═══════════════════════════════════════════════════════════════════════════
 
+    @cached("search", "spotify.search_tracks")
     async def search_tracks(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search for music tracks."""
         if not self.enabled:
@@ -132,6 +136,7 @@ class SpotifyService:
         tracks = data.get("tracks", {}).get("items", [])
         return [self._transform_track(t) for t in tracks]
 
+    @cached("search", "spotify.search_albums")
     async def search_albums(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search for albums."""
         if not self.enabled:
@@ -150,6 +155,7 @@ class SpotifyService:
         albums = data.get("albums", {}).get("items", [])
         return [self._transform_album(a) for a in albums]
 
+    @cached("search", "spotify.search_playlists")
     async def search_playlists(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search for playlists."""
         if not self.enabled:
@@ -167,6 +173,7 @@ class SpotifyService:
         playlists = data.get("playlists", {}).get("items", [])
         return [self._transform_playlist(p) for p in playlists if p]
 
+    @cached("search", "spotify.search_podcasts")
     async def search_podcasts(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search for podcasts/shows."""
         if not self.enabled:
@@ -185,6 +192,7 @@ class SpotifyService:
         shows = data.get("shows", {}).get("items", [])
         return [self._transform_podcast(s) for s in shows if s]
 
+    @cached("search", "spotify.search_episodes")
     async def search_episodes(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search for podcast episodes."""
         if not self.enabled:
@@ -203,6 +211,7 @@ class SpotifyService:
         episodes = data.get("episodes", {}).get("items", [])
         return [self._transform_episode(e) for e in episodes if e]
 
+    @cached("search", "spotify.search_all")
     async def search_all(self, query: str, limit: int = 5) -> Dict[str, List[Dict]]:
         """Search all content types at once."""
         if not self.enabled:
@@ -229,11 +238,15 @@ class SpotifyService:
     # DETAIL METHODS
     # ═══════════════════════════════════════════════════════════════════════════
 
+    @cached("details", "spotify.track")
+    @coalesce("spotify.track")
     async def get_track(self, track_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed track information."""
         data = await self._api_request(f"tracks/{track_id}")
         return self._transform_track(data) if data else None
 
+    @cached("details", "spotify.album")
+    @coalesce("spotify.album")
     async def get_album(self, album_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed album information with tracks."""
         data = await self._api_request(f"albums/{album_id}")
@@ -247,6 +260,8 @@ class SpotifyService:
         ]
         return album
 
+    @cached("details", "spotify.playlist")
+    @coalesce("spotify.playlist")
     async def get_playlist(self, playlist_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed playlist information with tracks."""
         data = await self._api_request(f"playlists/{playlist_id}")
@@ -261,6 +276,8 @@ class SpotifyService:
         ]
         return playlist
 
+    @cached("details", "spotify.podcast")
+    @coalesce("spotify.podcast")
     async def get_podcast(self, show_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed podcast/show information."""
         data = await self._api_request(f"shows/{show_id}", {"market": "US"})
@@ -279,6 +296,8 @@ class SpotifyService:
     # DISCOVERY METHODS
     # ═══════════════════════════════════════════════════════════════════════════
 
+    @cached("trending", "spotify.featured_playlists")
+    @coalesce("spotify.featured_playlists")
     async def get_featured_playlists(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get Spotify's featured playlists."""
         data = await self._api_request("browse/featured-playlists", {
@@ -292,6 +311,8 @@ class SpotifyService:
         playlists = data.get("playlists", {}).get("items", [])
         return [self._transform_playlist(p) for p in playlists if p]
 
+    @cached("trending", "spotify.new_releases")
+    @coalesce("spotify.new_releases")
     async def get_new_releases(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get new album releases."""
         data = await self._api_request("browse/new-releases", {
@@ -305,6 +326,7 @@ class SpotifyService:
         albums = data.get("albums", {}).get("items", [])
         return [self._transform_album(a) for a in albums]
 
+    @coalesce("spotify.recommendations")
     async def get_recommendations(
         self,
         seed_tracks: List[str] = None,
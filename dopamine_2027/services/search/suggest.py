@@ -0,0 +1,351 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+TYPEAHEAD SUGGESTIONS
+Sorted-array prefix index over known titles, artists and channels.
+Weighted by upstream popularity and our own click data; a keystroke is a
+bisect plus a small top-k, never an upstream call.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+
+from services.search.catalog import get_catalog, normalize_title
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Prefixes this short are served from precomputed top lists (huge ranges)
+HEAD_PREFIX_LENGTH = 3
+HEAD_SIZE = 32
+
+# Longer prefixes scan at most this many index keys
+MAX_SCAN = 4096
+
+# Each entry is findable from the start of its first few words
+MAX_WORD_STARTS = 6
+
+# A match on the start of the text beats one on an inner word
+INNER_WORD_FACTOR = 0.8
+
+# Each click counts like this much log-popularity
+CLICK_WEIGHT = 1.5
+
+# Key separator (sorts before every printable character)
+_SEP = "\x00"
+
+
+class SuggestEntry:
+    """One suggestable thing - a title, an artist or a channel."""
+
+    __slots__ = ("id", "text", "kind", "type", "platform", "image_url", "popularity", "keys")
+
+    def __init__(self, id: str, text: str, kind: str, type: str, platform: str,
+                 image_url: Optional[str], popularity: float):
+        self.id = id
+        self.text = text
+        self.kind = kind
+        self.type = type
+        self.platform = platform
+        self.image_url = image_url
+        self.popularity = popularity
+        self.keys: Tuple[str, ...] = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "title": self.text,
+            "kind": self.kind,
+            "type": self.type,
+            "platform": self.platform,
+            "image_url": self.image_url
+        }
+
+
+def _popularity(record: Dict[str, Any]) -> float:
+    """Map each platform's popularity signal onto a comparable log scale."""
+    if record.get("platform") == "youtube":
+        # View counts run to the billions; /3 lines them up with TMDB/Spotify
+        return math.log1p(float(record.get("view_count") or 0)) / 3
+    return math.log1p(float(record.get("popularity") or 0))
+
+
+class SuggestIndex:
+    """
+    Prefix index for autocomplete.
+
+    - Keys: every word start of the normalized text ("the dark knight",
+      "dark knight", "knight"), kept in one sorted list as key\\0pos\\0id
+    - Short prefixes (<= 3 chars) read a maintained top-32 list per prefix
+    - Longer prefixes bisect the key range and take the top-k by weight
+    - Weight: log popularity + CLICK_WEIGHT * log(1 + clicks)
+
+    Entries are added incrementally (catalog listener + aggregator results),
+    so the index never needs a full rebuild. Click counts survive an entry
+    being re-added, e.g. when a details payload upserts a title.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries: Dict[str, SuggestEntry] = {}
+        self._keys: List[str] = []
+        self._head: Dict[str, List[Tuple[float, str]]] = {}
+        self._clicks: Dict[str, int] = {}
+
+        # Recent lookup latencies (ms) for p50/p99
+        self._latencies = deque(maxlen=1024)
+
+        # Statistics
+        self._stats = {
+            "lookups": 0,
+            "clicks": 0,
+            "upserts": 0,
+            "removals": 0
+        }
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # INGESTION
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def upsert(self, entry_id: str, text: str, kind: str, type: str, platform: str,
+               image_url: Optional[str] = None, popularity: float = 0.0) -> None:
+        """Insert an entry or update its text/popularity."""
+        normalized = normalize_title(text)
+        if not entry_id or not normalized:
+            return
+
+        with self._lock:
+            existing = self._entries.get(entry_id)
+            if existing is not None:
+                popularity = max(popularity, existing.popularity)
+                if existing.text == text:
+                    existing.popularity = popularity
+                    existing.image_url = image_url or existing.image_url
+                    self._refresh_head(existing)
+                    return
+                self._remove_entry(existing)
+
+            entry = SuggestEntry(entry_id, text, kind, type, platform, image_url, popularity)
+            words = normalized.split(" ")
+            entry.keys = tuple(" ".join(words[i:]) for i in range(min(len(words), MAX_WORD_STARTS)))
+            for position, key in enumerate(entry.keys):
+                composite = f"{key}{_SEP}{position}{_SEP}{entry_id}"
+                index = bisect_left(self._keys, composite)
+                self._keys.insert(index, composite)
+
+            self._entries[entry_id] = entry
+            self._refresh_head(entry)
+            self._stats["upserts"] += 1
+
+    def remove(self, entry_id: str) -> None:
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if entry is not None:
+                self._remove_entry(entry)
+                self._stats["removals"] += 1
+
+    def add_title(self, record: Dict[str, Any]) -> None:
+        """Index a unified movie/TV/podcast record by its title."""
+        self.upsert(
+            record.get("id"), record.get("title") or "", "title",
+            record.get("type"), record.get("platform"),
+            record.get("poster_url") or record.get("thumbnail_url"),
+            _popularity(record)
+        )
+
+    def observe(self, results: Iterable[Dict[str, Any]]) -> None:
+        """Pick suggestable titles, artists and channels out of search results."""
+        for record in results or []:
+            content_type = record.get("type")
+            if content_type == "podcast":
+                self.add_title(record)
+            elif content_type == "channel":
+                self.upsert(record.get("id"), record.get("title") or "", "channel", "channel",
+                            "youtube", record.get("thumbnail_url"), _popularity(record))
+
+            for artist in record.get("artists") or []:
+                if artist:
+                    self.upsert(f"artist_{normalize_title(artist).replace(' ', '_')}", artist, "artist", "artist",
+                                "spotify", None, _popularity(record))
+
+            if record.get("channel_id") and record.get("channel_title"):
+                self.upsert(f"youtube_channel_{record['channel_id']}", record["channel_title"],
+                            "channel", "channel", "youtube", None, _popularity(record))
+
+    def on_catalog_change(self, event: str, record: Dict[str, Any]) -> None:
+        """TitleCatalog listener: keep titles in step with the catalog."""
+        if event == "add":
+            self.add_title(record)
+        elif event == "remove":
+            self.remove(record.get("id"))
+
+    def record_click(self, entry_id: str) -> bool:
+        """Count a suggestion click (boosts it for every later keystroke)."""
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                return False
+            self._clicks[entry_id] = self._clicks.get(entry_id, 0) + 1
+            self._stats["clicks"] += 1
+            self._refresh_head(entry)
+            return True
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # LOOKUP
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def suggest(self, prefix: str, limit: int = 8, kinds: Iterable[str] = None) -> List[Dict[str, Any]]:
+        """
+        Top suggestions for what the user has typed so far.
+
+        Args:
+            prefix: Partial query
+            limit: Max suggestions
+            kinds: Restrict to "title", "artist" and/or "channel"
+
+        Returns:
+            Suggestions, best first
+        """
+        started = time.perf_counter()
+        query = normalize_title(prefix)
+        if not query:
+            return []
+        allowed = set(kinds) if kinds else None
+
+        with self._lock:
+            self._stats["lookups"] += 1
+            if len(query) <= HEAD_PREFIX_LENGTH:
+                candidates = self._head.get(query, [])
+            else:
+                candidates = self._scan(query)
+
+            picked = []
+            seen = set()
+            for score, entry_id in sorted(candidates, reverse=True):
+                entry = self._entries.get(entry_id)
+                if entry is None or entry_id in seen:
+                    continue
+                if allowed and entry.kind not in allowed:
+                    continue
+                seen.add(entry_id)
+                picked.append(entry.to_dict())
+                if len(picked) >= limit:
+                    break
+
+        self._latencies.append((time.perf_counter() - started) * 1000)
+        return picked
+
+    def _scan(self, query: str, limit: Optional[int] = MAX_SCAN) -> List[Tuple[float, str]]:
+        """Score every key in the prefix range (at most `limit` keys; None scans it all)."""
+        start = bisect_left(self._keys, query)
+        end = bisect_left(self._keys, query + "\uffff")
+        if limit is not None:
+            end = min(end, start + limit)
+        best: Dict[str, float] = {}
+        for composite in self._keys[start:end]:
+            _, position, entry_id = composite.split(_SEP)
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                continue
+            score = self._score(entry, int(position))
+            if score > best.get(entry_id, -1.0):
+                best[entry_id] = score
+        return [(score, entry_id) for entry_id, score in best.items()]
+
+    def _weight(self, entry: SuggestEntry) -> float:
+        return entry.popularity + CLICK_WEIGHT * math.log1p(self._clicks.get(entry.id, 0))
+
+    def _score(self, entry: SuggestEntry, position: int) -> float:
+        # +1 so zero-popularity entries still order by where they matched
+        weight = self._weight(entry) + 1.0
+        return weight if position == 0 else weight * INNER_WORD_FACTOR
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # HEAD LISTS (short prefixes)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def _head_prefixes(self, entry: SuggestEntry) -> Dict[str, float]:
+        """Short prefix -> best score this entry has under it."""
+        prefixes: Dict[str, float] = {}
+        for position, key in enumerate(entry.keys):
+            score = self._score(entry, position)
+            for length in range(1, min(len(key), HEAD_PREFIX_LENGTH) + 1):
+                prefix = key[:length].rstrip()
+                if prefix and score > prefixes.get(prefix, -1.0):
+                    prefixes[prefix] = score
+        return prefixes
+
+    def _refresh_head(self, entry: SuggestEntry) -> None:
+        for prefix, score in self._head_prefixes(entry).items():
+            top = [item for item in self._head.get(prefix, []) if item[1] != entry.id]
+            if len(top) < HEAD_SIZE or score > top[-1][0]:
+                top.append((score, entry.id))
+                top.sort(reverse=True)
+                del top[HEAD_SIZE:]
+            self._head[prefix] = top
+
+    def _remove_entry(self, entry: SuggestEntry) -> None:
+        for position, key in enumerate(entry.keys):
+            composite = f"{key}{_SEP}{position}{_SEP}{entry.id}"
+            index = bisect_left(self._keys, composite)
+            if index < len(self._keys) and self._keys[index] == composite:
+                del self._keys[index]
+        self._entries.pop(entry.id, None)
+
+        for prefix in self._head_prefixes(entry):
+            top = [item for item in self._head.get(prefix, []) if item[1] != entry.id]
+            if len(top) < HEAD_SIZE:
+                # Refill from the index so short prefixes don't drain as entries go
+                top = sorted(self._scan(prefix, limit=None), reverse=True)[:HEAD_SIZE]
+            if top:
+                self._head[prefix] = top
+            else:
+                self._head.pop(prefix, None)
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # STATISTICS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics, including lookup latency percentiles."""
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 3)
+
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "keys": len(self._keys),
+            "head_prefixes": len(self._head),
+            "p50_ms": percentile(0.50),
+            "p99_ms": percentile(0.99)
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# GLOBAL INSTANCE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Singleton instance
+_suggest_index: Optional[SuggestIndex] = None
+
+
+def get_suggest_index() -> SuggestIndex:
+    """Get or create the global suggestion index (follows the title catalog)."""
+    global _suggest_index
+    if _suggest_index is None:
+        index = SuggestIndex()
+        catalog = get_catalog()
+        for record in catalog.records():
+            index.add_title(record)
+        catalog.add_listener(index.on_catalog_change)
+        _suggest_index = index
+    return _suggest_index
@@ -5,20 +5,89 @@ Movie and TV show search via The Movie Database API.
 ═══════════════════════════════════════════════════════════════════════════════
 """
 
-import aiohttp
 from typing import List, Dict, Any, Optional
 from config.settings import TMDB_API_KEY, TMDB_BASE_URL, TMDB_IMAGE_BASE, TMDB_ENABLED
+from services.search.http_client import PooledHTTPClient, get_http_client
+from services.search.single_flight import coalesce
+from services.search.cache import cached
+from services.search.catalog import get_catalog
+from services.search.genres import mask_from_ids
+
+
+# Sub-resources fetched alongside title details via append_to_response
+DETAIL_APPEND = {
+    "movie": "videos,watch/providers,release_dates",
+    "tv": "videos,watch/providers,content_ratings"
+}
+
+# TMDB genre ids (movie + TV lists) - search results only carry the ids
+TMDB_GENRES = {
+    28: "Action", 12: "Adventure", 16: "Animation", 35: "Comedy", 80: "Crime",
+    99: "Documentary", 18: "Drama", 10751: "Family", 14: "Fantasy", 36: "History",
+    27: "Horror", 10402: "Music", 9648: "Mystery", 10749: "Romance",
+    878: "Science Fiction", 10770: "TV Movie", 53: "Thriller", 10752: "War", 37: "Western",
+    10759: "Action & Adventure", 10762: "Kids", 10763: "News", 10764: "Reality",
+    10765: "Sci-Fi & Fantasy", 10766: "Soap", 10767: "Talk", 10768: "War & Politics"
+}
+
+
+def _pick_trailer_key(videos: List[Dict]) -> Optional[str]:
+    """Best YouTube video key: Official Trailer > Trailer > Teaser > anything."""
+    youtube = [v for v in videos if v.get("site") == "YouTube"]
+    for video in youtube:
+        if video.get("type") == "Trailer" and "official" in video.get("name", "").lower():
+            return video.get("key")
+    for wanted in ("Trailer", "Teaser"):
+        for video in youtube:
+            if video.get("type") == wanted:
+                return video.get("key")
+    return youtube[0].get("key") if youtube else None
+
+
+def _merge_providers(region_data: Dict, limit: int = 8) -> List[Dict[str, Any]]:
+    """Subscription providers first, then rent options not already listed."""
+    providers = []
+    seen = set()
+    for availability, bucket in (("stream", "flatrate"), ("rent", "rent")):
+        for p in region_data.get(bucket, []):
+            if p.get("provider_id") in seen:
+                continue
+            seen.add(p.get("provider_id"))
+            providers.append({
+                "provider_id": p.get("provider_id"),
+                "provider_name": p.get("provider_name"),
+                "logo_path": p.get("logo_path"),
+                "availability": availability
+            })
+    return providers[:limit]
+
+
+def _us_certification(data: Dict, media_type: str) -> Optional[str]:
+    """US age rating from release_dates (movies) or content_ratings (TV)."""
+    if media_type == "tv":
+        for rating in data.get("content_ratings", {}).get("results", []):
+            if rating.get("iso_3166_1") == "US":
+                return rating.get("rating") or None
+        return None
+    for release in data.get("release_dates", {}).get("results", []):
+        if release.get("iso_3166_1") == "US":
+            for entry in release.get("release_dates", []):
+                if entry.get("certification"):
+                    return entry["certification"]
+    return None
 
 
 class TMDBService:
     """Service for searching movies and TV shows via TMDB API."""
 
-    def __init__(self):
+    def __init__(self, http_client: PooledHTTPClient = None):
         self.api_key = TMDB_API_KEY
         self.base_url = TMDB_BASE_URL
         self.image_base = TMDB_IMAGE_BASE
         self.enabled = TMDB_ENABLED
+        self.http = http_client or get_http_client()
 
+    @cached("search", "tmdb.search_movies")
     async def search_movies(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search for movies."""
         if not self.enabled:
@@ -34,16 +103,17 @@ class TMDBService:
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return [self._transform_movie(m) for m in data.get("results", [])[:limit]]
-                    return []
+            session = await self.http.get_session()
+            async with session.get(url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return self._ingest([self._transform_movie(m) for m in data.get("results", [])[:limit]])
+                return []
         except Exception as e:
             print(f"TMDB movie search error: {e}")
             return []
 
+    @cached("search", "tmdb.search_tv")
     async def search_tv(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search for TV shows."""
         if not self.enabled:
@@ -59,38 +129,52 @@ class TMDBService:
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return [self._transform_tv(t) for t in data.get("results", [])[:limit]]
-                    return []
+            session = await self.http.get_session()
+            async with session.get(url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return self._ingest([self._transform_tv(t) for t in data.get("results", [])[:limit]])
+                return []
         except Exception as e:
             print(f"TMDB TV search error: {e}")
             return []
 
-    async def get_movie_details(self, movie_id: int) -> Optional[Dict[str, Any]]:
-        """Get detailed movie information."""
+    @cached("details", "tmdb.title_details")
+    @coalesce("tmdb.title_details")
+    async def get_title_details(self, tmdb_id: int, media_type: str = "movie") -> Optional[Dict[str, Any]]:
+        """
+        Get details, videos, watch providers and release info in ONE request.
+
+        Uses TMDB's append_to_response and normalizes the payload into the
+        shared title record (same layout the Streamlit app reads), so a title
+        page costs one upstream call instead of three.
+        """
         if not self.enabled:
             return None
 
-        url = f"{self.base_url}/movie/{movie_id}"
+        url = f"{self.base_url}/{media_type}/{tmdb_id}"
         params = {
             "api_key": self.api_key,
-            "append_to_response": "watch/providers,credits"
+            "append_to_response": DETAIL_APPEND.get(media_type, DETAIL_APPEND["movie"])
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._transform_movie_details(data)
-                    return None
+            session = await self.http.get_session()
+            async with session.get(url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return self._ingest([self._transform_title_details(data, media_type)])[0]
+                return None
         except Exception as e:
-            print(f"TMDB movie details error: {e}")
+            print(f"TMDB title details error: {e}")
             return None
 
+    async def get_movie_details(self, movie_id: int) -> Optional[Dict[str, Any]]:
+        """Get detailed movie information."""
+        return await self.get_title_details(movie_id, "movie")
+
+    @cached("trending", "tmdb.trending")
+    @coalesce("tmdb.trending")
     async def get_trending(self, media_type: str = "all", time_window: str = "week", limit: int = 10) -> List[Dict]:
         """Get trending content."""
         if not self.enabled:
@@ -100,22 +184,24 @@ class TMDBService:
         params = {"api_key": self.api_key}
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        results = []
-                        for item in data.get("results", [])[:limit]:
-                            if item.get("media_type") == "movie":
-                                results.append(self._transform_movie(item))
-                            else:
-                                results.append(self._transform_tv(item))
-                        return results
-                    return []
+            session = await self.http.get_session()
+            async with session.get(url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    results = []
+                    for item in data.get("results", [])[:limit]:
+                        if item.get("media_type") == "movie":
+                            results.append(self._transform_movie(item))
+                        else:
+                            results.append(self._transform_tv(item))
+                    return self._ingest(results)
+                return []
         except Exception as e:
             print(f"TMDB trending error: {e}")
             return []
 
+    @cached("details", "tmdb.recommendations")
+    @coalesce("tmdb.recommendations")
     async def get_recommendations(self, movie_id: int, limit: int = 10) -> List[Dict]:
         """Get movie recommendations based on a movie."""
         if not self.enabled:
@@ -125,16 +211,21 @@ class TMDBService:
         params = {"api_key": self.api_key}
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return [self._transform_movie(m) for m in data.get("results", [])[:limit]]
-                    return []
+            session = await self.http.get_session()
+            async with session.get(url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return self._ingest([self._transform_movie(m) for m in data.get("results", [])[:limit]])
+                return []
         except Exception as e:
             print(f"TMDB recommendations error: {e}")
             return []
 
+    def _ingest(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Feed every title we see into the local catalog (see services.search.catalog)."""
+        get_catalog().add_many(records)
+        return records
+
     def _transform_movie(self, data: Dict) -> Dict[str, Any]:
         """Transform TMDB movie response to unified format."""
         return {
@@ -149,7 +240,9 @@ class TMDBService:
             "vote_count": data.get("vote_count", 0),
             "release_year": int(data.get("release_date", "2000")[:4]) if data.get("release_date") else None,
             "description": data.get("overview", ""),
-            "genres": [],  # Would need separate call to get genre names
+            "genres": [TMDB_GENRES[g] for g in data.get("genre_ids", []) if g in TMDB_GENRES],
+            "genre_ids": data.get("genre_ids", []),
+            "genre_mask": mask_from_ids(data.get("genre_ids")),
             "duration_minutes": None,  # Not in search results
             "popularity": data.get("popularity", 0)
         }
@@ -168,38 +261,50 @@ class TMDBService:
             "vote_count": data.get("vote_count", 0),
             "release_year": int(data.get("first_air_date", "2000")[:4]) if data.get("first_air_date") else None,
             "description": data.get("overview", ""),
-            "genres": [],
+            "genres": [TMDB_GENRES[g] for g in data.get("genre_ids", []) if g in TMDB_GENRES],
+            "genre_ids": data.get("genre_ids", []),
+            "genre_mask": mask_from_ids(data.get("genre_ids")),
             "duration_minutes": 45,  # Typical episode length
             "popularity": data.get("popularity", 0)
         }
 
-    def _transform_movie_details(self, data: Dict) -> Dict[str, Any]:
-        """Transform detailed movie response."""
-        genres = [g.get("name") for g in data.get("genres", [])]
+    def _transform_title_details(self, data: Dict, media_type: str = "movie") -> Dict[str, Any]:
+        """Transform an append_to_response payload into the unified title record."""
+        genres = data.get("genres", [])
+        release_date = data.get("release_date") or data.get("first_air_date") or ""
+        runtime = data.get("runtime")
+        if runtime is None and data.get("episode_run_time"):
+            runtime = data["episode_run_time"][0]
 
         # Get streaming providers (US)
         watch_providers = data.get("watch/providers", {}).get("results", {}).get("US", {})
-        streaming = [p.get("provider_name") for p in watch_providers.get("flatrate", [])]
+        providers = _merge_providers(watch_providers)
 
         return {
-            "id": f"tmdb_movie_{data.get('id')}",
+            "id": f"tmdb_{media_type}_{data.get('id')}",
             "tmdb_id": data.get("id"),
-            "title": data.get("title", "Unknown"),
-            "type": "movie",
+            "title": data.get("title") or data.get("name") or "Unknown",
+            "type": media_type,
             "platform": "tmdb",
             "poster_url": f"{self.image_base}/w500{data.get('poster_path')}" if data.get("poster_path") else None,
             "backdrop_url": f"{self.image_base}/w1280{data.get('backdrop_path')}" if data.get("backdrop_path") else None,
             "rating": round(data.get("vote_average", 0), 1),
             "vote_count": data.get("vote_count", 0),
-            "release_year": int(data.get("release_date", "2000")[:4]) if data.get("release_date") else None,
+            "release_year": int(release_date[:4]) if release_date[:4].isdigit() else None,
             "description": data.get("overview", ""),
-            "genres": genres,
-            "duration_minutes": data.get("runtime"),
+            "genres": [g.get("name") for g in genres],
+            "genre_ids": [g.get("id") for g in genres],
+            "genre_mask": mask_from_ids(g.get("id") for g in genres),
+            "duration_minutes": runtime,
             "tagline": data.get("tagline"),
             "budget": data.get("budget"),
             "revenue": data.get("revenue"),
-            "streaming_on": streaming,
-            "imdb_id": data.get("imdb_id")
+            "imdb_id": data.get("imdb_id"),
+            "certification": _us_certification(data, media_type),
+            "trailer_key": _pick_trailer_key(data.get("videos", {}).get("results", [])),
+            "providers": providers,
+            "streaming_on": [p["provider_name"] for p in providers if p["availability"] == "stream"],
+            "watch_link": f"https://www.themoviedb.org/{media_type}/{data.get('id')}/watch?locale=US"
         }
 
 
@@ -349,6 +454,7 @@ def get_streaming_deep_link(
         return url_template.format(title=safe_title)
 
 
+@cached("providers", "tmdb.watch_links")
 async def get_movie_watch_links(movie_id: int) -> Dict[str, Any]:
     """
     Get watch links for a movie across streaming services.
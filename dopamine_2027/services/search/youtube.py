@@ -5,13 +5,15 @@ Video search and discovery via YouTube Data API.
 ═══════════════════════════════════════════════════════════════════════════════
 """
 
-import aiohttp
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import re
 import logging
 
 from config.settings import YOUTUBE_API_KEY, YOUTUBE_ENABLED
+from services.search.http_client import PooledHTTPClient, get_http_client
+from services.search.single_flight import coalesce
+from services.search.cache import cached
 
 logger = logging.getLogger(__name__)
 
@@ -30,9 +32,10 @@ class YouTubeService:
 
     BASE_URL = "https://www.googleapis.com/youtube/v3"
 
-    def __init__(self):
+    def __init__(self, http_client: PooledHTTPClient = None):
         self.api_key = YOUTUBE_API_KEY
         self.enabled = YOUTUBE_ENABLED and bool(self.api_key)
+        self.http = http_client or get_http_client()
 
     async def _api_request(self, endpoint: str, params: Dict) -> Optional[Dict]:
         """Make an API request to YouTube."""
@@ -42,19 +45,19 @@ class YouTubeService:
         params["key"] = self.api_key
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.BASE_URL}/{endpoint}",
-                    params=params
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    elif response.status == 403:
-                        logger.error("YouTube API quota exceeded or key invalid")
-                        return None
-                    else:
-                        logger.error(f"YouTube API error: {response.status}")
-                        return None
+            session = await self.http.get_session()
+            async with session.get(
+                f"{self.BASE_URL}/{endpoint}",
+                params=params
+            ) as response:
+                if response.status == 200:
+                    return await response.json()
+                elif response.status == 403:
+                    logger.error("YouTube API quota exceeded or key invalid")
+                    return None
+                else:
+                    logger.error(f"YouTube API error: {response.status}")
+                    return None
         except Exception as e:
             logger.error(f"YouTube request error: {e}")
             return None
@@ -63,6 +66,7 @@ class YouTubeService:
     # SEARCH METHODS
     # ═══════════════════════════════════════════════════════════════════════════
 
+    @cached("search", "youtube.search_videos")
     async def search_videos(
         self,
         query: str,
@@ -122,6 +126,7 @@ class YouTubeService:
 
         return [self._transform_video(item, {}) for item in data.get("items", [])]
 
+    @cached("search", "youtube.search_channels")
     async def search_channels(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search for YouTube channels."""
         if not self.enabled:
@@ -141,6 +146,7 @@ class YouTubeService:
 
         return [self._transform_channel(item) for item in data.get("items", [])]
 
+    @cached("search", "youtube.search_playlists")
     async def search_playlists(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search for YouTube playlists."""
         if not self.enabled:
@@ -189,6 +195,8 @@ class YouTubeService:
     # DETAIL METHODS
     # ═══════════════════════════════════════════════════════════════════════════
 
+    @cached("details", "youtube.video")
+    @coalesce("youtube.video")
     async def get_video(self, video_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed video information."""
         if not self.enabled:
@@ -207,6 +215,8 @@ class YouTubeService:
         item = data["items"][0]
         return self._transform_video_full(item)
 
+    @cached("details", "youtube.channel")
+    @coalesce("youtube.channel")
     async def get_channel(self, channel_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed channel information."""
         if not self.enabled:
@@ -224,6 +234,7 @@ class YouTubeService:
 
         return self._transform_channel_full(data["items"][0])
 
+    @cached("details", "youtube.playlist_videos")
     async def get_playlist_videos(
         self,
         playlist_id: str,
@@ -265,6 +276,8 @@ class YouTubeService:
     # DISCOVERY METHODS
     # ═══════════════════════════════════════════════════════════════════════════
 
+    @cached("trending", "youtube.trending")
+    @coalesce("youtube.trending")
     async def get_trending(
         self,
         category_id: str = None,
@@ -292,6 +305,7 @@ class YouTubeService:
 
         return [self._transform_video_full(item) for item in data.get("items", [])]
 
+    @coalesce("youtube.related_videos")
     async def get_related_videos(self, video_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Get videos related to a specific video."""
         # Note: Related videos endpoint was deprecated, using search instead
@@ -0,0 +1,118 @@
+"""
+═══════════════════════════════════════════════════════════════════════════════
+MESSAGE LOG
+Per-conversation message storage in fixed-size segments. Every message
+gets a sequence number; a sequence number maps straight to (segment, slot),
+so cursor pages seek instead of slicing, deletes leave a tombstone instead
+of rebuilding the list, and retention drops whole segments from the front.
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+from typing import Any, Iterator, List, Optional, Tuple
+
+SEGMENT_SIZE = 128
+
+
+class MessageLog:
+    """
+    Append-only, segmented message list for one conversation.
+
+    - append() stamps message.seq and returns any messages retention evicted
+    - get(seq) / remove(seq) are O(1)
+    - page(before, limit) walks backwards from a cursor, O(limit) plus
+      any tombstones skipped
+    - Keeps at least max_messages live messages, rounded up to whole segments
+    """
+
+    def __init__(self, max_messages: int = 1000, segment_size: int = SEGMENT_SIZE):
+        self._segments: List[List[Optional[Any]]] = []
+        self._segment_size = segment_size
+        self._max_messages = max_messages
+        self._base_seq = 0   # seq of slot 0 in the first segment
+        self._next_seq = 0
+        self._live = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    @property
+    def first_seq(self) -> int:
+        """Lowest seq still held (older ones have aged out)."""
+        return self._base_seq
+
+    @property
+    def last_seq(self) -> int:
+        """Seq of the newest message ever appended (-1 if none)."""
+        return self._next_seq - 1
+
+    def __iter__(self) -> Iterator[Any]:
+        """Live messages, oldest first."""
+        for segment in self._segments:
+            for message in segment:
+                if message is not None:
+                    yield message
+
+    def append(self, message: Any) -> List[Any]:
+        if not self._segments or len(self._segments[-1]) == self._segment_size:
+            self._segments.append([])
+        message.seq = self._next_seq
+        self._segments[-1].append(message)
+        self._next_seq += 1
+        self._live += 1
+        return self._evict()
+
+    def _evict(self) -> List[Any]:
+        evicted = []
+        while len(self._segments) > 1:
+            front = [message for message in self._segments[0] if message is not None]
+            if self._live - len(front) < self._max_messages:
+                break
+            self._segments.pop(0)
+            self._base_seq += self._segment_size
+            self._live -= len(front)
+            evicted.extend(front)
+        return evicted
+
+    def _locate(self, seq: int) -> Optional[Tuple[List[Optional[Any]], int]]:
+        offset = seq - self._base_seq
+        if offset < 0 or seq >= self._next_seq:
+            return None
+        return self._segments[offset // self._segment_size], offset % self._segment_size
+
+    def get(self, seq: int) -> Optional[Any]:
+        location = self._locate(seq)
+        return location[0][location[1]] if location else None
+
+    def remove(self, seq: int) -> Optional[Any]:
+        """Tombstone a message; returns it if it was still stored."""
+        location = self._locate(seq)
+        if location is None:
+            return None
+        segment, slot = location
+        message, segment[slot] = segment[slot], None
+        if message is not None:
+            self._live -= 1
+        return message
+
+    def page(self, before: Optional[int] = None, limit: int = 50) -> Tuple[List[Any], Optional[int]]:
+        """
+        Up to `limit` live messages older than seq `before` (newest page if None).
+
+        Returns (messages oldest first, cursor for the next older page or None).
+        """
+        seq = self._next_seq if before is None else min(before, self._next_seq)
+        messages = []
+        # One extra message tells whether an older page exists
+        while seq > self._base_seq and len(messages) <= limit:
+            seq -= 1
+            message = self.get(seq)
+            if message is not None:
+                messages.append(message)
+
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        messages.reverse()
+        return messages, (messages[0].seq if has_more else None)
+
+    def latest(self, limit: int) -> List[Any]:
+        return self.page(None, limit)[0]
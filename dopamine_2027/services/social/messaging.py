@@ -14,6 +14,7 @@ import uuid
 import logging
 
 from services.realtime.websocket_manager import get_websocket_manager, MessageType
+from services.social.message_log import MessageLog
 
 logger = logging.getLogger(__name__)
 
@@ -42,11 +43,11 @@ class Message:
     content: str
     created_at: datetime = field(default_factory=datetime.utcnow)
     status: MessageStatus = MessageStatus.SENT
-    read_by: Set[str] = field(default_factory=set)
     reply_to_id: Optional[str] = None
     edited_at: Optional[datetime] = None
     attachments: List[Dict] = field(default_factory=list)
     reactions: Dict[str, List[str]] = field(default_factory=dict)  # emoji -> [user_ids]
+    seq: int = 0  # Position in the conversation's MessageLog (pagination cursor)
 
 
 @dataclass
@@ -58,8 +59,10 @@ class Conversation:
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
     last_message: Optional[Message] = None
-    messages: List[Message] = field(default_factory=list)
+    messages: MessageLog = field(default_factory=MessageLog)
     typing_users: Dict[str, datetime] = field(default_factory=dict)  # user_id -> last_typing_time
+    read_watermarks: Dict[str, int] = field(default_factory=dict)  # user_id -> seq of last message read
+    unread_counts: Dict[str, int] = field(default_factory=dict)  # user_id -> messages after the watermark
     muted_by: Set[str] = field(default_factory=set)
     name: Optional[str] = None  # For group chats
     avatar_url: Optional[str] = None  # For group chats
@@ -76,12 +79,18 @@ class DirectMessagingService:
     - Read receipts
     - Message reactions
     - Reply threading
+    - Message-ID index + segmented per-conversation logs: lookups by ID and
+      cursor pages never scan a conversation
+    - Read watermarks: one last-read seq per participant instead of a read_by
+      set per message, with unread counters kept up to date on every change
     """
 
     def __init__(self):
         self._conversations: Dict[str, Conversation] = {}
         self._user_conversations: Dict[str, Set[str]] = {}  # user_id -> conversation_ids
         self._dm_lookup: Dict[str, str] = {}  # "user1:user2" -> conversation_id
+        self._message_index: Dict[str, Message] = {}  # message_id -> message (every stored message)
+        self._total_unread: Dict[str, int] = {}  # user_id -> unread across all conversations
         self._ws_manager = get_websocket_manager()
 
         # Register message handlers
@@ -147,6 +156,7 @@ class DirectMessagingService:
             if user_id not in self._user_conversations:
                 self._user_conversations[user_id] = set()
             self._user_conversations[user_id].add(conversation.id)
+            self._add_reader(conversation, user_id)
 
         self._stats["total_conversations"] += 1
         logger.info(f"Created DM conversation: {conversation.id}")
@@ -189,6 +199,7 @@ class DirectMessagingService:
             if user_id not in self._user_conversations:
                 self._user_conversations[user_id] = set()
             self._user_conversations[user_id].add(conversation.id)
+            self._add_reader(conversation, user_id)
 
         # Create WebSocket room
         await self._ws_manager.create_room(
@@ -220,7 +231,9 @@ class DirectMessagingService:
         if added_by not in conversation.participants:
             return False
 
-        conversation.participants.add(user_id)
+        if user_id not in conversation.participants:
+            conversation.participants.add(user_id)
+            self._add_reader(conversation, user_id)  # history counts as read
 
         if user_id not in self._user_conversations:
             self._user_conversations[user_id] = set()
@@ -246,6 +259,7 @@ class DirectMessagingService:
             return False
 
         conversation.participants.discard(user_id)
+        self._remove_reader(conversation, user_id)
         self._user_conversations.get(user_id, set()).discard(conversation_id)
 
         await self._ws_manager.leave_room(user_id, conversation_id)
@@ -324,14 +338,10 @@ class DirectMessagingService:
         )
 
         # Add to conversation
-        conversation.messages.append(message)
+        self._store_message(conversation, message)
         conversation.last_message = message
         conversation.updated_at = datetime.utcnow()
 
-        # Keep only last 1000 messages in memory
-        if len(conversation.messages) > 1000:
-            conversation.messages = conversation.messages[-1000:]
-
         # Clear typing indicator
         conversation.typing_users.pop(sender_id, None)
 
@@ -377,10 +387,8 @@ class DirectMessagingService:
 
         conversation = self._conversations.get(message.conversation_id)
         if conversation:
-            conversation.messages = [
-                m for m in conversation.messages
-                if m.id != message_id
-            ]
+            conversation.messages.remove(message.seq)
+            self._forget_message(conversation, message)
 
             await self._broadcast_to_conversation(
                 conversation,
@@ -460,11 +468,52 @@ class DirectMessagingService:
 
     def _find_message(self, message_id: str) -> Optional[Message]:
         """Find a message by ID."""
-        for conversation in self._conversations.values():
-            for message in conversation.messages:
-                if message.id == message_id:
-                    return message
-        return None
+        return self._message_index.get(message_id)
+
+    def _store_message(self, conversation: Conversation, message: Message) -> None:
+        """Append to the conversation's log, index it and count it unread (older messages may age out)."""
+        for evicted in conversation.messages.append(message):
+            self._forget_message(conversation, evicted)
+        self._message_index[message.id] = message
+
+        for user_id in conversation.participants:
+            if user_id != message.sender_id:
+                self._adjust_unread(conversation, user_id, 1)
+
+    def _forget_message(self, conversation: Conversation, message: Message) -> None:
+        """A message left the log (deleted or aged out): unindex it and uncount it."""
+        self._message_index.pop(message.id, None)
+        for user_id in conversation.participants:
+            if user_id != message.sender_id and message.seq > conversation.read_watermarks.get(user_id, -1):
+                self._adjust_unread(conversation, user_id, -1)
+
+    def get_messages(
+        self,
+        conversation_id: str,
+        before: Optional[int] = None,
+        limit: int = 50
+    ) -> Optional[Dict[str, Any]]:
+        """
+        A page of messages, oldest first.
+
+        Args:
+            conversation_id: Conversation to read
+            before: Cursor (message seq) - only older messages are returned
+            limit: Page size
+
+        Returns:
+            {"messages", "next_cursor", "total"}, or None if no such conversation
+        """
+        conversation = self._conversations.get(conversation_id)
+        if not conversation:
+            return None
+
+        messages, next_cursor = conversation.messages.page(before, limit)
+        return {
+            "messages": messages,
+            "next_cursor": next_cursor,
+            "total": len(conversation.messages)
+        }
 
     # ═══════════════════════════════════════════════════════════════════════════
     # TYPING INDICATORS
@@ -535,24 +584,31 @@ class DirectMessagingService:
         if not conversation or user_id not in conversation.participants:
             return 0
 
-        marked_count = 0
-        found_target = up_to_message_id is None
+        watermark = conversation.read_watermarks.get(user_id, -1)
+        if up_to_message_id is None:
+            target = conversation.messages.last_seq
+        else:
+            message = self._message_index.get(up_to_message_id)
+            if not message or message.conversation_id != conversation_id:
+                return 0
+            target = message.seq
 
-        for message in conversation.messages:
-            if message.id == up_to_message_id:
-                found_target = True
+        if target <= watermark:
+            return 0
 
-            if found_target or not up_to_message_id:
-                if message.sender_id != user_id and user_id not in message.read_by:
-                    message.read_by.add(user_id)
+        if target == conversation.messages.last_seq:
+            # Caught up: everything that was unread is now read
+            marked_count = conversation.unread_counts.get(user_id, 0)
+        else:
+            # Partial: count what the watermark passes over (each message is crossed once per reader)
+            marked_count = 0
+            for seq in range(max(watermark + 1, conversation.messages.first_seq), target + 1):
+                message = conversation.messages.get(seq)
+                if message is not None and message.sender_id != user_id:
                     marked_count += 1
 
-                    # Check if all participants have read
-                    if message.read_by >= (conversation.participants - {message.sender_id}):
-                        message.status = MessageStatus.READ
-
-            if message.id == up_to_message_id:
-                break
+        conversation.read_watermarks[user_id] = target
+        self._adjust_unread(conversation, user_id, -marked_count)
 
         # Broadcast read receipt
         if marked_count > 0:
@@ -562,7 +618,8 @@ class DirectMessagingService:
                     "type": MessageType.DM_READ.value,
                     "user_id": user_id,
                     "conversation_id": conversation_id,
-                    "up_to_message_id": up_to_message_id
+                    "up_to_message_id": up_to_message_id,
+                    "up_to_seq": target
                 },
                 exclude_user=user_id
             )
@@ -575,18 +632,36 @@ class DirectMessagingService:
         if not conversation:
             return 0
 
-        return sum(
-            1 for msg in conversation.messages
-            if msg.sender_id != user_id and user_id not in msg.read_by
-        )
+        return conversation.unread_counts.get(user_id, 0)
 
     def get_total_unread_count(self, user_id: str) -> int:
         """Get total unread messages across all conversations."""
-        conversation_ids = self._user_conversations.get(user_id, set())
-        return sum(
-            self.get_unread_count(cid, user_id)
-            for cid in conversation_ids
-        )
+        return self._total_unread.get(user_id, 0)
+
+    def get_message_status(self, conversation_id: str, message: Message) -> MessageStatus:
+        """READ once every other participant's watermark has passed the message."""
+        conversation = self._conversations.get(conversation_id)
+        if not conversation:
+            return message.status
+
+        readers = conversation.participants - {message.sender_id}
+        if readers and all(conversation.read_watermarks.get(u, -1) >= message.seq for u in readers):
+            return MessageStatus.READ
+        return message.status
+
+    def _add_reader(self, conversation: Conversation, user_id: str) -> None:
+        conversation.read_watermarks[user_id] = conversation.messages.last_seq
+        conversation.unread_counts[user_id] = 0
+
+    def _remove_reader(self, conversation: Conversation, user_id: str) -> None:
+        conversation.read_watermarks.pop(user_id, None)
+        self._adjust_unread(conversation, user_id, -conversation.unread_counts.get(user_id, 0))
+        conversation.unread_counts.pop(user_id, None)
+
+    def _adjust_unread(self, conversation: Conversation, user_id: str, delta: int) -> None:
+        if delta:
+            conversation.unread_counts[user_id] = conversation.unread_counts.get(user_id, 0) + delta
+            self._total_unread[user_id] = self._total_unread.get(user_id, 0) + delta
 
     # ═══════════════════════════════════════════════════════════════════════════
     # MESSAGE HANDLERS
@@ -679,7 +754,7 @@ class DirectMessagingService:
             content=content
         )
 
-        conversation.messages.append(message)
+        self._store_message(conversation, message)
 
         await self._broadcast_to_conversation(
             conversation,
@@ -717,7 +792,8 @@ class DirectMessagingService:
         """Get service statistics."""
         return {
             **self._stats,
-            "active_conversations": len(self._conversations)
+            "active_conversations": len(self._conversations),
+            "indexed_messages": len(self._message_index)
         }
 
 
@@ -0,0 +1,262 @@
+# mr_dp_cache.py
+# --------------------------------------------------
+# DOPAMINE.WATCH - MR.DP RESPONSE CACHE
+# --------------------------------------------------
+# First-turn prompts repeat a lot ("I'm bored", "something funny",
+# "can't sleep"), so completions are reused:
+# 1. Keyed on normalized prompt + mood pair + context fingerprint
+# 2. Exact match, then a near match by character-trigram similarity of
+#    the content words (same mood/context scope, negations and numbers)
+# 3. Per-entry TTLs
+# 4. Multi-turn chats always go to the model
+#
+# Mirrors dopamine_2027/services/mr_dp/response_cache.py (same keys and matching).
+# --------------------------------------------------
+
+import copy
+import hashlib
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+# --------------------------------------------------
+# 1. SETTINGS
+# --------------------------------------------------
+
+MR_DP_CACHE_ENABLED = os.environ.get("MR_DP_CACHE_ENABLED", "1") != "0"
+MR_DP_CACHE_MAX_ENTRIES = int(os.environ.get("MR_DP_CACHE_MAX_ENTRIES", 2000))
+MR_DP_CACHE_TTL = int(os.environ.get("MR_DP_CACHE_TTL", 6 * 3600))            # plain answers (s)
+MR_DP_CACHE_CONTENT_TTL = int(os.environ.get("MR_DP_CACHE_CONTENT_TTL", 1800))  # answers naming titles (s)
+
+SIMILARITY_THRESHOLD = 0.7   # trigram Jaccard of the content words for a near match
+MAX_SIMILAR_WORDS = 8        # longer prompts only match exactly
+MAX_PROMPT_CHARS = 500       # longer prompts aren't cached at all
+
+# A near match must agree on these ("something funny" is not "nothing funny")
+NEGATIONS = frozenset({
+    "no", "not", "nothing", "never", "none", "nobody", "without",
+    "dont", "doesnt", "didnt", "cant", "cannot", "wont", "isnt", "arent",
+    "wasnt", "shouldnt", "wouldnt", "couldnt", "hate", "stop",
+})
+
+# Dropped before near-matching, so "I'm so bored" finds "bored"
+FILLER_WORDS = frozenset({
+    "i", "im", "am", "me", "my", "a", "an", "the", "to", "of", "and", "is", "it", "its",
+    "so", "really", "very", "just", "kinda", "kind", "sort", "bit", "little", "pretty", "super",
+    "please", "pls", "plz", "hey", "hi", "hello", "um", "uh", "ok", "okay", "mr", "dp",
+    "feel", "feeling", "want", "wanna", "need", "give", "show", "find", "recommend",
+    "watch", "something", "anything", "some", "like", "right", "now",
+})
+
+# --------------------------------------------------
+# 2. NORMALIZATION
+# --------------------------------------------------
+
+_APOSTROPHES = re.compile(r"['’`]")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_REPEATS = re.compile(r"([a-z])\1{2,}")   # letters only: "2000s" stays
+
+
+def normalize_prompt(text: str) -> str:
+    """Lowercase ASCII words, apostrophes dropped, 'sooo' -> 'so'."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = text.encode("ascii", "ignore").decode("ascii").lower()
+    text = _APOSTROPHES.sub("", text)
+    text = _REPEATS.sub(r"\1", text)
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def prompt_signature(normalized: str) -> FrozenSet[str]:
+    """Negations and any word with a digit ("90s", "2h", "2024") in a normalized prompt."""
+    return frozenset(w for w in normalized.split() if w in NEGATIONS or any(c.isdigit() for c in w))
+
+
+def content_words(normalized: str) -> str:
+    """The prompt without filler words (the prompt itself if that leaves nothing)."""
+    words = [w for w in normalized.split() if w not in FILLER_WORDS]
+    return " ".join(words) if words else normalized
+
+
+def trigrams(normalized: str) -> FrozenSet[str]:
+    padded = f" {normalized} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def context_fingerprint(context: Optional[str]) -> str:
+    """Short stable hash of the context text sent with the prompt ("" if none)."""
+    if not context:
+        return ""
+    return hashlib.sha1(context.encode("utf-8")).hexdigest()[:16]
+
+# --------------------------------------------------
+# 3. CACHE
+# --------------------------------------------------
+
+class CachedResponse:
+    __slots__ = ("key", "scope", "prompt", "signature", "grams", "value", "expires_at")
+
+    def __init__(self, key: Tuple[str, str], scope: str, prompt: str, value: Any, expires_at: float):
+        self.key = key
+        self.scope = scope
+        self.prompt = prompt
+        self.signature = prompt_signature(prompt)
+        self.grams = trigrams(content_words(prompt))
+        self.value = value
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """
+    Bounded LRU of Mr.DP completions, shared by every Streamlit session.
+    Scope = namespace + mood pair + context fingerprint; nothing is served
+    across scopes. Values are deep-copied in and out.
+    """
+
+    def __init__(self, max_entries: int = MR_DP_CACHE_MAX_ENTRIES, ttl: float = MR_DP_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], CachedResponse]" = OrderedDict()
+        self._grams: Dict[str, Dict[str, Set[Tuple[str, str]]]] = {}   # scope -> trigram -> keys
+        self.stats = {
+            "exact_hits": 0, "similar_hits": 0, "misses": 0, "bypassed": 0,
+            "stored": 0, "expired": 0, "evictions": 0,
+        }
+
+    @staticmethod
+    def scope(namespace: str, moods: Tuple[Optional[str], Optional[str]] = (None, None),
+              context: Optional[str] = None) -> str:
+        current, desired = moods
+        return f"{namespace}|{current or ''}|{desired or ''}|{context_fingerprint(context)}"
+
+    def get(self, namespace: str, prompt: str, moods: Tuple[Optional[str], Optional[str]] = (None, None),
+            context: Optional[str] = None, history: Optional[List[Dict]] = None) -> Optional[Any]:
+        """Cached response for a first-turn prompt, or None (miss or bypass)."""
+        if not MR_DP_CACHE_ENABLED:
+            return None
+        if history:
+            self.stats["bypassed"] += 1
+            return None
+        normalized = normalize_prompt(prompt)
+        if not normalized:
+            return None
+        scope = self.scope(namespace, moods, context)
+
+        with self._lock:
+            now = time.time()
+            entry = self._live((scope, normalized), now)
+            if entry is not None:
+                self.stats["exact_hits"] += 1
+            elif len(normalized.split()) <= MAX_SIMILAR_WORDS:
+                entry = self._nearest(scope, normalized, now)
+                if entry is not None:
+                    self.stats["similar_hits"] += 1
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(entry.key)
+            value = entry.value
+        return copy.deepcopy(value)
+
+    def put(self, namespace: str, prompt: str, value: Any,
+            moods: Tuple[Optional[str], Optional[str]] = (None, None),
+            context: Optional[str] = None, history: Optional[List[Dict]] = None,
+            ttl: Optional[float] = None) -> bool:
+        """Cache a first-turn response; False when it wasn't cacheable."""
+        if not MR_DP_CACHE_ENABLED or history:
+            return False
+        normalized = normalize_prompt(prompt)
+        if not normalized or len(normalized) > MAX_PROMPT_CHARS:
+            return False
+        scope = self.scope(namespace, moods, context)
+        entry = CachedResponse((scope, normalized), scope, normalized, copy.deepcopy(value),
+                               time.time() + (self.ttl if ttl is None else ttl))
+
+        with self._lock:
+            self._remove(entry.key)
+            self._entries[entry.key] = entry
+            if len(normalized.split()) <= MAX_SIMILAR_WORDS:
+                index = self._grams.setdefault(scope, {})
+                for gram in entry.grams:
+                    index.setdefault(gram, set()).add(entry.key)
+            self.stats["stored"] += 1
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+        return True
+
+    def _live(self, key: Tuple[str, str], now: float) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= now:
+            self._remove(key)
+            self.stats["expired"] += 1
+            return None
+        return entry
+
+    def _nearest(self, scope: str, prompt: str, now: float) -> Optional[CachedResponse]:
+        index = self._grams.get(scope)
+        if not index:
+            return None
+        grams = trigrams(content_words(prompt))
+        shared: Dict[Tuple[str, str], int] = {}
+        for gram in grams:
+            for key in index.get(gram, ()):
+                shared[key] = shared.get(key, 0) + 1
+
+        signature = prompt_signature(prompt)
+        best, best_score = None, SIMILARITY_THRESHOLD
+        for key, overlap in shared.items():
+            entry = self._entries[key]
+            score = overlap / (len(grams) + len(entry.grams) - overlap)
+            if score >= best_score and entry.signature == signature:
+                best, best_score = key, score
+        return self._live(best, now) if best is not None else None
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        index = self._grams.get(entry.scope)
+        if index is None:
+            return
+        for gram in entry.grams:
+            keys = index.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del index[gram]
+        if not index:
+            del self._grams[entry.scope]
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self.stats["exact_hits"] + self.stats["similar_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# --------------------------------------------------
+# 4. SHARED INSTANCE
+# --------------------------------------------------
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_mr_dp_cache() -> ResponseCache:
+    """Process-wide cache shared by every Streamlit session."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
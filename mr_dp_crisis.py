@@ -0,0 +1,144 @@
+# mr_dp_crisis.py
+# --------------------------------------------------
+# DOPAMINE.WATCH - MR.DP CRISIS DETECTION
+# --------------------------------------------------
+# Every Mr.DP entry point (ask_mr_dp, ask_mr_dp_v2, the offline fallbacks,
+# chat_with_mr_dp) checks a message for crisis wording first:
+# 1. One keyword list, normalized like the messages (accents, apostrophes,
+#    leetspeak, spaced-out and stretched letters)
+# 2. Compiled once into a regex trie on word boundaries ("end it" is not
+#    in "spend it")
+# 3. One shared support message for replies that skip the model
+#
+# Mirrors dopamine_2027/services/mr_dp/crisis.py (same keywords and normalization).
+# --------------------------------------------------
+
+import re
+import unicodedata
+from typing import Dict, Iterable, List
+
+from mr_dp_intents import trie_pattern
+
+
+# --------------------------------------------------
+# 1. KEYWORDS
+# --------------------------------------------------
+
+# Whole words/phrases; a trailing * is a stem ("suicid*" = suicide, suicidal).
+# Multi-word phrases also match written as one word ("killmyself").
+CRISIS_KEYWORDS = (
+    # Suicide / wanting to die
+    "suicid*", "kill myself", "killing myself", "kms", "unalive*",
+    "end it", "end it all", "ending it all", "end my life", "ending my life", "take my own life",
+    "want to die", "wanna die", "wish i was dead", "wish i were dead", "better off dead",
+    "dont want to live", "dont want to be alive", "dont wanna live", "dont wanna be alive",
+    "no reason to live",
+    # Self-harm
+    "self harm*", "hurt myself", "hurting myself", "cut myself", "cutting myself", "cutting again",
+    # Hopelessness (phrases only: "cutting-edge", "never give up" are not crises)
+    "no point in living", "no point living", "no point anymore", "point in anything",
+    "want to give up", "wanna give up", "give up on life", "giving up on life",
+    "cant go on", "cannot go on",
+)
+
+
+# --------------------------------------------------
+# 2. NORMALIZATION
+# --------------------------------------------------
+
+# Cyrillic lookalikes NFKD leaves alone; curly apostrophes dropped
+_UNICODE_FOLD = str.maketrans("аеорсухіјѕԁӏ", "aeopcyxijsdl", "’ʼ")
+# "2" between words reads as "to" ("want2die", "want 2 die")
+_TWO = re.compile(r"(?<=[a-z ])2(?=[a-z ])")
+# Symbols read as letters only when a letter follows ("$uicide", "k!ll"), not in "die!"
+_LEET_SYMBOLS = re.compile(r"[@$!|+€](?=[a-z0-9])")
+_SYMBOL_LETTERS = {"@": "a", "$": "s", "!": "i", "|": "i", "+": "t", "€": "e"}
+
+
+def _ascii_fold() -> bytes:
+    """a-z kept, digits read as letters, "l" folded into "i" ("k1ll", "ki11", "kill"), rest spaces."""
+    table = bytearray(b" " * 256)
+    for char in b"abcdefghijklmnopqrstuvwxyz":
+        table[char] = char
+    for digit, letter in zip(b"013457l", b"oieasti"):
+        table[digit] = letter
+    return bytes(table)
+
+
+_ASCII_FOLD = _ascii_fold()
+_SPACED_LETTERS = re.compile(r" ([a-z](?: [a-z]){2,})(?= )")   # "d i e", "k.i.l.l"
+_MY_SELF = re.compile(r" my seif(?= )(?! h+a+r+m)")          # "my self", but not "my self harm"
+_REPEATS = re.compile(r"([a-z])\1+")
+
+
+def normalize_crisis_text(text: str) -> str:
+    """
+    Skeleton of a message: lowercase a-z words between single spaces, with
+    accents, lookalikes, leetspeak, "2" for "to", "my self" and spaced-out
+    letters undone. Stretched letters ("diiie") are left in; the detector's
+    pattern absorbs them.
+    """
+    t = (text or "").lower()
+    if not t.isascii():
+        t = unicodedata.normalize("NFKD", t).translate(_UNICODE_FOLD)
+        t = "".join(c for c in t if not unicodedata.combining(c) and unicodedata.category(c) != "Cf")
+    t = _TWO.sub(" to ", t)
+    t = _LEET_SYMBOLS.sub(lambda m: _SYMBOL_LETTERS[m.group()], t)
+    t = t.encode("ascii", "replace").translate(_ASCII_FOLD, b"'`").decode("ascii")
+    t = _SPACED_LETTERS.sub(lambda m: " " + m.group(1).replace(" ", ""), f" {' '.join(t.split())} ")
+    return _MY_SELF.sub(" myseif", t).strip()
+
+
+# --------------------------------------------------
+# 3. DETECTOR
+# --------------------------------------------------
+
+class CrisisDetector:
+    """
+    Crisis keywords compiled into one regex trie over normalized text.
+
+    Keywords are normalized like messages, with letter runs collapsed, and
+    padded with spaces (no trailing space for stems) so matches start and
+    end on word boundaries; every trie character matches a run of itself.
+    The trie never backtracks past the next character, so a scan costs at
+    most one keyword length per offset: linear in the message, whatever
+    the keyword count.
+    """
+
+    def __init__(self, keywords: Iterable[str] = CRISIS_KEYWORDS):
+        self.keywords = tuple(keywords)
+        self._terms: Dict[str, str] = {}   # padded skeleton -> keyword
+        for keyword in self.keywords:
+            stem = keyword.endswith("*")
+            phrase = _REPEATS.sub(r"\1", normalize_crisis_text(keyword.rstrip("*")))
+            for form in (phrase, phrase.replace(" ", "")):
+                self._terms.setdefault(f" {form}" + ("" if stem else " "), keyword)
+        body = trie_pattern(self._terms, runs=True)
+        self._search = re.compile(body).search
+        self._scan = re.compile(f"(?=({body}))")
+
+    def detect(self, text: str) -> bool:
+        return self._search(f" {normalize_crisis_text(text)} ") is not None
+
+    def terms(self, text: str) -> List[str]:
+        """Keywords found in the text, in order (the longest one at each position)."""
+        found: List[str] = []
+        for m in self._scan.finditer(f" {normalize_crisis_text(text)} "):
+            keyword = self._terms[_REPEATS.sub(r"\1", m.group(1))]
+            if keyword not in found:
+                found.append(keyword)
+        return found
+
+
+# --------------------------------------------------
+# 4. SHARED DETECTOR
+# --------------------------------------------------
+
+CRISIS_DETECTOR = CrisisDetector()
+
+CRISIS_MESSAGE = "I hear you, and I care about you. Please know you're not alone. 💜\n\n🇺🇸 988 (Suicide & Crisis Lifeline)\n🇬🇧 116 123 (Samaritans)\n🌍 findahelpline.com\n\nIf you're in immediate danger, please call emergency services. These trained professionals can provide the support you deserve."
+
+
+def detect_crisis(message: str) -> bool:
+    """Check if message contains crisis indicators."""
+    return CRISIS_DETECTOR.detect(message)
@@ -17,6 +17,10 @@ import json
 import random
 import os
 
+from mr_dp_crisis import detect_crisis, CRISIS_MESSAGE
+from mr_dp_intents import match_intents
+from mr_dp_prompt import PromptBuilder
+
 # Try to import OpenAI for conversational AI
 try:
     from openai import OpenAI
@@ -52,11 +56,11 @@ Speaking style:
 - Don't overuse emojis - maybe 1 per message max
 - Be direct - ADHD users appreciate getting to the point
 
-Current context about the user:
-{user_context}
-
 Remember: You're here to reduce decision fatigue, not add to it!"""
 
+# The prompt above stays byte-identical (cacheable prefix); user context follows it
+MR_DP_CHAT_PROMPT = PromptBuilder(MR_DP_SYSTEM_PROMPT, "gpt-4o-mini")
+
 def init_openai_client():
     """Initialize OpenAI client"""
     api_key = None
@@ -117,6 +121,10 @@ def chat_with_mr_dp(
     Chat with Mr.DP using OpenAI
     Returns: (response_text, expression)
     """
+    # Crisis wording gets support resources, not a movie pick
+    if detect_crisis(message):
+        return CRISIS_MESSAGE, "love"
+
     client = init_openai_client()
 
     if not client:
@@ -124,21 +132,12 @@ def chat_with_mr_dp(
         return get_fallback_response(message), "thinking"
 
     try:
-        # Build messages
-        messages = [
-            {
-                "role": "system",
-                "content": MR_DP_SYSTEM_PROMPT.format(user_context=get_user_context(user_data))
-            }
-        ]
-
-        # Add conversation history
-        if conversation_history:
-            for entry in conversation_history[-10:]:  # Last 10 messages
-                messages.append({"role": entry["role"], "content": entry["content"]})
-
-        # Add current message
-        messages.append({"role": "user", "content": message})
+        # Build messages: system prompt, user context, older turns summarized, recent turns
+        messages = MR_DP_CHAT_PROMPT.build(
+            message,
+            conversation_history,
+            f"Current context about the user:\n{get_user_context(user_data)}"
+        )
 
         # Call OpenAI
         response = client.chat.completions.create(
@@ -148,6 +147,7 @@ def chat_with_mr_dp(
             temperature=0.8
         )
 
+        MR_DP_CHAT_PROMPT.record_usage(response.usage)
         response_text = response.choices[0].message.content
 
         # Determine expression based on response sentiment
@@ -189,10 +189,10 @@ def get_fallback_response(message: str, user_name: str = None) -> str:
         message: User's message
         user_name: User's name for personalized responses (optional)
     """
-    message_lower = message.lower()
+    reply = match_intents(message).first("chat_reply")
 
     # Greeting - personalized when we know the name (Neurodivergent Engine - Session Learning)
-    if any(word in message_lower for word in ["hi", "hello", "hey", "sup"]):
+    if reply == "greeting":
         if user_name:
             return random.choice([
                 f"Hey {user_name}! Ready to find something awesome to watch?",
@@ -207,7 +207,7 @@ def get_fallback_response(message: str, user_name: str = None) -> str:
             ])
 
     # Help with decision
-    if any(word in message_lower for word in ["can't decide", "help", "pick", "choose", "recommend"]):
+    if reply == "help":
         return random.choice([
             "I gotchu! Try the Quick Hit button - I'll pick something perfect for your mood!",
             "Decision paralysis hitting? Let me take over - hit that Quick Hit button!",
@@ -215,13 +215,13 @@ def get_fallback_response(message: str, user_name: str = None) -> str:
         ])
 
     # Mood related
-    if any(word in message_lower for word in ["sad", "down", "depressed"]):
+    if reply == "sad":
         return "I hear you. Sometimes a comfort rewatch hits different. Want me to suggest something cozy and familiar?"
 
-    if any(word in message_lower for word in ["bored", "boring"]):
+    if reply == "bored":
         return "Boredom is just untapped curiosity! Let's find something that'll grab your brain. Comedy? Documentary? Something weird?"
 
-    if any(word in message_lower for word in ["tired", "exhausted", "sleepy"]):
+    if reply == "tired":
         return "Low energy mode activated! How about something light that doesn't require much brainpower? A familiar sitcom maybe?"
 
     # Default
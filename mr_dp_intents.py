@@ -0,0 +1,313 @@
+# mr_dp_intents.py
+# --------------------------------------------------
+# DOPAMINE.WATCH - MR.DP INTENT & ENTITY MATCHER
+# --------------------------------------------------
+# Every keyword table the offline Mr.DP fallbacks use, compiled once at
+# import into a single regex trie:
+# 1. One scan of the prompt finds every keyword occurrence (overlaps too)
+# 2. Each table keeps its first-listed hit - the same answer the old
+#    "for entry in table: if keyword in t" chains gave
+# 3. Entities: media type, mood pair, artist and duration
+# Greeting words match whole words only ("hi" is not in "something").
+#
+# Mirrors dopamine_2027/services/mr_dp/intents.py (same tables and matching).
+# --------------------------------------------------
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# --------------------------------------------------
+# 1. KEYWORD TABLES (order = priority within a table)
+# --------------------------------------------------
+
+POPULAR_ARTISTS = (
+    # Pop/Hip-Hop
+    "drake", "taylor swift", "kendrick", "beyonce", "kanye", "travis scott", "bad bunny",
+    "weeknd", "doja cat", "sza", "dua lipa", "billie eilish", "ed sheeran", "ariana grande",
+    "post malone", "harry styles", "olivia rodrigo", "morgan wallen", "luke combs", "eminem",
+    "rihanna", "bruno mars", "coldplay", "imagine dragons", "maroon 5", "adele", "shakira",
+    # Rock/Metal
+    "metallica", "led zeppelin", "pink floyd", "queen", "ac/dc", "acdc", "guns n roses",
+    "nirvana", "foo fighters", "linkin park", "green day", "blink 182", "fall out boy",
+    "panic at the disco", "my chemical romance", "slipknot", "avenged sevenfold",
+    "iron maiden", "black sabbath", "megadeth", "slayer", "pantera", "tool",
+    "red hot chili peppers", "pearl jam", "soundgarden", "alice in chains",
+    # Classic/Other
+    "the beatles", "beatles", "rolling stones", "david bowie", "prince", "michael jackson",
+    "elton john", "fleetwood mac", "eagles", "u2", "radiohead", "oasis", "arctic monkeys",
+)
+
+# "play X" / "listen to X" - X is taken as the artist
+ARTIST_PREFIXES = ("play ", "listen to ", "put on ", "songs by ", "music by ")
+NOT_ARTISTS = frozenset({"some", "something", "music", "songs", "a"})
+
+MEDIA_KEYWORDS = (
+    ("shorts", ("shorts", "short video", "tiktok", "reels", "quick video", "clips", "viral video",
+                "satisfying", "asmr video", "quick dopamine", "scroll")),
+    ("podcasts", ("podcast", "podcasts", "episode", "episodes", "listen to talk", "talk show",
+                  "interview", "conversations", "joe rogan", "lex fridman", "true crime podcast")),
+    ("audiobooks", ("audiobook", "audiobooks", "audio book", "listen to a book", "book to listen",
+                    "audible", "read to me", "narrated book", "spoken book")),
+    ("music", ("music", "song", "songs", "playlist", "beats", "tunes", "track", "tracks",
+               "album", "melody", "lo-fi", "lofi", "workout music", "study music",
+               "focus music", "chill music", "sad songs", "happy songs")),
+)
+
+# Current feeling -> keywords, and the feeling each one is steered toward
+FEELING_KEYWORDS = (
+    ("Bored", ("bored", "boring", "nothing to watch", "meh", "blah", "dull")),
+    ("Stressed", ("stress", "overwhelm", "too much", "burnout", "pressure")),
+    ("Anxious", ("anxious", "anxiety", "nervous", "worried", "panic")),
+    ("Sad", ("sad", "down", "depressed", "crying", "upset", "heartbr", "grief")),
+    ("Tired", ("tired", "exhaust", "drained", "sleepy", "no energy", "wiped")),
+    ("Scared", ("scared", "spooky", "horror", "creepy", "terrif", "frighten")),
+    ("Nostalgic", ("nostalg", "throwback", "miss", "remember", "old times", "childhood", "90s", "2000s")),
+    ("Romantic", ("romantic", "love", "date night", "cuddle", "partner", "valentine")),
+    ("Adventurous", ("adventure", "explore", "travel", "wild", "spontan")),
+    ("Frustrated", ("frustrat", "ugh", "annoyed", "irritat", "fed up")),
+    ("Hopeful", ("hope", "optimist", "looking up", "better", "positive")),
+)
+FEELING_TARGETS = {
+    "Bored": "Entertained", "Stressed": "Relaxed", "Anxious": "Calm", "Sad": "Comforted",
+    "Tired": "Relaxed", "Scared": "Scared", "Nostalgic": "Nostalgic", "Romantic": "Romantic",
+    "Adventurous": "Adventurous", "Frustrated": "Calm", "Hopeful": "Inspired",
+}
+
+# What the user wants to feel: keyword -> desired feeling
+DESIRE_KEYWORDS = (
+    ("laugh", "Entertained"), ("funny", "Entertained"), ("relax", "Relaxed"),
+    ("focus", "Focused"), ("sleep", "Sleepy"), ("energy", "Energized"),
+    ("workout", "Energized"), ("motivat", "Motivated"), ("learn", "Curious"),
+    ("scared", "Scared"), ("spooky", "Scared"), ("thrill", "Thrilled"),
+    ("nostalg", "Nostalgic"), ("romantic", "Romantic"), ("love", "Romantic"),
+    ("adventure", "Adventurous"), ("amuse", "Amused"), ("creepy", "Scared"),
+    ("scare me", "Scared"), ("feel scared", "Scared"),
+)
+
+DIRECTORS = ("nolan", "spielberg", "tarantino", "scorsese", "kubrick", "villeneuve")
+
+# Spelled-out lengths (numbers like "20 min" / "2 hours" are parsed separately)
+DURATION_WORDS = (
+    (30, ("half an hour", "half hour")),
+    (90, ("hour and a half", "hour and half")),
+    (120, ("couple hours", "couple of hours", "two hours")),
+    (60, ("an hour", "one hour")),
+)
+
+# fallback_mr_dp_v2 - first intent wins
+QUICK_INTENTS = (
+    ("greeting", ("hi", "hello", "hey", "howdy")),
+    ("stressed", ("stress", "anxious", "overwhelm", "calm", "relax")),
+    ("music", ("music", "song", "playlist", "spotify", "play", "tunes", "tune")),
+    ("podcasts", ("podcast", "podcasts", "pod")),
+    ("audiobooks", ("audiobook", "audiobooks", "book", "books", "read", "listen to a book")),
+    ("shorts", ("shorts", "short", "tiktok", "reels", "quick video")),
+)
+GENRE_KEYWORDS = (
+    "horror", "scary", "thriller", "comedy", "funny", "action", "romance", "romantic", "sad",
+    "drama", "adventure", "sci-fi", "scifi", "fantasy", "documentary", "animation", "anime",
+)
+
+# mr_dp_intelligence.get_fallback_response - first reply wins
+CHAT_REPLIES = (
+    ("greeting", ("hi", "hello", "hey", "sup")),
+    ("help", ("can't decide", "help", "pick", "choose", "recommend")),
+    ("sad", ("sad", "down", "depressed")),
+    ("bored", ("bored", "boring")),
+    ("tired", ("tired", "exhausted", "sleepy")),
+)
+
+# dopamine_2027 services/mr_dp/agent.fallback_response - first reply wins
+AGENT_REPLIES = (
+    ("sad", ("sad", "down", "depressed", "unhappy")),
+    ("bored", ("bored", "nothing to do", "boring")),
+    ("stressed", ("stressed", "anxious", "overwhelmed", "anxiety")),
+    ("funny", ("funny", "comedy", "laugh", "hilarious")),
+    ("music", ("music", "song", "playlist", "tune")),
+)
+
+# Matched as whole words only
+WHOLE_WORDS = frozenset({"hi", "hey", "hello", "howdy", "sup"})
+
+TABLES: Dict[str, Tuple[Tuple[Any, Tuple[str, ...]], ...]] = {
+    "artist": tuple((artist, (artist,)) for artist in POPULAR_ARTISTS),
+    "artist_prefix": tuple((prefix, (prefix,)) for prefix in ARTIST_PREFIXES),
+    "media": MEDIA_KEYWORDS,
+    "feeling": FEELING_KEYWORDS,
+    "desire": tuple((keyword, (keyword,)) for keyword, _ in DESIRE_KEYWORDS),
+    "director": (("director", DIRECTORS),),
+    "duration": DURATION_WORDS,
+    "quick_intent": QUICK_INTENTS,
+    "genre": tuple((keyword, (keyword,)) for keyword in GENRE_KEYWORDS),
+    "chat_reply": CHAT_REPLIES,
+    "agent_reply": AGENT_REPLIES,
+}
+
+# --------------------------------------------------
+# 2. COMPILED MATCHER
+# --------------------------------------------------
+
+# "20 min", "1.5 hours", "2h" (numbers take priority over spelled-out lengths)
+_DURATION_NUMBER = r"(?P<num>\d+(?:\.\d+)?)\s*(?P<unit>hours?|hrs?|h|minutes?|mins?|m)(?![a-z])"
+
+
+def trie_pattern(words: Iterable[str], runs: bool = False) -> str:
+    """
+    Regex matching any of `words`, as a trie; the longest continuation is
+    tried first. With runs=True each character also matches a run of itself.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+    return _node_pattern(trie, runs)
+
+
+def _node_pattern(node: Dict[str, Any], runs: bool) -> str:
+    # "xx*" rather than "x+": a literal first character keeps the regex engine's prefix scan
+    branches = [re.escape(char) + (re.escape(char) + "*" if runs else "") + _node_pattern(child, runs)
+                for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return f"(?:{body})?" if "" in node else body
+
+
+class IntentMatcher:
+    """
+    Keyword tables compiled into one regex trie.
+
+    The pattern is a zero-width lookahead tried at every offset, so each
+    offset yields its longest keyword; the shorter keywords that are
+    prefixes of it are filled in from a precomputed closure. That is every
+    occurrence of every keyword in one pass of the regex engine.
+    """
+
+    def __init__(self, tables: Dict[str, Iterable[Tuple[Any, Iterable[str]]]],
+                 whole_words: Iterable[str] = ()):
+        self.whole_words = frozenset(whole_words)
+        # keyword -> [(table, rank, value)]
+        self._targets: Dict[str, List[Tuple[str, int, Any]]] = {}
+        for table, entries in tables.items():
+            for rank, (value, keywords) in enumerate(entries):
+                for keyword in keywords:
+                    self._targets.setdefault(keyword, []).append((table, rank, value))
+
+        self._pattern = re.compile(f"(?=(?:{_DURATION_NUMBER})|(?P<kw>{trie_pattern(self._targets)}))")
+
+        # keyword -> every keyword that is a prefix of it (itself included)
+        self._prefixes: Dict[str, Tuple[str, ...]] = {
+            keyword: tuple(keyword[:i] for i in range(1, len(keyword) + 1) if keyword[:i] in self._targets)
+            for keyword in self._targets
+        }
+
+    def match(self, text: str) -> "IntentMatch":
+        t = (text or "").lower()
+        hits: Dict[str, Dict[int, Tuple[Any, int, int]]] = {}
+        duration = None
+        for m in self._pattern.finditer(t):
+            if m.group("num") is not None:
+                if duration is None:
+                    duration = _minutes(float(m.group("num")), m.group("unit"))
+                continue
+            start = m.start()
+            for keyword in self._prefixes[m.group("kw")]:
+                end = start + len(keyword)
+                if keyword in self.whole_words and not _is_word(t, start, end):
+                    continue
+                for table, rank, value in self._targets[keyword]:
+                    ranks = hits.setdefault(table, {})
+                    if rank not in ranks:
+                        ranks[rank] = (value, start, end)
+        return IntentMatch(t, hits, duration)
+
+
+class IntentMatch:
+    """What one prompt matched; every lookup is a dict access."""
+
+    __slots__ = ("text", "_hits", "_duration")
+
+    def __init__(self, text: str, hits: Dict[str, Dict[int, Tuple[Any, int, int]]], duration: Optional[int]):
+        self.text = text
+        self._hits = hits
+        self._duration = duration
+
+    def first(self, table: str) -> Optional[Any]:
+        """Value of the highest-priority entry of `table` found in the text."""
+        ranks = self._hits.get(table)
+        return ranks[min(ranks)][0] if ranks else None
+
+    def all(self, table: str) -> List[Tuple[Any, int, int]]:
+        """(value, start, end) of every entry found, in table order (earliest occurrence)."""
+        ranks = self._hits.get(table, {})
+        return [ranks[rank] for rank in sorted(ranks)]
+
+    def has(self, table: str) -> bool:
+        return table in self._hits
+
+    @property
+    def duration_minutes(self) -> Optional[int]:
+        return self._duration if self._duration is not None else self.first("duration")
+
+
+def _is_word(text: str, start: int, end: int) -> bool:
+    return (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+
+
+def _minutes(amount: float, unit: str) -> int:
+    return int(round(amount * 60)) if unit.startswith("h") else int(round(amount))
+
+# --------------------------------------------------
+# 3. ENTITIES
+# --------------------------------------------------
+
+_DESIRED = dict(DESIRE_KEYWORDS)
+
+
+def _artist_after_prefix(match: IntentMatch) -> Optional[str]:
+    """"play X" -> first 2-3 words of X, if they look like a name."""
+    for _, _, end in match.all("artist_prefix"):
+        words = match.text[end:].strip().split()[:3]
+        if words:
+            candidate = " ".join(words).strip(".,!?")
+            if len(candidate) > 2 and candidate not in NOT_ARTISTS:
+                return candidate
+    return None
+
+
+def extract_entities(match: IntentMatch) -> Dict[str, Any]:
+    """
+    Media type, mood pair, artist and duration from one match.
+
+    Same precedence as the keyword chains this replaced: a known artist,
+    then "play X", then shorts > podcasts > audiobooks > music > movies; the
+    first listed feeling sets the pair, a desire keyword fills what's left.
+    """
+    artist = match.first("artist") or _artist_after_prefix(match)
+    media_type = "artist" if artist else (match.first("media") or "movies")
+
+    current = match.first("feeling")
+    desired = FEELING_TARGETS[current] if current else ("Entertained" if artist else None)
+    desire = match.first("desire")
+    if desire and not desired:
+        desired = _DESIRED[desire]
+
+    return {
+        "media_type": media_type,
+        "current_feeling": current,
+        "desired_feeling": desired,
+        "artist": artist,
+        "duration_minutes": match.duration_minutes,
+    }
+
+# --------------------------------------------------
+# 4. SHARED INSTANCE (built at import)
+# --------------------------------------------------
+
+INTENT_MATCHER = IntentMatcher(TABLES, WHOLE_WORDS)
+
+
+def match_intents(text: str) -> IntentMatch:
+    return INTENT_MATCHER.match(text)
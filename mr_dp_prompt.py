@@ -0,0 +1,203 @@
+# mr_dp_prompt.py
+# --------------------------------------------------
+# DOPAMINE.WATCH - MR.DP PROMPT BUILDER
+# --------------------------------------------------
+# Token-budgeted message lists for ask_mr_dp, ask_mr_dp_v2 and
+# chat_with_mr_dp:
+# 1. The static system prompt goes first, byte for byte, so OpenAI's
+#    prompt cache (a prefix match) covers it on every call
+# 2. Per-user context, then a rolling summary of older turns, the recent
+#    turns that fit the budget and the new message
+# 3. Older turns are folded into the summary a block at a time, so the
+#    prompt before the newest turns only changes every few exchanges
+# Token counts use tiktoken when installed, otherwise an estimate.
+#
+# Mirrors dopamine_2027/services/mr_dp/prompt_builder.py (same budget and folding).
+# --------------------------------------------------
+
+import functools
+import os
+from typing import Any, Dict, List, Optional
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# --------------------------------------------------
+# 1. SETTINGS
+# --------------------------------------------------
+
+MR_DP_PROMPT_CONFIG = {
+    # Input tokens per request: system prompt + context + summary + turns + message
+    "max_input_tokens": int(os.environ.get("MR_DP_MAX_INPUT_TOKENS", 6000)),
+
+    # Caps for single pieces, so one pasted essay can't take the whole budget
+    "max_message_tokens": 800,
+    "max_turn_tokens": 300,
+    "max_context_tokens": 400,
+
+    # Recent turns sent verbatim; older ones are folded into the summary
+    # fold_step at a time, so the prompt prefix only moves every few turns
+    "max_history_messages": 10,
+    "fold_step": 6,
+    "summary_tokens": 250,
+    "summary_line_tokens": 40,
+}
+
+MESSAGE_OVERHEAD = 4   # role and separator tokens per chat message
+REPLY_PRIMING = 3      # tokens the API adds to start the reply
+
+
+# --------------------------------------------------
+# 2. TOKEN COUNTING
+# --------------------------------------------------
+
+class TokenCounter:
+    """Exact counts with tiktoken when installed, otherwise about 4 bytes per token."""
+
+    def __init__(self, model: str):
+        self._encoding = None
+        if TIKTOKEN_AVAILABLE:
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("o200k_base")
+        # History messages are recounted every turn
+        self.count = functools.lru_cache(maxsize=4096)(self._count)
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def _count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return len(text.encode("utf-8")) // 4 + 1
+
+    def truncate(self, text: str, limit: int) -> str:
+        """`text` cut to at most `limit` tokens, marked with an ellipsis."""
+        if self.count(text) <= limit:
+            return text
+        if self._encoding is not None:
+            return self._encoding.decode(self._encoding.encode(text)[:max(limit - 1, 0)]) + "…"
+        return text.encode("utf-8")[:max(limit - 1, 0) * 4].decode("utf-8", "ignore") + "…"
+
+
+# --------------------------------------------------
+# 3. PROMPT BUILDER
+# --------------------------------------------------
+
+class PromptBuilder:
+    """
+    Token-budgeted messages for one system prompt.
+
+    - The system prompt is never altered, so its prefix stays cacheable
+    - Context, the new message and each history turn are capped
+    - Up to max_history_messages recent turns are sent verbatim while they
+      fit; older ones are folded fold_step at a time into a summary
+    - The summary is extractive (the start of each folded turn), so it
+      costs no model call and stays identical until the next fold
+    """
+
+    def __init__(self, system_prompt: str, model: str, config: Dict[str, Any] = None):
+        self.system_prompt = system_prompt
+        self._config = {**MR_DP_PROMPT_CONFIG, **(config or {})}
+        self.counter = TokenCounter(model)
+        self.system_tokens = self.counter.count(system_prompt) + MESSAGE_OVERHEAD
+        self._stats = {
+            "builds": 0, "input_tokens": 0, "truncated": 0, "folded_messages": 0,
+            "prompt_tokens": 0, "cached_tokens": 0,
+        }
+
+    def build(self, message: str, history: Optional[List[Dict]] = None,
+              context: Optional[str] = None) -> List[Dict[str, str]]:
+        config = self._config
+        count = self.counter.count
+        messages = [{"role": "system", "content": self.system_prompt}]
+        used = self.system_tokens + REPLY_PRIMING
+
+        if context:
+            context = self._cap(context, config["max_context_tokens"])
+            messages.append({"role": "system", "content": context})
+            used += count(context) + MESSAGE_OVERHEAD
+
+        message = self._cap(message, config["max_message_tokens"])
+        used += count(message) + MESSAGE_OVERHEAD
+
+        turns = [
+            {"role": "user" if msg.get("role") == "user" else "assistant",
+             "content": self._cap(str(msg.get("content") or ""), config["max_turn_tokens"])}
+            for msg in (history or []) if msg.get("content")
+        ]
+        folded = self._fold_point([count(t["content"]) + MESSAGE_OVERHEAD for t in turns],
+                                  config["max_input_tokens"] - used)
+        if folded:
+            summary = self._summarize(turns[:folded])
+            messages.append({"role": "system", "content": summary})
+            used += count(summary) + MESSAGE_OVERHEAD
+        messages.extend(turns[folded:])
+        used += sum(count(t["content"]) + MESSAGE_OVERHEAD for t in turns[folded:])
+        messages.append({"role": "user", "content": message})
+
+        self._stats["builds"] += 1
+        self._stats["input_tokens"] += used
+        self._stats["folded_messages"] += folded
+        return messages
+
+    def _fold_point(self, costs: List[int], budget: int) -> int:
+        """How many of the oldest turns go into the summary (a multiple of fold_step)."""
+        config = self._config
+        step = config["fold_step"]
+        summary_cost = config["summary_tokens"] + MESSAGE_OVERHEAD
+        folded, kept = 0, sum(costs)
+        while folded < len(costs) and (
+            len(costs) - folded > config["max_history_messages"]
+            or kept + (summary_cost if folded else 0) > budget
+        ):
+            end = min(folded + step, len(costs))
+            kept -= sum(costs[folded:end])
+            folded = end
+        return folded
+
+    def _summarize(self, turns: List[Dict[str, str]]) -> str:
+        """Folded turns as one clipped line each; the newest lines win when over summary_tokens."""
+        config = self._config
+        header = "Earlier in this conversation (summary):"
+        lines: List[str] = []
+        used = self.counter.count(header)
+        for turn in reversed(turns):
+            text = self.counter.truncate(" ".join(turn["content"].split()), config["summary_line_tokens"])
+            line = f"- {'User' if turn['role'] == 'user' else 'Mr.DP'}: {text}"
+            cost = self.counter.count(line) + 1
+            if used + cost > config["summary_tokens"]:
+                break
+            lines.append(line)
+            used += cost
+        return "\n".join([header, *reversed(lines)])
+
+    def _cap(self, text: str, limit: int) -> str:
+        capped = self.counter.truncate(text, limit)
+        if capped is not text:
+            self._stats["truncated"] += 1
+        return capped
+
+    def record_usage(self, usage: Any) -> None:
+        """Prompt and provider-cached token counts from a completion's `usage`."""
+        if usage is None:
+            return
+        self._stats["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        self._stats["cached_tokens"] += getattr(details, "cached_tokens", 0) or 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        builds = self._stats["builds"]
+        prompt_tokens = self._stats["prompt_tokens"]
+        return {
+            **self._stats,
+            "token_counts": "tiktoken" if self.counter.exact else "estimated",
+            "system_tokens": self.system_tokens,
+            "avg_input_tokens": round(self._stats["input_tokens"] / builds) if builds else 0,
+            "cached_token_rate": round(self._stats["cached_tokens"] / prompt_tokens, 3) if prompt_tokens else 0.0,
+        }
@@ -11,9 +11,18 @@
 # --------------------------------------------------
 
 import streamlit as st
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
 import os
+import threading
+import time
+
+import numpy as np
+
+from services.tmdb import TMDB_GENRES
+from title_catalog import get_title_catalog
+from genre_registry import mask_from_names, mask_from_ids, item_genre_mask
 
 # --------------------------------------------------
 # 1. MOOD-GENRE MAPPING
@@ -32,75 +41,108 @@ MOOD_GENRE_MAP = {
     "curious": ["documentary", "educational", "science", "history", "mystery"]
 }
 
+# Precomputed masks - mood overlap is one `&` per item
+MOOD_GENRE_MASKS = {mood: mask_from_names(genres) for mood, genres in MOOD_GENRE_MAP.items()}
+
 
 # --------------------------------------------------
 # 2. TMDB SEARCH (Movies & TV)
 # --------------------------------------------------
 
 def _search_tmdb(query: str, content_type: str = "movie", limit: int = 10) -> List[Dict]:
-    """Search TMDB for movies and TV shows."""
-    try:
-        # Try to use existing TMDB setup from app
-        import requests
+    """Search movies and TV shows - local title catalog first, TMDB only on a miss."""
+    media_types = ["movie", "tv"] if content_type == "all" else [content_type]
 
-        api_key = os.environ.get("TMDB_API_KEY") or st.secrets.get("TMDB_API_KEY", "")
-        if not api_key:
-            return _mock_tmdb_results(query, content_type)
-
-        base_url = "https://api.themoviedb.org/3"
-        results = []
+    local = _tmdb_catalog_results(query, media_types, limit)
+    if local is not None:
+        return local
 
-        if content_type in ["all", "movie"]:
-            response = requests.get(
-                f"{base_url}/search/movie",
-                params={"api_key": api_key, "query": query, "page": 1},
-                timeout=5
-            )
-            if response.ok:
-                data = response.json()
-                for item in data.get("results", [])[:limit]:
-                    results.append({
-                        "id": f"tmdb_movie_{item['id']}",
-                        "title": item.get("title", ""),
-                        "type": "movie",
-                        "platform": "tmdb",
-                        "year": item.get("release_date", "")[:4] if item.get("release_date") else "",
-                        "rating": item.get("vote_average", 0),
-                        "description": item.get("overview", "")[:200],
-                        "image_url": f"https://image.tmdb.org/t/p/w300{item['poster_path']}" if item.get("poster_path") else None,
-                        "genres": [],  # Would need additional API call
-                        "duration_minutes": 120  # Default estimate
-                    })
-
-        if content_type in ["all", "tv"]:
-            response = requests.get(
-                f"{base_url}/search/tv",
-                params={"api_key": api_key, "query": query, "page": 1},
-                timeout=5
-            )
-            if response.ok:
-                data = response.json()
-                for item in data.get("results", [])[:limit]:
-                    results.append({
-                        "id": f"tmdb_tv_{item['id']}",
-                        "title": item.get("name", ""),
-                        "type": "tv",
-                        "platform": "tmdb",
-                        "year": item.get("first_air_date", "")[:4] if item.get("first_air_date") else "",
-                        "rating": item.get("vote_average", 0),
-                        "description": item.get("overview", "")[:200],
-                        "image_url": f"https://image.tmdb.org/t/p/w300{item['poster_path']}" if item.get("poster_path") else None,
-                        "genres": [],
-                        "duration_minutes": 45  # Episode estimate
-                    })
+    try:
+        api_key = _tmdb_api_key()
+        if not api_key:
+            return _tmdb_offline_results(query, content_type, media_types, limit)
 
-        return results
+        fetched = {media_type: _fetch_tmdb(query, media_type, limit, api_key) for media_type in media_types}
+        return _merge_tmdb(query, media_types, fetched, limit)
 
     except Exception as e:
         print(f"TMDB search error: {e}")
         return _mock_tmdb_results(query, content_type)
 
 
+def _tmdb_api_key() -> str:
+    return os.environ.get("TMDB_API_KEY") or st.secrets.get("TMDB_API_KEY", "")
+
+
+def _tmdb_catalog_results(query: str, media_types: List[str], limit: int) -> Optional[List[Dict]]:
+    """Catalog answer for the query, or None when TMDB has to be asked."""
+    local = get_title_catalog().lookup(query, media_types, limit * len(media_types))
+    if local is None:
+        return None
+    return [_tmdb_item_to_result(item) for item in local]
+
+
+def _tmdb_offline_results(query: str, content_type: str, media_types: List[str], limit: int) -> List[Dict]:
+    """No API key: whatever the catalog has, else mock results."""
+    local = get_title_catalog().search(query, media_types, limit * len(media_types))
+    return [_tmdb_item_to_result(item) for item in local] or _mock_tmdb_results(query, content_type)
+
+
+def _fetch_tmdb(query: str, media_type: str, limit: int, api_key: str) -> List[Dict]:
+    """One TMDB /search/{media_type} request; the response is fed into the catalog."""
+    import requests
+
+    response = requests.get(
+        f"https://api.themoviedb.org/3/search/{media_type}",
+        params={"api_key": api_key, "query": query, "page": 1},
+        timeout=5
+    )
+    if not response.ok:
+        return []
+    items = response.json().get("results", [])[:limit]
+    get_title_catalog().add_many(items, media_type)
+    return [dict(item, media_type=media_type) for item in items]
+
+
+def _merge_tmdb(query: str, media_types: List[str], fetched: Dict[str, List[Dict]], limit: int) -> List[Dict]:
+    """
+    Combine catalog ranking with fresh TMDB items.
+
+    `fetched` may be missing media types that timed out; the query is only
+    marked backfilled once every type has answered.
+    """
+    catalog = get_title_catalog()
+    total = limit * len(media_types)
+    if all(media_type in fetched for media_type in media_types):
+        catalog.mark_backfilled(query, media_types)
+
+    # Catalog ranking first, then TMDB matches it can't see (alternate titles)
+    ranked = catalog.search(query, media_types, total)
+    seen = {(item["media_type"], item.get("id")) for item in ranked}
+    for items in fetched.values():
+        ranked += [item for item in items if (item["media_type"], item.get("id")) not in seen]
+    return [_tmdb_item_to_result(item) for item in ranked[:total]]
+
+
+def _tmdb_item_to_result(item: Dict) -> Dict:
+    """Raw TMDB search item (media_type set) -> unified search result."""
+    is_tv = item.get("media_type") == "tv"
+    date = item.get("first_air_date" if is_tv else "release_date") or ""
+    return {
+        "id": f"tmdb_{'tv' if is_tv else 'movie'}_{item['id']}" if item.get("id") else f"catalog_{item.get('_seed_key', '')}",
+        "title": item.get("name" if is_tv else "title") or item.get("title") or item.get("name", ""),
+        "type": "tv" if is_tv else "movie",
+        "platform": "tmdb",
+        "year": date[:4],
+        "rating": item.get("vote_average", 0),
+        "description": (item.get("overview") or "")[:200],
+        "image_url": f"https://image.tmdb.org/t/p/w300{item['poster_path']}" if item.get("poster_path") else None,
+        "genres": [TMDB_GENRES[g].lower() for g in item.get("genre_ids") or [] if g in TMDB_GENRES],
+        "genre_mask": mask_from_ids(item.get("genre_ids")),
+        "duration_minutes": 45 if is_tv else 120  # Episode / movie estimate
+    }
+
+
 def _mock_tmdb_results(query: str, content_type: str) -> List[Dict]:
     """Return mock results when TMDB unavailable."""
     return [
@@ -123,82 +165,111 @@ def _mock_tmdb_results(query: str, content_type: str) -> List[Dict]:
 # 3. SPOTIFY SEARCH (Music & Podcasts)
 # --------------------------------------------------
 
+SPOTIFY_SEARCH_TYPES = {"music": "track", "podcast": "show"}
+
+# Client-credentials token, shared by every search until it expires
+_spotify_token = {"value": None, "expires_at": 0.0}
+_spotify_token_lock = threading.Lock()
+
+
 def _search_spotify(query: str, content_type: str = "music", limit: int = 10) -> List[Dict]:
     """Search Spotify for music and podcasts."""
     try:
-        import requests
+        credentials = _spotify_credentials()
+        if not credentials or not _get_spotify_token(credentials):
+            return _mock_spotify_results(query, content_type)
 
-        client_id = os.environ.get("SPOTIFY_CLIENT_ID") or st.secrets.get("SPOTIFY_CLIENT_ID", "")
-        client_secret = os.environ.get("SPOTIFY_CLIENT_SECRET") or st.secrets.get("SPOTIFY_CLIENT_SECRET", "")
+        results = []
+        for kind in _spotify_kinds(content_type):
+            results.extend(_fetch_spotify(query, kind, limit, credentials))
+        return results
 
-        if not client_id or not client_secret:
-            return _mock_spotify_results(query, content_type)
+    except Exception as e:
+        print(f"Spotify search error: {e}")
+        return _mock_spotify_results(query, content_type)
 
-        # Get access token
-        auth_response = requests.post(
-            "https://accounts.spotify.com/api/token",
-            data={"grant_type": "client_credentials"},
-            auth=(client_id, client_secret),
-            timeout=5
-        )
 
-        if not auth_response.ok:
-            return _mock_spotify_results(query, content_type)
+def _spotify_credentials() -> Optional[Tuple[str, str]]:
+    client_id = os.environ.get("SPOTIFY_CLIENT_ID") or st.secrets.get("SPOTIFY_CLIENT_ID", "")
+    client_secret = os.environ.get("SPOTIFY_CLIENT_SECRET") or st.secrets.get("SPOTIFY_CLIENT_SECRET", "")
+    return (client_id, client_secret) if client_id and client_secret else None
 
-        token = auth_response.json().get("access_token")
-        headers = {"Authorization": f"Bearer {token}"}
 
-        results = []
+def _spotify_kinds(content_type: str) -> List[str]:
+    return [kind for kind in SPOTIFY_SEARCH_TYPES if content_type in ["all", kind]]
 
-        if content_type in ["all", "music"]:
-            response = requests.get(
-                "https://api.spotify.com/v1/search",
-                params={"q": query, "type": "track", "limit": limit},
-                headers=headers,
-                timeout=5
-            )
-            if response.ok:
-                data = response.json()
-                for item in data.get("tracks", {}).get("items", []):
-                    results.append({
-                        "id": f"spotify_track_{item['id']}",
-                        "title": item.get("name", ""),
-                        "type": "music",
-                        "platform": "spotify",
-                        "artist": ", ".join([a["name"] for a in item.get("artists", [])]),
-                        "album": item.get("album", {}).get("name", ""),
-                        "image_url": item.get("album", {}).get("images", [{}])[0].get("url") if item.get("album", {}).get("images") else None,
-                        "duration_minutes": round(item.get("duration_ms", 0) / 60000, 1),
-                        "spotify_url": item.get("external_urls", {}).get("spotify")
-                    })
-
-        if content_type in ["all", "podcast"]:
-            response = requests.get(
-                "https://api.spotify.com/v1/search",
-                params={"q": query, "type": "show", "limit": limit},
-                headers=headers,
-                timeout=5
-            )
-            if response.ok:
-                data = response.json()
-                for item in data.get("shows", {}).get("items", []):
-                    results.append({
-                        "id": f"spotify_podcast_{item['id']}",
-                        "title": item.get("name", ""),
-                        "type": "podcast",
-                        "platform": "spotify",
-                        "publisher": item.get("publisher", ""),
-                        "description": item.get("description", "")[:200],
-                        "image_url": item.get("images", [{}])[0].get("url") if item.get("images") else None,
-                        "duration_minutes": 45,  # Episode estimate
-                        "spotify_url": item.get("external_urls", {}).get("spotify")
-                    })
 
-        return results
+def _get_spotify_token(credentials: Tuple[str, str]) -> Optional[str]:
+    """Cached access token; concurrent callers wait for a single refresh."""
+    import requests
 
-    except Exception as e:
-        print(f"Spotify search error: {e}")
-        return _mock_spotify_results(query, content_type)
+    with _spotify_token_lock:
+        if _spotify_token["value"] and time.time() < _spotify_token["expires_at"]:
+            return _spotify_token["value"]
+
+        auth_response = requests.post(
+            "https://accounts.spotify.com/api/token",
+            data={"grant_type": "client_credentials"},
+            auth=credentials,
+            timeout=5
+        )
+        if not auth_response.ok:
+            return None
+
+        data = auth_response.json()
+        _spotify_token["value"] = data.get("access_token")
+        # Refresh a minute early
+        _spotify_token["expires_at"] = time.time() + data.get("expires_in", 3600) - 60
+        return _spotify_token["value"]
+
+
+def _fetch_spotify(query: str, kind: str, limit: int, credentials: Tuple[str, str]) -> List[Dict]:
+    """One Spotify search request ("music" -> tracks, "podcast" -> shows)."""
+    import requests
+
+    token = _get_spotify_token(credentials)
+    if not token:
+        return []
+
+    search_type = SPOTIFY_SEARCH_TYPES[kind]
+    response = requests.get(
+        "https://api.spotify.com/v1/search",
+        params={"q": query, "type": search_type, "limit": limit},
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=5
+    )
+    if not response.ok:
+        return []
+
+    results = []
+    data = response.json()
+    if search_type == "track":
+        for item in data.get("tracks", {}).get("items", []):
+            results.append({
+                "id": f"spotify_track_{item['id']}",
+                "title": item.get("name", ""),
+                "type": "music",
+                "platform": "spotify",
+                "artist": ", ".join([a["name"] for a in item.get("artists", [])]),
+                "album": item.get("album", {}).get("name", ""),
+                "image_url": item.get("album", {}).get("images", [{}])[0].get("url") if item.get("album", {}).get("images") else None,
+                "duration_minutes": round(item.get("duration_ms", 0) / 60000, 1),
+                "spotify_url": item.get("external_urls", {}).get("spotify")
+            })
+    else:
+        for item in data.get("shows", {}).get("items", []):
+            results.append({
+                "id": f"spotify_podcast_{item['id']}",
+                "title": item.get("name", ""),
+                "type": "podcast",
+                "platform": "spotify",
+                "publisher": item.get("publisher", ""),
+                "description": item.get("description", "")[:200],
+                "image_url": item.get("images", [{}])[0].get("url") if item.get("images") else None,
+                "duration_minutes": 45,  # Episode estimate
+                "spotify_url": item.get("external_urls", {}).get("spotify")
+            })
+    return results
 
 
 def _mock_spotify_results(query: str, content_type: str) -> List[Dict]:
@@ -243,15 +314,40 @@ def _search_youtube(query: str, limit: int = 10) -> List[Dict]:
 # 5. AGGREGATOR FUNCTIONS
 # --------------------------------------------------
 
+# Parallel mode: every platform sub-request starts at once; a source's
+# results are used only if they land within its deadline (seconds from the
+# start of the search), so a slow platform can't hold up the whole search.
+SEARCH_SOURCE_DEADLINES = {
+    "tmdb": 3.0,
+    "spotify": 2.5,
+    "youtube": 2.0,
+}
+SEARCH_WORKERS = 16
+
+_search_pool: Optional[ThreadPoolExecutor] = None
+_search_pool_lock = threading.Lock()
+
+
+def _get_search_pool() -> ThreadPoolExecutor:
+    """Process-wide pool shared by every Streamlit session's searches."""
+    global _search_pool
+    if _search_pool is None:
+        with _search_pool_lock:
+            if _search_pool is None:
+                _search_pool = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="search")
+    return _search_pool
+
+
 def search_all_sync(
     query: str,
     content_type: str = "all",
     mood: Optional[str] = None,
     limit: int = 10,
-    max_duration_minutes: Optional[int] = None
+    max_duration_minutes: Optional[int] = None,
+    parallel: bool = True
 ) -> List[Dict]:
     """
-    Search all platforms synchronously (Streamlit-friendly).
+    Search all platforms (Streamlit-friendly - blocks until ranked).
 
     Args:
         query: Search query
@@ -259,10 +355,32 @@ def search_all_sync(
         mood: Current mood for filtering
         limit: Max results to return
         max_duration_minutes: Filter by max duration
+        parallel: Fan out every request at once with per-source deadlines
+            (False = one platform after another, no deadlines)
 
     Returns:
         List of unified content items, ranked by relevance
     """
+    # Ranking is vectorized, so over-fetch candidates and let it choose
+    candidates = max(limit, RANKING_CANDIDATES_PER_PLATFORM)
+
+    if parallel:
+        combined = _gather_parallel(query, content_type, candidates)
+    else:
+        combined = _gather_sequential(query, content_type, candidates)
+
+    # Mood affinity, duration filter and ranking in one vectorized pass
+    ranked = _rank_results(combined, query, mood, limit, max_duration_minutes)
+
+    # Add ADHD-friendly metadata
+    for item in ranked:
+        item["time_estimate"] = format_duration(item.get("duration_minutes", 0))
+        item["adhd_friendly"] = is_adhd_friendly(item)
+
+    return ranked
+
+
+def _gather_sequential(query: str, content_type: str, limit: int) -> List[Dict]:
     combined = []
 
     # Movies & TV
@@ -277,23 +395,78 @@ def search_all_sync(
     if content_type in ["all", "video"]:
         combined.extend(_search_youtube(query, limit))
 
-    # Apply mood filtering
-    if mood:
-        combined = _apply_mood_filter(combined, mood)
+    return combined
 
-    # Apply duration filter
-    if max_duration_minutes:
-        combined = [r for r in combined if r.get("duration_minutes", 999) <= max_duration_minutes]
 
-    # Rank results
-    ranked = _rank_results(combined, query, mood)
+def _gather_parallel(query: str, content_type: str, limit: int) -> List[Dict]:
+    """
+    Submit every sub-request (TMDB movie + tv, Spotify tracks + shows, YouTube)
+    to the shared pool, then collect each source up to its deadline.
 
-    # Add ADHD-friendly metadata
-    for item in ranked:
-        item["time_estimate"] = format_duration(item.get("duration_minutes", 0))
-        item["adhd_friendly"] = is_adhd_friendly(item)
+    Late requests keep running in the background; TMDB responses still
+    reach the title catalog, so the next search for the query is local.
+    Mock results only stand in for a source with no credentials: one that
+    errors or misses its deadline is left out (partial results).
+    """
+    started = time.monotonic()
+    pool = _get_search_pool()
+    combined = []
+
+    # source -> ({sub-request key: future}, finish(results by key) -> items)
+    pending: Dict[str, Tuple[Dict[str, Any], Callable[[Dict[str, List[Dict]]], List[Dict]]]] = {}
+
+    # Movies & TV - catalog answers are immediate
+    if content_type in ["all", "movie", "tv"]:
+        media_types = ["movie", "tv"] if content_type == "all" else [content_type]
+        local = _tmdb_catalog_results(query, media_types, limit)
+        api_key = _tmdb_api_key() if local is None else None
+        if local is not None:
+            combined.extend(local)
+        elif not api_key:
+            combined.extend(_tmdb_offline_results(query, content_type, media_types, limit))
+        else:
+            pending["tmdb"] = (
+                {media_type: pool.submit(_fetch_tmdb, query, media_type, limit, api_key) for media_type in media_types},
+                lambda fetched: _merge_tmdb(query, media_types, fetched, limit)
+            )
+
+    # Music & Podcasts - both searches share one cached token
+    if content_type in ["all", "music", "podcast"]:
+        credentials = _spotify_credentials()
+        if not credentials:
+            combined.extend(_mock_spotify_results(query, content_type))
+        else:
+            pending["spotify"] = (
+                {kind: pool.submit(_fetch_spotify, query, kind, limit, credentials) for kind in _spotify_kinds(content_type)},
+                lambda fetched: [item for items in fetched.values() for item in items]
+            )
+
+    # Videos
+    if content_type in ["all", "video"]:
+        pending["youtube"] = (
+            {"video": pool.submit(_search_youtube, query, limit)},
+            lambda fetched: fetched.get("video", [])
+        )
 
-    return ranked[:limit]
+    # Deadlines are absolute, so the slowest source bounds the wait - they don't add up
+    for source, (futures, finish) in pending.items():
+        remaining = started + SEARCH_SOURCE_DEADLINES[source] - time.monotonic()
+        wait(futures.values(), timeout=max(0.0, remaining))
+
+        fetched = {}
+        for key, future in futures.items():
+            if not future.done():
+                print(f"{source} search: '{key}' missed its {SEARCH_SOURCE_DEADLINES[source]}s deadline")
+                continue
+            try:
+                fetched[key] = future.result()
+            except Exception as e:
+                print(f"{source} search error ({key}): {e}")
+
+        if fetched:
+            combined.extend(finish(fetched))
+
+    return combined
 
 
 def quick_search_sync(query: str, limit: int = 5) -> List[Dict]:
@@ -316,54 +489,101 @@ def mood_based_search_sync(
 # 6. FILTERING & RANKING
 # --------------------------------------------------
 
-def _apply_mood_filter(results: List[Dict], mood: str) -> List[Dict]:
-    """Filter results based on mood preference."""
-    preferred_genres = set(MOOD_GENRE_MAP.get(mood.lower(), []))
-    if not preferred_genres:
-        return results
+# Points per factor; every candidate is scored at once over NumPy columns
+RANKING_WEIGHTS = {
+    "title": 10,            # query appears in the title
+    "rating": 5,            # rating >= RANKING_RATING_THRESHOLD
+    "duration_ideal": 3,    # 20-45 min (ideal episode length)
+    "duration_ok": 2,       # up to 90 min
+    "mood_genre": 2,        # per genre shared with the mood
+}
+RANKING_RATING_THRESHOLD = 7.5
+
+# Candidates requested from each platform before ranking
+RANKING_CANDIDATES_PER_PLATFORM = 20
 
-    # Score each result based on genre match
-    for result in results:
-        result_genres = set(g.lower() for g in result.get("genres", []))
-        overlap = len(result_genres & preferred_genres)
-        result["mood_score"] = overlap
 
-    # Sort by mood score but don't filter out non-matching
-    return sorted(results, key=lambda x: x.get("mood_score", 0), reverse=True)
+def _popcount(masks: np.ndarray) -> np.ndarray:
+    """Number of set bits in each uint64 mask."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(masks)
+    return np.unpackbits(masks.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def _number(value, default: float) -> float:
+    try:
+        return float(value) if value is not None else default
+    except (TypeError, ValueError):
+        return default
 
 
 def _rank_results(
     results: List[Dict],
     query: str,
-    mood: Optional[str] = None
+    mood: Optional[str] = None,
+    limit: Optional[int] = None,
+    max_duration_minutes: Optional[int] = None
 ) -> List[Dict]:
-    """Rank results by relevance."""
-    query_lower = query.lower()
-
-    for result in results:
-        score = 0
-
-        # Title match
-        if query_lower in result.get("title", "").lower():
-            score += 10
-
-        # High rating
-        if result.get("rating", 0) >= 7.5:
-            score += 5
+    """
+    Rank results by relevance (mood affinity included), best first.
 
-        # ADHD-friendly duration
-        duration = result.get("duration_minutes", 0)
-        if 20 <= duration <= 45:
-            score += 3  # Ideal episode length
-        elif duration <= 90:
-            score += 2
+    Builds rating/duration/genre-mask columns in one pass, scores the whole
+    batch with NumPy, applies the duration filter as a mask, and only writes
+    scores back onto the top `limit` items.
+    """
+    if not results:
+        return []
+
+    w = RANKING_WEIGHTS
+    count = len(results)
+
+    mood_mask = MOOD_GENRE_MASKS.get(mood.lower(), 0) if mood else 0
+
+    titles = []
+    ratings = np.empty(count, dtype=np.float64)
+    durations = np.empty(count, dtype=np.float64)
+    masks = np.zeros(count, dtype=np.uint64)
+    for i, result in enumerate(results):
+        titles.append((result.get("title") or "").lower())
+        ratings[i] = _number(result.get("rating"), 0.0)
+        durations[i] = _number(result.get("duration_minutes"), np.nan)
+        masks[i] = item_genre_mask(result)
+
+    # Title match
+    scores = np.where(np.char.find(np.array(titles, dtype=str), query.lower()) >= 0, float(w["title"]), 0.0)
+
+    # High rating
+    scores += np.where(ratings >= RANKING_RATING_THRESHOLD, w["rating"], 0)
+
+    # ADHD-friendly duration (unknown counts as 0, like before)
+    scoring_durations = np.nan_to_num(durations, nan=0.0)
+    scores += np.select(
+        [(scoring_durations >= 20) & (scoring_durations <= 45), scoring_durations <= 90],
+        [w["duration_ideal"], w["duration_ok"]],
+        0
+    )
+
+    # Mood match: number of shared genres
+    mood_scores = _popcount(masks & np.uint64(mood_mask)).astype(np.float64)
+    scores += mood_scores * w["mood_genre"]
+
+    candidates = np.arange(count)
+    if max_duration_minutes:
+        candidates = candidates[np.nan_to_num(durations, nan=999) <= max_duration_minutes]
 
-        # Mood match
-        score += result.get("mood_score", 0) * 2
+    if limit is not None and limit < len(candidates):
+        candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
 
-        result["relevance_score"] = score
+    # Best first; ties keep platform order
+    order = candidates[np.lexsort((candidates, -scores[candidates]))]
 
-    return sorted(results, key=lambda x: x.get("relevance_score", 0), reverse=True)
+    ranked = []
+    for i in order:
+        result = results[i]
+        result["relevance_score"] = float(scores[i])
+        result["mood_score"] = int(mood_scores[i])
+        ranked.append(result)
+    return ranked
 
 
 # --------------------------------------------------
@@ -427,9 +647,24 @@ def render_unified_search_bar():
             key="unified_search_duration"
         )
 
+    # Typeahead: known titles matching what's typed (local catalog, no API call)
+    if query and len(query.strip()) >= 2:
+        typed = query.strip().lower()
+        suggestions = [t for t in get_title_catalog().suggest(query, limit=5) if t.lower() != typed]
+        if suggestions:
+            chip_cols = st.columns(len(suggestions))
+            for i, title in enumerate(suggestions):
+                with chip_cols[i]:
+                    st.button(title, key=f"unified_suggest_{i}", on_click=_pick_suggestion, args=(title,))
+
     return query, content_type, max_duration
 
 
+def _pick_suggestion(title: str):
+    """Suggestion chip callback - fills the search box before the rerun."""
+    st.session_state.unified_search_query = title
+
+
 def render_search_results_grid(results: List[Dict]):
     """Render search results in a responsive grid."""
     if not results:
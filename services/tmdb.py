@@ -53,17 +53,122 @@ def get_popular_movies():
     except Exception:
         return []
 
-@st.cache_data(ttl=86400)
 def get_streaming_providers(tmdb_id, media_type="movie"):
     """Returns detailed provider info (name + logo) for buttons."""
-    url = f"{BASE_URL}/{media_type}/{tmdb_id}/watch/providers"
-    params = {"api_key": get_api_key()}
+    details = get_title_details(tmdb_id, media_type) or {}
+    return {
+        "flatrate": details.get("flatrate", []),
+        "rent": details.get("rent", [])
+    }
+
+# TMDB genre ids (movie + TV lists) - search results only carry the ids
+TMDB_GENRES = {
+    28: "Action", 12: "Adventure", 16: "Animation", 35: "Comedy", 80: "Crime",
+    99: "Documentary", 18: "Drama", 10751: "Family", 14: "Fantasy", 36: "History",
+    27: "Horror", 10402: "Music", 9648: "Mystery", 10749: "Romance",
+    878: "Science Fiction", 10770: "TV Movie", 53: "Thriller", 10752: "War", 37: "Western",
+    10759: "Action & Adventure", 10762: "Kids", 10763: "News", 10764: "Reality",
+    10765: "Sci-Fi & Fantasy", 10766: "Soap", 10767: "Talk", 10768: "War & Politics",
+}
+
+# UNIFIED TITLE DETAILS
+# One append_to_response request returns details, videos, watch providers and
+# release info; every caller (cards, trailers, provider buttons) reads the same
+# normalized record instead of making three separate requests.
+DETAIL_APPEND = {
+    "movie": "videos,watch/providers,release_dates",
+    "tv": "videos,watch/providers,content_ratings",
+}
+
+def pick_trailer_key(videos):
+    """Best YouTube video key: Official Trailer > Trailer > Teaser > anything."""
+    youtube = [v for v in videos if v.get("site") == "YouTube"]
+    for video in youtube:
+        if video.get("type") == "Trailer" and "official" in video.get("name", "").lower():
+            return video.get("key")
+    for wanted in ("Trailer", "Teaser"):
+        for video in youtube:
+            if video.get("type") == wanted:
+                return video.get("key")
+    return youtube[0].get("key") if youtube else None
+
+def merge_providers(region_data, limit=8):
+    """Subscription providers first, then rent options not already listed."""
+    providers = []
+    seen = set()
+    for availability, bucket in (("stream", "flatrate"), ("rent", "rent")):
+        for p in region_data.get(bucket, []):
+            if p.get("provider_id") in seen:
+                continue
+            seen.add(p.get("provider_id"))
+            providers.append({
+                "provider_id": p.get("provider_id"),
+                "provider_name": p.get("provider_name"),
+                "logo_path": p.get("logo_path"),
+                "availability": availability
+            })
+    return providers[:limit]
+
+def _us_certification(data, media_type):
+    if media_type == "tv":
+        for rating in data.get("content_ratings", {}).get("results", []):
+            if rating.get("iso_3166_1") == "US":
+                return rating.get("rating") or None
+        return None
+    for release in data.get("release_dates", {}).get("results", []):
+        if release.get("iso_3166_1") == "US":
+            for entry in release.get("release_dates", []):
+                if entry.get("certification"):
+                    return entry["certification"]
+    return None
+
+def normalize_title_details(data, media_type="movie"):
+    """Flatten an append_to_response payload into the shared title record."""
+    region = data.get("watch/providers", {}).get("results", {}).get("US", {})
+    tmdb_id = data.get("id")
+    release_date = data.get("release_date") or data.get("first_air_date") or ""
+    runtime = data.get("runtime")
+    if runtime is None and data.get("episode_run_time"):
+        runtime = data["episode_run_time"][0]
+
+    return {
+        "id": tmdb_id,
+        "tmdb_id": tmdb_id,
+        "type": media_type,
+        "title": data.get("title") or data.get("name") or "Unknown",
+        "overview": data.get("overview", ""),
+        "poster_path": data.get("poster_path"),
+        "backdrop_path": data.get("backdrop_path"),
+        "release_date": release_date,
+        "release_year": int(release_date[:4]) if release_date[:4].isdigit() else None,
+        "vote_average": data.get("vote_average", 0),
+        "vote_count": data.get("vote_count", 0),
+        "genres": [g.get("name") for g in data.get("genres", [])],
+        "genre_ids": [g.get("id") for g in data.get("genres", [])],
+        "runtime": runtime,
+        "tagline": data.get("tagline"),
+        "imdb_id": data.get("imdb_id"),
+        "certification": _us_certification(data, media_type),
+        "trailer_key": pick_trailer_key(data.get("videos", {}).get("results", [])),
+        "providers": merge_providers(region),
+        "flatrate": region.get("flatrate", []),
+        "rent": region.get("rent", []),
+        "watch_link": f"https://www.themoviedb.org/{media_type}/{tmdb_id}/watch?locale=US",
+    }
+
+@st.cache_data(ttl=86400)
+def get_title_details(tmdb_id, media_type="movie", api_key=None):
+    """Details + videos + providers + release info in ONE request (cached record)."""
+    if not tmdb_id:
+        return None
+    url = f"{BASE_URL}/{media_type}/{tmdb_id}"
+    params = {
+        "api_key": api_key or get_api_key(),
+        "append_to_response": DETAIL_APPEND.get(media_type, DETAIL_APPEND["movie"])
+    }
     try:
-        r = requests.get(url, params=params)
-        data = r.json().get("results", {}).get("US", {})
-        return {
-            "flatrate": data.get("flatrate", []),
-            "rent": data.get("rent", [])
-        }
+        r = requests.get(url, params=params, timeout=8)
+        r.raise_for_status()
+        return normalize_title_details(r.json(), media_type)
     except Exception:
-        return {"flatrate": [], "rent": []}
\ No newline at end of file
+        return None
@@ -90,15 +90,18 @@ def filter_movies_by_runtime(movies: list, max_minutes: int) -> list:
     return [m for m in movies if m.get('runtime', 0) and m.get('runtime', 0) <= max_minutes]
 
 
+# Sci-Fi & Fantasy, Animation, Comedy, Talk shows. Matched by TMDB TV id:
+# as a genre mask 10765 would also let through plain Sci-Fi (878) or Fantasy (14)
+SHORT_EPISODE_GENRE_IDS = frozenset({10765, 16, 35, 10767})
+
+
 def filter_tv_by_episode_length(shows: list, max_minutes: int) -> list:
     """
     Filter TV shows by typical episode length.
     Shows with shorter episodes are prioritized for shorter time slots.
     """
-    short_ep_genres = [10765, 16, 35, 10767]  # Animation, Comedy, Talk shows
-
     if max_minutes <= 30:
-        return [s for s in shows if any(g in s.get('genre_ids', []) for g in short_ep_genres)]
+        return [s for s in shows if not SHORT_EPISODE_GENRE_IDS.isdisjoint(s.get('genre_ids') or ())]
     return shows
 
 
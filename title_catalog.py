@@ -0,0 +1,526 @@
+# title_catalog.py
+# --------------------------------------------------
+# DOPAMINE.WATCH - LOCAL TITLE CATALOG
+# --------------------------------------------------
+# In-memory inverted index over every movie/TV title we have seen:
+# 1. Seeded from movies.csv
+# 2. Grown from every TMDB search response
+# 3. BM25 ranking over title, genres and overview
+# 4. Prefix matching for the term being typed
+# 5. Typo tolerance (SymSpell-style deletion index)
+# TMDB is only asked when the catalog can't answer a query.
+#
+# Mirrors dopamine_2027/services/search/catalog.py (same index and scoring);
+# this one stores raw TMDB result dicts so each caller keeps its own cleaner.
+# --------------------------------------------------
+
+import csv
+import heapq
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Iterable, Tuple, Set
+
+from services.tmdb import TMDB_GENRES
+from genre_registry import mask_from_ids
+
+# --------------------------------------------------
+# 1. SETTINGS
+# --------------------------------------------------
+
+CATALOG_SEED_CSV = os.environ.get(
+    "CATALOG_SEED_CSV", os.path.join(os.path.dirname(os.path.abspath(__file__)), "movies.csv")
+)
+CATALOG_MIN_LOCAL_HITS = 3        # answer locally once this many titles match every term
+CATALOG_BACKFILL_TTL = 3600       # a query backfilled from TMDB stays local this long (s)
+CATALOG_MAX_TITLES = 50000        # oldest-ingested titles evicted beyond this
+
+# BM25F field weights: title, genres, overview
+FIELD_WEIGHTS = (3.0, 2.0, 1.0)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Expansion weights relative to an exact term match
+PREFIX_WEIGHT = 0.8
+TYPO_WEIGHT = 0.6
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_SCAN = 256
+MAX_EXPANSIONS = 16
+
+# Typo tolerance: 1 edit from 4 chars, 2 edits from 8 chars
+MIN_TYPO_LENGTH = 4
+LONG_TERM_LENGTH = 8
+
+# Dropped from overviews only - titles keep every word ("It", "Us", "Her")
+OVERVIEW_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "he",
+    "her", "his", "in", "is", "it", "its", "of", "on", "or", "she", "that", "the",
+    "their", "they", "this", "to", "was", "who", "with"
+})
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# --------------------------------------------------
+# 2. TEXT HELPERS
+# --------------------------------------------------
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, strip accents and apostrophes, split on non-alphanumerics."""
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = text.replace("'", "").replace("’", "")
+    return _TOKEN_RE.findall(text)
+
+
+def normalize_title(text: str) -> str:
+    """Canonical form of a title or query."""
+    return " ".join(tokenize(text))
+
+
+def _deletes(term: str, max_edits: int) -> Set[str]:
+    """All strings reachable from term by up to max_edits deletions."""
+    results = {term}
+    frontier = {term}
+    for _ in range(max_edits):
+        next_frontier = set()
+        for word in frontier:
+            if len(word) <= 1:
+                continue
+            for i in range(len(word)):
+                next_frontier.add(word[:i] + word[i + 1:])
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+
+def _max_edits(term: str) -> int:
+    return 2 if len(term) >= LONG_TERM_LENGTH else 1
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein (optimal string alignment) distance, capped at limit + 1."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous_row = None
+    row = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous_row = previous_row, row
+        row = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, before[j - 2] + 1)
+            row[j] = value
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+    return row[len(b)]
+
+
+def _item_key(item: Dict) -> Optional[str]:
+    """Catalog key for a raw TMDB item (or a seed row without a TMDB id)."""
+    if item.get("id"):
+        return f"{item.get('media_type', 'movie')}:{item['id']}"
+    if item.get("_seed_key"):
+        return item["_seed_key"]
+    return None
+
+
+def _item_title(item: Dict) -> str:
+    return item.get("title") or item.get("name") or ""
+
+# --------------------------------------------------
+# 3. CATALOG
+# --------------------------------------------------
+
+class TitleCatalog:
+    """
+    Inverted index of raw TMDB result dicts (search/multi layout, media_type set).
+
+    Postings map term -> {key: (tf in title, tf in genres, tf in overview)}.
+    Ranking is BM25F boosted by query-term coverage and exact/prefix title
+    matches, with popularity as a tiebreak. Safe to share across Streamlit
+    sessions (one lock around index mutation and search).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+
+        self._docs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._doc_terms: Dict[str, Tuple[str, ...]] = {}
+        self._doc_lengths: Dict[str, Tuple[int, int, int]] = {}
+        self._doc_titles: Dict[str, str] = {}
+        self._length_totals = [0, 0, 0]
+
+        self._postings: Dict[str, Dict[str, Tuple[int, int, int]]] = {}
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+        self._typo_index: Dict[str, Set[str]] = {}
+        self._typo_terms: Dict[str, int] = {}   # title/genre term -> documents using it
+        self._title_keys: Dict[str, Set[str]] = {}
+
+        self._backfilled: "OrderedDict[tuple, float]" = OrderedDict()
+
+        self.stats = {"searches": 0, "local_answers": 0, "backfilled_answers": 0,
+                      "misses": 0, "ingested": 0, "evicted": 0, "seeded": 0}
+
+    # ---------- ingestion ----------
+
+    def add(self, item: Dict, media_type: str = None) -> bool:
+        """Insert or update one raw TMDB item. Returns False if it can't be indexed."""
+        if not item:
+            return False
+        item = dict(item)
+        if media_type:
+            item["media_type"] = media_type
+        item.setdefault("media_type", "movie")
+        if item["media_type"] not in ("movie", "tv") or not _item_title(item):
+            return False
+        key = _item_key(item)
+        if not key:
+            return False
+
+        with self._lock:
+            existing = self._docs.get(key)
+            if existing is not None:
+                item = {**existing, **{k: v for k, v in item.items() if v not in (None, "", [], {})}}
+                self._remove(key)
+            if item.get("id"):
+                self._drop_seed_duplicates(item)
+
+            # Genres may have been merged from several payloads
+            item["genre_mask"] = mask_from_ids(item.get("genre_ids"))
+            self._index(key, item)
+            self.stats["ingested"] += 1
+
+            while len(self._docs) > CATALOG_MAX_TITLES:
+                self._remove(next(iter(self._docs)))
+                self.stats["evicted"] += 1
+        return True
+
+    def add_many(self, items: Iterable[Dict], media_type: str = None) -> int:
+        """Upsert a batch of raw TMDB items (one API response)."""
+        return sum(1 for item in items or [] if self.add(item, media_type))
+
+    def seed_from_csv(self, path: str) -> int:
+        """Load the curated movies.csv (pipe-delimited) into the catalog."""
+        if not path or not os.path.exists(path):
+            return 0
+        count = 0
+        try:
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f, delimiter="|"):
+                    if self.add(_seed_item(row)):
+                        count += 1
+        except Exception as e:
+            print(f"Catalog seed error: {e}")
+        self.stats["seeded"] += count
+        return count
+
+    def _drop_seed_duplicates(self, item: Dict) -> None:
+        """A real TMDB item supersedes the seed row with the same title."""
+        for key in list(self._title_keys.get(normalize_title(_item_title(item)), ())):
+            seed = self._docs.get(key)
+            if seed and not seed.get("id") and seed.get("media_type") == item["media_type"]:
+                self._remove(key)
+
+    def _index(self, key: str, item: Dict) -> None:
+        title_tokens = tokenize(_item_title(item))
+        genre_names = [TMDB_GENRES[g] for g in item.get("genre_ids") or [] if g in TMDB_GENRES]
+        genre_tokens = tokenize(" ".join(genre_names))
+        overview_tokens = [t for t in tokenize(item.get("overview") or "") if t not in OVERVIEW_STOPWORDS]
+
+        counts: Dict[str, List[int]] = {}
+        for field, tokens in enumerate((title_tokens, genre_tokens, overview_tokens)):
+            for token in tokens:
+                counts.setdefault(token, [0, 0, 0])[field] += 1
+
+        for term, tfs in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._vocabulary_dirty = True
+            postings[key] = tuple(tfs)
+            if (tfs[0] or tfs[1]) and len(term) >= MIN_TYPO_LENGTH:
+                self._add_typo_term(term)
+
+        lengths = (len(title_tokens), len(genre_tokens), len(overview_tokens))
+        for field in range(3):
+            self._length_totals[field] += lengths[field]
+
+        normalized = " ".join(title_tokens)
+        self._docs[key] = item
+        self._doc_terms[key] = tuple(counts)
+        self._doc_lengths[key] = lengths
+        self._doc_titles[key] = normalized
+        self._title_keys.setdefault(normalized, set()).add(key)
+
+    def _remove(self, key: str) -> None:
+        self._docs.pop(key, None)
+        for term in self._doc_terms.pop(key, ()):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            tfs = postings.pop(key, None)
+            if tfs and (tfs[0] or tfs[1]) and term in self._typo_terms:
+                self._drop_typo_term(term)
+            if not postings:
+                del self._postings[term]
+                self._vocabulary_dirty = True
+
+        lengths = self._doc_lengths.pop(key, (0, 0, 0))
+        for field in range(3):
+            self._length_totals[field] -= lengths[field]
+
+        normalized = self._doc_titles.pop(key, None)
+        keys = self._title_keys.get(normalized) if normalized is not None else None
+        if keys:
+            keys.discard(key)
+            if not keys:
+                del self._title_keys[normalized]
+
+    def _add_typo_term(self, term: str) -> None:
+        count = self._typo_terms.get(term, 0)
+        self._typo_terms[term] = count + 1
+        if not count:
+            for variant in _deletes(term, _max_edits(term)):
+                self._typo_index.setdefault(variant, set()).add(term)
+
+    def _drop_typo_term(self, term: str) -> None:
+        """Forget a term's deletion variants once no title/genre uses it."""
+        count = self._typo_terms.pop(term) - 1
+        if count:
+            self._typo_terms[term] = count
+            return
+        for variant in _deletes(term, _max_edits(term)):
+            terms = self._typo_index.get(variant)
+            if terms:
+                terms.discard(term)
+                if not terms:
+                    del self._typo_index[variant]
+
+    # ---------- search ----------
+
+    def search(self, query: str, media_types: Iterable[str] = None, limit: int = 20) -> List[Dict]:
+        """Ranked raw TMDB items for a (possibly partial) query, best first."""
+        results, _ = self._search(query, media_types, limit)
+        return results
+
+    def lookup(self, query: str, media_types: Iterable[str] = None, limit: int = 20) -> Optional[List[Dict]]:
+        """
+        Answer a query locally if the catalog is good enough, else None.
+
+        None means "miss": ask TMDB, add_many() the response, then mark_backfilled().
+        """
+        self.stats["searches"] += 1
+        results, strong = self._search(query, media_types, limit)
+
+        if self._is_backfilled(query, media_types):
+            self.stats["backfilled_answers"] += 1
+            return results
+        if strong >= min(limit, CATALOG_MIN_LOCAL_HITS):
+            self.stats["local_answers"] += 1
+            return results
+
+        self.stats["misses"] += 1
+        return None
+
+    def suggest(self, prefix: str, limit: int = 5) -> List[str]:
+        """Distinct titles for a partial query (typeahead chips)."""
+        titles = []
+        for item in self.search(prefix, limit=limit * 2):
+            title = _item_title(item)
+            if title not in titles:
+                titles.append(title)
+        return titles[:limit]
+
+    def mark_backfilled(self, query: str, media_types: Iterable[str] = None) -> None:
+        """Remember that TMDB was asked for this query, so repeats stay local."""
+        with self._lock:
+            key = _query_key(query, media_types)
+            self._backfilled[key] = time.time() + CATALOG_BACKFILL_TTL
+            self._backfilled.move_to_end(key)
+            while len(self._backfilled) > CATALOG_MAX_TITLES:
+                self._backfilled.popitem(last=False)
+
+    def _is_backfilled(self, query: str, media_types: Iterable[str] = None) -> bool:
+        with self._lock:
+            key = _query_key(query, media_types)
+            expires_at = self._backfilled.get(key)
+            if expires_at is None:
+                return False
+            if time.time() >= expires_at:
+                del self._backfilled[key]
+                return False
+            return True
+
+    def _search(self, query: str, media_types: Iterable[str], limit: int) -> Tuple[List[Dict], int]:
+        """Returns (ranked items, number of titles matching every query term)."""
+        terms = tokenize(query)
+        if not terms:
+            return [], 0
+        types = set(media_types) if media_types else None
+
+        with self._lock:
+            doc_count = len(self._docs)
+            if not doc_count:
+                return [], 0
+            averages = [max(total / doc_count, 1.0) for total in self._length_totals]
+
+            scores: Dict[str, float] = {}
+            matched: Dict[str, int] = {}
+            title_hits: Set[str] = set()
+
+            for position, term in enumerate(terms):
+                best: Dict[str, float] = {}
+                for variant, weight in self._expand(term, prefix=position == len(terms) - 1):
+                    postings = self._postings.get(variant)
+                    if not postings:
+                        continue
+                    df = len(postings)
+                    idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                    for key, tfs in postings.items():
+                        if types and self._docs[key]["media_type"] not in types:
+                            continue
+                        score = weight * idf * _bm25(tfs, self._doc_lengths[key], averages)
+                        if score > best.get(key, 0.0):
+                            best[key] = score
+                        if tfs[0]:
+                            title_hits.add(key)
+                for key, score in best.items():
+                    scores[key] = scores.get(key, 0.0) + score
+                    matched[key] = matched.get(key, 0) + 1
+
+            if not scores:
+                return [], 0
+
+            normalized_query = " ".join(terms)
+            ranked = []
+            strong = 0
+            for key, score in scores.items():
+                coverage = matched[key] / len(terms)
+                score *= coverage * coverage
+                title = self._doc_titles[key]
+                if title == normalized_query:
+                    score *= 2.0
+                elif title.startswith(normalized_query):
+                    score *= 1.5
+                if coverage == 1.0 and key in title_hits:
+                    strong += 1
+                popularity = self._docs[key].get("popularity") or 0
+                ranked.append((score + 0.01 * math.log1p(popularity), key))
+
+            results = [dict(self._docs[key]) for _, key in heapq.nlargest(limit, ranked)]
+
+        return results, strong
+
+    def _expand(self, term: str, prefix: bool) -> List[Tuple[str, float]]:
+        """The index terms a query term should match, with their weights."""
+        expansions = {}
+        if term in self._postings:
+            expansions[term] = 1.0
+
+        if prefix and len(term) >= MIN_PREFIX_LENGTH:
+            if self._vocabulary_dirty:
+                self._vocabulary = sorted(self._postings)
+                self._vocabulary_dirty = False
+            vocabulary = self._vocabulary
+            candidates = []
+            i = bisect_left(vocabulary, term)
+            while i < len(vocabulary) and len(candidates) < MAX_PREFIX_SCAN and vocabulary[i].startswith(term):
+                if vocabulary[i] != term and vocabulary[i] in self._postings:
+                    candidates.append(vocabulary[i])
+                i += 1
+            candidates.sort(key=lambda t: len(self._postings[t]), reverse=True)
+            for candidate in candidates[:MAX_EXPANSIONS]:
+                expansions.setdefault(candidate, PREFIX_WEIGHT)
+
+        if term not in self._postings and len(term) >= MIN_TYPO_LENGTH:
+            limit = _max_edits(term)
+            candidates = set()
+            for variant in _deletes(term, limit):
+                candidates |= self._typo_index.get(variant, set())
+            verified = [c for c in candidates if c in self._postings and _edit_distance(term, c, limit) <= limit]
+            verified.sort(key=lambda t: len(self._postings[t]), reverse=True)
+            for candidate in verified[:MAX_EXPANSIONS]:
+                expansions.setdefault(candidate, TYPO_WEIGHT)
+
+        return list(expansions.items())
+
+    def get_stats(self) -> Dict[str, Any]:
+        searches = self.stats["searches"]
+        answered = self.stats["local_answers"] + self.stats["backfilled_answers"]
+        return {
+            **self.stats,
+            "local_rate": round(answered / searches, 3) if searches else 0.0,
+            "titles": len(self._docs),
+            "terms": len(self._postings),
+            "typo_variants": len(self._typo_index),
+        }
+
+
+def _bm25(tfs: Tuple[int, int, int], lengths: Tuple[int, int, int], averages: List[float]) -> float:
+    total = 0.0
+    for field in range(3):
+        tf = tfs[field]
+        if tf:
+            norm = 1 - BM25_B + BM25_B * lengths[field] / averages[field]
+            total += FIELD_WEIGHTS[field] * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+    return total
+
+
+def _query_key(query: str, media_types: Iterable[str] = None) -> tuple:
+    return normalize_title(query), tuple(sorted(media_types or ("movie", "tv")))
+
+
+def _seed_item(row: Dict[str, str]) -> Dict:
+    """movies.csv row -> TMDB-shaped item (poster/backdrop paths cut from the image URLs)."""
+    title = (row.get("Title") or "").strip()
+    poster = row.get("Poster") or ""
+    backdrop = row.get("Backdrop") or ""
+    try:
+        rating = float(row.get("Rating") or 0)
+    except ValueError:
+        rating = 0
+    return {
+        "id": None,
+        "_seed_key": f"csv:{normalize_title(title).replace(' ', '_')}",
+        "media_type": "movie",
+        "title": title,
+        "overview": row.get("Overview") or "",
+        "poster_path": "/" + poster.rsplit("/", 1)[-1] if poster else None,
+        "backdrop_path": "/" + backdrop.rsplit("/", 1)[-1] if backdrop else None,
+        "vote_average": rating,
+        "popularity": 0,
+        "genre_ids": [],
+        "watch_link": row.get("Link") or None,
+    }
+
+# --------------------------------------------------
+# 4. SHARED INSTANCE
+# --------------------------------------------------
+
+_catalog: Optional[TitleCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_title_catalog() -> TitleCatalog:
+    """Process-wide catalog shared by every Streamlit session (seeded on first use)."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                catalog = TitleCatalog()
+                catalog.seed_from_csv(CATALOG_SEED_CSV)
+                _catalog = catalog
+    return _catalog